@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Description:
+    Benchmark mtpy.processing.decimate against the chain of
+    scipy.signal.decimate calls MTTS.decimate used before, for the
+    4096 Hz -> 4 Hz decimation done by Z3DCollection.combine_z3d_files.
+
+Usage:
+    python -m benchmarks.bench_decimate [n_minutes] [dec_factor]
+
+Revision History:
+    LastUpdate:     19/10/2026
+"""
+
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import scipy.signal as signal
+
+import mtpy.processing.decimate as mtdecimate
+
+
+def legacy_decimate(data, dec_factor):
+    """
+    decimation as done by MTTS.decimate before the polyphase engine
+    """
+    if dec_factor > 8:
+        n_dec = np.log2(dec_factor) / np.log2(8)
+        dec_list = [8] * int(n_dec) + [int(2**(3 * n_dec % 1))]
+        decimated_data = signal.decimate(data, 8, n=8)
+        for dec in dec_list[1:]:
+            if dec == 0:
+                break
+            decimated_data = signal.decimate(decimated_data, dec, n=8)
+    else:
+        decimated_data = signal.decimate(data, dec_factor, n=8)
+
+    return decimated_data
+
+
+def measure(func, *args, **kwargs):
+    """
+    run func and return the result, run time in seconds and peak memory in MB
+    """
+    tracemalloc.start()
+    st = time.perf_counter()
+    result = func(*args, **kwargs)
+    et = time.perf_counter()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return result, et - st, peak / 2.**20
+
+
+def main(n_minutes=60, dec_factor=1024, sampling_rate=4096):
+    n_samples = int(n_minutes * 60 * sampling_rate)
+    t = np.arange(n_samples) / float(sampling_rate)
+    data = (np.sin(2 * np.pi * 0.1 * t) +
+            0.5 * np.random.randn(n_samples)).astype(np.float32)
+
+    # warm the filter cache so the design time is not counted
+    mtdecimate.get_filter_bank(dec_factor)
+
+    print('Decimating {0} samples by {1} ({2} stages {3})'.format(
+          n_samples, dec_factor, 'polyphase',
+          mtdecimate.get_decimation_stages(dec_factor)))
+
+    old, old_time, old_mem = measure(legacy_decimate, data, dec_factor)
+    print('    scipy.signal.decimate chain: {0:8.3f} s {1:10.1f} MB '
+          '{2} samples'.format(old_time, old_mem, old.size))
+
+    new, new_time, new_mem = measure(mtdecimate.decimate, data, dec_factor)
+    print('    polyphase float32:           {0:8.3f} s {1:10.1f} MB '
+          '{2} samples'.format(new_time, new_mem, new.size))
+
+    new64, new64_time, new64_mem = measure(mtdecimate.decimate, data,
+                                           dec_factor, dtype='float64')
+    print('    polyphase float64:           {0:8.3f} s {1:10.1f} MB '
+          '{2} samples'.format(new64_time, new64_mem, new64.size))
+
+    print('    speed up float32: {0:.1f}x'.format(old_time / new_time))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
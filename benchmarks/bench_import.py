@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""
+Description:
+    Benchmark the time to import mtpy modules, each one in a new
+    interpreter, and list the heavy optional modules they import.
+
+Usage:
+    python -m benchmarks.bench_import [n_repeats] [module ...]
+
+Revision History:
+    LastUpdate:     19/10/2026
+"""
+
+import json
+import subprocess
+import sys
+
+# modules that should only be imported when they are used
+LAZY_MODULES = ['scipy.stats', 'scipy.interpolate', 'osgeo', 'pyproj',
+                'matplotlib.pyplot', 'geopandas']
+
+DEFAULT_MODULES = ['mtpy', 'mtpy.utils.gis_tools', 'mtpy.core.mt',
+                   'mtpy.modeling.modem']
+
+_TIMER = """
+import json, sys, time
+st = time.perf_counter()
+import {module}
+et = time.perf_counter()
+import mtpy.utils
+print(json.dumps({{'time': et - st,
+                  'epsg_read': mtpy.utils.EPSG_DICT.is_loaded,
+                  'lazy': [m for m in {lazy} if m in sys.modules]}}))
+"""
+
+
+def time_import(module):
+    """
+    import module in a new interpreter
+
+    :returns: dictionary of the import time in seconds, whether the EPSG table
+              was read and the lazy modules that were imported
+    """
+    output = subprocess.check_output(
+        [sys.executable, '-c', _TIMER.format(module=module, lazy=LAZY_MODULES)],
+        stderr=subprocess.DEVNULL)
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def main(n_repeats=5, modules=None):
+    if not modules:
+        modules = DEFAULT_MODULES
+
+    for module in modules:
+        results = [time_import(module) for ii in range(n_repeats)]
+        times = sorted(result['time'] for result in results)
+        print('{0:<24} best {1:7.3f} s median {2:7.3f} s EPSG read: {3} '
+              'imported: {4}'.format(module, times[0], times[len(times) // 2],
+                                     results[0]['epsg_read'],
+                                     ', '.join(results[0]['lazy']) or '-'))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5, sys.argv[2:])
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+"""
+Description:
+    Benchmark the peak memory of handling a large ModEM resistivity model:
+    reading the model file, finding the cells of a slice through the model
+    as PlotSlices does and adding air layers for topography.  The way each
+    was done before is compared with float64, float32 and memory mapped
+    models.  Memory mapped pages are not allocated by python, so they are
+    not part of the peak memory.
+
+Usage:
+    python -m benchmarks.bench_model_memory [n_north] [n_east] [n_z]
+
+Revision History:
+    LastUpdate:     19/10/2026
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from benchmarks import synthetic
+from benchmarks.bench_decimate import measure
+
+from mtpy.modeling.modem import Model
+from mtpy.utils.mesh_tools import get_nearest_cells, grid_centre
+
+
+def legacy_read_res_model(model_fn):
+    """
+    read the resistivity of a model file as Model.read_model_file did before
+    it was read a layer at a time
+    """
+    with open(model_fn, 'r') as ifid:
+        ilines = ifid.readlines()
+
+    nsize = ilines[1].strip().split()
+    n_north, n_east, n_z = [int(nn) for nn in nsize[:3]]
+    res_model = np.zeros((n_north, n_east, n_z))
+
+    count_z = 0
+    line_index = 6
+    count_e = 0
+    while count_z < n_z:
+        iline = ilines[line_index].strip().split()
+        if len(iline) == 0:
+            count_z += 1
+            count_e = 0
+        elif (len(iline) == 3) & (count_z == n_z - 1):
+            count_z += 1
+            count_e = 0
+        else:
+            res_model[:, count_e, count_z] = np.array([float(nres) for nres in iline])[::-1]
+            count_e += 1
+        line_index += 1
+
+    return np.e ** res_model
+
+
+def read_model(model_fn, **kwargs):
+    model_obj = Model(**kwargs)
+    with contextlib.redirect_stdout(io.StringIO()):
+        model_obj.read_model_file(model_fn)
+    return model_obj
+
+
+def legacy_nearest_cells(model_obj, xyz):
+    """
+    nearest cells as PlotSlices found them before, from a Kd-Tree of the
+    meshgridded cell centres
+    """
+    mgx, mgy, mgz = np.meshgrid(grid_centre(model_obj.grid_east),
+                                grid_centre(model_obj.grid_north),
+                                grid_centre(model_obj.grid_z))
+    tree = cKDTree(np.vstack([mgx.flatten(), mgy.flatten(), mgz.flatten()]).T)
+    return model_obj.res_model.flatten()[tree.query(xyz, k=1)[1]]
+
+
+def nearest_cells(model_obj, xyz):
+    flat_index = get_nearest_cells([grid_centre(model_obj.grid_north),
+                                    grid_centre(model_obj.grid_east),
+                                    grid_centre(model_obj.grid_z)],
+                                   xyz[:, [1, 0, 2]], k=1)[1]
+    return model_obj.res_model.ravel()[flat_index]
+
+
+def legacy_add_air_layers(res_model, n_air_layers, res_initial_value=100.):
+    """
+    the resistivity model with air layers on top as add_topography_to_model2
+    made it before
+    """
+    shape = (res_model.shape[0], res_model.shape[1], res_model.shape[2] + n_air_layers)
+    new_res_model = np.ones(shape) * res_initial_value
+    new_res_model[:, :, n_air_layers:] = res_model
+    return new_res_model
+
+
+def add_air_layers(model_obj, n_air_layers, res_initial_value=100.):
+    shape = model_obj.res_model.shape
+    model_obj.res_model = model_obj._allocate_res_model(
+        (shape[0], shape[1], shape[2] + n_air_layers), res_initial_value,
+        np.s_[:, :, n_air_layers:])
+    return model_obj.res_model
+
+
+def report(name, result_time_mem):
+    print('    {0:<36} {1:8.3f} s {2:10.1f} MB'.format(name, *result_time_mem[1:]))
+    return result_time_mem[0]
+
+
+def main(n_north=160, n_east=160, n_z=80, n_air_layers=20):
+    save_dir = tempfile.mkdtemp(prefix='mtpy_bench_')
+    try:
+        model_fn = synthetic.make_modem_model(save_dir, n_north=n_north, n_east=n_east,
+                                              n_z=n_z)
+        n_cells = n_north * n_east * n_z
+        print('Model of {0} x {1} x {2} cells, {3:.1f} MB as float64, file of '
+              '{4:.1f} MB'.format(n_north, n_east, n_z, n_cells * 8 / 2.**20,
+                                  os.path.getsize(model_fn) / 2.**20))
+
+        print('read_model_file')
+        report('before, lines then float64', measure(legacy_read_res_model, model_fn))
+        model_obj = report('float64', measure(read_model, model_fn))
+        model32 = report('float32', measure(read_model, model_fn, res_dtype=np.float32))
+        npy_fn = os.path.join(save_dir, 'res_model.npy')
+        model_mm = report('float32 memory mapped',
+                          measure(read_model, model_fn, res_dtype=np.float32,
+                                  res_model_npy_fn=npy_fn))
+
+        print('nearest cells of a vertical slice')
+        random_state = np.random.RandomState(0)
+        n_points = n_east * n_z
+        xyz = np.column_stack([np.linspace(model_obj.grid_east[0], model_obj.grid_east[-1], n_points),
+                               random_state.uniform(model_obj.grid_north[0],
+                                                    model_obj.grid_north[-1], n_points),
+                               np.repeat(grid_centre(model_obj.grid_z), n_east)])
+        report('before, meshgrid and Kd-Tree', measure(legacy_nearest_cells, model_obj, xyz))
+        report('float64, 1-D axes', measure(nearest_cells, model_obj, xyz))
+        report('float32, 1-D axes', measure(nearest_cells, model32, xyz))
+
+        print('add {0} air layers'.format(n_air_layers))
+        report('before, np.ones * value',
+               measure(legacy_add_air_layers, model_obj.res_model, n_air_layers))
+        report('float64', measure(add_air_layers, model_obj, n_air_layers))
+        report('float32', measure(add_air_layers, model32, n_air_layers))
+        report('float32 memory mapped', measure(add_air_layers, model_mm, n_air_layers))
+        del model_mm
+    finally:
+        shutil.rmtree(save_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
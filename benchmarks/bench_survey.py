@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+"""
+Description:
+    Benchmark the hot paths of reading, interpolating, converting and
+    writing a synthetic survey: EDI parsing, MT.interpolate, z2pt, ModEM
+    data and model files, Z3D and NIMS readers and processing.tf.stft.
+    The run time and peak memory of every operation are reported, the
+    survey is made by benchmarks.synthetic in a temporary directory so
+    nothing needs to be downloaded.
+
+Usage:
+    python -m benchmarks.bench_survey [n_stations] [n_periods] [n_seconds]
+
+Revision History:
+    LastUpdate:     19/10/2026
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+from benchmarks import synthetic
+from benchmarks.bench_decimate import measure
+
+import mtpy.analysis.pt as mtpt
+import mtpy.core.edi as mtedi
+import mtpy.processing.tf as tf
+from mtpy.core.mt import MT
+from mtpy.modeling.modem import Data, Model
+from mtpy.usgs import nims, zen
+
+
+def quiet(func):
+    """
+    run func without the progress the readers print
+    """
+    def wrapper(*args, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def read_edi_files(edi_list):
+    edi_objs = []
+    for edi_fn in edi_list:
+        edi_obj = mtedi.Edi()
+        edi_obj.read_edi_file(edi_fn)
+        edi_objs.append(edi_obj)
+    return edi_objs
+
+
+def interpolate(mt_list, new_freq):
+    return [mt_obj.interpolate(new_freq) for mt_obj in mt_list]
+
+
+def read_data_file(data_fn):
+    data_obj = Data()
+    data_obj.read_data_file(data_fn)
+    return data_obj
+
+
+def read_model_file(model_fn):
+    model_obj = Model()
+    model_obj.read_model_file(model_fn)
+    return model_obj
+
+
+def read_z3d(z3d_fn):
+    z3d_obj = zen.Zen3D(z3d_fn)
+    z3d_obj.read_z3d()
+    return z3d_obj
+
+
+def report(name, n_items, unit, result_time_mem):
+    run_time, peak = result_time_mem[1:]
+    print('    {0:<24} {1:8.3f} s {2:9.1f} MB {3:12.1f} {4}/s'.format(
+          name, run_time, peak, n_items / run_time, unit))
+    return result_time_mem[0]
+
+
+def main(n_stations=20, n_periods=40, n_seconds=600, save_dir=None):
+    remove_dir = save_dir is None
+    if save_dir is None:
+        save_dir = tempfile.mkdtemp(prefix='mtpy_bench_')
+
+    try:
+        print('Making a survey of {0} stations, {1} periods and {2} s of '
+              'time series in {3}'.format(n_stations, n_periods, n_seconds, save_dir))
+        with contextlib.redirect_stdout(io.StringIO()):
+            edi_list = synthetic.make_edi_collection(os.path.join(save_dir, 'edi'),
+                                                     n_stations=n_stations,
+                                                     n_periods=n_periods)
+            data_obj = synthetic.make_modem_data(save_dir, edi_list,
+                                                 n_periods=n_periods // 2)
+            n_cells = int(round((n_stations * 200.) ** (1 / 3.)))
+            model_fn = synthetic.make_modem_model(save_dir, n_north=2 * n_cells,
+                                                  n_east=2 * n_cells, n_z=n_cells)
+            z3d_fn = synthetic.make_z3d_file(os.path.join(save_dir, 'synthetic.Z3D'),
+                                             n_seconds=n_seconds)
+            nims_fn = synthetic.make_nims_file(os.path.join(save_dir, 'DATA.BIN'),
+                                               n_seconds=max(n_seconds, 600))
+        n_data = np.count_nonzero(data_obj.data_array['z'].real) + \
+            np.count_nonzero(data_obj.data_array['tip'].real)
+
+        print('{0:<28} {1:>10} {2:>12} {3:>16}'.format('operation', 'time',
+                                                       'peak memory', 'throughput'))
+        report('Edi.read_edi_file', n_stations, 'stations',
+               measure(read_edi_files, edi_list))
+
+        mt_list = [MT(edi_fn) for edi_fn in edi_list]
+        new_freq = np.logspace(2.5, -2.5, n_periods)
+        report('MT.interpolate', n_stations, 'stations',
+               measure(quiet(interpolate), mt_list, new_freq))
+
+        # z2pt is called tensor by tensor when a PhaseTensor is made from Z
+        z_array = np.vstack([mt_obj.Z.z for mt_obj in mt_list])
+        z_err_array = np.vstack([mt_obj.Z.z_err for mt_obj in mt_list])
+        report('PhaseTensor (z2pt)', z_array.shape[0], 'tensors',
+               measure(quiet(mtpt.PhaseTensor), z_array=z_array, z_err_array=z_err_array))
+
+        report('Data.write_data_file', n_data, 'data',
+               measure(quiet(data_obj.write_data_file), save_path=save_dir,
+                       fn_basename='ModEM_Data.dat', fill=False))
+        report('Data.read_data_file', n_data, 'data',
+               measure(quiet(read_data_file), data_obj.data_fn))
+
+        model_obj = report('Model.read_model_file', 4 * n_cells ** 3, 'cells',
+                           measure(quiet(read_model_file), model_fn))
+
+        z3d_obj = report('Zen3D.read_z3d', n_seconds, 'seconds',
+                         measure(quiet(read_z3d), z3d_fn))
+        report('NIMS.read_nims', max(n_seconds, 600), 'seconds',
+               measure(quiet(nims.NIMS), nims_fn))
+
+        ts_data = z3d_obj.ts_obj.ts.data.values
+        report('tf.stft', ts_data.size, 'samples',
+               measure(tf.stft, ts_data, nh=2 ** 8, tstep=2 ** 7, nfbins=2 ** 9,
+                       df=z3d_obj.df))
+        del model_obj
+    finally:
+        if remove_dir:
+            shutil.rmtree(save_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,277 @@
+#!/usr/bin/env python
+"""
+Description:
+    Generators of synthetic surveys of a given size for the benchmarks:
+    EDI collections, ModEM data and model files, Z3D files and NIMS
+    DATA.BIN files.  Everything is made from a seeded random state, so a
+    survey of the same size is the same survey.
+
+    * make_edi_collection : EDI files of a grid of stations
+    * make_modem_data : ModEM data file of an EDI collection
+    * make_modem_model : ModEM model file of a given mesh size
+    * make_z3d_file : Z3D file of a single channel
+    * make_nims_file : NIMS DATA.BIN file of 8 Hz data
+
+Usage:
+    >>> from benchmarks import synthetic
+    >>> edi_list = synthetic.make_edi_collection(save_dir, n_stations=50)
+
+Revision History:
+    LastUpdate:     19/10/2026
+"""
+
+import datetime
+import os
+
+import numpy as np
+
+from mtpy.core.mt import MT
+from mtpy.core import z as mtz
+
+# GPS week of the synthetic Z3D files and the start of the recordings
+GPS_EPOCH = datetime.datetime(1980, 1, 6)
+START_TIME = datetime.datetime(2020, 3, 1, 8, 0, 0)
+GPS_LEAP_SECONDS = 18
+
+
+def synthetic_z(freq, random_state, rho=100.):
+    """
+    impedance tensors of a rotated, mildly 2D half space with noise
+
+    :returns: z_array, z_err_array of shape (n_freq, 2, 2)
+    """
+    omega = 2 * np.pi * freq
+    # impedance of a half space in [mV/km]/[nT]
+    z_half = np.sqrt(1j * omega * 4e-7 * np.pi * rho) * 796.
+    z_array = np.zeros((freq.size, 2, 2), dtype=np.complex128)
+    z_array[:, 0, 1] = z_half * random_state.uniform(0.8, 1.25)
+    z_array[:, 1, 0] = -z_half * random_state.uniform(0.8, 1.25)
+    z_array[:, 0, 0] = 0.05 * z_half * random_state.normal()
+    z_array[:, 1, 1] = -0.05 * z_half * random_state.normal()
+    z_array *= 1 + 0.02 * (random_state.normal(size=z_array.shape) +
+                           1j * random_state.normal(size=z_array.shape))
+    return z_array, 0.05 * np.abs(z_array)
+
+
+def make_edi_collection(save_dir, n_stations=20, n_periods=40, seed=0,
+                        lat0=-30., lon0=135., spacing=0.02):
+    """
+    write EDI files of a square grid of stations
+
+    :param save_dir: directory to write the files to
+    :param n_stations: number of stations
+    :param n_periods: number of periods of each station, 1e-3 to 1e3 s
+    :param seed: seed of the random state
+    :param lat0, lon0: south west corner of the grid in decimal degrees
+    :param spacing: station spacing in decimal degrees
+
+    :returns: list of the EDI files
+    """
+    if not os.path.isdir(save_dir):
+        os.makedirs(save_dir)
+    random_state = np.random.RandomState(seed)
+    freq = np.logspace(3, -3, n_periods)
+    n_columns = int(np.ceil(np.sqrt(n_stations)))
+
+    edi_list = []
+    for ss in range(n_stations):
+        mt_obj = MT()
+        mt_obj.station = 'SYN{0:04}'.format(ss)
+        mt_obj.lat = lat0 + spacing * (ss // n_columns)
+        mt_obj.lon = lon0 + spacing * (ss % n_columns)
+        mt_obj.elev = random_state.uniform(0, 500)
+
+        z_array, z_err_array = synthetic_z(freq, random_state,
+                                           rho=10 ** random_state.uniform(0, 3))
+        mt_obj.Z = mtz.Z(z_array=z_array, z_err_array=z_err_array, freq=freq)
+        tipper = 0.1 * (random_state.normal(size=(freq.size, 1, 2)) +
+                        1j * random_state.normal(size=(freq.size, 1, 2)))
+        mt_obj.Tipper = mtz.Tipper(tipper_array=tipper,
+                                   tipper_err_array=np.full(tipper.shape, 0.02),
+                                   freq=freq)
+        edi_list.append(mt_obj.write_mt_file(save_dir=save_dir,
+                                             fn_basename=mt_obj.station))
+    return edi_list
+
+
+def make_modem_data(save_dir, edi_list, n_periods=20, epsg=28353):
+    """
+    write a ModEM data file (full impedance and tipper) of an EDI collection
+
+    :returns: modem.Data object, its data_fn is the data file
+    """
+    from mtpy.modeling.modem import Data
+
+    data_obj = Data(edi_list=edi_list, period_list=np.logspace(-2, 2, n_periods),
+                    epsg=epsg, inv_mode='1')
+    data_obj.write_data_file(save_path=save_dir, fn_basename='ModEM_Data.dat')
+    return data_obj
+
+
+def make_modem_model(save_dir, n_north=60, n_east=60, n_z=40, seed=0):
+    """
+    write a ModEM model file of a mesh of n_north x n_east x n_z cells with a
+    random resistivity model
+
+    :returns: name of the model file
+    """
+    from mtpy.modeling.modem import Model
+
+    random_state = np.random.RandomState(seed)
+    model_obj = Model()
+    model_obj.write_model_file(save_path=save_dir,
+                               model_fn_basename='ModEM_Model_File.rho',
+                               nodes_north=np.full(n_north, 500.),
+                               nodes_east=np.full(n_east, 500.),
+                               nodes_z=np.logspace(1, 4, n_z),
+                               res_model=10 ** random_state.uniform(0, 3, (n_north, n_east, n_z)))
+    return model_obj.model_fn
+
+
+def make_z3d_file(fn, n_seconds=600, sampling_rate=256, component='ex',
+                  station='100', seed=0):
+    """
+    write a Z3D file of a single channel, n_seconds blocks of sampling_rate
+    samples each preceded by a GPS stamp
+
+    :returns: fn
+    """
+    random_state = np.random.RandomState(seed)
+    gps_dtype = np.dtype([('flag0', np.int32), ('flag1', np.int32),
+                          ('time', np.int32), ('lat', np.float64),
+                          ('lon', np.float64), ('num_sat', np.int32),
+                          ('gps_sens', np.int32), ('temperature', np.float32),
+                          ('voltage', np.float32), ('num_fpga', np.int32),
+                          ('num_adc', np.int32), ('pps_count', np.int32),
+                          ('dac_tune', np.int32), ('block_len', np.int32)])
+
+    gps_seconds = (START_TIME - GPS_EPOCH).total_seconds() + GPS_LEAP_SECONDS
+    gps_week = int(gps_seconds // 604800)
+    week_seconds = gps_seconds - gps_week * 604800
+
+    header = '\n'.join(['GPS Brd339/Brd357 Metadata',
+                        'Version = 4147',
+                        'Main.hex Buildnum = 5357',
+                        'ChannelSerial = 0xD474777C',
+                        'Box number = 24',
+                        'Channel = 1',
+                        'A/D Gain = 1',
+                        'A/D Rate = {0}'.format(sampling_rate),
+                        'GpsWeek = {0}'.format(gps_week),
+                        'Lat = {0:.10f}'.format(np.deg2rad(-30.)),
+                        'Long = {0:.10f}'.format(np.deg2rad(135.)),
+                        'Alt = 100.0',
+                        'NumSats = 9', ''])
+    schedule_str = '\n'.join(['\n\nSchedule.Date = {0}'.format(START_TIME.strftime('%Y-%m-%d')),
+                              'Schedule.Time = {0}'.format(START_TIME.strftime('%H:%M:%S')),
+                              'Schedule.Sync = 1', 'Schedule.S/R = {0}'.format(sampling_rate),
+                              ''])
+    metadata = ('\n\nGPS Metadata record 1 | rx.stn={0}|'
+                'ch.stn={0}|ch.cmp={1}|ch.azimuth=0|ch.length=100.0|'
+                'ch.number=2314|job.name=synthetic|'.format(station, component))
+
+    # the reader skips the 3 stamps before the start time
+    n_seconds += 3
+    stamps = np.zeros(n_seconds, dtype=gps_dtype)
+    stamps['flag0'] = 2147483647
+    stamps['flag1'] = -2147483648
+    stamps['time'] = ((week_seconds - 3 + np.arange(n_seconds)) * 1024).astype(np.int32)
+    stamps['lat'] = np.deg2rad(-30.)
+    stamps['lon'] = np.deg2rad(135.)
+    stamps['num_sat'] = 9
+    stamps['block_len'] = sampling_rate
+    stamps['block_len'][0] = 0
+
+    t = np.arange(n_seconds * sampling_rate) / float(sampling_rate)
+    counts = (1e6 * np.sin(2 * np.pi * 0.5 * t) +
+              1e5 * random_state.normal(size=t.size)).astype(np.int32)
+    # zeros are dropped by the reader and the flags mark the stamps
+    counts[(counts == 0) | (counts == 2147483647)] = 1
+    blocks = np.hstack([stamps.view(np.int32).reshape(n_seconds, -1),
+                        counts.reshape(n_seconds, sampling_rate)])
+
+    with open(fn, 'wb') as fid:
+        fid.write(header.encode().ljust(512, b'\x00'))
+        fid.write(schedule_str.encode().ljust(512, b'\x00'))
+        fid.write(metadata.encode().ljust(512, b'\x00'))
+        fid.write(blocks.astype('<i4').tobytes())
+
+    return fn
+
+
+def _nims_gps_strings(time_stamp, lat='3000.0000', lon='13500.0000'):
+    """GPRMC and GPGGA strings of a time stamp"""
+    gprmc = 'GPRMC,{0},A,{1},S,{2},E,000.0,000.0,{3},008.0,E*'.format(
+        time_stamp.strftime('%H%M%S'), lat, lon, time_stamp.strftime('%d%m%y'))
+    gpgga = 'GPGGA,{0},{1},S,{2},E,1,08,1.0,100.0,M,0.0,M,,*'.format(
+        time_stamp.strftime('%H%M%S'), lat, lon)
+    return gprmc, gpgga
+
+
+def make_nims_file(fn, n_seconds=3600, lock_interval=300, seed=0):
+    """
+    write a NIMS DATA.BIN file of 8 Hz data, the GPS locks every
+    lock_interval seconds with the GPRMC stamp 2 blocks and the GPGGA stamp
+    74 blocks after the lock.
+
+    :returns: fn
+    """
+    random_state = np.random.RandomState(seed)
+    block_size = 131
+    n_blocks = n_seconds
+
+    header = '\r'.join(['>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>',
+                        '>>>user field>>>>>>>>>>>>>>>>>>>>>>>>>>>>',
+                        'SITE NAME: Synthetic',
+                        'STATE/PROVINCE: SA',
+                        'COUNTRY: AUS',
+                        '"001a"  <-- 2CHAR EXPERIMENT CODE + 3 CHAR SITE CODE + RUN LETTER',
+                        '1105-3; 1305-3  <-- SYSTEM BOX I.D.; MAG HEAD ID (if different)',
+                        '100  0 <-- N-S Ex WIRE LENGTH (m); HEADING (deg E mag N)',
+                        '100  90 <-- E-W Ey WIRE LENGTH (m); HEADING (deg E mag N)',
+                        'GPS INFO: {0} 3000.0000 S 13500.0000 E 100.0'.format(
+                            START_TIME.strftime('%d/%m/%y %H:%M:%S')),
+                        'OPERATOR: MTpy',
+                        'COMMENTS: synthetic survey',
+                        ' '])
+
+    blocks = np.zeros((n_blocks, block_size), dtype=np.uint8)
+    blocks[:, 0] = 1
+    blocks[:, 1] = block_size
+    blocks[:, 2] = 1
+    blocks[:, 4] = np.arange(n_blocks) % 256
+    # electronics and box temperature of 25 C
+    temp = 25 * 70 + 18048
+    blocks[:, [5, 7]] = temp // 256
+    blocks[:, [6, 8]] = temp % 256
+    blocks[:, 130] = 255
+
+    gps_chars = np.zeros(n_blocks, dtype=np.uint8)
+    for lock in range(1, n_blocks - 150, lock_interval):
+        blocks[lock, 2] = 0
+        gprmc, gpgga = _nims_gps_strings(START_TIME + datetime.timedelta(seconds=lock))
+        for start, stamp in [(lock + 2, gprmc), (lock + 74, gpgga)]:
+            stamp = np.frombuffer(('$' + stamp).encode(), dtype=np.uint8)
+            gps_chars[start:start + stamp.size] = stamp
+    blocks[:, 3] = gps_chars
+
+    # 24 bit samples of 3 magnetic and 2 electric channels
+    t = np.arange(n_blocks * 8) / 8.
+    for cc in range(5):
+        counts = (1e5 * np.sin(2 * np.pi * t / (100. * (cc + 1))) +
+                  1e3 * random_state.normal(size=t.size)).astype(np.int64)
+        counts = (counts % 16777216).reshape(n_blocks, 8)
+        for kk in range(8):
+            if cc < 3:
+                index = 9 + kk * 9 + cc * 3
+            else:
+                index = 82 + kk * 6 + (cc - 3) * 3
+            blocks[:, index] = counts[:, kk] // 65536
+            blocks[:, index + 1] = (counts[:, kk] // 256) % 256
+            blocks[:, index + 2] = counts[:, kk] % 256
+
+    with open(fn, 'wb') as fid:
+        fid.write(header.encode())
+        fid.write(blocks.tobytes())
+
+    return fn
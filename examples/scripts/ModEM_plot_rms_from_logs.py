@@ -1,12 +1,12 @@
 #! /usr/bin/env python
 """
-Provide a directory containing ModEm logfiles to have them
-joined into a single file. This joint logfile is saved as
-'{directory_name}.log'.
+Provide a directory containing ModEm logfiles to plot the
+values of all of them. The values are kept in the RMS history
+of the directory, 'rms_history.npz', and only the logfiles
+that are new or changed since the last plot are read.
 
-Logfiles are sorted alphanumerically before they are
-joined, so ensure the files in the directory are named
-correctly to achieve the desired ordering.
+Logfiles are taken in name order, so ensure the files in the
+directory are named correctly to achieve the desired ordering.
 
 By default, the 'rms' value is plotted, but any value that
 appears in the logfile per iteration as '{metric}={value}'
@@ -40,11 +40,11 @@ if __name__ == "__main__":
         'dpi': None
     }
 
-    logfile = plot_rms_iterations.concatenate_log_files(path)
-    metrics = plot_rms_iterations.read(logfile)
+    # the values are kept in the RMS history of the directory, so only the
+    # log files that changed since the last plot are read
+    metrics = plot_rms_iterations.read_history(path)
     figure = plot_rms_iterations.plot(metric, metrics[metric], **plot_kwargs)
     plotfile = os.path.join(path, metric + '.png')
     figure.savefig(plotfile)
     print("Complete!")
-    print("Concatenated logfile: {}".format(logfile))
     print("Plot: {}".format(plotfile))
@@ -31,17 +31,25 @@ set det(D) = P and det(D) = T, where P,T can be chosen. Common choice is to
 set  one of P,T to an arbitrary value (e.g. 1). Then check, for which values
 of the other parameter  S^2 = T^2+4*P*X_12*X_21/det(X) > 0 holds.
 
+SurveyDistortion estimates and removes the distortion of all the stations
+of a survey at once.  get_distortion_tensors and average_distortion are the
+per-frequency estimate and the frequency average of find_distortion for
+stacks of impedance tensors (..., n_freq, 2, 2).
+
 @UofA, 2013  (LK)
 
 Edited by JP, 2016
 
 """
 
+import concurrent.futures
 import copy
+import os
 
 import numpy as np
 
 import mtpy.analysis.geometry as MTge
+import mtpy.analysis.strike as MTstrike
 import mtpy.core.z as MTz
 import mtpy.utils.calculator as MTcc
 import mtpy.utils.exceptions as MTex
@@ -105,160 +113,16 @@ def find_distortion(z_object, g='det', num_freq=None, lo_dims=None):
                   z_object.z_err[0:num_freq],
                   z_object.freq[0:num_freq])
 
-    g = 'det'
-
-    dim_arr = MTge.dimensionality(z_object=z_obj)
-    st_arr = -1 * MTge.strike_angle(z_object=z_obj)[:, 0]
-
-    dis = np.zeros_like(z_obj.z, dtype=np.float)
-    dis_err = np.ones_like(z_obj.z, dtype=np.float)
-
-    #dictionary of values that should be no distortion in case distortion
-    #cannot be calculated for that component
-    rot_mat = np.matrix([[0, -1], [1, 0]])
-    for idx, dim in enumerate(dim_arr):
-        if np.any(z_obj.z[idx] == 0.0 + 0.0j) == True:
-            dis[idx] = np.identity(2)
-            print('Found a zero in z at {0}, skipping'.format(idx))
-            continue
-
-        if dim == 1:
-
-            if g in ['01', '10']:
-                gr = np.abs(z_obj.z.real[idx, int(g[0]), int(g[1])])
-                gi = np.abs(z_obj.z.imag[idx, int(g[0]), int(g[1])])
-            else:
-                gr = np.sqrt(np.linalg.det(z_obj.z.real[idx]))
-                gi = np.sqrt(np.linalg.det(z_obj.z.imag[idx]))
-
-            dis[idx] = np.mean(np.array([(1. / gr * np.dot(z_obj.z.real[idx],
-                                                           rot_mat)),
-                                         (1. / gi * np.dot(z_obj.z.imag[idx],
-                                                           rot_mat))]),
-                               axis=0)
-
-            if z_obj.z_err is not None:
-                # find errors of entries for calculating weights
-
-                gr_err = 1. / gr * np.abs(z_obj.z_err[idx])
-                gr_err[np.where(gr_err == 0.0)] = 1.0
-
-                gi_err = 1. / gi * np.abs(z_obj.z_err[idx])
-                gi_err[np.where(gi_err == 0.0)] = 1.0
-
-                dis_err[idx] = np.mean(np.array([gi_err, gr_err]),
-                                       axis=0)
-
-        elif dim == 2:
-            P = 1
-            strike_ang = st_arr[idx]
-            if np.isnan(strike_ang):
-                strike_ang = 0.0
-
-            if z_obj.z_err is not None:
-                err_arr = z_obj.z_err[idx]
-                err_arr[np.where(err_arr == 0.0)] = 1.0
-            else:
-                err_arr = None
-
-            tetm_arr, tetm_err = MTcc.rotatematrix_incl_errors(z_obj.z[idx],
-                                                               strike_ang,
-                                                               inmatrix_err=err_arr)
-
-            tetm_r = tetm_arr.real
-            tetm_i = tetm_arr.imag
-            t_arr_r = -4 * P * tetm_r[0, 1] * tetm_r[1, 0] / np.linalg.det(tetm_r)
-            t_arr_i = -4 * P * tetm_i[0, 1] * tetm_i[1, 0] / np.linalg.det(tetm_i)
-
-            try:
-                T = np.sqrt(max([t_arr_r, t_arr_i])) + .001
-            except ValueError:
-                T = 2
-
-            sr = np.sqrt(T ** 2 + 4 * P * tetm_r[0, 1] * tetm_r[1, 0] / np.linalg.det(tetm_r))
-            si = np.sqrt(T ** 2 + 4 * P * tetm_i[0, 1] * tetm_i[1, 0] / np.linalg.det(tetm_i))
-
-            par_r = 2 * tetm_r[0, 1] / (T - sr)
-            orth_r = 2 * tetm_r[1, 0] / (T + sr)
-            par_i = 2 * tetm_i[0, 1] / (T - si)
-            orth_i = 2 * tetm_i[1, 0] / (T + si)
-
-            mat2_r = np.matrix([[0, 1. / orth_r], [1. / par_r, 0]])
-            mat2_i = np.matrix([[0, 1. / orth_i], [1. / par_i, 0]])
-
-            avg_mat = np.mean(np.array([np.dot(tetm_r, mat2_r),
-                                        np.dot(tetm_i, mat2_i)]),
-                              axis=0)
-
-            dis[idx] = avg_mat
-
-            if err_arr is not None:
-                # find errors of entries for calculating weights
-                sigma_sr = np.sqrt((-(2 * P * tetm_r[0, 1] * tetm_r[1, 0] * \
-                                      tetm_r[1, 1] * err_arr[0, 0]) / \
-                                    (np.linalg.det(tetm_r) ** 2 * sr)) ** 2 + \
-                                   ((2 * P * tetm_r[0, 0] * tetm_r[1, 0] *
-                                     tetm_r[1, 1] * err_arr[0, 1]) /
-                                    (np.linalg.det(tetm_r) ** 2 * sr)) ** 2 + \
-                                   ((2 * P * tetm_r[0, 0] * tetm_r[0, 1] *
-                                     tetm_r[1, 1] * err_arr[1, 0]) / \
-                                    (np.linalg.det(tetm_r) ** 2 * sr)) ** 2 + \
-                                   (-(2 * P * tetm_r[0, 1] * tetm_r[1, 0] * \
-                                      tetm_r[0, 0] * err_arr[1, 1]) / \
-                                    (np.linalg.det(tetm_r) ** 2 * sr)) ** 2)
-
-                sigma_dr_11 = 0.5 * sigma_sr
-                sigma_dr_22 = 0.5 * sigma_sr
-
-                sigma_dr_12 = np.sqrt((mat2_r[0, 1] / tetm_r[0, 0] * err_arr[0, 0]) ** 2 + \
-                                      (mat2_r[0, 1] / tetm_r[1, 0] * err_arr[1, 0]) ** 2 + \
-                                      (0.5 * tetm_r[0, 0] / tetm_r[1, 0] * sigma_sr) ** 2)
-                sigma_dr_21 = np.sqrt((mat2_r[1, 0] / tetm_r[1, 1] * err_arr[1, 1]) ** 2 + \
-                                      (mat2_r[1, 0] / tetm_r[0, 1] * err_arr[0, 1]) ** 2 + \
-                                      (0.5 * tetm_r[1, 1] / tetm_r[0, 1] * sigma_sr) ** 2)
-
-                dis_err_r = np.array([[sigma_dr_11, sigma_dr_12],
-                                      [sigma_dr_21, sigma_dr_22]])
-
-                sigma_si = np.sqrt((-(2 * P * tetm_i[0, 1] * tetm_i[1, 0] * \
-                                      tetm_i[1, 1] * err_arr[0, 0]) / \
-                                    (np.linalg.det(tetm_i) ** 2 * sr)) ** 2 + \
-                                   ((2 * P * tetm_i[0, 0] * tetm_i[1, 0] * \
-                                     tetm_i[1, 1] * err_arr[0, 1]) / \
-                                    (np.linalg.det(tetm_i) ** 2 * sr)) ** 2 + \
-                                   ((2 * P * tetm_i[0, 0] * tetm_i[0, 1] * \
-                                     tetm_i[1, 1] * err_arr[1, 0]) / \
-                                    (np.linalg.det(tetm_i) ** 2 * sr)) ** 2 + \
-                                   (-(2 * P * tetm_i[0, 1] * tetm_i[1, 0] * \
-                                      tetm_i[0, 0] * err_arr[1, 1]) / \
-                                    (np.linalg.det(tetm_i) ** 2 * sr)) ** 2)
-
-                sigma_di_11 = 0.5 * sigma_si
-                sigma_di_22 = 0.5 * sigma_si
-                sigma_di_12 = np.sqrt((mat2_i[0, 1] / tetm_i[0, 0] * err_arr[0, 0]) ** 2 + \
-                                      (mat2_i[0, 1] / tetm_i[1, 0] * err_arr[1, 0]) ** 2 + \
-                                      (0.5 * tetm_i[0, 0] / tetm_i[1, 0] * sigma_si) ** 2)
-                sigma_di_21 = np.sqrt((mat2_i[1, 0] / tetm_i[1, 1] * err_arr[1, 1]) ** 2 + \
-                                      (mat2_i[1, 0] / tetm_i[0, 1] * err_arr[0, 1]) ** 2 + \
-                                      (0.5 * tetm_i[1, 1] / tetm_i[0, 1] * sigma_si) ** 2)
-
-                dis_err_i = np.array([[sigma_di_11, sigma_di_12],
-                                      [sigma_di_21, sigma_di_22]])
-
-                dis_err[idx] = np.mean(np.array([dis_err_r, dis_err_i]))
-        else:
-            dis[idx] = np.identity(2)
+    for idx in np.nonzero(np.any(z_obj.z == 0.0 + 0.0j, axis=(1, 2)))[0]:
+        print('Found a zero in z at {0}, skipping'.format(idx))
 
-    nonzero_idx = np.array(list(set(np.nonzero(dis)[0])))
+    if lo_dims is not None:
+        lo_dims = np.asarray(lo_dims)[0:num_freq]
 
-    dis_avg, weights_sum = np.average(dis[nonzero_idx],
-                                      axis=0,
-                                      weights=(1. / dis_err[nonzero_idx]) ** 2,
-                                      returned=True)
+    dis, dis_err = get_distortion_tensors(z_obj.z, z_obj.z_err, g=g,
+                                          dimensions=lo_dims)
 
-    dis_avg_err = np.sqrt(1. / weights_sum)
-
-    return dis_avg, dis_avg_err
+    return average_distortion(dis, dis_err)
 
 
 def find_1d_distortion(z_object, include_non1d=False):
@@ -393,3 +257,436 @@ def remove_distortion(z_array=None, z_object=None, num_freq=None, g='det'):
         print('Could not compute distortion tensor')
 
         return np.identity(2), z_obj
+
+
+# =================================================================
+# distortion of stacks of impedance tensors (..., n_freq, 2, 2)
+# =================================================================
+def _times_rot(matrices):
+    """
+    matrices (..., 2, 2) times [[0, -1], [1, 0]]
+    """
+    return np.stack([np.stack([matrices[..., 0, 1], -matrices[..., 0, 0]], axis=-1),
+                     np.stack([matrices[..., 1, 1], -matrices[..., 1, 0]], axis=-1)],
+                    axis=-2)
+
+
+def _sigma_s(tetm, err_arr, s):
+    """
+    error of S from the rotated impedance tensors and their errors
+    """
+    denominator = np.linalg.det(tetm) ** 2 * s
+    t00, t01 = tetm[..., 0, 0], tetm[..., 0, 1]
+    t10, t11 = tetm[..., 1, 0], tetm[..., 1, 1]
+    return np.sqrt((2 * t01 * t10 * t11 * err_arr[..., 0, 0] / denominator) ** 2 +
+                   (2 * t00 * t10 * t11 * err_arr[..., 0, 1] / denominator) ** 2 +
+                   (2 * t00 * t01 * t11 * err_arr[..., 1, 0] / denominator) ** 2 +
+                   (2 * t01 * t10 * t00 * err_arr[..., 1, 1] / denominator) ** 2)
+
+
+def _get_2d_distortion(tetm, P, T, err_arr=None, s_err=None):
+    """
+    2D distortion tensor of the real or imaginary part of impedance tensors
+    rotated onto strike, and the errors of its entries
+    """
+    s = np.sqrt(T ** 2 + 4 * P * tetm[..., 0, 1] * tetm[..., 1, 0] /
+                np.linalg.det(tetm))
+    par = 2 * tetm[..., 0, 1] / (T - s)
+    orth = 2 * tetm[..., 1, 0] / (T + s)
+
+    # tetm times [[0, 1 / orth], [1 / par, 0]]
+    mat2_01 = 1. / orth
+    mat2_10 = 1. / par
+    dis = np.stack([np.stack([tetm[..., 0, 1] * mat2_10, tetm[..., 0, 0] * mat2_01], axis=-1),
+                    np.stack([tetm[..., 1, 1] * mat2_10, tetm[..., 1, 0] * mat2_01], axis=-1)],
+                   axis=-2)
+    if err_arr is None:
+        return dis, s, None
+
+    # the error of S of the imaginary part was always computed with the S
+    # of the real part, s_err keeps that
+    sigma_s = _sigma_s(tetm, err_arr, s if s_err is None else s_err)
+    sigma_d12 = np.sqrt((mat2_01 / tetm[..., 0, 0] * err_arr[..., 0, 0]) ** 2 +
+                        (mat2_01 / tetm[..., 1, 0] * err_arr[..., 1, 0]) ** 2 +
+                        (0.5 * tetm[..., 0, 0] / tetm[..., 1, 0] * sigma_s) ** 2)
+    sigma_d21 = np.sqrt((mat2_10 / tetm[..., 1, 1] * err_arr[..., 1, 1]) ** 2 +
+                        (mat2_10 / tetm[..., 0, 1] * err_arr[..., 0, 1]) ** 2 +
+                        (0.5 * tetm[..., 1, 1] / tetm[..., 0, 1] * sigma_s) ** 2)
+
+    return dis, s, [0.5 * sigma_s, sigma_d12, sigma_d21, 0.5 * sigma_s]
+
+
+def get_distortion_tensors(z_array, z_err_array=None, g='det', dimensions=None,
+                           skew_threshold=5, eccentricity_threshold=0.1):
+    """
+    Estimate the distortion tensor from each impedance tensor of a stack,
+    as find_distortion does frequency by frequency.
+
+    1D impedance tensors give D from the impedance scaled by g, 2D ones
+    from the impedance rotated onto strike [Bibby et al., 2005].  3D
+    impedance tensors and ones with a zero entry give the identity with
+    errors of 1.
+
+    :param z_array: complex np.ndarray(..., 2, 2) of impedance tensors
+    :param z_err_array: np.ndarray(..., 2, 2) of impedance errors,
+                        *default* is None, giving errors of 1
+    :param g: [ 'det' | '01' | '10 ] scaling of the 1D distortion
+    :param dimensions: np.ndarray(...) of dimensions [ 1 | 2 | 3 ],
+                       *default* is None, estimated from the phase tensor
+    :param skew_threshold: threshold on the skew angle in degrees for 3D
+    :param eccentricity_threshold: threshold on the eccentricity for 1D
+
+    :returns: distortion and distortion error, np.ndarray(..., 2, 2)
+    """
+    z_array = np.asarray(z_array)
+    zr = z_array.real
+    zi = z_array.imag
+
+    pt_dict = MTstrike.get_pt_parameters(MTstrike.get_phase_tensor(z_array))
+    if dimensions is None:
+        dimensions = MTstrike.get_dimensionality(
+            pt_dict['beta'], pt_dict['eccentricity'],
+            skew_threshold=skew_threshold,
+            eccentricity_threshold=eccentricity_threshold)
+    dimensions = np.asarray(dimensions)
+
+    err_arr = None
+    if z_err_array is not None:
+        err_arr = np.real(z_err_array).astype(np.float64)
+        err_arr[err_arr == 0.0] = 1.0
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # --> 1D
+        if g in ['01', '10']:
+            gr = np.abs(zr[..., int(g[0]), int(g[1])])
+            gi = np.abs(zi[..., int(g[0]), int(g[1])])
+        else:
+            gr = np.sqrt(np.linalg.det(zr))
+            gi = np.sqrt(np.linalg.det(zi))
+        gr = gr[..., None, None]
+        gi = gi[..., None, None]
+        dis_1d = np.mean([1. / gr * _times_rot(zr), 1. / gi * _times_rot(zi)],
+                         axis=0)
+        dis_err_1d = np.ones(zr.shape)
+        if z_err_array is not None:
+            gr_err = 1. / gr * np.abs(z_err_array)
+            gr_err[gr_err == 0.0] = 1.0
+            gi_err = 1. / gi * np.abs(z_err_array)
+            gi_err[gi_err == 0.0] = 1.0
+            dis_err_1d = np.mean([gi_err, gr_err], axis=0)
+
+        # --> 2D, rotate onto strike as MTcc.rotatematrix_incl_errors
+        # the negative of geometry.strike_angle
+        strike = (pt_dict['alpha'] - pt_dict['beta']) % 180
+        strike[strike > 90] -= 180
+        strike = np.nan_to_num(-strike) % 360
+        cphi = np.cos(np.radians(strike))
+        sphi = np.sin(np.radians(strike))
+        rotmat = np.stack([np.stack([cphi, sphi], axis=-1),
+                           np.stack([-sphi, cphi], axis=-1)], axis=-2)
+        tetm = np.matmul(np.matmul(rotmat, z_array), np.linalg.inv(rotmat))
+        tetm_r = tetm.real
+        tetm_i = tetm.imag
+
+        P = 1
+        t_arr_r = -4 * P * tetm_r[..., 0, 1] * tetm_r[..., 1, 0] / np.linalg.det(tetm_r)
+        t_arr_i = -4 * P * tetm_i[..., 0, 1] * tetm_i[..., 1, 0] / np.linalg.det(tetm_i)
+        T = (np.sqrt(np.where(t_arr_i > t_arr_r, t_arr_i, t_arr_r)) + .001)
+
+        dis_r, sr, err_r = _get_2d_distortion(tetm_r, P, T, err_arr)
+        dis_i, si, err_i = _get_2d_distortion(tetm_i, P, T, err_arr, s_err=sr)
+        dis_2d = np.mean([dis_r, dis_i], axis=0)
+        dis_err_2d = np.ones(zr.shape)
+        if err_arr is not None:
+            # a single error for all the entries
+            dis_err_2d[:] = np.mean(np.stack(err_r + err_i, axis=-1),
+                                    axis=-1)[..., None, None]
+
+    identity = np.identity(2)
+    has_zero = np.any(z_array == 0.0 + 0.0j, axis=(-2, -1))
+    is_1d = ((dimensions == 1) & ~has_zero)[..., None, None]
+    is_2d = ((dimensions == 2) & ~has_zero)[..., None, None]
+
+    dis = np.where(is_1d, dis_1d, np.where(is_2d, dis_2d, identity))
+    dis_err = np.where(is_1d, dis_err_1d, np.where(is_2d, dis_err_2d, 1.))
+
+    return dis, dis_err
+
+
+def average_distortion(distortion, distortion_err, mask=None):
+    """
+    Average distortion tensors over frequency weighted by their errors, as
+    find_distortion does.  Distortion tensors that are all zero are left out.
+
+    :param distortion: np.ndarray(..., n_freq, 2, 2) of distortion tensors
+    :param distortion_err: np.ndarray(..., n_freq, 2, 2) of their errors
+    :param mask: boolean np.ndarray(..., n_freq), only the frequencies
+                 where mask is True are averaged, *default* is all
+
+    :returns: distortion and distortion error, np.ndarray(..., 2, 2)
+    """
+    use = np.any(distortion != 0, axis=(-2, -1))
+    if mask is not None:
+        use &= mask
+    use = use[..., None, None]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        weights = np.where(use, (1. / distortion_err) ** 2, 0)
+        weights_sum = weights.sum(axis=-3)
+        dis_avg = np.where(use, distortion * weights, 0).sum(axis=-3) / weights_sum
+        dis_avg_err = np.sqrt(1. / weights_sum)
+
+    return dis_avg, dis_avg_err
+
+
+def remove_distortion_array(z_array, distortion, z_err_array=None,
+                            distortion_err=None):
+    """
+    Remove distortion tensors D from impedance tensors Z = D * Z0, as
+    mtpy.core.z.Z.remove_distortion does for each station.  The errors are
+    propagated through the inverse of D and the product with Z (1-norm).
+
+    :param z_array: complex np.ndarray(..., n_freq, 2, 2)
+    :param distortion: real np.ndarray(..., 2, 2), one for each stack of
+                       frequencies
+    :param z_err_array: np.ndarray(..., n_freq, 2, 2), *default* is None
+    :param distortion_err: np.ndarray(..., 2, 2), *default* is None,
+                           meaning no error
+
+    :returns: z_array and z_err_array with the distortion removed,
+              z_err_array is None if it is not given
+    """
+    distortion = np.real(distortion)
+    if distortion_err is None:
+        distortion_err = np.zeros_like(distortion)
+
+    try:
+        DI, DI_err = MTcc.invertmatrix_incl_errors(distortion, distortion_err)
+    except MTex.MTpyError_inputarguments:
+        raise MTex.MTpyError_Z('The provided distortion tensor is '
+                               'singular - I cannot invert that!')
+    DI = DI[..., None, :, :]
+    DI_err = DI_err[..., None, :, :]
+
+    z_corrected = np.matmul(DI, z_array)
+    if z_err_array is None:
+        return z_corrected, None
+
+    z_corrected_err = np.matmul(np.abs(DI_err), np.abs(z_array)) + \
+        np.matmul(np.abs(DI), np.abs(z_err_array))
+
+    return z_corrected, z_corrected_err
+
+
+def remove_static_shift_array(z_array, ss_x=1.0, ss_y=1.0, z_err_array=None):
+    """
+    Remove static shift S from impedance tensors Z = S * Z0, as
+    mtpy.core.z.Z.remove_ss does for each station.  The factors are in
+    resistivity scale, the errors are scaled with the impedance.
+
+    :param z_array: complex np.ndarray(..., n_freq, 2, 2)
+    :param ss_x: factors of the x components (z[..., 0, :]), a number or
+                 np.ndarray broadcastable to (..., n_freq), e.g. one factor
+                 for each station (n_stations, 1)
+    :param ss_y: factors of the y components (z[..., 1, :])
+    :param z_err_array: np.ndarray(..., n_freq, 2, 2), *default* is None
+
+    :returns: static shift np.ndarray(..., n_freq, 2, 2) and z_array and
+              z_err_array with the static shift removed, z_err_array is None
+              if it is not given
+    """
+    z_array = np.asarray(z_array)
+    factors = np.sqrt(np.stack(np.broadcast_arrays(
+        np.asarray(ss_x, dtype=np.float64), np.asarray(ss_y, dtype=np.float64),
+        np.zeros(z_array.shape[:-2])), axis=-1)[..., :2])
+
+    static_shift = np.zeros(z_array.shape, dtype=np.float64)
+    static_shift[..., 0, 0] = factors[..., 0]
+    static_shift[..., 1, 1] = factors[..., 1]
+
+    z_corrected = z_array / factors[..., None]
+    if z_err_array is None:
+        return static_shift, z_corrected, None
+
+    return static_shift, z_corrected, z_err_array / factors[..., None]
+
+
+def _make_z_list(z_array, z_err_array, freq, mask):
+    """
+    Z objects of the frequencies in mask of each station of a stack
+    """
+    return [MTz.Z(z_array=z_array[ii, mask[ii]].copy(),
+                  z_err_array=z_err_array[ii, mask[ii]].copy(),
+                  freq=freq[ii, mask[ii]].copy())
+            for ii in range(z_array.shape[0])]
+
+
+def _remove_survey_distortion(z_array, z_err_array, freq, mask, num_mask, g):
+    """
+    estimate and remove the distortion of a stack of stations, the errors
+    are propagated as remove_distortion does.  Run in the worker processes
+    of SurveyDistortion.
+    """
+    dis, dis_err = get_distortion_tensors(z_array, z_err_array, g=g)
+    dis, dis_err = average_distortion(dis, dis_err, mask=num_mask)
+
+    # stations with a singular distortion tensor are left as they are
+    singular = np.linalg.det(dis) == 0
+    dis[singular] = np.identity(2)
+    dis_err[singular] = 0
+
+    z_corrected, z_corrected_err = remove_distortion_array(z_array, dis,
+                                                           z_err_array, dis_err)
+    z_corrected[z_array == 0 + 0j] = 0.0 + 0.0j
+    z_corrected_err = np.nan_to_num(z_corrected_err)
+    z_corrected_err[z_corrected_err == 0.0] = 1.0
+    z_corrected[singular] = z_array[singular]
+    z_corrected_err[singular] = z_err_array[singular]
+
+    return dis, dis_err, singular, _make_z_list(z_corrected, z_corrected_err,
+                                                freq, mask)
+
+
+class SurveyDistortion(object):
+    """
+    Estimate and remove the galvanic distortion and static shift of all the
+    stations of a survey at once.
+
+    The impedance tensors of the stations are stacked into an array
+    (n_stations, n_freq, 2, 2), padded with zeros for stations with fewer
+    frequencies, and the distortion of all the stations is computed with
+    array operations as remove_distortion does for one station.  Large
+    surveys are split into chunks of stations that are processed in
+    parallel.
+
+    Arguments
+    ------------
+        **mt_list** : list of mtpy.core.mt.MT objects or
+                      mtpy.core.edi_collection.EdiCollection
+
+        **num_freq** : int
+                       number of frequencies to look for distortion from
+                       the index 0 of each station
+                       *default* is None, meaning all frequencies are used
+
+        **g** : [ 'det' | '01' | '10 ]
+                type of distortion correction
+                *default* is 'det'
+
+        **n_workers** : number of worker processes, *default* is the number
+                        of cpus, 1 processes the survey in this process
+
+        **chunk_size** : number of stations processed by a worker at a time
+                         *default* is 200
+
+    ======================= ===================================================
+    Attributes              Description
+    ======================= ===================================================
+    z_array                 impedance tensors (n_stations, n_freq, 2, 2)
+    z_err_array             impedance errors (n_stations, n_freq, 2, 2)
+    freq                    frequencies (n_stations, n_freq), 0 for padding
+    mask                    True where a station has a frequency
+    distortion              distortion tensor of each station (n_stations,
+                            2, 2), the identity where it is singular
+    distortion_err          error of the distortion tensors
+    ======================= ===================================================
+
+    :Example: ::
+
+        >>> import mtpy.analysis.distortion as distortion
+        >>> s_dis = distortion.SurveyDistortion(mt_list, num_freq=12)
+        >>> z_list = s_dis.remove_distortion()
+        >>> for mt_obj, z_obj in zip(mt_list, z_list):
+        >>> ...     mt_obj.write_mt_file(new_Z_obj=z_obj)
+
+    """
+
+    def __init__(self, mt_list, num_freq=None, g='det', n_workers=None,
+                 chunk_size=200):
+        self.mt_list = list(getattr(mt_list, 'mt_obj_list', mt_list))
+        self.num_freq = num_freq
+        self.g = g
+        self.n_workers = n_workers
+        self.chunk_size = chunk_size
+        self.distortion = None
+        self.distortion_err = None
+
+        self._stack_survey()
+
+    def _stack_survey(self):
+        """
+        stack the impedance tensors of the survey
+        """
+        n_freq = np.array([mt_obj.Z.z.shape[0] for mt_obj in self.mt_list])
+        shape = (len(self.mt_list), n_freq.max(), 2, 2)
+        self.z_array = np.zeros(shape, dtype=np.complex128)
+        self.z_err_array = np.zeros(shape, dtype=np.float64)
+        self.freq = np.zeros(shape[:2])
+        self.mask = np.arange(shape[1]) < n_freq[:, None]
+        for ii, mt_obj in enumerate(self.mt_list):
+            self.z_array[ii, :n_freq[ii]] = mt_obj.Z.z
+            if mt_obj.Z.z_err is not None:
+                self.z_err_array[ii, :n_freq[ii]] = mt_obj.Z.z_err
+            self.freq[ii, :n_freq[ii]] = mt_obj.Z.freq
+
+    def remove_distortion(self):
+        """
+        Estimate the distortion tensor of each station and remove it.
+
+        :returns: list of mtpy.core.z.Z with distortion removed and errors
+                  propagated, in the order of mt_list
+        """
+        num_mask = self.mask.copy()
+        if self.num_freq is not None:
+            num_mask[:, self.num_freq:] = False
+
+        n_stations = len(self.mt_list)
+        chunks = [slice(ii, ii + self.chunk_size)
+                  for ii in range(0, n_stations, self.chunk_size)]
+        args = [(self.z_array[chunk], self.z_err_array[chunk], self.freq[chunk],
+                 self.mask[chunk], num_mask[chunk], self.g) for chunk in chunks]
+
+        n_workers = self.n_workers
+        if n_workers is None:
+            n_workers = os.cpu_count() or 1
+        n_workers = max(1, min(int(n_workers), len(chunks)))
+
+        if n_workers == 1:
+            results = [_remove_survey_distortion(*arg) for arg in args]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=n_workers) as executor:
+                results = list(executor.map(_remove_survey_distortion,
+                                            *zip(*args)))
+
+        self.distortion, self.distortion_err, singular = \
+            [np.concatenate(result) for result in list(zip(*results))[:3]]
+        z_list = [z_obj for result in results for z_obj in result[3]]
+        for ii in np.nonzero(singular)[0]:
+            print('Could not compute distortion tensor of station {0}'.format(
+                  self.mt_list[ii].station))
+
+        return z_list
+
+    def remove_static_shift(self, ss_x=1.0, ss_y=1.0):
+        """
+        Remove static shift from the apparent resistivity of each station.
+
+        :param ss_x: correction factors for the x components, a number or
+                     one for each station
+        :param ss_y: correction factors for the y components, a number or
+                     one for each station
+
+        :returns: list of static shift arrays (num_freq, 2, 2) as returned
+                  by mtpy.core.z.Z.remove_ss and list of mtpy.core.z.Z with
+                  static shift removed and errors scaled with the impedance,
+                  both in the order of mt_list
+        """
+        ss_x = np.asarray(ss_x, dtype=np.float64).reshape(-1, 1)
+        ss_y = np.asarray(ss_y, dtype=np.float64).reshape(-1, 1)
+        static_shift, z_array, z_err_array = remove_static_shift_array(
+            self.z_array, ss_x=ss_x, ss_y=ss_y, z_err_array=self.z_err_array)
+        static_shift = [static_shift[ii, self.mask[ii]]
+                        for ii in range(static_shift.shape[0])]
+
+        return static_shift, _make_z_list(z_array, z_err_array, self.freq, self.mask)
@@ -21,6 +21,7 @@ Edited by JP, 2016
 import numpy as np
 
 import mtpy.analysis.pt as MTpt
+import mtpy.analysis.strike as MTstrike
 import mtpy.core.z as MTz
 import mtpy.utils.exceptions as MTex
 
@@ -85,8 +86,6 @@ def dimensionality(z_array=None, z_object=None, pt_array=None,
 
     """
 
-    lo_dimensionality = []
-
     if z_array is not None:
         pt_obj = MTpt.PhaseTensor(z_array=z_array)
     elif z_object is not None:
@@ -103,22 +102,14 @@ def dimensionality(z_array=None, z_object=None, pt_array=None,
         pt_obj = pt_object
 
     # use criteria from Bibby et al. 2005 for determining the dimensionality
-    # for each frequency of the pt/z array:
-    for idx_f in range(len(pt_obj.pt)):
-        #1. determine skew value...
-        skew = pt_obj.beta[idx_f]
-            #compare with threshold for 3D
-        if np.abs(skew) > skew_threshold:
-            lo_dimensionality.append(3)
-        else:
-            # 2.check for eccentricity:
-            ecc = pt_obj._pi1()[0][idx_f] / pt_obj._pi2()[0][idx_f]
-            if ecc > eccentricity_threshold:
-                lo_dimensionality.append(2)
-            else:
-                lo_dimensionality.append(1)
-
-    return np.array(lo_dimensionality)
+    # for all frequencies of the pt/z array at once:
+    # 1. skew above the threshold is 3D, 2. eccentricity decides 1D or 2D
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ecc = pt_obj._pi1()[0] / pt_obj._pi2()[0]
+
+    return MTstrike.get_dimensionality(
+        pt_obj.beta, ecc, skew_threshold=skew_threshold,
+        eccentricity_threshold=eccentricity_threshold)
 
 
 def strike_angle(z_array=None, z_object=None, pt_array=None,
@@ -196,33 +187,19 @@ def strike_angle(z_array=None, z_object=None, pt_array=None,
                              skew_threshold=skew_threshold,
                              eccentricity_threshold=eccentricity_threshold)
 
-    lo_strikes = []
-
-    for idx, dim in enumerate(lo_dims):
-        if dim == 1:
-            lo_strikes.append((np.nan, np.nan))
-#            continue
-        
-        elif dim == 3:
-            lo_strikes.append((np.nan, np.nan))
-
-        else:
-            a = pt_obj.alpha[idx]
-            b = pt_obj.beta[idx]
-    
-            strike1 = (a - b) % 180
-            
-            # change so that values range from -90 to +90
-            # add alternative strikes to account for ambiguity
-            if strike1 > 90:
-                strike1 -= 180
-                strike2 = strike1 + 90
-            else:
-                strike2 = strike1 - 90
-        
-            lo_strikes.append((strike1, strike2))
-
-    return np.array(lo_strikes)
+    strike1 = (pt_obj.alpha - pt_obj.beta) % 180
+
+    # change so that values range from -90 to +90
+    # add alternative strikes to account for ambiguity
+    shift = strike1 > 90
+    strike1[shift] -= 180
+    strike2 = np.where(shift, strike1 + 90, strike1 - 90)
+
+    # only the 2D parts have a strike
+    lo_strikes = np.vstack([strike1, strike2]).T
+    lo_strikes[lo_dims != 2] = np.nan
+
+    return lo_strikes
 
 
 def eccentricity(z_array=None, z_object=None, pt_array=None, pt_object=None):
@@ -283,21 +260,19 @@ def eccentricity(z_array=None, z_object=None, pt_array=None, pt_object=None):
                 'Input argument is not an instance of the PhaseTensor class')
         pt_obj = pt_object
 
-    lo_ecc = []
-    lo_eccerr = []
-
     if not isinstance(pt_obj, MTpt.PhaseTensor):
         raise MTex.MTpyError_PT(
             'Input argument is not an instance of the PhaseTensor class')
 
-    for idx_f in range(len(pt_obj.pt)):
-        lo_ecc.append(pt_obj._pi1()[0][idx_f] / pt_obj._pi2()[0][idx_f])
+    pi1, pi1_err = pt_obj._pi1()
+    pi2, pi2_err = pt_obj._pi2()
 
-        ecc_err = None
-        if (pt_obj._pi1()[1] is not None) and (pt_obj._pi2()[1] is not None):
-            ecc_err = np.sqrt((pt_obj._pi1()[1][idx_f] / pt_obj._pi1()[0][idx_f]) ** 2 +\
-                              (pt_obj._pi2()[1][idx_f] / pt_obj._pi2()[0][idx_f]) ** 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ecc = pi1 / pi2
 
-        lo_eccerr.append(ecc_err)
+        ecc_err = None
+        if (pi1_err is not None) and (pi2_err is not None):
+            ecc_err = np.sqrt((pi1_err / pi1) ** 2 +
+                              (pi2_err / pi2) ** 2) * ecc
 
-    return np.array(lo_ecc), np.array(lo_eccerr)*np.array(lo_ecc)
+    return ecc, ecc_err
@@ -0,0 +1,285 @@
+#!/usr/bin/env python
+
+"""
+mtpy/mtpy/analysis/penetration.py
+
+Penetration depth of a whole survey computed as arrays.
+
+The apparent resistivity of the off-diagonal components and of the
+determinant of the impedance tensor is converted into a depth for all the
+stations and periods in one go.  SurveyPenetration stacks a survey into a
+cube of (station, period, component) with the components ordered as
+COMPONENTS, padding stations with fewer periods, and picks the nearest
+period of every station to a list of periods with a tolerance mask.  This
+cube drives Depth1D, Depth2D, Depth3D and
+EdiCollection.create_penetration_depth_csv.
+
+    * get_apparent_resistivity : resistivity and phase of zxy, zyx and det
+    * get_penetration_depth : Niblett-Bostick depth sqrt(rho T / 2 pi mu0)
+    * get_skin_depth : skin depth sqrt(rho T / pi mu0)
+    * get_niblett_bostick_resistivity : resistivity at the Bostick depth
+    * get_component_index : index of a component in the cube
+
+:Example: ::
+
+    >>> import mtpy.analysis.penetration as penetration
+    >>> import mtpy.imaging.mtplottools as mtpl
+    >>> mt_list = mtpl.get_mtlist(fn_list=edi_list)
+    >>> p_obj = penetration.SurveyPenetration(mt_list)
+    >>> period, depth, mask = p_obj.get_depth_by_period([0.1, 10.],
+    >>> ...                                             ptol=0.1)
+    >>> det_depth = depth[:, :, penetration.get_component_index('det')]
+
+"""
+
+# =================================================================
+import numpy as np
+
+import mtpy.utils.calculator as MTcc
+from mtpy.utils.exceptions import MTpyError_inputarguments
+
+# =================================================================
+
+COMPONENTS = ('zxy', 'zyx', 'det')
+
+
+def get_component_index(component):
+    """
+    Get the index of a component in the last axis of the cube.
+
+    :param component: [ 'zxy' | 'zyx' | 'det' ]
+
+    :returns: int
+    """
+    try:
+        return COMPONENTS.index(component)
+    except ValueError:
+        raise MTpyError_inputarguments(
+            "unsupported method to compute penetration depth: {}".format(
+                component))
+
+
+def get_apparent_resistivity(z_array, freq):
+    """
+    Compute the apparent resistivity and phase of zxy, zyx and of the
+    determinant of a stack of impedance tensors.
+
+    The resistivity is 0.2 |Z|^2 / f as in mtpy.core.z.Z, for the
+    determinant |det Z| takes the place of |Z|^2 and the phase is half the
+    phase of det Z.
+
+    :param z_array: complex np.ndarray(..., 2, 2) of impedance tensors in
+                    mV/km/nT
+    :param freq: np.ndarray of frequencies that broadcasts against
+                 z_array[..., 0, 0]
+
+    :returns: tuple of np.ndarray(..., 3) (resistivity, phase in degrees)
+    """
+    z_array = np.asarray(z_array)
+    freq = np.asarray(freq, dtype=np.float64)
+
+    z_det = z_array[..., 0, 0] * z_array[..., 1, 1] - \
+        z_array[..., 0, 1] * z_array[..., 1, 0]
+
+    z_comp = np.stack([z_array[..., 0, 1], z_array[..., 1, 0], z_det],
+                      axis=-1)
+    modulus = np.abs(z_comp)
+    modulus[..., :2] **= 2
+
+    resistivity = 0.2 * modulus / freq[..., None]
+    phase = np.rad2deg(np.angle(z_comp))
+    phase[..., 2] /= 2.
+
+    return resistivity, phase
+
+
+def get_penetration_depth(resistivity, period):
+    """
+    Compute the Niblett-Bostick penetration depth sqrt(rho T / 2 pi mu0),
+    the depth that mtpy plots as the penetration depth.
+
+    :param resistivity: np.ndarray of apparent resistivity in Ohm-m
+    :param period: np.ndarray of periods in s, broadcast against resistivity
+
+    :returns: np.ndarray of depths in m
+    """
+    return np.sqrt(np.asarray(resistivity) * period / (2 * np.pi * MTcc.mu0))
+
+
+def get_skin_depth(resistivity, period):
+    """
+    Compute the skin depth sqrt(rho T / pi mu0), the depth at which the
+    fields of a half space with the apparent resistivity decay by 1/e.
+
+    :param resistivity: np.ndarray of apparent resistivity in Ohm-m
+    :param period: np.ndarray of periods in s, broadcast against resistivity
+
+    :returns: np.ndarray of depths in m
+    """
+    return np.sqrt(np.asarray(resistivity) * period / (np.pi * MTcc.mu0))
+
+
+def get_niblett_bostick_resistivity(resistivity, phase):
+    """
+    Compute the Niblett-Bostick resistivity at the penetration depth
+    rho (pi / 2 phi - 1), as mtpy.analysis.niblettbostick.rhophi2rhodepth.
+
+    :param resistivity: np.ndarray of apparent resistivity in Ohm-m
+    :param phase: np.ndarray of phase in degrees, taken modulo 90
+
+    :returns: np.ndarray of resistivity in Ohm-m, inf where the phase is a
+              multiple of 90
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.asarray(resistivity) * \
+            (np.pi / 2 / np.deg2rad(np.asarray(phase) % 90) - 1)
+
+
+class SurveyPenetration(object):
+    """
+    Penetration depth of all the stations, periods and components of a
+    survey.
+
+    The impedance tensors of all the stations are stacked into one cube,
+    stations with fewer periods are padded with np.nan, so that the depths
+    are computed in one pass and the nearest periods of all the stations
+    are found with one argmin.
+
+    Arguments
+    ------------
+        **mt_list** : list of mtpy.core.mt.MT objects
+
+    ======================= ===================================================
+    Attributes              Description
+    ======================= ===================================================
+    stations                list of station names
+    latlons                 np.ndarray(n_stations, 2) of (lat, lon)
+    n_periods               number of periods of each station
+    freq                    np.ndarray(n_stations, n_max) of frequencies,
+                            np.inf in the padding
+    period                  np.ndarray(n_stations, n_max) of periods,
+                            np.nan in the padding
+    resistivity             np.ndarray(n_stations, n_max, 3) of apparent
+                            resistivity of COMPONENTS
+    phase                   np.ndarray(n_stations, n_max, 3) of phase (deg)
+    depth                   Niblett-Bostick penetration depth (m)
+    skin_depth              skin depth (m)
+    rho_nb                  Niblett-Bostick resistivity at depth (Ohm-m)
+    ======================= ===================================================
+
+    """
+
+    def __init__(self, mt_list):
+        self.mt_list = mt_list
+
+        self.compute_depth()
+
+    def compute_depth(self):
+        """
+        Stack the survey and compute the depths, call again after the
+        impedance tensors of the stations have changed.
+        """
+        self.stations = [mt_obj.station for mt_obj in self.mt_list]
+        self.latlons = np.array([(mt_obj.lat, mt_obj.lon)
+                                 for mt_obj in self.mt_list], dtype=np.float64)
+        self.n_periods = np.array([mt_obj.Z.freq.size
+                                   for mt_obj in self.mt_list], dtype=int)
+
+        n_stations = len(self.mt_list)
+        n_max = self.n_periods.max() if n_stations else 0
+        z_array = np.zeros((n_stations, n_max, 2, 2), dtype=np.complex128)
+        z_array[:] = np.nan
+        self.freq = np.zeros((n_stations, n_max))
+        self.freq[:] = np.inf
+        for ii, mt_obj in enumerate(self.mt_list):
+            z_array[ii, :self.n_periods[ii]] = mt_obj.Z.z
+            self.freq[ii, :self.n_periods[ii]] = mt_obj.Z.freq
+
+        with np.errstate(divide='ignore'):
+            self.period = 1. / self.freq
+        self.period[np.isinf(self.freq)] = np.nan
+
+        self.resistivity, self.phase = get_apparent_resistivity(z_array,
+                                                                self.freq)
+        self.depth = get_penetration_depth(self.resistivity,
+                                           self.period[..., None])
+        self.skin_depth = get_skin_depth(self.resistivity,
+                                         self.period[..., None])
+        self.rho_nb = get_niblett_bostick_resistivity(self.resistivity,
+                                                      self.phase)
+
+    def get_period_index(self, selected_periods, ptol=0.1):
+        """
+        Find the nearest period of every station to each selected period.
+
+        The nearest period is the one with the nearest frequency, it matches
+        if it is within ptol * selected period of the selected period.
+
+        :param selected_periods: list or np.ndarray(n_selected) of periods
+        :param ptol: relative tolerance of a matching period
+
+        :returns: tuple (index, mask) of np.ndarray(n_stations, n_selected),
+                  index of the nearest period of each station and True where
+                  it matches
+        """
+        selected_periods = np.atleast_1d(np.asarray(selected_periods,
+                                                    dtype=np.float64))
+        freq_diff = np.abs(self.freq[:, None, :] -
+                           1. / selected_periods[None, :, None])
+        index = np.argmin(freq_diff, axis=-1)
+        nearest = self.period[np.arange(len(self.mt_list))[:, None], index]
+        mask = np.abs(selected_periods - nearest) <= \
+            selected_periods * ptol
+
+        return index, mask
+
+    def get_depth_by_period(self, selected_periods, ptol=0.1, depth=None):
+        """
+        Get the depth of every station at each selected period.
+
+        :param selected_periods: list or np.ndarray(n_selected) of periods
+        :param ptol: relative tolerance of a matching period
+        :param depth: np.ndarray(n_stations, n_max, ...) to pick from,
+                      *default* is the penetration depth, use skin_depth or
+                      rho_nb for the other estimates
+
+        :returns: tuple (period, depth, mask), np.ndarray(n_stations,
+                  n_selected) of the nearest period of each station or the
+                  selected period where it does not match, np.ndarray(
+                  n_stations, n_selected, 3) of depths with np.nan where
+                  the period does not match and the mask of
+                  get_period_index
+        """
+        if depth is None:
+            depth = self.depth
+        selected_periods = np.atleast_1d(np.asarray(selected_periods,
+                                                    dtype=np.float64))
+        index, mask = self.get_period_index(selected_periods, ptol=ptol)
+
+        station_index = np.arange(len(self.mt_list))[:, None]
+        period = np.where(mask, self.period[station_index, index],
+                          selected_periods)
+        depth = depth[station_index, index].astype(np.float64)
+        depth[~mask] = np.nan
+
+        return period, depth, mask
+
+    def get_depth_by_index(self, per_index, depth=None):
+        """
+        Get the depth of every station at a period index.
+
+        :param per_index: index of the period in the stations
+        :param depth: np.ndarray(n_stations, n_max, ...) to pick from,
+                      *default* is the penetration depth
+
+        :returns: tuple (period, depth), np.ndarray(n_stations) and
+                  np.ndarray(n_stations, 3)
+        """
+        if depth is None:
+            depth = self.depth
+        if np.any(per_index >= self.n_periods):
+            raise MTpyError_inputarguments(
+                "Index out_of_range Error: period index must be less than "
+                "number of periods {}".format(self.n_periods.min()))
+
+        return self.period[:, per_index], depth[:, per_index]
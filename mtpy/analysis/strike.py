@@ -0,0 +1,471 @@
+#!/usr/bin/env python
+
+"""
+mtpy/mtpy/analysis/strike.py
+
+Strike angles and dimensionality of a whole survey computed as arrays.
+
+The invariants of Weaver et al. [2000, 2003], the phase tensor of Caldwell
+et al. [2004] and the tipper strike are computed for a stack of impedance
+tensors of any shape (..., 2, 2) in one go, instead of frequency by
+frequency.  SurveyStrike stacks all the stations and periods of a survey,
+puts the estimates onto a common period axis and bins them into rose
+histograms for PlotStrike and PlotStrike2D.
+
+    * get_phase_tensor : phase tensor of a stack of impedance tensors
+    * get_weaver_invariants : invariants and strike of Weaver et al.
+    * get_pt_parameters : angles, eccentricity and phimax of phase tensors
+    * get_dimensionality : 1, 2 or 3 from skew and eccentricity thresholds
+    * get_tipper_strike : strike from the real induction arrows
+    * get_rose_angles : both ends (and orthogonal) of strike lines
+    * get_rose_histograms : histograms of strike angles for period bands
+
+:Example: ::
+
+    >>> import mtpy.analysis.strike as strike
+    >>> import mtpy.imaging.mtplottools as mtpl
+    >>> mt_list = mtpl.get_mtlist(fn_list=edi_list)
+    >>> s_obj = strike.SurveyStrike(mt_list, skew_threshold=3)
+    >>> period_arr = s_obj.get_period_arr()
+    >>> pt_az = s_obj.get_grid(90 - s_obj.pt_azimuth, period_arr)
+    >>> counts, edges = strike.get_rose_histograms(
+    >>> ...     strike.get_rose_angles(pt_az), period_arr, [-2, -1, 0, 1])
+
+"""
+
+# =================================================================
+import numpy as np
+
+# =================================================================
+
+
+def get_phase_tensor(z_array):
+    """
+    Compute the phase tensor Phi = X^-1 Y of impedance tensors Z = X + iY.
+
+    :param z_array: complex np.ndarray(..., 2, 2) of impedance tensors
+
+    :returns: real np.ndarray(..., 2, 2), zeros where the real part of the
+              impedance tensor is singular, as PhaseTensor does
+    """
+    z_array = np.asarray(z_array)
+    realz = z_array.real
+    imagz = z_array.imag
+
+    det_real = realz[..., 0, 0] * realz[..., 1, 1] - \
+        realz[..., 0, 1] * realz[..., 1, 0]
+
+    pt_array = np.zeros(z_array.shape, dtype=np.float64)
+    pt_array[..., 0, 0] = realz[..., 1, 1] * imagz[..., 0, 0] - \
+        realz[..., 0, 1] * imagz[..., 1, 0]
+    pt_array[..., 0, 1] = realz[..., 1, 1] * imagz[..., 0, 1] - \
+        realz[..., 0, 1] * imagz[..., 1, 1]
+    pt_array[..., 1, 0] = realz[..., 0, 0] * imagz[..., 1, 0] - \
+        realz[..., 1, 0] * imagz[..., 0, 0]
+    pt_array[..., 1, 1] = realz[..., 0, 0] * imagz[..., 1, 1] - \
+        realz[..., 1, 0] * imagz[..., 0, 1]
+
+    singular = det_real == 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pt_array /= np.where(singular, 1, det_real)[..., None, None]
+    pt_array[singular] = 0
+
+    return pt_array
+
+
+def get_weaver_invariants(z_array):
+    """
+    Compute the invariants of Weaver et al. [2000, 2003] of impedance
+    tensors, see mtpy.analysis.zinvariants.Zinvariants.
+
+    :param z_array: complex np.ndarray(..., 2, 2) of impedance tensors
+
+    :returns: dictionary with keys inv1, inv2, ..., inv7, q, strike and
+              strike_err, each np.ndarray(...).  The strike is in degrees
+              assuming 0 is North and positive clockwise.  Values are
+              np.nan where the invariants cannot be computed.
+    """
+    z_array = np.asarray(z_array)
+    x1 = .5 * (z_array[..., 0, 0].real + z_array[..., 1, 1].real)  # trace
+    x2 = .5 * (z_array[..., 0, 1].real + z_array[..., 1, 0].real)
+    x3 = .5 * (z_array[..., 0, 0].real - z_array[..., 1, 1].real)
+    x4 = .5 * (z_array[..., 0, 1].real - z_array[..., 1, 0].real)  # berd
+    e1 = .5 * (z_array[..., 0, 0].imag + z_array[..., 1, 1].imag)  # trace
+    e2 = .5 * (z_array[..., 0, 1].imag + z_array[..., 1, 0].imag)
+    e3 = .5 * (z_array[..., 0, 0].imag - z_array[..., 1, 1].imag)
+    e4 = .5 * (z_array[..., 0, 1].imag - z_array[..., 1, 0].imag)  # berd
+    ex = x1 * e1 - x2 * e2 - x3 * e3 + x4 * e4
+
+    # where ex is 0 the invariants are not defined
+    undefined = ex == 0
+    ex = np.where(undefined, np.nan, ex)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d12 = (x1 * e2 - x2 * e1) / ex
+        d34 = (x3 * e4 - x4 * e3) / ex
+        d13 = (x1 * e3 - x3 * e1) / ex
+        d24 = (x2 * e4 - x4 * e2) / ex
+        d41 = (x4 * e1 - x1 * e4) / ex
+        d23 = (x2 * e3 - x3 * e2) / ex
+
+        inv1 = np.sqrt(x4 ** 2 + x1 ** 2)
+        inv2 = np.sqrt(e4 ** 2 + e1 ** 2)
+        inv3 = np.sqrt(x2 ** 2 + x3 ** 2) / inv1
+        inv4 = np.sqrt(e2 ** 2 + e3 ** 2) / inv2
+
+        s41 = (x4 * e1 + x1 * e4) / ex
+
+        inv5 = s41 * ex / (inv1 * inv2)
+        inv6 = d41 * ex / (inv1 * inv2)
+
+        q = np.sqrt((d12 - d34) ** 2 + (d13 + d24) ** 2)
+
+        inv7 = (d41 - d23) / q
+
+        strike = .5 * np.arctan2(d12 - d34, d13 + d24) * (180 / np.pi)
+        strike_err = abs(.5 * np.arcsin(inv7)) * (180 / np.pi)
+
+    inv_dict = {'inv1': inv1, 'inv2': inv2, 'inv3': inv3, 'inv4': inv4,
+                'inv5': inv5, 'inv6': inv6, 'inv7': inv7, 'q': q,
+                'strike': strike, 'strike_err': strike_err}
+    for key, value in inv_dict.items():
+        inv_dict[key] = np.where(undefined, np.nan, value)
+
+    return inv_dict
+
+
+def get_pt_parameters(pt_array):
+    """
+    Compute the parameters of phase tensors used to estimate strike and
+    dimensionality, following Caldwell et al. [2004] and Bibby et al. [2005]
+    as in mtpy.analysis.pt.PhaseTensor.
+
+    :param pt_array: real np.ndarray(..., 2, 2) of phase tensors
+
+    :returns: dictionary with keys alpha, beta, azimuth, phimax, phimin and
+              eccentricity, each np.ndarray(...).  Angles are in degrees,
+              the azimuth assumes 0 is North and positive clockwise.  The
+              eccentricity is Pi1 / Pi2 as in geometry.eccentricity.
+    """
+    pt_array = np.asarray(pt_array)
+    pt_xx = pt_array[..., 0, 0]
+    pt_xy = pt_array[..., 0, 1]
+    pt_yx = pt_array[..., 1, 0]
+    pt_yy = pt_array[..., 1, 1]
+
+    alpha = np.degrees(0.5 * np.arctan2(pt_xy + pt_yx, pt_xx - pt_yy))
+    beta = np.degrees(0.5 * np.arctan2(pt_xy - pt_yx, pt_xx + pt_yy))
+
+    # after bibby et al. 2005
+    pi1 = 0.5 * np.sqrt((pt_xx - pt_yy) ** 2 + (pt_xy + pt_yx) ** 2)
+    pi2 = 0.5 * np.sqrt((pt_xx + pt_yy) ** 2 + (pt_xy - pt_yx) ** 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        eccentricity = pi1 / pi2
+
+    return {'alpha': alpha, 'beta': beta, 'azimuth': alpha - beta,
+            'phimax': np.degrees(np.arctan(pi2 + pi1)),
+            'phimin': np.degrees(np.arctan(pi2 - pi1)),
+            'eccentricity': eccentricity}
+
+
+def get_dimensionality(beta, eccentricity, skew_threshold=5,
+                       eccentricity_threshold=0.1):
+    """
+    Estimate dimensionality from the skew angle and eccentricity of the
+    phase tensor following Bibby et al. [2005], see
+    mtpy.analysis.geometry.dimensionality.
+
+    :param beta: np.ndarray of skew angles in degrees
+    :param eccentricity: np.ndarray of eccentricities, same shape as beta
+    :param skew_threshold: anything above this skew in degrees is 3-D
+    :param eccentricity_threshold: anything below this eccentricity is 1-D
+
+    :returns: np.ndarray(dtype=int) of [ 1 | 2 | 3 ], same shape as beta
+    """
+    beta = np.asarray(beta)
+    with np.errstate(invalid='ignore'):
+        dimensions = np.where(np.asarray(eccentricity) >
+                              eccentricity_threshold, 2, 1)
+        dimensions[np.abs(beta) > skew_threshold] = 3
+
+    return dimensions
+
+
+def get_tipper_strike(tipper_array):
+    """
+    Compute the strike from the real induction arrows.
+
+    :param tipper_array: complex np.ndarray(..., 1, 2) of tipper
+
+    :returns: np.ndarray(...) of strike angles in degrees from -180 to 180,
+              the negative of Tipper.angle_real, with 180 set to 0
+    """
+    tipper_array = np.asarray(tipper_array)
+    tip_strike = -np.rad2deg(np.arctan2(-tipper_array[..., 0, 1].real,
+                                        -tipper_array[..., 0, 0].real))
+    tip_strike[tip_strike == 180.] = 0.0
+
+    return tip_strike
+
+
+def fold_angles(angles, fold=True):
+    """
+    Fold strike angles so that they go from -90 to 90, or put them on the
+    whole circle from 0 to 360.
+
+    :param angles: np.ndarray of angles in degrees, changed in place
+    :param fold: [ True | False ] fold to -90 to 90 or keep 0 to 360
+
+    :returns: angles
+    """
+    with np.errstate(invalid='ignore'):
+        if fold:
+            # for plotting put the NW angles into the SE quadrant
+            angles[angles > 90] -= 180
+            angles[angles < -90] += 180
+        else:
+            angles %= 360
+            angles[angles == 360.0] = 0.0
+
+    return angles
+
+
+def get_rose_angles(angles, fold=True, orthogonal=True):
+    """
+    Get both ends of the strike lines for rose diagrams, like
+    PlotStrike.get_plot_array but keeping the shape of the input.
+
+    :param angles: np.ndarray(...) of strike angles in degrees, 0 and
+                   np.nan mark missing estimates
+    :param fold: [ True | False ] angles from 0 to 180 or 0 to 360
+    :param orthogonal: [ True | False ] add the orthogonal directions
+
+    :returns: np.ndarray(..., 2) or np.ndarray(..., 4) with orthogonal,
+              np.nan where the estimate is missing
+    """
+    angles = np.array(angles, dtype=np.float64)
+    angles[angles == 0] = np.nan
+
+    rose = np.stack([angles, (angles + 180) % 360], axis=-1)
+    if orthogonal:
+        rose = np.concatenate([rose, (rose + 90) % 360], axis=-1)
+    if fold:
+        rose %= 180
+
+    return rose
+
+
+def get_rose_histograms(angles, period, period_edges, bin_width=5,
+                        hist_range=(0, 360)):
+    """
+    Histograms of strike angles for period bands, computed for all bands
+    at once.
+
+    :param angles: np.ndarray(n_periods, ...) of strike angles in degrees,
+                   0 and np.nan mark missing estimates
+    :param period: np.ndarray(n_periods) of periods in seconds
+    :param period_edges: log10 of the edges of the period bands, periods
+                         strictly between two edges are in that band, e.g.
+                         [-2, -1, 0] for the decades 0.01 - 0.1 s and
+                         0.1 - 1 s
+    :param bin_width: width of the angle bins in degrees
+    :param hist_range: (min, max) angles of the histograms in degrees
+
+    :returns: counts np.ndarray(n_bands, n_bins) and the bin edges in
+              degrees, counts of each band are the same as np.histogram of
+              the angles in that band
+    """
+    angles = np.asarray(angles, dtype=np.float64)
+    angles = angles.reshape(angles.shape[0], -1)
+    period_edges = 10. ** np.asarray(period_edges, dtype=np.float64)
+    n_bands = period_edges.size - 1
+    n_bins = int(360 / bin_width)
+    bin_edges = np.linspace(hist_range[0], hist_range[1], n_bins + 1)
+
+    # period band of each row, -1 if outside the bands
+    band = np.searchsorted(period_edges, period, side='left') - 1
+    in_band = (band >= 0) & (band < n_bands)
+    on_edge = np.zeros_like(in_band)
+    on_edge[in_band] = period[in_band] == period_edges[band[in_band] + 1]
+    in_band &= ~on_edge
+    band = np.repeat(np.where(in_band, band, -1), angles.shape[1])
+
+    angles = angles.ravel()
+    with np.errstate(invalid='ignore'):
+        keep = (band >= 0) & (angles != 0) & np.isfinite(angles) & \
+            (angles >= hist_range[0]) & (angles <= hist_range[1])
+    band = band[keep]
+    angles = angles[keep]
+
+    # bin the same way as np.histogram with equal bins
+    norm = n_bins / float(hist_range[1] - hist_range[0])
+    index = ((angles - hist_range[0]) * norm).astype(np.intp)
+    index[index == n_bins] -= 1
+    index[angles < bin_edges[index]] -= 1
+    index[(angles >= bin_edges[index + 1]) & (index != n_bins - 1)] += 1
+
+    counts = np.bincount(band * n_bins + index,
+                         minlength=n_bands * n_bins).reshape(n_bands, n_bins)
+
+    return counts, bin_edges
+
+
+class SurveyStrike(object):
+    """
+    Strike angles and dimensionality of all the stations and periods of a
+    survey.
+
+    The impedance tensors and tipper of all the stations are stacked into
+    one array so that the invariants, phase tensors and tipper strikes are
+    computed in one go.  The estimates are kept as flat arrays of all the
+    (station, period) pairs, get_grid puts them onto a common period axis.
+
+    Arguments
+    ------------
+        **mt_list** : list of mtpy.core.mt.MT or
+                      mtpy.imaging.mtplottools.MTplot objects
+
+        **period_tolerance** : tolerance to match periods of different
+                               stations to the period axis
+                               *default* is 0.05
+
+        **skew_threshold** : threshold on the skew angle in degrees for 3-D
+                             *default* is 5 degrees
+
+        **eccentricity_threshold** : threshold on eccentricity for 1-D
+                                     *default* is 0.1
+
+    ======================= ===================================================
+    Attributes              Description
+    ======================= ===================================================
+    period                  period of each (station, period) pair
+    station_index           index in mt_list of each pair
+    n_periods               number of periods of each station
+    inv_strike              strike from the invariants (deg), 0 is North
+    inv_strike_err          strike error from the invariants (deg)
+    pt_azimuth              phase tensor azimuth (deg), 0 is North
+    pt_azimuth_err          error of the azimuth as PhaseTensor.azimuth_err,
+                            np.nan for stations without z_err
+    pt_skew                 phase tensor skew angle beta (deg)
+    pt_eccentricity         phase tensor eccentricity Pi1 / Pi2
+    pt_phimax               phimax of the phase tensor (deg)
+    tipper_strike           strike of the real induction arrows (deg),
+                            0 for stations without tipper
+    dimensionality          [ 1 | 2 | 3 ] following Bibby et al. [2005]
+    ======================= ===================================================
+
+    """
+
+    def __init__(self, mt_list, period_tolerance=.05, skew_threshold=5,
+                 eccentricity_threshold=0.1):
+        self.mt_list = mt_list
+        self.period_tolerance = period_tolerance
+        self.skew_threshold = skew_threshold
+        self.eccentricity_threshold = eccentricity_threshold
+
+        self.compute_strike()
+
+    def compute_strike(self):
+        """
+        Stack the survey and compute the strike estimates, call again after
+        the stations have been rotated.
+        """
+        z_list = []
+        tipper_list = []
+        has_z_err = []
+        for mt in self.mt_list:
+            z_list.append(mt.Z.z)
+            has_z_err.append(mt.Z.z_err is not None)
+            tipper = mt.Tipper.tipper
+            if tipper is None:
+                tipper = np.zeros((mt.Z.z.shape[0], 1, 2), dtype='complex')
+            tipper_list.append(tipper)
+
+        self.n_periods = np.array([z.shape[0] for z in z_list])
+        self.station_index = np.repeat(np.arange(len(self.mt_list)),
+                                       self.n_periods)
+        self.period = np.hstack([mt.period for mt in self.mt_list])
+        z_array = np.vstack(z_list)
+
+        #--> invariants
+        inv_dict = get_weaver_invariants(z_array)
+        self.inv_strike = inv_dict['strike']
+        self.inv_strike_err = inv_dict['strike_err']
+
+        #--> phase tensor
+        pt_dict = get_pt_parameters(get_phase_tensor(z_array))
+        self.pt_azimuth = pt_dict['azimuth']
+        self.pt_skew = pt_dict['beta']
+        self.pt_eccentricity = pt_dict['eccentricity']
+        self.pt_phimax = pt_dict['phimax']
+        with np.errstate(invalid='ignore'):
+            self.pt_azimuth_err = np.where(
+                np.repeat(has_z_err, self.n_periods),
+                np.sqrt(pt_dict['alpha'] + pt_dict['beta']), np.nan)
+
+        #--> tipper
+        self.tipper_strike = get_tipper_strike(np.vstack(tipper_list))
+
+        #--> dimensionality
+        self.dimensionality = get_dimensionality(
+            self.pt_skew, self.pt_eccentricity,
+            skew_threshold=self.skew_threshold,
+            eccentricity_threshold=self.eccentricity_threshold)
+
+    def get_period_arr(self, mask=None):
+        """
+        Get a period axis that spans the periods of the survey with as many
+        periods as the station with the most periods.
+
+        :param mask: boolean np.ndarray, only the periods where mask is True
+                     set the limits of the axis, e.g. only 2-D estimates
+
+        :returns: np.ndarray of log spaced periods
+        """
+        period = self.period
+        if mask is not None:
+            period = period[mask]
+
+        return np.logspace(np.log10(period.min()),
+                           np.log10(period.max()),
+                           num=self.n_periods.max(),
+                           base=10)
+
+    def get_grid(self, values, period_arr, mask=None, fill_value=0.):
+        """
+        Put an estimate onto a common period axis.
+
+        Each period of a station goes into all the periods of period_arr
+        within period_tolerance, if more than one period of a station
+        matches the last one is used.
+
+        :param values: np.ndarray with a value for each (station, period)
+                       pair, like the attributes of SurveyStrike
+        :param period_arr: np.ndarray(n_periods) of the period axis
+        :param mask: boolean np.ndarray, only put in values where True
+        :param fill_value: value where a station has no estimate
+
+        :returns: np.ndarray(n_periods, n_stations)
+        """
+        values = np.asarray(values)
+        grid = np.zeros((period_arr.size, len(self.mt_list)),
+                        dtype=np.result_type(values, fill_value))
+        grid[:] = fill_value
+
+        period = self.period
+        station_index = self.station_index
+        if mask is not None:
+            values = values[mask]
+            period = period[mask]
+            station_index = station_index[mask]
+
+        match = (period[:, None] > period_arr * (1 - self.period_tolerance)) & \
+                (period[:, None] < period_arr * (1 + self.period_tolerance))
+        pair_index, period_index = np.nonzero(match)
+
+        # keep only the last period of a station matching a grid period
+        cell = period_index * grid.shape[1] + station_index[pair_index]
+        cell, last = np.unique(cell[::-1], return_index=True)
+        grid.flat[cell] = values[pair_index[::-1][last]]
+
+        return grid
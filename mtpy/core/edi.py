@@ -14,22 +14,24 @@
 # ==============================================================================
 import os
 import datetime
+import importlib.util
 import numpy as np
 
 import mtpy.utils.gis_tools as gis_tools
 import mtpy.utils.exceptions as MTex
 import mtpy.utils.filehandling as MTfh
 import mtpy.core.z as MTz
+import mtpy.utils.instrumentation as instrumentation
 from mtpy.utils.mtpylog import MtPyLog
 
+# scipy.stats is slow to import, it is only imported when spectra are read
 try:
-    import scipy.stats.distributions as ssd
-
-    ssd_test = True
+    ssd_test = importlib.util.find_spec('scipy.stats') is not None
 except ImportError:
+    ssd_test = False
+if ssd_test is False:
     print('Need scipy.stats.distributions to compute spectra errors')
     print('Could not find scipy.stats.distributions, check distribution')
-    ssd_test = False
 
 tab = ' ' * 4
 # ==============================================================================
@@ -135,6 +137,7 @@ class Edi(object):
         if self.edi_fn is not None:
             self.read_edi_file()
 
+    @instrumentation.timed('core.edi.read_edi_file')
     def read_edi_file(self, edi_fn=None):
         """
         Read in an edi file and fill attributes of each section's classes.
@@ -178,6 +181,7 @@ class Edi(object):
 
             with open(self.edi_fn, 'r') as fid:
                 self._edi_lines = _validate_edi_lines(fid.readlines())
+            instrumentation.count('bytes', os.path.getsize(self.edi_fn))
 
         self.Header = Header(edi_lines=self._edi_lines)
         self.Info = Information(edi_lines=self._edi_lines)
@@ -185,6 +189,8 @@ class Edi(object):
         self.Data_sect = DataSection(edi_lines=self._edi_lines)
 
         self._read_data()
+        if self.Z.freq is not None:
+            instrumentation.count('records', len(self.Z.freq))
 
         if self.Header.lat is None:
             self.Header.lat = self.Define_measurement.reflat
@@ -445,6 +451,8 @@ class Edi(object):
 
             # compute error only if scipy package exists
             if ssd_test is True:
+                import scipy.stats.distributions as ssd
+
                 # 68% Quantil of the Fisher distribution:
                 z_det = np.real(s_arr[cc.hx, cc.hx] * s_arr[cc.hy, cc.hy] - \
                                 np.abs(s_arr[cc.hx, cc.hy] ** 2))
@@ -539,6 +547,7 @@ class Edi(object):
         self.Tipper.compute_amp_phase()
         self.Tipper.compute_mag_direction()
 
+    @instrumentation.timed('core.edi.write_edi_file')
     def write_edi_file(self, new_edi_fn=None,longitude_format='LON', 
                        latlon_format='dms'):
         """
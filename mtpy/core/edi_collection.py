@@ -22,12 +22,11 @@ import pandas as pd
 from shapely.geometry import Point  # , Polygon, LineString, LinearRing
 
 import mtpy.core.mt as mt
-import mtpy.imaging.mtplottools as mtplottools
 from mtpy.utils.mtpy_decorator import deprecated
 from mtpy.utils.matplotlib_utils import gen_hist_bins
 from mtpy.utils.mtpylog import MtPyLog
-import mtpy.analysis.pt as MTpt
-import mtpy.imaging.penetration
+from mtpy.analysis.penetration import SurveyPenetration, get_component_index
+from mtpy.utils.bulk_export import SurveyExport, GIS_COLUMNS, PT_COLUMNS, MEASUREMENT_COLUMNS, write_csv_files
 
 def is_num_in_seq(anum, aseq, atol=0.0001):
     """
@@ -364,61 +363,21 @@ class EdiCollection(object):
                       'tip_mag_re', 'tip_mag_im', 'tip_ang_re', 'tip_ang_im']
         """
 
-        pt_dict_list = []
-        plot_per = period
-        #plot_per = self.all_unique_periods[1]  # test first
+        self._logger.debug("The plot period is %s", period)
 
-        print("The plot period is ", plot_per)
+        s_export = SurveyExport(self.mt_obj_list, period_list=[period], interpolate=interpolate,
+                                ptol=self.ptol, by_period=True)
+        for station in s_export.station[~s_export.valid[0]]:
+            self._logger.warn(" the period %s is NOT found for this station %s. Skipping!!!" % (period, station))
 
-        for mt_obj in self.mt_obj_list:
-            pt_dict = {}
-            pt = None
-            ti = None
-
-            if(interpolate == False):
-                p_index = [ff for ff, f2 in enumerate(1.0/mt_obj.Z.freq)
-                           if (f2 > plot_per * (1 - self.ptol)) and
-                           (f2 < plot_per * (1 + self.ptol))]
-
-                pt = mt_obj.pt
-                ti = mt_obj.Tipper
-            else:
-                p_index = [0]
-                newZ, newTipper = mt_obj.interpolate([1./plot_per], bounds_error=False)
-
-                pt = MTpt.PhaseTensor(z_object=newZ)
-                ti = newTipper
-            # end if
-
-            if len(p_index) >= 1:
-                p_index = p_index[0]
-                pt_dict['station']=mt_obj.station
-                pt_dict['period'] =plot_per
-                pt_dict['lon'] = mt_obj.lon
-                pt_dict['lat'] = mt_obj.lat
-
-                pt_dict['phi_min'] = pt.phimin[p_index]
-                pt_dict['phi_max'] = pt.phimax[p_index]
-                pt_dict['azimuth']= pt.azimuth[p_index]
-                pt_dict['skew'] = pt.beta[p_index]
-                pt_dict['n_skew'] = 2 * pt.beta[p_index]
-                pt_dict['elliptic'] = pt.ellipticity[p_index]
-
-                pt_dict['tip_mag_re']= ti.mag_real[p_index]
-                pt_dict['tip_mag_im']= ti.mag_imag[p_index]
-                pt_dict['tip_ang_re']= ti.angle_real[p_index]
-                pt_dict['tip_ang_im']= ti.angle_imag[p_index]
-
-                pt_dict_list.append(pt_dict)
-            else:
-                self._logger.warn(" the period %s is NOT found for this station %s. Skipping!!!" % (plot_per, mt_obj.station))
+        pt_dict_list = [dict(zip(GIS_COLUMNS, row)) for row in s_export.get_rows(GIS_COLUMNS, 0)]
 
         return pt_dict_list
 
 
     def create_phase_tensor_csv(self, dest_dir, period_list=None,
                                 interpolate=True,
-                                file_name="phase_tensor.csv"):
+                                file_name="phase_tensor.csv", n_workers=None):
         """
         create phase tensor ellipse and tipper properties.
         Implementation based on mtpy.utils.shapefiles_creator.ShapeFilesCreator.create_csv_files
@@ -428,16 +387,13 @@ class EdiCollection(object):
                             frequencies are output
         :param interpolate: Boolean to indicate whether to interpolate data onto given period_list
         :param file_name: output file name
+        :param n_workers: number of processes writing the csv files of the frequencies,
+                          default=None the number of cpus
 
         :return: pt_dict
         """
         csvfname = os.path.join(dest_dir, file_name)
 
-        pt_dict = {}
-
-        csv_header = ['station', 'freq', 'lon', 'lat', 'phi_min', 'phi_max', 'azimuth', 'skew',
-                      'n_skew', 'elliptic', 'tip_mag_re', 'tip_mag_im', 'tip_ang_re', 'tip_ang_im']
-
         freq_list = None
         if(period_list is None):
             freq_list = self.all_frequencies
@@ -445,78 +401,15 @@ class EdiCollection(object):
             freq_list = 1./np.array(period_list)
         # end if
 
-        #with open(csvfname, "wb") as csvf:
-        with open(csvfname, "w",newline="") as csvf:
-            writer = csv.writer(csvf)
-            writer.writerow(csv_header)
-
-            for freq in freq_list:
-                ptlist = []
-                for mt_obj in self.mt_obj_list:
-                    f_index_list = None
-                    pt = None
-                    ti = None
-
-                    if(interpolate):
-                        f_index_list = [0]
-
-                        newZ = None
-                        newTipper = None
-                        newZ, newTipper = mt_obj.interpolate([freq], bounds_error=False)
-
-                        pt = MTpt.PhaseTensor(z_object=newZ)
-                        ti = newTipper
-                    else:
-                        freq_min = freq * (1 - self.ptol)
-                        freq_max = freq * (1 + self.ptol)
-
-                        f_index_list = [ff for ff, f2 in enumerate(mt_obj.Z.freq)
-                                        if (f2 > freq_min) and (f2 < freq_max)]
-                        pt = mt_obj.pt
-                        ti = mt_obj.Tipper
-                    #end if
-
-                    if len(f_index_list) > 1:
-                        self._logger.warn("more than one freq found %s", f_index_list)
-                    if len(f_index_list) >= 1:
-                        p_index = f_index_list[0]
-                        # geographic coord lat long and elevation
-                        # long, lat, elev = (mt_obj.lon, mt_obj.lat, 0)
-                        station, lon, lat = (mt_obj.station, mt_obj.lon, mt_obj.lat)
-
-                        pt_stat = [station, freq, lon, lat,
-                                   pt.phimin[p_index],
-                                   pt.phimax[p_index],
-                                   pt.azimuth[p_index],
-                                   pt.beta[p_index],
-                                   2 * pt.beta[p_index],
-                                   pt.ellipticity[p_index],  # FZ: get ellipticity begin here
-                                   ti.mag_real[p_index],
-                                   ti.mag_imag[p_index],
-                                   ti.angle_real[p_index],
-                                   ti.angle_imag[p_index]]
-
-                        ptlist.append(pt_stat)
-                    else:
-                        self._logger.warn("Freq %s NOT found for this station %s", freq, mt_obj.station)
-
-                csv_freq_file = os.path.join(dest_dir,
-                                             '{name[0]}_{freq}Hz{name[1]}'.format(
-                                                 freq=str(freq), name=os.path.splitext(file_name)))
-                #with open(csv_freq_file, "wb") as freq_csvf:
-                with open(csv_freq_file, "w",newline="") as freq_csvf:
-                    writer_freq = csv.writer(freq_csvf)
-                    writer_freq.writerow(csv_header)
-                    writer_freq.writerows(ptlist)
-
-                writer.writerows(ptlist)
-
-                pt_dict[freq] = ptlist
+        # attributes of all the stations and frequencies in one go
+        s_export = SurveyExport(self.mt_obj_list, freq_list, interpolate=interpolate, ptol=self.ptol)
+        pt_dict = s_export.write_csv(csvfname, PT_COLUMNS, n_workers=n_workers)
 
         return pt_dict
 
     # 2020-10: FZ started this new function on request of WPJ
-    def create_penetration_depth_csv(self, dest_dir, period_list=None, interpolate=False, file_name="penetration_depth.csv"):
+    def create_penetration_depth_csv(self, dest_dir, period_list=None, interpolate=False, file_name="penetration_depth.csv",
+                                     n_workers=None):
         """
         create penetration depth csv file for each frequency corresponding to the given input 1.0/period_list.
         of course subject to a tolerance.  Note that frequencies values are usually provided in MT EDI files.
@@ -525,13 +418,13 @@ class EdiCollection(object):
         :param period_list: list of periods; default=None all available periods will be output
         :param interpolate: Boolean to indicate whether to interpolate data onto given period_list
         :param file_name: output files basename
+        :param n_workers: number of processes writing the csv files of the frequencies,
+                          default=None the number of cpus
 
-        :return: pt_dict
+        :return: csvfname
         """
         csvfname = os.path.join(dest_dir, file_name)
 
-        p_dict = {}
-
         csv_header = ['FREQ','STATION',  'LON', 'LAT', 'pen_depth_det', 'pen_depth_zxy', 'pen_depth_zyx']
 
         # convert the period_list into freq array
@@ -542,33 +435,22 @@ class EdiCollection(object):
             freq_list = 1./np.array(period_list)
         # end if
 
-        with open(csvfname, "w",newline="") as csvf:
-            writer = csv.writer(csvf)
-            writer.writerow(csv_header)
-
-            for freq in freq_list:
-                pdlist = []
-
-                stations, periods, pen_depth_det, latlons = mtpy.imaging.penetration.get_penetration_depth_by_period( self.mt_obj_list, 1.0/freq)  # whichrho='det')
-                stations, periods, pen_depth_zxy, latlons = mtpy.imaging.penetration.get_penetration_depth_by_period( self.mt_obj_list, 1.0/freq,whichrho='zxy')
-                stations, periods, pen_depth_zyx, latlons = mtpy.imaging.penetration.get_penetration_depth_by_period( self.mt_obj_list, 1.0/freq,whichrho='zyx')
+        # depths of all the stations, frequencies and components in one go
+        p_obj = SurveyPenetration(self.mt_obj_list)
+        _, pen_depth, _ = p_obj.get_depth_by_period(1.0 / np.asarray(freq_list))
+        pen_depth = -pen_depth[:, :, [get_component_index(comp) for comp in ('det', 'zxy', 'zyx')]]
 
+        freq_rows = []
+        for ifreq, freq in enumerate(freq_list):
+            pdlist = []
 
-                for iter in range(len(stations)):
-                    pdlist.append([freq, stations[iter], latlons[iter][1], latlons[iter][0], pen_depth_det[iter], pen_depth_zxy[iter], pen_depth_zyx[iter]])
+            for iter in range(len(p_obj.stations)):
+                pdlist.append([freq, p_obj.stations[iter], p_obj.latlons[iter][1], p_obj.latlons[iter][0]] +
+                              pen_depth[iter, ifreq].tolist())
 
-                csv_freq_file = os.path.join(dest_dir,
-                                             '{name[0]}_{freq}Hz{name[1]}'.format(
-                                                 freq=str(freq), name=os.path.splitext(file_name)))
+            freq_rows.append((freq, pdlist))
 
-                with open(csv_freq_file, "w",newline="") as freq_csvf:
-                    writer_freq = csv.writer(freq_csvf)
-                    writer_freq.writerow(csv_header)
-                    writer_freq.writerows(pdlist)
-
-                writer.writerows(pdlist)
-
-                p_dict[freq] = pdlist
+        write_csv_files(csvfname, csv_header, freq_rows, n_workers=n_workers)
 
         return csvfname
 
@@ -586,7 +468,7 @@ class EdiCollection(object):
             ptm.export_params_to_file(save_path=dest_dir)
         return
 
-    def create_measurement_csv(self, dest_dir, period_list=None, interpolate=True):
+    def create_measurement_csv(self, dest_dir, period_list=None, interpolate=True, n_workers=None):
         """
         create csv file from the data of EDI files: IMPEDANCE, APPARENT RESISTIVITIES AND PHASES
         see also utils/shapefiles_creator.py
@@ -595,6 +477,8 @@ class EdiCollection(object):
         :param period_list: list of periods; default=None, in which data for all available
                             frequencies are output
         :param interpolate: Boolean to indicate whether to interpolate data onto given period_list
+        :param n_workers: number of processes writing the csv files of the frequencies,
+                          default=None the number of cpus
 
         :return: csvfname
         """
@@ -609,14 +493,6 @@ class EdiCollection(object):
         csv_basename = "edi_measurement"
         csvfname = os.path.join(dest_dir, "%s.csv" % csv_basename)
 
-        pt_dict = {}
-
-        csv_header = [
-            'FREQ', 'STATION',  'LON', 'LAT','ZXXre', 'ZXXim',
-            'ZXYre', 'ZXYim', 'ZYXre', 'ZYXim', 'ZYYre', 'ZYYim', 'TXre', 'TXim', 'TYre', 'TYim',
-            'RHOxx', 'RHOxy', 'RHOyx', 'RHOyy', 'PHSxx', 'PHSxy', 'PHSyx', 'PHSyy'
-        ]
-
         freq_list = None
         if(period_list is None):
             freq_list = self.all_frequencies
@@ -624,93 +500,9 @@ class EdiCollection(object):
             freq_list = 1./np.array(period_list)
         # end if
 
-        with open(csvfname, "w",newline="") as csvf:
-            writer = csv.writer(csvf)
-            writer.writerow(csv_header)
-
-
-        for freq in freq_list:
-            mtlist = []
-            for mt_obj in self.mt_obj_list:
-                f_index_list = None
-                pt = None
-                ti = None
-                zobj = None
-                if (interpolate):
-                    f_index_list = [0]
-
-                    newZ = None
-                    newTipper = None
-                    self._logger.debug("Interpolating frequency ....%s", freq)
-                    newZ, newTipper = mt_obj.interpolate([freq], bounds_error=False)
-
-                    pt = MTpt.PhaseTensor(z_object=newZ)
-                    ti = newTipper
-                    zobj = newZ
-                else:  # interpolate is False
-                    freq_max = freq * (1 + self.ptol)
-                    freq_min = freq * (1 - self.ptol)
-                    f_index_list = np.where((mt_obj.Z.freq < freq_max) & (mt_obj.Z.freq > freq_min))
-                    f_index_list = f_index_list[0]  # reduce from 3d [f,2,2] to 1d [f]
-
-                    pt = mt_obj.pt
-                    ti = mt_obj.Tipper
-                    zobj = mt_obj.Z
-                # end if
-
-                if len(f_index_list) > 1:
-                    self._logger.warn("more than one freq found %s", f_index_list)
-
-                if len(f_index_list) >= 1:
-                    the_index = f_index_list[0]  # a single value
-
-                    self._logger.debug("The freqs index %s", the_index)
-                    # geographic coord lat long and elevation
-                    # long, lat, elev = (mt_obj.lon, mt_obj.lat, 0)
-                    station, lat, lon = (
-                        mt_obj.station, mt_obj.lat, mt_obj.lon)
-
-                    resist_phase = mtplottools.ResPhase(z_object=zobj)
-                    # resist_phase.compute_res_phase()
-
-                    mt_stat = [freq, station, lon, lat,
-                               zobj.z[the_index, 0, 0].real,
-                               zobj.z[the_index, 0, 0].imag,
-                               zobj.z[the_index, 0, 1].real,
-                               zobj.z[the_index, 0, 1].imag,
-                               zobj.z[the_index, 1, 0].real,
-                               zobj.z[the_index, 1, 0].imag,
-                               zobj.z[the_index, 1, 1].real,
-                               zobj.z[the_index, 1, 1].imag,
-                               ti.tipper[the_index, 0, 0].real,
-                               ti.tipper[the_index, 0, 0].imag,
-                               ti.tipper[the_index, 0, 1].real,
-                               ti.tipper[the_index, 0, 1].imag,
-                               resist_phase.resxx[the_index], resist_phase.resxy[the_index],
-                               resist_phase.resyx[the_index], resist_phase.resyy[the_index],
-                               resist_phase.phasexx[the_index], resist_phase.phasexy[the_index],
-                               resist_phase.phaseyx[the_index], resist_phase.phaseyy[the_index]
-                               ]
-                    mtlist.append(mt_stat)
-
-                else:
-                    self._logger.warn(
-                        'Freq %s NOT found for this station %s *** Skipping it in CSV file', freq, mt_obj.station)
-
-            with open(csvfname, "a",newline="") as csvf:  # summary csv for all freqs
-                writer = csv.writer(csvf)
-                writer.writerows(mtlist)
-
-            csv_basename2 = "%s_%sHz.csv" % (csv_basename, str(freq))
-            csvfile2 = os.path.join(dest_dir, csv_basename2)
-
-            with open(csvfile2, "w", newline="") as csvf:  # individual csvfile for each freq
-                writer = csv.writer(csvf)
-
-                writer.writerow(csv_header)
-                writer.writerows(mtlist)
-
-            pt_dict[freq] = mtlist
+        # impedance, tipper, resistivity and phase of all the stations and frequencies in one go
+        s_export = SurveyExport(self.mt_obj_list, freq_list, interpolate=interpolate, ptol=self.ptol)
+        s_export.write_csv(csvfname, MEASUREMENT_COLUMNS, n_workers=n_workers)
 
         return csvfname
 
@@ -837,29 +629,16 @@ class EdiCollection(object):
 
         :return: dict={}
         """
-        import math
-
-        mt_stations = []
-
-        for mtobj in self.mt_obj_list:
-            mt_stations.append( (mtobj.station, mtobj.lat, mtobj.lon,  mtobj.utm_zone) )
-
-        pdf = pd.DataFrame(mt_stations, columns=['Station', 'Lat', 'Lon',  'UtmZone'])
-
-        mt_distances = []
-        for i in range(len(pdf)):
-            xi=pdf.iloc[i]['Lat']
-            yi=pdf.iloc[i]['Lon']
-            for j in range(i+1, len(pdf)):
-                xj = pdf.iloc[j]['Lat']
-                yj = pdf.iloc[j]['Lon']
-                dist = math.sqrt((xi-xj)**2 + (yi - yj)**2)
-                mt_distances.append(dist)
+        stations = np.array([mtobj.station for mtobj in self.mt_obj_list])
+        lat = np.array([mtobj.lat for mtobj in self.mt_obj_list])
+        lon = np.array([mtobj.lon for mtobj in self.mt_obj_list])
 
-                if(dist <0.004): # 0.004 is about 400 meters
-                    self._logger.info("Small distances occurred between stations: %s %s", pdf.iloc[i].Station, pdf.iloc[j].Station)
+        # distances of all the pairs of stations, in the order of the pairs (i, j>i)
+        ii, jj = np.triu_indices(len(stations), 1)
+        mt_distances = np.sqrt((lat[ii] - lat[jj])**2 + (lon[ii] - lon[jj])**2)
 
-        # print (mt_distances)
+        for i, j in zip(ii[mt_distances < 0.004], jj[mt_distances < 0.004]):  # 0.004 is about 400 meters
+            self._logger.info("Small distances occurred between stations: %s %s", stations[i], stations[j])
 
         anarray = pd.Series(mt_distances)
         print(anarray.describe())
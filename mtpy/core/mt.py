@@ -22,6 +22,7 @@ import mtpy.analysis.distortion as MTdistortion
 import mtpy.core.jfile as MTj
 import mtpy.core.mt_xml as MTxml
 import mtpy.core.zmm as MTzmm
+import mtpy.utils.instrumentation as instrumentation
 
 from mtpy.utils.mtpylog import MtPyLog
 
@@ -38,8 +39,7 @@ try:
                           'might not work.', ImportWarning)
             _logger.warning('Note: need scipy version 0.14.0 or higher or interpolation '
                             'might not work.')
-    import scipy.interpolate as spi
-
+    # scipy.interpolate is imported when MT.interpolate is first called
     interp_import = True
 
 except ImportError:  # pragma: no cover
@@ -340,6 +340,7 @@ class MT(object):
     # ==========================================================================
     #  read in files
     # ==========================================================================
+    @instrumentation.timed('core.mt.read_mt_file')
     def read_mt_file(self, fn, file_type=None):
         """
         Read an MT response file.
@@ -376,6 +377,7 @@ class MT(object):
         else:
             raise MTError('File type not supported yet')
 
+    @instrumentation.timed('core.mt.write_mt_file')
     def write_mt_file(self, save_dir=None, fn_basename=None, file_type='edi',
                       new_Z_obj=None, new_Tipper_obj=None, longitude_format='LON',
                       latlon_format='dms'
@@ -1782,6 +1784,7 @@ class MT(object):
 
         return new_z_obj
 
+    @instrumentation.timed('core.mt.interpolate')
     def interpolate(self, new_freq_array, interp_type='slinear', bounds_error=True, period_buffer=None):
         """
         Interpolate the impedance tensor onto different frequencies
@@ -1820,6 +1823,7 @@ class MT(object):
         # if the interpolation module has not been loaded return
         if interp_import is False:
             raise ImportError('could not interpolate, need to install scipy')
+        import scipy.interpolate as spi
 
         # make sure the input is a numpy array
         if not isinstance(new_freq_array, np.ndarray):
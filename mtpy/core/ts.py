@@ -19,6 +19,8 @@ import scipy.signal as signal
 
 import mtpy.utils.gis_tools as gis_tools
 import mtpy.processing.filter as mtfilter
+import mtpy.processing.decimate as mtdecimate
+import mtpy.utils.instrumentation as instrumentation
 
 import matplotlib.pyplot as plt
 
@@ -398,7 +400,8 @@ class MTTS(object):
         print("   * Reset time seies index to start at {0}".format(start_time))
 
     def apply_addaptive_notch_filter(self, notches=None, notch_radius=0.5,
-                                     freq_rad=0.5, rp=0.1):
+                                     freq_rad=0.5, rp=0.1, method='fft',
+                                     chunk_size=None):
         """
         apply notch filter to the data that finds the peak around each
         frequency.
@@ -410,6 +413,15 @@ class MTTS(object):
                            for 60 Hz and harmonics to filter out.
         :type notch_dict: dictionary
 
+        :param method: [ 'fft' | 'sos' ] remove all notches in one pass
+                       in the frequency domain or with cascaded second
+                       order sections
+        :type method: string
+
+        :param chunk_size: number of samples to transform at a time with
+                           method 'fft', None for all at once
+        :type chunk_size: int
+
         """
         if notches is None:
             notches = list(np.arange(60, 1860, 120))
@@ -418,7 +430,9 @@ class MTTS(object):
                   'notches':notches,
                   'notchradius':notch_radius,
                   'freqrad':freq_rad,
-                  'rp':rp}
+                  'rp':rp,
+                  'method':method,
+                  'chunk_size':chunk_size}
 
         ts, filt_list = mtfilter.adaptive_notch_filter(self.ts.data, **kwargs)
 
@@ -433,36 +447,38 @@ class MTTS(object):
                 pass
 
     # decimate data
-    def decimate(self, dec_factor=1):
+    def decimate(self, dec_factor=1, chunk_size=mtdecimate.CHUNK_SIZE,
+                 dtype='float32'):
         """
-        decimate the data by using scipy.signal.decimate
+        decimate the data by using a multi-stage polyphase FIR filter
+
+        see mtpy.processing.decimate.decimate
 
         :param dec_factor: decimation factor
         :type dec_factor: int
 
-        * refills ts.data with decimated data and replaces sampling_rate
+        :param chunk_size: number of samples to filter at a time
+        :type chunk_size: int
+
+        :param dtype: data type to do the filtering in
+        :type dtype: string
+
+        * refills ts.data with decimated data and replaces sampling_rate,
+          the start time is unchanged
 
         """
         # be sure the decimation factor is an integer
         dec_factor = int(dec_factor)
 
         if dec_factor > 1:
-            if dec_factor > 8:
-                n_dec = np.log2(dec_factor)/np.log2(8)
-                dec_list = [8] * int(n_dec) + [int(2**(3 * n_dec % 1))]
-                decimated_data = signal.decimate(self.ts.data, 8, n=8)
-                for dec in dec_list[1:]:
-                    if dec == 0:
-                        break
-                    decimated_data = signal.decimate(decimated_data,
-                                                     dec,
-                                                     n=8)
-            else:
-                decimated_data = signal.decimate(self.ts.data, dec_factor, n=8)
             start_time = str(self.start_time_utc)
-            self.ts = decimated_data
-            self.sampling_rate /= float(dec_factor)
-            self._set_dt_index(start_time, self.sampling_rate)
+            sampling_rate = self.sampling_rate / float(dec_factor)
+            self.ts = mtdecimate.decimate(self.ts.data.values,
+                                          dec_factor,
+                                          chunk_size=chunk_size,
+                                          dtype=dtype)
+            self._sampling_rate = sampling_rate
+            self._set_dt_index(start_time, sampling_rate)
 
     def low_pass_filter(self, low_pass_freq=15, cutoff_freq=55):
         """
@@ -552,6 +568,7 @@ class MTTS(object):
 
         hdf5_store.close()
 
+    @instrumentation.timed('core.ts.write_ascii_file')
     def write_ascii_file(self, fn_ascii, chunk_size=4096):
         """
         Write an ascii format file with metadata
@@ -568,8 +585,6 @@ class MTTS(object):
 
         """
 
-        st = datetime.datetime.utcnow()
-
         # get the number of chunks to write
         chunks = int(self.ts.shape[0]/chunk_size)
 
@@ -602,14 +617,10 @@ class MTTS(object):
             # be sure to write the last little bit
             fid.write('\n'.join(list(np.array(self.ts.data[(cc+1)*chunk_size:],
                                               dtype='U22'))))
-
-
-        # get an estimation of how long it took to write the file
-        et = datetime.datetime.utcnow()
-        time_diff = et-st
+            instrumentation.count('bytes', fid.tell())
+        instrumentation.count('records', self.ts.shape[0])
 
         print('--> Wrote {0}'.format(fn_ascii))
-        print('    Took {0:.2f} seconds'.format(time_diff.seconds+time_diff.microseconds*1E-6))
 
     def read_ascii_header(self, fn_ascii):
         """
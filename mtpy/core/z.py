@@ -666,78 +666,31 @@ class Z(ResPhase):
 
         """
 
-        # check for iterable list/set of reduce_res_factor_x - if so, it must
-        # have length 1 or same as len(z):
-        if np.iterable(reduce_res_factor_x) == 0:
+        # the factors are a single number or one for each frequency
+        lo_factors = []
+        for name, factor in [('reduce_res_factor_x', reduce_res_factor_x),
+                             ('reduce_res_factor_y', reduce_res_factor_y)]:
             try:
-                x_factor = float(reduce_res_factor_x)
-            except ValueError:
-                self._logger.error('reduce_res_factor_x must be a valid numbers')
-                return
-
-            lo_x_factors = np.repeat(x_factor, len(self.z))
-        elif len(reduce_res_factor_x) == 1:
-            try:
-                x_factor = float(reduce_res_factor_x)
-            except ValueError:
-                self._logger.error('reduce_res_factor_x must be a valid numbers')
-                return
-            lo_x_factors = np.repeat(x_factor, len(self.z))
-        else:
-            try:
-                lo_x_factors = np.repeat(x_factor,
-                                         len(reduce_res_factor_x))
-            except ValueError:
-                self._logger.error('"reduce_res_factor_x" must be valid numbers')
-                return
-
-        if len(lo_x_factors) != len(self.z):
-            self._logger.error('Wrong number Number of reduce_res_factor_x - need {0}'.format(len(self.z)))
-            return
-
-        # check for iterable list/set of reduce_res_factor_y - if so,
-        # it must have length 1 or same as len(z):
-        if np.iterable(reduce_res_factor_y) == 0:
-            try:
-                y_factor = float(reduce_res_factor_y)
-            except ValueError:
-                self._logger.error('"reduce_res_factor_y" must be a valid numbers')
+                factor = np.array(factor, dtype=float).flatten()
+            except (TypeError, ValueError):
+                self._logger.error('"{0}" must be valid numbers'.format(name))
                 return
 
-            lo_y_factors = np.repeat(y_factor, len(self.z))
-        elif len(reduce_res_factor_y) == 1:
-            try:
-                y_factor = float(reduce_res_factor_y)
-            except ValueError:
-                self._logger.error('"reduce_res_factor_y" must be a valid numbers')
+            if factor.size == 1:
+                factor = np.repeat(factor, len(self.z))
+            if factor.size != len(self.z):
+                self._logger.error('Wrong number of "{0}" - need {1}'.format(
+                    name, len(self.z)))
                 return
-            lo_y_factors = np.repeat(y_factor, len(self.z))
-        else:
-            try:
-                lo_y_factors = np.repeat(y_factor,
-                                         len(reduce_res_factor_y))
-            except ValueError:
-                self._logger.error('"reduce_res_factor_y" must be valid numbers')
-                return
-
-        if len(lo_y_factors) != len(self.z):
-            self._logger.error('Wrong number Number of "reduce_res_factor_y"' + \
-                               '- need {0} '.format(len(self.z)))
-            return
+            lo_factors.append(factor)
 
-        z_corrected = copy.copy(self.z)
+        # make static shift array, x-direction is z[:, 0, :] and
+        # y-direction is z[:, 1, :]
         static_shift = np.zeros((len(self.z), 2, 2))
+        static_shift[:, 0, 0] = np.sqrt(lo_factors[0])
+        static_shift[:, 1, 1] = np.sqrt(lo_factors[1])
 
-        for idx_f in range(len(self.z)):
-            # correct for x-direction
-            z_corrected[idx_f, 0, :] = self.z[idx_f, 0, :] / \
-                                       np.sqrt(lo_x_factors[idx_f])
-            # correct for y-direction
-            z_corrected[idx_f, 1, :] = self.z[idx_f, 1, :] / \
-                                       np.sqrt(lo_y_factors[idx_f])
-            # make static shift array
-            static_shift[idx_f, 0, 0] = np.sqrt(lo_x_factors[idx_f])
-            static_shift[idx_f, 1, 1] = np.sqrt(lo_y_factors[idx_f])
+        z_corrected = self.z / np.sqrt(np.array(lo_factors).T)[:, :, None]
 
         return static_shift, z_corrected
 
@@ -819,22 +772,10 @@ class Z(ResPhase):
 
         # propagation of errors - step 2 - product of D.inverse and Z;
         # D.I * Z, making it 4 summands for each component:
-        z_corrected = np.zeros_like(self.z)
-        z_corrected_err = np.zeros_like(self.z_err)
-
-        for idx_f in range(len(self.z)):
-            z_corrected[idx_f] = np.array(np.dot(DI, np.matrix(self.z[idx_f])))
-            for ii in range(2):
-                for jj in range(2):
-                    z_corrected_err[idx_f, ii, jj] = np.sum(np.abs(
-                        np.array([DI_err[ii, 0] * \
-                                  self.z[idx_f, 0, jj], \
-                                  DI[ii, 0] * \
-                                  self.z_err[idx_f, 0, jj], \
-                                  DI_err[ii, 1] * \
-                                  self.z[idx_f, 1, jj], \
-                                  DI[ii, 1] * \
-                                  self.z_err[idx_f, 1, jj]])))
+        DI = np.asarray(DI)
+        z_corrected = np.matmul(DI, self.z)
+        z_corrected_err = np.matmul(np.abs(DI_err), np.abs(self.z)) + \
+                          np.matmul(np.abs(DI), np.abs(self.z_err))
 
         return distortion_tensor, z_corrected, z_corrected_err
 
@@ -134,7 +134,7 @@ class PlotOption(QWidget):
 
     def update_ui(self):
         if self._current_plot is not None:
-            self._current_plot.set_data(self.get_mt_objs())
+            self._current_plot.set_data(self.get_mt_objs(), self.file_handler.station_cache)
 
     def get_mt_objs(self):
         mt_objs = []
@@ -36,6 +36,7 @@ from mtpy.gui.SmartMT.gui.station_summary import StationSummary
 from mtpy.gui.SmartMT.gui.station_viewer import StationViewer
 from mtpy.gui.SmartMT.ui_asset.main_window import Ui_SmartMT_MainWindow
 from mtpy.gui.SmartMT.utils.file_handler import FileHandler, FileHandlingException
+from mtpy.gui.SmartMT.utils.file_loader import FileLoader
 from mtpy.gui.SmartMT.visualization.visualization_base import MPLCanvasWidget
 from mtpy.utils.mtpy_decorator import deprecated
 from mtpy.utils.mtpylog import MtPyLog
@@ -81,6 +82,7 @@ class StartGUI(QMainWindow):
         self._station_summary = None
 
         self._progress_bar = ProgressBar(title='Loading files...')
+        self._file_loader = None
         self.subwindows = {}
         # enable export if the activated subwindow is a image window
         self.ui.mdiArea.subWindowActivated.connect(self._subwindow_activated)
@@ -309,11 +311,7 @@ class StartGUI(QMainWindow):
         dialog.setFileMode(QFileDialog.ExistingFiles)
         if dialog.exec_() == QDialog.Accepted:
             file_list = dialog.selectedFiles()
-            self._progress_bar.setMaximumValue(len(file_list))
-            self._progress_bar.onStart()
-            self._add_files(file_list, DEFAULT_GROUP_NAME)
-            self._update_tree_view()
-            self._progress_bar.onFinished()
+            self._load_files(file_list, DEFAULT_GROUP_NAME)
 
     def _add_files(self, file_list, group_id=DEFAULT_GROUP_NAME):
         for file_ref in file_list:
@@ -325,6 +323,53 @@ class StartGUI(QMainWindow):
                 self._logger.critical(exp.message)
             self._progress_bar.incrementValue()
 
+    def _load_files(self, file_list, group_id=DEFAULT_GROUP_NAME):
+        """
+        read the files in a pool of worker processes in the background, the stations are added to the file handler
+        on this thread as they are read and the tree view is updated once all of them are loaded
+        :param file_list:
+        :param group_id:
+        :return:
+        """
+        if self._file_loader is not None and self._file_loader.isRunning():
+            QMessageBox.information(self, "NOTE",
+                                    "Still loading the previously selected files, please try again once finished.")
+            return
+        file_list = [os.path.abspath(str(file_ref)) for file_ref in file_list]
+        loaded_files = [file_ref for file_ref in file_list if self._file_handler.is_loaded(file_ref)]
+        new_files = [file_ref for file_ref in file_list if not self._file_handler.is_loaded(file_ref)]
+
+        self._progress_bar.setMaximumValue(len(file_list))
+        self._progress_bar.onStart()
+        # files that are already loaded only need to be added to the group
+        self._add_files(loaded_files, group_id)
+        if not new_files:
+            self._file_loading_finished()
+            return
+
+        self._file_loader = FileLoader(new_files, group_id, self)
+        self._file_loader.file_loaded.connect(self._file_loaded)
+        self._file_loader.loading_error.connect(self._file_loading_error)
+        self._file_loader.progress.connect(
+            lambda done, total: self._progress_bar.setValue(len(loaded_files) + done))
+        self._file_loader.finished.connect(self._file_loading_finished)
+        self._file_loader.start()
+
+    def _file_loaded(self, file_name, mt_obj, group_id):
+        try:
+            self._file_handler.add_file(mt_obj, group_id=group_id)
+        except FileHandlingException as exp:
+            self._logger.warning(str(exp))
+        except Exception as exp:
+            self._logger.critical(str(exp))
+
+    def _file_loading_error(self, file_name, error):
+        self._logger.critical("Could not read %s:\n%s" % (file_name, error))
+
+    def _file_loading_finished(self):
+        self._update_tree_view()
+        self._progress_bar.onFinished()
+
     def plot_selected_station(self, *args, **kwargs):
         if self._station_viewer and self._station_viewer.selected_stations:
             self.ui.stackedWidget.setCurrentWidget(self._plot_option)
@@ -353,11 +398,7 @@ class StartGUI(QMainWindow):
                                             "Directory does not contain any .edi file, please select again.")
                     dir_name = None  # will read again
                 else:
-                    self._progress_bar.setMaximumValue(len(file_list))
-                    self._progress_bar.onStart()
-                    self._add_files(file_list, os.path.basename(dir_name))
-                    self._update_tree_view()
-                    self._progress_bar.onFinished()
+                    self._load_files(file_list, os.path.basename(dir_name))
             else:
                 break
 
@@ -10,9 +10,13 @@
 """
 
 import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 import mtpy.core.mt as mt
 
+from mtpy.gui.SmartMT.utils.station_cache import StationCache
+from mtpy.imaging.mtplottools import MTplot
 from mtpy.utils.mtpylog import MtPyLog
 
 DEFAULT_GROUP_PREFIX = 'Group'
@@ -31,6 +35,7 @@ class FileHandler():
         self._file_dict = dict()
         self._group_dict = dict()
         self._file_to_groups = dict()
+        self.station_cache = StationCache()
 
     def add_file(self, file_name, group_id=None):
         """
@@ -51,7 +56,7 @@ class FileHandler():
                 else:
                     file_ref = file_name
                     self._logger.info("loading %s" % file_name)
-                    mt_obj = mt.MT(file_name)
+                    mt_obj = load_mt_file(file_name)
         elif isinstance(file_name, mt.MT):
             mt_obj = file_name
             file_ref = mt_obj.fn
@@ -71,11 +76,33 @@ class FileHandler():
         # add file to group
         return self.add_to_group(group_id, file_ref)
 
-    def add_files(self, file_list, group_id=None):
+    def add_files(self, file_list, group_id=None, n_workers=None):
+        """
+        read the files in a pool of worker processes and add them to the container
+
+        :param file_list:
+        :param group_id:
+        :param n_workers: number of worker processes, 1 reads the files one by one in this process
+        :type file_list: list
+        :type group_id: str
+        :type n_workers: int
+        :return:
+        """
+        new_files = []
         for file_name in file_list:
-            self.add_file(file_name, group_id)
+            if isinstance(file_name, str) and not self.is_loaded(file_name):
+                new_files.append(file_name)
+            else:
+                self.add_file(file_name, group_id)
+        for file_name, mt_obj, error in iter_load_files(new_files, n_workers=n_workers):
+            if error is not None:
+                raise FileHandlingException("Could not read %s:\n%s" % (file_name, error))
+            self.add_file(mt_obj, group_id)
         return True
 
+    def is_loaded(self, file_ref):
+        return file_ref in self._file_dict and self._file_dict[file_ref] is not None
+
     def station2ref(self, station):
         if station in self._station_dict:
             return self._station_dict[station]
@@ -142,7 +169,7 @@ class FileHandler():
         del self._station_dict[station]
         del self._file_to_groups[file_ref]
         del self._file_dict[file_ref]
-
+        self.station_cache.invalidate(file_ref)
 
     def remove_group(self, group_id):
         self._logger.info("Remove group %s" % group_id)
@@ -184,6 +211,56 @@ class FileHandler():
             return False
 
 
+def load_mt_file(file_name):
+    """
+    read a station file into a MTplot object (a mt.MT that also knows its periods)
+    this is a module level function so that it can be run in worker processes
+    :param file_name:
+    :type file_name: str
+    :return: MTplot
+    """
+    return MTplot(fn=file_name)
+
+
+def _load_mt_file(file_name):
+    try:
+        return file_name, load_mt_file(file_name), None
+    except Exception:
+        return file_name, None, traceback.format_exc()
+
+
+def iter_load_files(file_list, n_workers=None):
+    """
+    read station files in a pool of worker processes, reading a file is mostly spent
+    in parsing python code so threads would not run in parallel.
+
+    the (file_name, mt_obj, error) are yielded in the order the files are read, error is
+    None or the trace back of the reading error of that file. The MT objects are not added to
+    any FileHandler, this is left to the caller, who owns the FileHandler
+
+    :param file_list:
+    :param n_workers: number of worker processes, None uses the number of cpus,
+                      1 reads the files one by one in this process
+    :type file_list: list
+    :type n_workers: int
+    :return: generator of (str, MTplot, str)
+    """
+    if n_workers == 1 or len(file_list) <= 1:
+        for file_name in file_list:
+            yield _load_mt_file(file_name)
+        return
+
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures = [executor.submit(_load_mt_file, file_name) for file_name in file_list]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # stop reading the files not yet started if the caller stops early
+            for future in futures:
+                future.cancel()
+
+
 class FileHandlingException(Exception):
     def __init__(self, *args, **kwargs):
         Exception.__init__(self, *args, **kwargs)
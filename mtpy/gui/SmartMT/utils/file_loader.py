@@ -0,0 +1,66 @@
+"""
+    Description:
+        thread that reads MT files in a pool of worker processes so the GUI stays responsive while a large survey
+        is loaded. the stations are handed back through signals, one by one as they are read, and should be added to
+        the FileHandler from the GUI thread
+
+    Usage:
+        >>> loader = FileLoader(file_list, group_id, parent)
+        >>> loader.file_loaded.connect(on_file_loaded)
+        >>> loader.progress.connect(progress_bar.setValue)
+        >>> loader.start()
+
+    Author: YingzhiGou
+    Date: 20/06/2017
+"""
+from qtpy import QtCore
+from qtpy.QtCore import Signal
+
+from mtpy.gui.SmartMT.utils.file_handler import iter_load_files
+from mtpy.utils.mtpylog import MtPyLog
+
+
+class FileLoader(QtCore.QThread):
+    """
+        Description:
+            reads a list of files in the background, emits file_loaded(file_name, mt_obj, group_id) for every station
+            that was read, loading_error(file_name, traceback) for every file that could not be read and
+            progress(done, total) after each file
+    """
+
+    def __init__(self, file_list, group_id=None, parent=None, n_workers=None):
+        QtCore.QThread.__init__(self, parent)
+        self._logger = MtPyLog.get_mtpy_logger(self.__class__.__name__)
+        self._file_list = list(file_list)
+        self._group_id = group_id
+        self._n_workers = n_workers
+        self._cancelled = False
+
+    def cancel(self):
+        """
+        stop reading, the files that are already being read by the workers are dropped
+        """
+        self._cancelled = True
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def run(self):
+        total = len(self._file_list)
+        done = 0
+        self.progress.emit(done, total)
+        for file_name, mt_obj, error in iter_load_files(self._file_list, n_workers=self._n_workers):
+            if self._cancelled:
+                self._logger.info("loading cancelled after %d of %d files" % (done, total))
+                break
+            if error is None:
+                self.file_loaded.emit(file_name, mt_obj, self._group_id)
+            else:
+                self._logger.error("could not read %s" % file_name)
+                self.loading_error.emit(file_name, error)
+            done += 1
+            self.progress.emit(done, total)
+
+    file_loaded = Signal(str, object, object)
+    loading_error = Signal(str, str)
+    progress = Signal(int, int)
@@ -0,0 +1,105 @@
+"""
+    Description:
+        cache of rotated stations and their phase tensors shared by all the plots of the GUI, so that changing the
+        rotation angle or re-plotting a station does not rotate or recompute the same data again
+
+    Usage:
+        >>> cache = StationCache()
+        >>> rotated = cache.get_mt_obj(mt_obj, rotation_angle=30)
+        >>> pt_obj = cache.get_pt(mt_obj, rotation_angle=30)
+
+    Author: YingzhiGou
+    Date: 20/06/2017
+"""
+import copy
+import threading
+from collections import OrderedDict
+
+from mtpy.utils.mtpylog import MtPyLog
+
+
+class StationCache(object):
+    """
+        Description:
+            thread safe container of the rotated copies of the loaded stations and of their phase tensors, keyed by
+            file reference and rotation angle. only the most recently used max_rotations angles are kept per station
+    """
+
+    def __init__(self, max_rotations=3):
+        self._logger = MtPyLog.get_mtpy_logger(self.__class__.__name__)
+        self._lock = threading.RLock()
+        self._stations = dict()
+        self._pts = dict()
+        self.max_rotations = max_rotations
+
+    def get_mt_obj(self, mt_obj, rotation_angle=0):
+        """
+        get the station rotated by rotation_angle, the original station is returned for 0 and is never modified
+
+        :param mt_obj:
+        :param rotation_angle: angle in degrees clockwise from north
+        :type mt_obj: mtpy.core.mt.MT
+        :type rotation_angle: float
+        :return:
+        """
+        angle = _normalise_angle(rotation_angle)
+        if angle == 0:
+            return mt_obj
+        with self._lock:
+            rotations = self._stations.setdefault(mt_obj.fn, OrderedDict())
+            if angle in rotations:
+                rotations.move_to_end(angle)
+                return rotations[angle]
+            self._logger.info("rotating %s by %g degrees" % (mt_obj.station, angle))
+            rotated = copy.copy(mt_obj)
+            rotated.Z = copy.deepcopy(mt_obj.Z)
+            rotated.Z.rotate(angle)
+            if mt_obj.Tipper is not None:
+                rotated.Tipper = copy.deepcopy(mt_obj.Tipper)
+                rotated.Tipper.rotate(angle)
+            rotations[angle] = rotated
+            while len(rotations) > self.max_rotations:
+                old_angle, _ = rotations.popitem(last=False)
+                self._pts.pop((mt_obj.fn, old_angle), None)
+            return rotated
+
+    def get_mt_objs(self, mt_objs, rotation_angle=0):
+        """
+        :type mt_objs: list[mtpy.core.mt.MT]
+        :return: the stations rotated by rotation_angle, in the same order
+        """
+        return [self.get_mt_obj(mt_obj, rotation_angle) for mt_obj in mt_objs]
+
+    def get_pt(self, mt_obj, rotation_angle=0):
+        """
+        get the phase tensor of the station rotated by rotation_angle
+
+        :type mt_obj: mtpy.core.mt.MT
+        :type rotation_angle: float
+        :return:
+        :rtype: mtpy.analysis.pt.PhaseTensor
+        """
+        angle = _normalise_angle(rotation_angle)
+        with self._lock:
+            key = (mt_obj.fn, angle)
+            if key not in self._pts:
+                self._pts[key] = self.get_mt_obj(mt_obj, angle).pt
+            return self._pts[key]
+
+    def invalidate(self, file_ref):
+        """
+        drop everything cached for the station loaded from file_ref
+        """
+        with self._lock:
+            self._stations.pop(file_ref, None)
+            for key in [key for key in self._pts if key[0] == file_ref]:
+                del self._pts[key]
+
+    def clear(self):
+        with self._lock:
+            self._stations.clear()
+            self._pts.clear()
+
+
+def _normalise_angle(rotation_angle):
+    return round(float(rotation_angle) % 360, 6) % 360
@@ -22,12 +22,16 @@ class MTResponse(VisualizationBase):
     def plot(self):
         # get parameters
         self._station = self._station_ui.get_station()
+        rotation_angle = self._rotation_ui.get_rotation_in_degree()
+        # rotated data and phase tensor are shared with the other plots through the station cache
+        station = self._station_cache.get_mt_obj(self._station, rotation_angle)
 
         self._params = {
-            'z_object': self._station.Z,
-            't_object': self._station.Tipper if 'y' in self._arrow_ui.get_plot_tipper() else None,
-            'pt_obj': self._station.pt if self._plot_control_ui.is_plot_ellipses() else None,
-            'rotation_angle': self._rotation_ui.get_rotation_in_degree(),
+            'z_object': station.Z,
+            't_object': station.Tipper if 'y' in self._arrow_ui.get_plot_tipper() else None,
+            'pt_obj': self._station_cache.get_pt(self._station, rotation_angle)
+            if self._plot_control_ui.is_plot_ellipses() else None,
+            'rotation_angle': rotation_angle,
             'plot_num': self._plot_control_ui.get_plot_num(),
             "plot_tipper": self._arrow_ui.get_plot_tipper(),
             # 'plot_strike': self._plot_control_ui.get_strike(),  # no longer available in mtpy
@@ -187,7 +191,8 @@ subplots such as strike, skew and phase tensor ellipses.</p>
     def plot(self):
         # get parameters
         self._params = {
-            'fn_list': [mt_obj.fn for mt_obj in self._mt_objs],
+            'mt_object_list': self._station_cache.get_mt_objs(self._mt_objs,
+                                                              self._rotation_ui.get_rotation_in_degree()),
             'rot_z': self._rotation_ui.get_rotation_in_degree(),
             'plot_num': self._plot_control_ui.get_plot_num(),
             'plot_tipper': self._arrow_ui.get_plot_tipper(),
@@ -47,12 +47,12 @@ class PhaseTensorMap(VisualizationBase):
 
     def plot(self):
         # get data
-        # NOTE: this is a hack because the existing bug(s) in the PlotPhaseTensorMaps class, that is the
-        # constructor of the class only populate all the necessary information correctly when reads from file
-        # this is the only way before this bug(s) is fixed
+        # NOTE: the constructor of PlotPhaseTensorMaps only populates all the necessary information correctly for
+        # stations read from file, the file handler loads every station as a MTplot read from its file so they can
+        # be passed in directly instead of reading the files again
 
         self._params = {
-            'fn_list': [mt_obj.fn for mt_obj in self._mt_objs],
+            'mt_object_list': self._station_cache.get_mt_objs(self._mt_objs),
             'plot_freq': self._frequency_ui.get_frequencies(),
             'ftol': self._tolerance_ui.get_tolerance_in_float(),
             'mapscale': self._scale_ui.get_mapscale(),
@@ -220,7 +220,7 @@ class PhaseTensorPseudoSection(VisualizationBase):
     def plot(self):
         # get parameters
         self._params = {
-            'fn_list': [mt_obj.fn for mt_obj in self._mt_objs],
+            'mt_object_list': self._station_cache.get_mt_objs(self._mt_objs),
             'plot_tipper': self._arrow_ui.get_plot_tipper(),
             'tscale': self._scale_ui.get_tscale(),
             'ellipse_dict': self._ellipse_ui.get_ellipse_dict(prefix=""),
@@ -272,7 +272,7 @@ class ResistivityPhasePseudoSection(VisualizationBase):
 
     def plot(self):
         self._params = {
-            'fn_list': [mt_obj.fn for mt_obj in self._mt_objs],
+            'mt_object_list': self._station_cache.get_mt_objs(self._mt_objs),
             'plot_style': self._mesh_grid_ui.get_grid_type(),
             'imshow_interp': self._mesh_grid_ui.get_interpolation_method(),
             'ftol': self._tolerance_ui.get_tolerance_in_float(),
@@ -43,7 +43,8 @@ class Strike(VisualizationBase):
     def plot(self):
         # set up params
         self._params = {
-            'fn_list': [mt_obj.fn for mt_obj in self._mt_objs],
+            'mt_object_list': self._station_cache.get_mt_objs(self._mt_objs,
+                                                              self._rotation_ui.get_rotation_in_degree()),
             'rot_z': self._rotation_ui.get_rotation_in_degree(),
             'period_tolerance': self._tolerance_ui.get_tolerance_in_float(),
             'plot_range': self._plot_control_ui.get_plot_range(),
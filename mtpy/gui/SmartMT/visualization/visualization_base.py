@@ -28,6 +28,7 @@ else:
     from matplotlib.backends.backend_qt5 import NavigationToolbar2QT as NavigationToolbar
 
 from mtpy.gui.SmartMT.Components.plot_parameter import PlotParameter
+from mtpy.gui.SmartMT.utils.station_cache import StationCache
 from mtpy.utils.mtpylog import MtPyLog
 
 
@@ -49,6 +50,7 @@ class VisualizationBase(QtCore.QThread):
         QtCore.QThread.__init__(self, parent)
         self._parent = parent
         self._mt_objs = None
+        self._station_cache = None
         self._fig = None
         self._plotting_object = None
         self._logger = MtPyLog.get_mtpy_logger(self.__class__.__name__)
@@ -70,14 +72,18 @@ class VisualizationBase(QtCore.QThread):
         """
         pass
 
-    def set_data(self, mt_objs):
+    def set_data(self, mt_objs, station_cache=None):
         """
         set input data, default is a collection of mt_objs
         then call to update gui components that may requires mt_objs as input
         :param mt_objs:
+        :param station_cache: cache of rotated stations and phase tensors shared by all the plots,
+                              a private one is created if not given
+        :type station_cache: StationCache
         :return:
         """
         self._mt_objs = mt_objs
+        self._station_cache = station_cache if station_cache is not None else StationCache()
         self.update_ui()
 
     @property
@@ -28,6 +28,7 @@ import numpy as np
 from scipy import signal
 
 import mtpy.modeling.modem as modem
+from mtpy.utils.matplotlib_utils import SliceCache, blit_axes, update_mesh
 
 #==============================================================================
 # Main Window
@@ -356,6 +357,16 @@ class ModelWidget(QtWidgets.QWidget):
         self.cb_ax = None
         self.location_ax = None
         self.new_res_model = None
+        self.slice_cache = None
+
+        # plotted artists that are updated instead of plotted again
+        self.map_mesh = None
+        self.east_mesh = None
+        self.north_mesh = None
+        self.map_stations = None
+        self.location_stations = None
+        self.east_stations = []
+        self.north_stations = []
 
         self.units = 'km'
         self.scale = 1000.
@@ -623,6 +634,11 @@ class ModelWidget(QtWidgets.QWidget):
         self.model_obj.read_model_file(self._model_fn)
         ## make a copy of the resistivity model to manipulate
         self.new_res_model = self.model_obj.res_model.copy()
+        self.slice_cache = SliceCache(self.new_res_model)
+        self.map_mesh = self.east_mesh = self.north_mesh = None
+        self.map_stations = self.location_stations = None
+        self.east_stations = []
+        self.north_stations = []
 
         # set slider bar intervals
         # need the minus 1 cause we are using the value of the slider as
@@ -730,11 +746,11 @@ class ModelWidget(QtWidgets.QWidget):
                                                  'b',
                                                  lw=2)[0]
         if self.data_fn is not None:
-            self.location_ax.scatter(self.data_obj.station_locations.rel_east/self.scale,
-                                     self.data_obj.station_locations.rel_north/self.scale,
-                                     marker='v',
-                                     c='k',
-                                     s=10)
+            self.location_stations = self.location_ax.scatter(self.data_obj.station_locations.rel_east/self.scale,
+                                                              self.data_obj.station_locations.rel_north/self.scale,
+                                                              marker='v',
+                                                              c='k',
+                                                              s=10)
             self.location_ax.set_xlim((self.data_obj.station_locations.rel_east.min()/self.scale - 1,
                                        self.data_obj.station_locations.rel_east.max()/self.scale + 1))
             self.location_ax.set_ylim((self.data_obj.station_locations.rel_north.min()/self.scale - 1,
@@ -881,19 +897,26 @@ class ModelWidget(QtWidgets.QWidget):
         """
         redraw map view
         """
-        self.map_ax.pcolormesh(self.plot_east_map,
-                               self.plot_north_map,
-                               np.log10(self.new_res_model[:, :, self.map_index].T),
-                               cmap=self.cmap,
-                               vmin=self.res_limits[0],
-                               vmax=self.res_limits[1])
-        if self.data_fn is not None:
-            self.map_ax.scatter(self.data_obj.station_locations.rel_east/self.scale,
-                                self.data_obj.station_locations.rel_north/self.scale,
-                                marker='v',
-                                c='k',
-                                s=10)
-        self.map_canvas.draw()
+        plot_res = self.slice_cache.get_slice(2, self.map_index).T
+        if self.map_mesh is None:
+            self.map_mesh = self.map_ax.pcolormesh(self.plot_east_map,
+                                                   self.plot_north_map,
+                                                   plot_res,
+                                                   cmap=self.cmap,
+                                                   vmin=self.res_limits[0],
+                                                   vmax=self.res_limits[1])
+        else:
+            update_mesh(self.map_mesh, self.plot_east_map, plot_res)
+            self.map_mesh.set_clim(*self.res_limits)
+        if self.data_fn is not None and self.map_stations is None:
+            self.map_stations = self.map_ax.scatter(self.data_obj.station_locations.rel_east/self.scale,
+                                                    self.data_obj.station_locations.rel_north/self.scale,
+                                                    marker='v',
+                                                    c='k',
+                                                    s=10)
+            self.map_canvas.draw()
+        else:
+            blit_axes(self.map_ax)
 
     def set_east_index(self):
         self.east_index = int(self.east_slider.value())
@@ -908,106 +931,49 @@ class ModelWidget(QtWidgets.QWidget):
         """
         redraw east view
         """
-        xlim = self.east_ax.get_xlim()
-        ylim = self.east_ax.get_ylim()
-
-        self.east_ax.cla()
-        self.east_ax.plot(self.east_north_line_xlist,
-                          self.east_north_line_ylist,
-                          lw=.25,
-                          color='k')
-        self.east_ax.plot(self.east_z_line_xlist,
-                          self.east_z_line_ylist,
-                          lw=.25,
-                          color='k')
-        self.east_ax.pcolormesh(self.plot_north_z,
-                               self.plot_z_north,
-                               np.log10(self.new_res_model[:, self.east_index, :]),
-                               cmap=self.cmap,
-                               vmin=self.res_limits[0],
-                               vmax=self.res_limits[1])
-
-        line = self.get_stations_east()
-        if line is not None:
-            self.east_ax.scatter(line['rel_north']/self.scale,
-                                 line['rel_elev']/self.scale,
-                                 marker='v',  c='cyan', s=50,
-                                 edgecolors='k')
-
-            self.location_ax.scatter(line['rel_east']/self.scale,
-                                     line['rel_north']/self.scale,
-                                     marker='v',  c='k', s=30,
-                                     edgecolors='cyan')
-            self.location_canvas.draw()
-
-            for ss in line:
-                self.east_ax.text(ss['rel_north']/self.scale,
-                                  ss['rel_elev']/self.scale - .2,
-                                  ss['station'],
-                                  va='bottom', ha='center',
-                                  fontdict={'weight':'bold',
-                                            'size':10},
-                                  clip_on=True,
-                                  bbox={'boxstyle':"square",
-                                        'ec':'k',
-                                        'fc':'w'})
+        plot_res = self.slice_cache.get_slice(1, self.east_index)
+        if self.east_mesh is None:
+            self.east_mesh = self.east_ax.pcolormesh(self.plot_north_z,
+                                                     self.plot_z_north,
+                                                     plot_res,
+                                                     cmap=self.cmap,
+                                                     vmin=self.res_limits[0],
+                                                     vmax=self.res_limits[1])
+            self.east_ax.set_xlabel('Northing {0}'.format(self.units))
+            self.east_ax.set_ylabel('Depth {0}'.format(self.units))
+        else:
+            update_mesh(self.east_mesh, self.plot_north_z, plot_res)
+            self.east_mesh.set_clim(*self.res_limits)
 
-        self.east_ax.set_xlabel('Northing {0}'.format(self.units))
-        self.east_ax.set_ylabel('Depth {0}'.format(self.units))
-        self.east_ax.set_ylim(ylim)
-        self.east_ax.set_xlim(xlim)
-        self.east_canvas.draw()
+        self.east_stations = self._plot_line_stations(self.east_ax,
+                                                      self.east_stations,
+                                                      self.get_stations_east(),
+                                                      'rel_north')
+        blit_axes(self.east_ax)
 
     def redraw_location(self):
         """
         redraw the location map with the indication lines on it
         """
-
-        self.location_ax.cla()
-        self.location_ax.plot(self.map_east_line_xlist,
-                              self.map_east_line_ylist,
-                              lw=.25,
-                              color='k',
-                              picker=3)
-        self.location_ax.plot(self.map_north_line_xlist,
-                              self.map_north_line_ylist,
-                              lw=.25,
-                              color='k',
-                              picker=3)
-        # make lines that can move around
-        self.east_line = self.location_ax.plot([self.model_obj.grid_east[self.east_index]/self.scale,
-                                                self.model_obj.grid_east[self.east_index]/self.scale],
-                                                [self.model_obj.grid_north.min()/self.scale,
-                                                 self.model_obj.grid_north.max()/self.scale],
-                                                 'g',
-                                                 lw=2)[0]
-        self.north_line = self.location_ax.plot([self.model_obj.grid_east.min()/self.scale,
-                                                self.model_obj.grid_east.max()/self.scale],
-                                                [self.model_obj.grid_north[self.north_index]/self.scale,
-                                                 self.model_obj.grid_north[self.north_index]/self.scale],
-                                                 'b',
-                                                 lw=2)[0]
-        self.location_ax.set_xlim((self.model_obj.grid_east[self.model_obj.pad_east]/self.scale,
-                                   self.model_obj.grid_east[-self.model_obj.pad_east]/self.scale))
-        self.location_ax.set_ylim((self.model_obj.grid_north[self.model_obj.pad_north]/self.scale,
-                                   self.model_obj.grid_north[-self.model_obj.pad_north]/self.scale))
-
-        if self.data_fn is not None:
-            self.location_ax.scatter(self.data_obj.station_locations.rel_east/self.scale,
-                                     self.data_obj.station_locations.rel_north/self.scale,
-                                     marker='v',
-                                     c='k',
-                                     edgecolors='k',
-                                     s=30)
+        grid_east = self.model_obj.grid_east[self.east_index]/self.scale
+        grid_north = self.model_obj.grid_north[self.north_index]/self.scale
+        self.east_line.set_xdata([grid_east, grid_east])
+        self.north_line.set_ydata([grid_north, grid_north])
+
+        if self.data_fn is not None and self.location_stations is None:
+            self.location_stations = self.location_ax.scatter(self.data_obj.station_locations.rel_east/self.scale,
+                                                              self.data_obj.station_locations.rel_north/self.scale,
+                                                              marker='v',
+                                                              c='k',
+                                                              edgecolors='k',
+                                                              s=30)
             self.location_ax.set_xlim((self.data_obj.station_locations.rel_east.min()/self.scale - 1,
                                        self.data_obj.station_locations.rel_east.max()/self.scale + 1))
             self.location_ax.set_ylim((self.data_obj.station_locations.rel_north.min()/self.scale - 1,
                                        self.data_obj.station_locations.rel_north.max()/self.scale + 1))
-
-        self.location_ax.set_xlabel('Easting {0}'.format(self.units))
-        self.location_ax.set_ylabel('Northing {0}'.format(self.units))
-
-        self.location_canvas.draw()
+            self.location_canvas.draw()
+        else:
+            blit_axes(self.location_ax)
 
     def set_north_index(self):
         self.north_index = int(self.north_slider.value())
@@ -1022,54 +988,52 @@ class ModelWidget(QtWidgets.QWidget):
         """
         redraw north view
         """
-        ylim = self.north_ax.get_ylim()
-        xlim = self.north_ax.get_xlim()
-        self.north_ax.cla()
-        self.north_ax.plot(self.north_east_line_xlist,
-                           self.north_east_line_ylist,
-                           lw=.25,
-                           color='k')
-        self.north_ax.plot(self.north_z_line_xlist,
-                           self.north_z_line_ylist,
-                           lw=.25,
-                           color='k')
-        self.north_ax.pcolormesh(self.plot_east_z,
-                                 self.plot_z_east,
-                                 np.log10(self.new_res_model[self.north_index, :, :]),
-                                 cmap=self.cmap,
-                                 vmin=self.res_limits[0],
-                                 vmax=self.res_limits[1])
-
-        line = self.get_stations_north()
-
-        if line is not None:
-            self.north_ax.scatter(line['rel_east']/self.scale,
-                                  line['rel_elev']/self.scale,
-                                  marker='v',  c='cyan', s=50,
-                                  edgecolors='k')
-            self.location_ax.scatter(line['rel_east']/self.scale,
-                                     line['rel_north']/self.scale,
-                                     marker='v',  c='k', s=30,
-                                     edgecolors='cyan')
-            self.location_canvas.draw()
-
-            for ss in line:
-                self.north_ax.text(ss['rel_east']/self.scale,
+        plot_res = self.slice_cache.get_slice(0, self.north_index)
+        if self.north_mesh is None:
+            self.north_mesh = self.north_ax.pcolormesh(self.plot_east_z,
+                                                       self.plot_z_east,
+                                                       plot_res,
+                                                       cmap=self.cmap,
+                                                       vmin=self.res_limits[0],
+                                                       vmax=self.res_limits[1])
+            self.north_ax.set_xlabel('Easting {0}'.format(self.units))
+            self.north_ax.set_ylabel('Elevation {0}'.format(self.units))
+        else:
+            update_mesh(self.north_mesh, self.plot_east_z, plot_res)
+            self.north_mesh.set_clim(*self.res_limits)
+
+        self.north_stations = self._plot_line_stations(self.north_ax,
+                                                       self.north_stations,
+                                                       self.get_stations_north(),
+                                                       'rel_east')
+        blit_axes(self.north_ax)
+
+    def _plot_line_stations(self, ax, artists, line, key):
+        """
+        replace the stations plotted on a cross section with the stations
+        close to the current line, key is the horizontal coordinate
+        """
+        for artist in artists:
+            artist.remove()
+        if line is None:
+            return []
+
+        artists = [ax.scatter(line[key]/self.scale,
+                              line['rel_elev']/self.scale,
+                              marker='v',  c='cyan', s=50,
+                              edgecolors='k')]
+        for ss in line:
+            artists.append(ax.text(ss[key]/self.scale,
                                    ss['rel_elev']/self.scale - .2,
                                    ss['station'],
                                    va='bottom', ha='center',
                                    fontdict={'weight':'bold',
-                                            'size':10},
-                                  clip_on=True,
-                                  bbox={'boxstyle':"square",
-                                        'ec':'k',
-                                        'fc':'w'})
-
-        self.north_ax.set_xlabel('Easting {0}'.format(self.units))
-        self.north_ax.set_ylabel('Elevation {0}'.format(self.units))
-        self.north_ax.set_ylim(ylim)
-        self.north_ax.set_xlim(xlim)
-        self.north_canvas.draw()
+                                             'size':10},
+                                   clip_on=True,
+                                   bbox={'boxstyle':"square",
+                                         'ec':'k',
+                                         'fc':'w'}))
+        return artists
 
     def get_stations_north(self):
         """
@@ -1222,6 +1186,8 @@ class ModelWidget(QtWidgets.QWidget):
         """
         redraw all plots
         """
+        # the model was edited or replaced, so the cached slices are stale
+        self.slice_cache.set_model(self.new_res_model)
         self.redraw_map()
         self.redraw_east()
         self.redraw_north()
@@ -1373,6 +1339,7 @@ class ModelWidget(QtWidgets.QWidget):
 
         #self.new_res_model[np.where(self.model_obj.res_model > 1E10)] = 1E12
 
+        self.slice_cache.clear()
         self.redraw_map()
 
     def map_copy_up(self):
@@ -1390,6 +1357,7 @@ class ModelWidget(QtWidgets.QWidget):
             self.new_res_model[:, :, self.map_index].reshape(o_shape)
         self.new_res_model[np.where(self.model_obj.res_model > 1E10)] = 1E12
 
+        self.slice_cache.clear()
         self.redraw_map()
 
     def set_map_copy_num(self):
@@ -1416,6 +1384,7 @@ class ModelWidget(QtWidgets.QWidget):
 
         self.new_res_model[np.where(self.model_obj.res_model > 1E10)] = 1E12
 
+        self.slice_cache.clear()
         self.redraw_east()
 
     def east_copy_west(self):
@@ -1435,6 +1404,7 @@ class ModelWidget(QtWidgets.QWidget):
 
         self.new_res_model[np.where(self.model_obj.res_model > 1E10)] = 1E12
 
+        self.slice_cache.clear()
         self.redraw_east()
 
     def set_east_copy_num(self):
@@ -1460,6 +1430,7 @@ class ModelWidget(QtWidgets.QWidget):
             self.new_res_model[self.north_index, :, :].reshape(o_shape)
         self.new_res_model[np.where(self.model_obj.res_model > 1E10)] = 1E12
 
+        self.slice_cache.clear()
         self.redraw_north()
 
     def north_copy_north(self):
@@ -1478,6 +1449,7 @@ class ModelWidget(QtWidgets.QWidget):
             self.new_res_model[self.north_index, :, :].reshape(o_shape)
         self.new_res_model[np.where(self.model_obj.res_model > 1E10)] = 1E12
 
+        self.slice_cache.clear()
         self.redraw_north()
 
     def set_north_copy_num(self):
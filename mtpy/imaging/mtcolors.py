@@ -544,6 +544,41 @@ def get_plot_color(colorx, comp, cmap, ckmin=None, ckmax=None, bounds=None):
     else:
         raise NameError('color key '+comp+' not supported')
 
+def get_plot_colors(colorx, comp, cmap, ckmin=None, ckmax=None, bounds=None):
+    """
+    gets the colors for an array of values of the given component, same as
+    calling get_plot_color for each value but mapped in one go.
+
+    returns an array of RGBA colors of shape (len(colorx), 4)
+    """
+    colorx = np.asarray(colorx, dtype=np.float64)
+
+    if comp in ['phimin', 'phimax', 'phidet', 'ellipticity', 'geometric_mean',
+                'azimuth', 'strike', 'skew', 'normalized_skew']:
+        if comp not in ['skew', 'normalized_skew'] and \
+                (ckmin is None or ckmax is None):
+            raise IOError('Need to input min and max values for plotting')
+        norm = colors.Normalize(ckmin, ckmax)
+
+    elif comp == 'skew_seg' or comp == 'normalized_skew_seg':
+        if bounds is None:
+            raise IOError('Need to input bounds for segmented colormap')
+        norm = colors.Normalize(bounds[0], bounds[-1])
+        step = abs(bounds[1] - bounds[0])
+        ### need to get the color into a bin so as to not smear the colors.
+        binned = np.trunc(step * np.round((colorx - np.sign(colorx) *
+                                           (abs(colorx) % step)) / step))
+        colorx = np.select([colorx > max(bounds), colorx < min(bounds),
+                            abs(colorx) <= step],
+                           [max(bounds), min(bounds), 0], binned)
+    else:
+        raise NameError('color key '+comp+' not supported')
+
+    if (cmap in list(cmapdict.keys())):
+        return cmapdict[cmap](norm(colorx))
+    else:
+        return cm.get_cmap(cmap)(norm(colorx))
+
 def cmap_discretize(cmap, N):
     """Return a discrete colormap from the continuous colormap cmap.
       
@@ -18,7 +18,7 @@ from mtpy.core import mt
 import mtpy.core.z as mtz
 import mtpy.utils.exceptions as mtex
 import mtpy.utils.gis_tools as gis_tools
-import matplotlib.mlab as mlab
+from scipy.interpolate import griddata
 
 # ==============================================================================
 
@@ -1414,7 +1414,10 @@ def grid_data(data_array, x, y, nx=None, ny=None):
 
     xg, yg = np.meshgrid(xi, yi)
 
-    grid_array = mlab.griddata(x, y, data_array, xg, yg)
+    # matplotlib.mlab.griddata was removed, grid with scipy and mask the points
+    # outside the convex hull of the data as mlab.griddata did
+    grid_array = np.ma.masked_invalid(
+        griddata((x, y), data_array, (xg, yg), method='linear'))
 
     return grid_array, xg, yg
 
@@ -28,7 +28,9 @@ from scipy.interpolate import griddata
 import mtpy
 import mtpy.modeling.occam2d_rewrite as occam2d
 from .imaging_base import ImagingBase, ParameterError, ImagingError
+from mtpy.analysis.penetration import SurveyPenetration, get_component_index
 from mtpy.core import mt as mt
+from mtpy.utils.exceptions import MTpyError_inputarguments
 from mtpy.utils.mtpy_decorator import deprecated
 from mtpy.utils.mtpylog import MtPyLog
 
@@ -82,43 +84,32 @@ class Depth1D(ImagingBase):
         self._fig.set_tight_layout(True)
         plt.grid(True)
 
-        zeta = self._data.Z  # the attribute Z represent the impedance tensor 2X2 matrix
-        freqs = zeta.freq  # frequencies
-        scale_param = np.sqrt(1.0 / (2.0 * np.pi * 4 * np.pi * 10 ** (-7)))
-
-        # The periods array
-        periods = 1.0 / freqs
+        # penetration depth of all the periods and components of the station
+        p_obj = SurveyPenetration([self._data])
+        periods = p_obj.period[0]
+        depth = p_obj.depth[0]
         legendh = []
 
         if 'zxy' in self._rholist:
             # One of the 4-components: XY
-            penetration_depth = scale_param * \
-                np.sqrt(zeta.resistivity[:, 0, 1] * periods)
-
             # pen_zxy, = plt.semilogx(periods, -penetration_depth, '-*',label='Zxy')
             pen_zxy, = plt.loglog(
-                periods, penetration_depth, color='#000000', marker='*', label='Zxy')
+                periods, depth[:, get_component_index('zxy')], color='#000000', marker='*', label='Zxy')
             # See
             # http://matplotlib.org/1.3.1/examples/pylab_examples/line_styles.html
 
             legendh.append(pen_zxy)
 
         if 'zyx' in self._rholist:
-            penetration_depth = scale_param * \
-                np.sqrt(zeta.resistivity[:, 1, 0] * periods)
-
             pen_zyx, = plt.loglog(
-                periods, penetration_depth, color='g', marker='o', label='Zyx')
+                periods, depth[:, get_component_index('zyx')], color='g', marker='o', label='Zyx')
             legendh.append(pen_zyx)
 
         if 'det' in self._rholist:
-            # determinant array
-            det2 = np.abs(zeta.det)
-            det_penetration_depth = scale_param * np.sqrt(0.2 * periods * det2 * periods)
-
+            # determinant of the 2X2 complex Z-matrix
             # pen_det, = plt.semilogx(periods, -det_penetration_depth, '-^', label='Determinant')
             pen_det, = plt.loglog(
-                periods, det_penetration_depth, color='b', marker='^', label='Determinant')
+                periods, depth[:, get_component_index('det')], color='b', marker='^', label='Determinant')
             legendh.append(pen_det)
 
             plt.legend(
@@ -173,14 +164,20 @@ class Depth2D(ImagingBase):
 
         self._fig = plt.figure(figsize=(8, 6), dpi=80)
         self._fig.set_tight_layout(True)
-        for selected_period in self._selected_periods:
-            if period_by_index:
-                (stations, periods, pen, _) = get_penetration_depth_by_index(
-                    pr.edi_list, selected_period, whichrho=self._rho)
-            else:
-                (stations, periods, pen, _) = get_penetration_depth_by_period(
-                    pr.edi_list, selected_period, whichrho=self._rho, ptol=self._ptol)
+        # the depths of all the selected periods in one go
+        p_obj = SurveyPenetration(pr.edi_list)
+        stations = p_obj.stations
+        comp_index = get_component_index(self._rho)
+        if period_by_index:
+            if np.max(self._selected_periods) >= p_obj.n_periods.min():
+                raise ParameterError("period index must be less than the number of periods %d" %
+                                     p_obj.n_periods.min())
+            pen_depth = -p_obj.depth[:, self._selected_periods, comp_index]
+        else:
+            _, pen_depth, _ = p_obj.get_depth_by_period(self._selected_periods, ptol=self._ptol)
+            pen_depth = -pen_depth[:, :, comp_index]
 
+        for pen, selected_period in zip(pen_depth.T, self._selected_periods):
             line_label = "Period=%.2e s" % selected_period
 
             plt.plot(
@@ -510,66 +507,25 @@ def get_penetration_depth_by_index(mt_obj_list, per_index, whichrho='det'):
     Parameters
     ----------
     mt_obj_list : list of MT
-        List of stations as MT objects.
-    selected_period : float
-        The period in seconds to plot depth for.
-    ptol : float
-        Tolerance to use when finding nearest period to selected period.
-        If abs(selected_period - nearest_period) is greater than
-        ptol * selected_period, then the period is discarded and will
-        appear as a gap in the plot.
+        List of stations as MT objects or edi file names.
+    per_index : int
+        The index of the period in the stations to plot depth for.
     whichrho : str
         'det', 'zxy' or 'zyx'. The component to plot.
-    """
-    scale_param = np.sqrt(1.0 / (2.0 * np.pi * 4 * np.pi * 10 ** (-7)))
 
-    # per_index=0,1,2,....
-    periods = []
-    pen_depth = []
-    stations = []
-    latlons = []
-    for mt_obj in mt_obj_list:
-        if isinstance(mt_obj, str) and os.path.isfile(mt_obj):
-            mt_obj = mt.MT(mt_obj)
-        elif not isinstance(mt_obj, mt.MT):
-            raise Exception("Unsupported list of objects %s" % type(mt_obj))
-        # station id
-        stations.append(mt_obj.station)
-        # latlons
-        latlons.append((mt_obj.lat, mt_obj.lon))
-        # the attribute Z
-        zeta = mt_obj.Z
-
-        if per_index >= len(zeta.freq):
-            _logger.debug(
-                "Number of frequecies (Max per_index)= %s", len(
-                    zeta.freq))
-            raise Exception(
-                "Index out_of_range Error: period index must be less than number of periods in zeta.freq")
-
-        per = 1.0 / zeta.freq[per_index]
-        periods.append(per)
-
-        if whichrho == 'zxy':
-            penetration_depth = - scale_param * \
-                np.sqrt(zeta.resistivity[per_index, 0, 1] * per)
-        elif whichrho == 'zyx':
-            penetration_depth = - scale_param * \
-                np.sqrt(zeta.resistivity[per_index, 1, 0] * per)
-        elif whichrho == 'det':  # the 2X2 complex Z-matrix's determinant abs value
-            # determinant value at the given period index
-            det2 = np.abs(zeta.det[per_index])
-            penetration_depth = -scale_param * np.sqrt(0.2 * per * det2 * per)
-        else:
-            _logger.critical(
-                "unsupported method to compute penetration depth: %s",
-                whichrho)
-            # sys.exit(100)
-            raise Exception("unsupported method to compute penetratoin depth: %s" % whichrho)
+    :return: tuple of (stations, periods, penetrationdepth, lat-lons-pairs)
+    """
+    comp_index = _get_component_index(whichrho)
+    p_obj = SurveyPenetration(_get_mt_objs(mt_obj_list))
+    if per_index >= p_obj.n_periods.min():
+        _logger.debug("Number of frequecies (Max per_index)= %s", p_obj.n_periods.min())
+        raise Exception(
+            "Index out_of_range Error: period index must be less than number of periods in zeta.freq")
 
-        pen_depth.append(penetration_depth)
+    periods, pen_depth = p_obj.get_depth_by_index(per_index)
 
-    return stations, periods, pen_depth, latlons
+    return p_obj.stations, periods.tolist(), (-pen_depth[:, comp_index]).tolist(), \
+        [tuple(latlon) for latlon in p_obj.latlons.tolist()]
 
 
 def load_edi_files(edi_path, file_list=None):
@@ -581,7 +537,7 @@ def load_edi_files(edi_path, file_list=None):
         edi_list = [mt.MT(os.path.join(edi_path, edi)) for edi in file_list]
     return edi_list
 
-# need further refactoring and testing
+
 def get_penetration_depth_by_period(mt_obj_list, selected_period, ptol=0.1, whichrho='det'):
     """
     This is a more generic and useful function to compute the penetration depths
@@ -593,70 +549,41 @@ def get_penetration_depth_by_period(mt_obj_list, selected_period, ptol=0.1, whic
     :param edi_file_list: edi file list of mt object list
     :param period_sec: the float number value of the period in second: 0.1, ...20.0
     :param whichrho:
-    :return: tuple of (stations, periods, penetrationdepth, lat-lons-pairs)
+    :return: tuple of (stations, periods, penetrationdepth, lat-lons-pairs),
+             the depth is np.nan and the period is selected_period for the
+             stations without a period within the tolerance
     """
-    scale_param = np.sqrt(1.0 / (2.0 * np.pi * 4 * np.pi * 10 ** (-7)))
-
-    # per_index=0,1,2,....
-    periods = []
-    pen_depth = []
-    stations = []
-    latlons = []
+    comp_index = _get_component_index(whichrho)
+    p_obj = SurveyPenetration(_get_mt_objs(mt_obj_list))
 
     _logger.info("Getting nearest period to {} for all stations".format(selected_period))
+    periods, pen_depth, mask = p_obj.get_depth_by_period([selected_period], ptol=ptol)
+    for station in np.array(p_obj.stations)[~mask[:, 0]]:
+        _logger.warning("Nearest period on station {} was beyond tolerance of {} ".format(station, ptol))
+
+    # The returned 4 lists should have equal length!!!
+    return p_obj.stations, periods[:, 0].tolist(), (-pen_depth[:, 0, comp_index]).tolist(), \
+        [tuple(latlon) for latlon in p_obj.latlons.tolist()]
+
+
+def _get_mt_objs(mt_obj_list):
+    """ read the edi files of a list of MT objects or edi files"""
+    mt_objs = []
     for mt_obj in mt_obj_list:
         if isinstance(mt_obj, str) and os.path.isfile(mt_obj):
             mt_obj = mt.MT(mt_obj)
         elif not isinstance(mt_obj, mt.MT):
             raise Exception("Unsupported list of objects %s" % type(mt_obj))
+        mt_objs.append(mt_obj)
+    return mt_objs
 
-        # station id
-        stations.append(mt_obj.station)
-        # latlons
-        latlons.append((mt_obj.lat, mt_obj.lon))
-
-        # the attribute Z
-        zeta = mt_obj.Z
-        per_index = np.argmin(np.fabs(zeta.freq - 1.0/selected_period))
-        per = 1.0 / zeta.freq[per_index]
-
-        print("********* The period-index=%s coressponding to the selected_period %s"%(per_index, selected_period))
-
-        if abs(selected_period - per) > (selected_period) * ptol:
-            print("************** Different the selected period =", selected_period, per)
-            #periods.append(np.nan)
-            periods.append(selected_period)
-            pen_depth.append(np.nan)
-            _logger.warning("Nearest preiod {} on station {} was beyond tolerance of {} ".format(per, mt_obj.Site.id, ptol))
-            pass
-        else:      # Otherwise do this block to compute the edi's pen-depth correspond to the selected_period
-
-            print("********* Include this period at the index ", per,  per_index)
-            periods.append(per)
-
-            if whichrho == 'zxy':
-                penetration_depth = - scale_param * \
-                    np.sqrt(zeta.resistivity[per_index, 0, 1] * per)
-            elif whichrho == 'zyx':
-                penetration_depth = - scale_param * \
-                    np.sqrt(zeta.resistivity[per_index, 1, 0] * per)
-            elif whichrho == 'det':  # the 2X2 complex Z-matrix's determinant abs value
-                # determinant value at the given period index
-                det2 = np.abs(zeta.det[per_index])
-                penetration_depth = -scale_param * np.sqrt(0.2 * per * det2 * per)
-            else:
-                _logger.critical(
-                    "unsupported method to compute penetration depth: %s",
-                    whichrho)
-                # sys.exit(100)
-                raise Exception("unsupported method to compute penetratoin depth: %s" % whichrho)
-
-            pen_depth.append(penetration_depth)
-
-    # The returned 4 lists should have equal length!!!
-    _logger.debug("The length of stations, periods, pen_depth, latlons: %s,%s,%s,%s ", len(stations), len(periods), len(pen_depth), len(latlons) )
 
-    return stations, periods, pen_depth, latlons
+def _get_component_index(whichrho):
+    try:
+        return get_component_index(whichrho)
+    except MTpyError_inputarguments:
+        _logger.critical("unsupported method to compute penetration depth: %s", whichrho)
+        raise Exception("unsupported method to compute penetratoin depth: %s" % whichrho)
 
 
 class ZComponentError(ParameterError):
@@ -20,9 +20,11 @@ import matplotlib.colors as colors
 import matplotlib.patches as patches
 import matplotlib.colorbar as mcb
 import matplotlib.tri as tri
+from matplotlib.backends.backend_pdf import PdfPages
 
 import mtpy.utils.gis_tools as gis_tools
 import mtpy.imaging.mtcolors as mtcl
+import mtpy.imaging.pt_collections as ptcol
 import mtpy.imaging.mtplottools as mtpl
 import mtpy.analysis.pt as MTpt
 from mtpy.utils.mtpylog import MtPyLog
@@ -547,140 +549,27 @@ class PlotPhaseTensorMaps(mtpl.PlotSettings):
     rot_z = property(fget=_get_rot_z, fset=_set_rot_z,
                      doc="""rotation angle(s)""")
 
-    # -----------------------------------------------
-    # The main plot method for this module
-    # -----------------------------------------------
-    def plot(self, fig=None, save_path=None, show=True,
-             raster_dict={'lons': [], 'lats': [],
-                          'vals': [], 'levels': 50, 'cmap': 'rainbow',
-                          'cbar_title': 'Arbitrary units',
-                          'cbar_position': None}):
-        """
-        Plots the phase tensor map.
-        :param fig: optional figure object
-        :param save_path: path to folder for saving plots
-        :param show: show plots if True
-        :param raster_dict: Plotting of raster data is currently only supported when mapscale='deg'.
-                            This parameter is a dictionary of parameters for plotting raster data,
-                            on top of which phase tensor data are plotted. 'lons', 'lats' and 'vals'
-                            are one dimensional lists (or numpy arrays) for longitudes, latitudes
-                            and corresponding values, respectively. 'levels', 'cmap' and 'cbar_title'
-                            are the number of levels to be used in the colormap, the colormap and its
-                            title, respectively.
+    def _get_plot_data(self):
         """
+        get the location, phase tensor and induction arrows of each station
+        at plot_freq, stations that do not have plot_freq are not found.
 
-        # set position properties for the plot
-        plt.rcParams['font.size'] = self.font_size
-        plt.rcParams['figure.subplot.left'] = .1
-        plt.rcParams['figure.subplot.right'] = .98
-        plt.rcParams['figure.subplot.bottom'] = .1
-        plt.rcParams['figure.subplot.top'] = .93
-        plt.rcParams['figure.subplot.wspace'] = .55
-        plt.rcParams['figure.subplot.hspace'] = .70
-        # FZ: tweaks to make plot positioned better
-        # plt.rcParams['font.size']=self.font_size
-        # plt.rcParams['figure.subplot.left']=.1
-        # plt.rcParams['figure.subplot.right']=.90
-        # plt.rcParams['figure.subplot.bottom']=.2
-        # plt.rcParams['figure.subplot.top']=.90
-        # plt.rcParams['figure.subplot.wspace']=.70
-        # plt.rcParams['figure.subplot.hspace']=.70
-
-        lpfig = None
-        lpax = None
-        lpax2 = None
-        # make figure instance
-        if(fig is None):
-            self.fig = plt.figure(self.fig_num, figsize=self.fig_size, dpi=self.fig_dpi)
-            # self.fig = plt.figure(self.fig_num, dpi=self.fig_dpi)
-
-            # clear the figure if there is already one up
-            plt.clf()
-            lpfig = self.fig
-        else:
-            lpfig = fig
-        # end if
-
-        lpax = lpfig.add_subplot(1, 1, 1, aspect='equal')
-
-        # plt.locator_params(axis='x', nbins=3)  # control number of ticks in axis (nbins ticks)
-        plt.xticks(rotation='vertical')  # FZ: control tick rotation=30 not that good
-
+        :returns: dictionary of arrays, one value per station in mt_list
+        """
         # get the reference point
         refpoint = self.plot_reference_point
 
-        # plot raster data if provided and if mapscale is 'deg'
-        if(len(raster_dict['lons']) and self.mapscale == 'deg'):
-            lons = np.array(raster_dict['lons'])
-            lats = np.array(raster_dict['lats'])
-
-            # retain masking if a masked array is passed in
-            if type(raster_dict['vals']) == np.ma.core.MaskedArray:
-                vals = np.ma.masked_array(raster_dict['vals'])
-            else:
-                vals = np.array(raster_dict['vals'])
-
-            assert len(lons) == len(lats) == len(vals), 'Lons, Lats and Vals must all have the same length'
-
-            lons -= refpoint[0]
-            lats -= refpoint[1]
-            levels = raster_dict.pop('levels', 50)
-            cmap = raster_dict.pop('cmap', 'rainbow')
-            cbar_title = raster_dict.pop('cbar_title', 'Arbitrary Units')
-            triangulation = tri.Triangulation(lons, lats)
-            cbinfo = lpax.tricontourf(triangulation, vals,
-                                      levels=np.linspace(vals.min(), vals.max(), levels),
-                                      cmap=cmap)
-            if raster_dict['cbar_position'] is not None:
-                cbax = self.fig.add_axes(raster_dict['cbar_position'])
-            else:
-                cbax, kw = mcb.make_axes(lpax,
-                                         orientation=self.cb_orientation,
-                                         shrink=.35)
-            cbar = lpfig.colorbar(cbinfo, cbax)
-
-            if(self.cb_orientation == 'horizontal'):
-                cbar.ax.set_xlabel(cbar_title)
-                cbar.ax.xaxis.set_label_position('top')
-                cbar.ax.xaxis.set_label_coords(.5, 1.3)
-            else:
-                cbar.ax.set_ylabel(cbar_title, fontsize=self.font_size,
-                                   fontweight='bold')
-                cbar.ax.yaxis.set_label_position('right')
-                cbar.ax.yaxis.set_label_coords(1.25, .5)
-                cbar.ax.yaxis.tick_left()
-                cbar.ax.tick_params(axis='y', direction='in')
-
-        # end if
-
-        # set some local parameters
-        es = float(self.ellipse_size)
-        cmap = self.ellipse_cmap
-        ckmin = float(self.ellipse_range[0])
-        ckmax = float(self.ellipse_range[1])
-        try:
-            ckstep = float(self.ellipse_range[2])
-        except IndexError:
-            if cmap == 'mt_seg_bl2wh2rd':
-                raise ValueError('Need to input range as (min, max, step)')
-            else:
-                ckstep = 3
-        nseg = float((ckmax - ckmin) / (2 * ckstep))
-        ck = self.ellipse_colorby
-
-        # --> set the bounds on the segmented colormap
-        if cmap == 'mt_seg_bl2wh2rd':
-            bounds = np.arange(ckmin, ckmax + ckstep, ckstep)
-
-        # set tick parameters depending on the mapscale
-        if self.mapscale == 'deg':
-            self.tickstrfmt = '%.2f'
-
-        elif self.mapscale == 'm' or self.mapscale == 'km':
-            self.tickstrfmt = '%.0f'
+        n_stations = len(self.mt_list)
+        plot_data = {'found': np.zeros(n_stations, dtype=bool),
+                     'station': [mt.station for mt in self.mt_list],
+                     'phimin': np.zeros(n_stations),
+                     'phimax': np.zeros(n_stations),
+                     'azimuth': np.zeros(n_stations),
+                     'color': np.zeros(n_stations),
+                     'tipper_real': np.full((n_stations, 2), np.nan),
+                     'tipper_imag': np.full((n_stations, 2), np.nan)}
 
         # make some empty arrays
-        elliplist = []
         latlist = np.zeros(len(self.mt_list))
         lonlist = np.zeros(len(self.mt_list))
         self.plot_xarr = np.zeros(len(self.mt_list))
@@ -783,17 +672,12 @@ class PlotPhaseTensorMaps(mtpl.PlotSettings):
                 self.plot_xarr[ii] = plotx
                 self.plot_yarr[ii] = ploty
 
-                # --> set local variables
-                phimin = np.nan_to_num(pt.phimin[jj])
-                phimax = np.nan_to_num(pt.phimax[jj])
-                eangle = np.nan_to_num(pt.azimuth[jj])
+                plot_data['found'][ii] = True
 
-                # output to csv file:
-                # print('OUTCSV', mt.station, plotx, ploty, phimin, phimax, eangle)
-
-                if cmap == 'mt_seg_bl2wh2rd':
-                    bounds = np.arange(ckmin, ckmax + ckstep, ckstep)
-                    nseg = float((ckmax - ckmin) / (2 * ckstep))
+                # --> set local variables
+                plot_data['phimin'][ii] = np.nan_to_num(pt.phimin[jj])
+                plot_data['phimax'][ii] = np.nan_to_num(pt.phimax[jj])
+                plot_data['azimuth'][ii] = np.nan_to_num(pt.azimuth[jj])
 
                 # get the properties to color the ellipses by
                 if self.ellipse_colorby == 'phiminang' or \
@@ -819,45 +703,9 @@ class PlotPhaseTensorMaps(mtpl.PlotSettings):
 
                 else:
                     raise NameError(self.ellipse_colorby + ' is not supported')
+                plot_data['color'][ii] = colorarray
 
-                # --> get ellipse properties
-                # if the ellipse size is not physically correct make it a dot
-                if phimax == 0 or phimax > 100 or phimin == 0 or phimin > 100:
-                    eheight = .0000001 * es
-                    ewidth = .0000001 * es
-                else:
-                    scaling = es / phimax
-                    eheight = phimin * scaling
-                    ewidth = phimax * scaling
-
-                # make an ellipse
-                ellipd = patches.Ellipse((plotx, ploty),
-                                         width=ewidth,
-                                         height=eheight,
-                                         angle=90 - eangle,
-                                         lw=self.lw,
-                                         **self.kwargs)
-
-                # get ellipse color
-                if cmap.find('seg') > 0:
-                    ellipd.set_facecolor(mtcl.get_plot_color(colorarray,
-                                                             self.ellipse_colorby,
-                                                             cmap,
-                                                             ckmin,
-                                                             ckmax,
-                                                             bounds=bounds))
-                else:
-                    ellipd.set_facecolor(mtcl.get_plot_color(colorarray,
-                                                             self.ellipse_colorby,
-                                                             cmap,
-                                                             ckmin,
-                                                             ckmax))
-
-                # ==> add ellipse to the plot
-                elliplist.append(ellipd)
-                lpax.add_artist(ellipd)
-
-                # -----------Plot Induction Arrows---------------------------
+                # -----------Induction Arrows---------------------------
                 if self.plot_tipper.find('y') == 0:
 
                     # get tipper
@@ -870,7 +718,6 @@ class PlotPhaseTensorMaps(mtpl.PlotSettings):
                     ascale = self.arrow_size
                     adir = self.arrow_direction * np.pi
 
-                    # plot real tipper
                     ti = None
                     if(not self.interpolate):
                         ti = mt.Tipper
@@ -878,60 +725,277 @@ class PlotPhaseTensorMaps(mtpl.PlotSettings):
                         ti = newTipper
                     # end if
 
+                    # real tipper, arrows above the threshold are not drawn
                     if self.plot_tipper == 'yri' or self.plot_tipper == 'yr':
                         if ti.mag_real[jj] <= self.arrow_threshold:
-                            txr = ti.mag_real[jj] * ascale * \
-                                np.sin((ti.angle_real[jj]) * np.pi / 180 + adir)
-                            tyr = ti.mag_real[jj] * ascale * \
-                                np.cos((ti.angle_real[jj]) * np.pi / 180 + adir)
-
-                            lpax.arrow(plotx,
-                                       ploty,
-                                       txr,
-                                       tyr,
-                                       width=self.arrow_lw,
-                                       facecolor=self.arrow_color_real,
-                                       edgecolor=self.arrow_color_real,
-                                       length_includes_head=False,
-                                       head_width=self.arrow_head_width,
-                                       head_length=self.arrow_head_length)
-                        else:
-                            pass
+                            plot_data['tipper_real'][ii] = \
+                                [ti.mag_real[jj] * ascale *
+                                 np.sin((ti.angle_real[jj]) * np.pi / 180 + adir),
+                                 ti.mag_real[jj] * ascale *
+                                 np.cos((ti.angle_real[jj]) * np.pi / 180 + adir)]
 
-                    # plot imaginary tipper
+                    # imaginary tipper
                     if self.plot_tipper == 'yri' or self.plot_tipper == 'yi':
                         if ti.mag_imag[jj] <= self.arrow_threshold:
-                            txi = ti.mag_imag[jj] * ascale * \
-                                np.sin((ti.angle_imag[jj]) * np.pi / 180 + adir)
-                            tyi = ti.mag_imag[jj] * ascale * \
-                                np.cos((ti.angle_imag[jj]) * np.pi / 180 + adir)
-
-                            lpax.arrow(plotx,
-                                       ploty,
-                                       txi,
-                                       tyi,
-                                       width=self.arrow_lw,
-                                       facecolor=self.arrow_color_imag,
-                                       edgecolor=self.arrow_color_imag,
-                                       length_includes_head=False,
-                                       head_width=self.arrow_head_width,
-                                       head_length=self.arrow_head_length)
-
-                # ------------Plot station name------------------------------
-                try:
-                    lpax.text(plotx,
-                              ploty + self.station_pad,
-                              mt.station[self.station_id[0]:self.station_id[1]],
-                              horizontalalignment='center',
-                              verticalalignment='baseline',
-                              fontdict=self.station_font_dict)
-                except AttributeError:
-                    pass
+                            plot_data['tipper_imag'][ii] = \
+                                [ti.mag_imag[jj] * ascale *
+                                 np.sin((ti.angle_imag[jj]) * np.pi / 180 + adir),
+                                 ti.mag_imag[jj] * ascale *
+                                 np.cos((ti.angle_imag[jj]) * np.pi / 180 + adir)]
 
             # ==> print a message if couldn't find the freq
             else:
                 _logger.warn('Did not find {0:.5g} Hz for station {1}'.format(self.plot_freq, mt.station))
 
+        plot_data['x'] = self.plot_xarr
+        plot_data['y'] = self.plot_yarr
+
+        return plot_data
+
+    def _draw_plot_data(self, plot_data):
+        """
+        draw the ellipses and induction arrows of the stations found at
+        plot_freq as collections
+        """
+        es = float(self.ellipse_size)
+        cmap = self.ellipse_cmap
+        ckmin = float(self.ellipse_range[0])
+        ckmax = float(self.ellipse_range[1])
+        try:
+            ckstep = float(self.ellipse_range[2])
+        except IndexError:
+            if cmap == 'mt_seg_bl2wh2rd':
+                raise ValueError('Need to input range as (min, max, step)')
+            else:
+                ckstep = 3
+
+        # --> set the bounds on the segmented colormap
+        bounds = None
+        if cmap == 'mt_seg_bl2wh2rd':
+            bounds = np.arange(ckmin, ckmax + ckstep, ckstep)
+
+        found = plot_data['found']
+        phimin = plot_data['phimin'][found]
+        phimax = plot_data['phimax'][found]
+
+        # --> get ellipse properties
+        # if the ellipse size is not physically correct make it a dot
+        dot = (phimax == 0) | (phimax > 100) | (phimin == 0) | (phimin > 100)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            eheight = np.where(dot, .0000001 * es, phimin * es / phimax)
+            ewidth = np.where(dot, .0000001 * es, es)
+
+        # get ellipse colors
+        if cmap.find('seg') > 0:
+            ellipse_colors = mtcl.get_plot_colors(plot_data['color'][found],
+                                                  self.ellipse_colorby,
+                                                  cmap, ckmin, ckmax,
+                                                  bounds=bounds)
+        else:
+            ellipse_colors = mtcl.get_plot_colors(plot_data['color'][found],
+                                                  self.ellipse_colorby,
+                                                  cmap, ckmin, ckmax)
+
+        self._renderer.draw_ellipses(plot_data['x'][found],
+                                     plot_data['y'][found],
+                                     ewidth, eheight,
+                                     90 - plot_data['azimuth'][found],
+                                     facecolors=ellipse_colors,
+                                     lw=self.lw,
+                                     **self.kwargs)
+
+        # -----------Plot Induction Arrows---------------------------
+        for key, color in [('tipper_real', getattr(self, 'arrow_color_real',
+                                                   'k')),
+                           ('tipper_imag', getattr(self, 'arrow_color_imag',
+                                                   'b'))]:
+            arrows = found & np.isfinite(plot_data[key][:, 0])
+            if arrows.any():
+                self._renderer.draw_arrows(plot_data['x'][arrows],
+                                           plot_data['y'][arrows],
+                                           plot_data[key][arrows, 0],
+                                           plot_data[key][arrows, 1],
+                                           color=color,
+                                           width=self.arrow_lw,
+                                           head_width=self.arrow_head_width,
+                                           head_length=self.arrow_head_length,
+                                           length_includes_head=False)
+
+    def _plot_station_names(self, plot_data):
+        """
+        label the stations found at plot_freq
+        """
+        self._station_labels = []
+        found = np.where(plot_data['found'])[0]
+        for ii in found:
+            try:
+                station = plot_data['station'][ii]
+                self._station_labels.append(
+                    self.ax.text(plot_data['x'][ii],
+                                 plot_data['y'][ii] + self.station_pad,
+                                 station[self.station_id[0]:self.station_id[1]],
+                                 horizontalalignment='center',
+                                 verticalalignment='baseline',
+                                 fontdict=self.station_font_dict))
+            except AttributeError:
+                pass
+
+    def _set_title(self):
+        """
+        set the title of the map in period or freq
+        """
+        if self.tscale == 'period':
+            titlefreq = '{0:.5g} (s)'.format(1. / self.plot_freq)
+        else:
+            titlefreq = '{0:.5g} (Hz)'.format(self.plot_freq)
+
+        if not self.plot_title:
+            self.ax.set_title('Phase Tensor Map for ' + titlefreq,
+                              fontsize=self.font_size + 2, fontweight='bold')
+        else:
+            self.ax.set_title(self.plot_title + titlefreq,
+                              fontsize=self.font_size + 2, fontweight='bold')
+
+
+    # -----------------------------------------------
+    # The main plot method for this module
+    # -----------------------------------------------
+    def plot(self, fig=None, save_path=None, show=True,
+             raster_dict={'lons': [], 'lats': [],
+                          'vals': [], 'levels': 50, 'cmap': 'rainbow',
+                          'cbar_title': 'Arbitrary units',
+                          'cbar_position': None}):
+        """
+        Plots the phase tensor map.
+        :param fig: optional figure object
+        :param save_path: path to folder for saving plots
+        :param show: show plots if True
+        :param raster_dict: Plotting of raster data is currently only supported when mapscale='deg'.
+                            This parameter is a dictionary of parameters for plotting raster data,
+                            on top of which phase tensor data are plotted. 'lons', 'lats' and 'vals'
+                            are one dimensional lists (or numpy arrays) for longitudes, latitudes
+                            and corresponding values, respectively. 'levels', 'cmap' and 'cbar_title'
+                            are the number of levels to be used in the colormap, the colormap and its
+                            title, respectively.
+        """
+
+        # set position properties for the plot
+        plt.rcParams['font.size'] = self.font_size
+        plt.rcParams['figure.subplot.left'] = .1
+        plt.rcParams['figure.subplot.right'] = .98
+        plt.rcParams['figure.subplot.bottom'] = .1
+        plt.rcParams['figure.subplot.top'] = .93
+        plt.rcParams['figure.subplot.wspace'] = .55
+        plt.rcParams['figure.subplot.hspace'] = .70
+        # FZ: tweaks to make plot positioned better
+        # plt.rcParams['font.size']=self.font_size
+        # plt.rcParams['figure.subplot.left']=.1
+        # plt.rcParams['figure.subplot.right']=.90
+        # plt.rcParams['figure.subplot.bottom']=.2
+        # plt.rcParams['figure.subplot.top']=.90
+        # plt.rcParams['figure.subplot.wspace']=.70
+        # plt.rcParams['figure.subplot.hspace']=.70
+
+        lpfig = None
+        lpax = None
+        lpax2 = None
+        # make figure instance
+        if(fig is None):
+            self.fig = plt.figure(self.fig_num, figsize=self.fig_size, dpi=self.fig_dpi)
+            # self.fig = plt.figure(self.fig_num, dpi=self.fig_dpi)
+
+            # clear the figure if there is already one up
+            plt.clf()
+            lpfig = self.fig
+        else:
+            lpfig = fig
+        # end if
+
+        lpax = lpfig.add_subplot(1, 1, 1, aspect='equal')
+
+        # plt.locator_params(axis='x', nbins=3)  # control number of ticks in axis (nbins ticks)
+        plt.xticks(rotation='vertical')  # FZ: control tick rotation=30 not that good
+
+        # get the reference point
+        refpoint = self.plot_reference_point
+
+        # plot raster data if provided and if mapscale is 'deg'
+        if(len(raster_dict['lons']) and self.mapscale == 'deg'):
+            lons = np.array(raster_dict['lons'])
+            lats = np.array(raster_dict['lats'])
+
+            # retain masking if a masked array is passed in
+            if type(raster_dict['vals']) == np.ma.core.MaskedArray:
+                vals = np.ma.masked_array(raster_dict['vals'])
+            else:
+                vals = np.array(raster_dict['vals'])
+
+            assert len(lons) == len(lats) == len(vals), 'Lons, Lats and Vals must all have the same length'
+
+            lons -= refpoint[0]
+            lats -= refpoint[1]
+            levels = raster_dict.pop('levels', 50)
+            cmap = raster_dict.pop('cmap', 'rainbow')
+            cbar_title = raster_dict.pop('cbar_title', 'Arbitrary Units')
+            triangulation = tri.Triangulation(lons, lats)
+            cbinfo = lpax.tricontourf(triangulation, vals,
+                                      levels=np.linspace(vals.min(), vals.max(), levels),
+                                      cmap=cmap)
+            if raster_dict['cbar_position'] is not None:
+                cbax = self.fig.add_axes(raster_dict['cbar_position'])
+            else:
+                cbax, kw = mcb.make_axes(lpax,
+                                         orientation=self.cb_orientation,
+                                         shrink=.35)
+            cbar = lpfig.colorbar(cbinfo, cbax)
+
+            if(self.cb_orientation == 'horizontal'):
+                cbar.ax.set_xlabel(cbar_title)
+                cbar.ax.xaxis.set_label_position('top')
+                cbar.ax.xaxis.set_label_coords(.5, 1.3)
+            else:
+                cbar.ax.set_ylabel(cbar_title, fontsize=self.font_size,
+                                   fontweight='bold')
+                cbar.ax.yaxis.set_label_position('right')
+                cbar.ax.yaxis.set_label_coords(1.25, .5)
+                cbar.ax.yaxis.tick_left()
+                cbar.ax.tick_params(axis='y', direction='in')
+
+        # end if
+
+        # set some local parameters
+        es = float(self.ellipse_size)
+        cmap = self.ellipse_cmap
+        ckmin = float(self.ellipse_range[0])
+        ckmax = float(self.ellipse_range[1])
+        try:
+            ckstep = float(self.ellipse_range[2])
+        except IndexError:
+            if cmap == 'mt_seg_bl2wh2rd':
+                raise ValueError('Need to input range as (min, max, step)')
+            else:
+                ckstep = 3
+        nseg = float((ckmax - ckmin) / (2 * ckstep))
+        ck = self.ellipse_colorby
+
+        # set tick parameters depending on the mapscale
+        if self.mapscale == 'deg':
+            self.tickstrfmt = '%.2f'
+
+        elif self.mapscale == 'm' or self.mapscale == 'km':
+            self.tickstrfmt = '%.0f'
+
+        # get the phase tensor and induction arrows of each station
+        self.ax = lpax
+        plot_data = self._get_plot_data()
+
+        # draw all the ellipses and arrows of the map as collections
+        self._renderer = ptcol.PTCollectionRenderer(lpax)
+        self._draw_plot_data(plot_data)
+
+        # ------------Plot station name------------------------------
+        self._plot_station_names(plot_data)
+
         # --> set axes properties depending on map scale------------------------
         if self.mapscale == 'deg':
             lpax.set_xlabel('Longitude',
@@ -979,17 +1043,7 @@ class PlotPhaseTensorMaps(mtpl.PlotSettings):
         plt.setp(lpax.get_xticklabels(), rotation=45)
 
         # --> set title in period or freq
-        if self.tscale == 'period':
-            titlefreq = '{0:.5g} (s)'.format(1. / self.plot_freq)
-        else:
-            titlefreq = '{0:.5g} (Hz)'.format(self.plot_freq)
-
-        if not self.plot_title:
-            lpax.set_title('Phase Tensor Map for ' + titlefreq,
-                           fontsize=self.font_size + 2, fontweight='bold')
-        else:
-            lpax.set_title(self.plot_title + titlefreq,
-                           fontsize=self.font_size + 2, fontweight='bold')
+        self._set_title()
 
         # --> plot induction arrow scale bar -----------------------------------
         if self.plot_tipper.find('y') == 0:
@@ -1271,6 +1325,91 @@ class PlotPhaseTensorMaps(mtpl.PlotSettings):
         plt.close(self.fig)
         self.plot()
 
+    def plot_freq_list(self, freq_list, save_fn, file_format='pdf',
+                       fig_dpi=None):
+        """
+        Plot a phase tensor map for each frequency in freq_list and save
+        them, as pages of one pdf or as one file per frequency.
+
+        The figure, axes, colorbar and legend are made once by plot for the
+        first frequency, for the other frequencies only the ellipses,
+        induction arrows, station names and title are drawn again, so many
+        periods of a large survey can be rendered quickly.  The axes limits
+        are those of the first frequency.
+
+        Arguments:
+        -----------
+
+            **freq_list** : list of frequencies (Hz) to plot
+
+            **save_fn** : string
+                          * full path of a .pdf file -> each frequency is
+                            a page of the pdf
+                          * directory path -> each frequency is saved to
+                            save_fn/PTmap_DPI*_colorby_freqHz.file_format
+
+            **file_format** : [ jpg | png | pdf | eps | svg ]
+                              file type of the saved figures if save_fn is
+                              a directory
+
+            **fig_dpi** : int
+                          resolution of the saved figures, *default* is
+                          fig_dpi
+
+        Returns:
+        ---------
+            **fn_list** : list of the files written
+
+        :Example: ::
+
+            >>> ptmap = PlotPhaseTensorMaps(fn_list=edi_list, plot_freq=1)
+            >>> ptmap.plot_freq_list(np.logspace(-2, 2, 20),
+            >>> ...                      r"/home/MT/ptmaps.pdf")
+        """
+        if fig_dpi is None:
+            fig_dpi = self.fig_dpi
+
+        pdf = None
+        if save_fn.lower().endswith('.pdf'):
+            pdf = PdfPages(save_fn)
+        elif not os.path.isdir(save_fn):
+            os.makedirs(save_fn)
+
+        fn_list = []
+        try:
+            for ii, freq in enumerate(freq_list):
+                self.plot_freq = freq
+                if ii == 0:
+                    self.plot(show=False)
+                else:
+                    # only draw the ellipses and arrows of this frequency
+                    self._renderer.clear()
+                    for label in self._station_labels:
+                        label.remove()
+                    plot_data = self._get_plot_data()
+                    self._draw_plot_data(plot_data)
+                    self._plot_station_names(plot_data)
+                    self._set_title()
+
+                if pdf is not None:
+                    pdf.savefig(self.fig, dpi=fig_dpi, bbox_inches='tight')
+                else:
+                    fn = os.path.join(save_fn, 'PTmap_DPI{0}_{1}_{2:.6g}Hz.{3}'.format(
+                        fig_dpi, self.ellipse_colorby, freq, file_format))
+                    self.fig.savefig(fn, dpi=fig_dpi, format=file_format,
+                                     bbox_inches='tight')
+                    fn_list.append(fn)
+        finally:
+            if pdf is not None:
+                pdf.close()
+                fn_list.append(save_fn)
+            plt.close(self.fig)
+
+        _logger.debug('Saved %d phase tensor maps to: %s', len(freq_list),
+                      save_fn)
+
+        return fn_list
+
     def export_params_to_file(self, save_path=None):
         """
         write text files for all the phase tensor parameters.
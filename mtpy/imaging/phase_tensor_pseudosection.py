@@ -16,6 +16,7 @@ import matplotlib.pyplot as plt
 import numpy as np
 
 import mtpy.imaging.mtcolors as mtcl
+import mtpy.imaging.pt_collections as ptcol
 import mtpy.imaging.mtplottools as mtpl
 
 
@@ -485,6 +486,12 @@ class PlotPhaseTensorPseudoSection(mtpl.PlotSettings):
 
         if cmap == 'mt_seg_bl2wh2rd':
             bounds = np.arange(ckmin, ckmax + ckstep, ckstep)
+
+        ellipse_data = dict([(key, []) for key in ['x', 'y', 'width',
+                                                    'height', 'angle',
+                                                    'color']])
+        arrow_data = {'real': [], 'imag': []}
+
         # plot phase tensor ellipses
         for ii, mt in enumerate(self.mt_list):
             self.stationlist.append(
@@ -588,96 +595,94 @@ class PlotPhaseTensorPseudoSection(mtpl.PlotSettings):
             minlist.append(min(colorarray))
             maxlist.append(max(colorarray))
 
-            for jj, ff in enumerate(periodlist):
-
-                # make sure the ellipses will be visable
-                eheight = phimin[jj] / phimax[jj] * es
-                ewidth = phimax[jj] / phimax[jj] * es
-
-                # create an ellipse scaled by phimin and phimax and orient
-                # the ellipse so that north is up and east is right
-                # need to add 90 to do so instead of subtracting
-                ellipd = patches.Ellipse((offset * self.xstretch,
-                                          np.log10(ff) * self.ystretch),
-                                         width=ewidth,
-                                         height=eheight,
-                                         edgecolor='k',
-                                         lw=0.5,
-                                         angle=azimuth[jj] + 90)
-
-                # get ellipse color
-                if cmap.find('seg') > 0:
-                    ellipd.set_facecolor(mtcl.get_plot_color(colorarray[jj],
-                                                             self.ellipse_colorby,
-                                                             cmap,
-                                                             ckmin,
-                                                             ckmax,
-                                                             bounds=bounds))
-                else:
-                    ellipd.set_facecolor(mtcl.get_plot_color(colorarray[jj],
-                                                             self.ellipse_colorby,
-                                                             cmap,
-                                                             ckmin,
-                                                             ckmax))
-
-                # == =add the ellipse to the plot == ========
-                self.ax.add_artist(ellipd)
-
-                # --------- Add induction arrows if desired -------------------
-                if self.plot_tipper.find('y') == 0:
-
-                    # --> plot real tipper
-                    if self.plot_tipper == 'yri' or self.plot_tipper == 'yr':
-                        txr = tmr[jj] * np.sin(tar[jj] * np.pi / 180 +
-                                               np.pi * self.arrow_direction) * \
-                            self.arrow_size
-                        tyr = -tmr[jj] * np.cos(tar[jj] * np.pi / 180 +
-                                                np.pi * self.arrow_direction) * \
-                            self.arrow_size
-
-                        maxlength = np.sqrt((txr / self.arrow_size) ** 2 +
-                                            (tyr / self.arrow_size) ** 2)
-
-                        if maxlength > self.arrow_threshold:
-                            pass
-                        elif ((txr > 0) or (tyr>0)):
-#                        else:
-                            self.ax.arrow(offset * self.xstretch,
-                                          np.log10(ff) * self.ystretch,
-                                          txr,
-                                          tyr,
-                                          lw=alw,
-                                          facecolor=self.arrow_color_real,
-                                          edgecolor=self.arrow_color_real,
-                                          length_includes_head=False,
-                                          head_width=awidth,
-                                          head_length=aheight)
-
-                    # --> plot imaginary tipper
-                    if self.plot_tipper == 'yri' or self.plot_tipper == 'yi':
-                        txi = tmi[jj] * np.sin(tai[jj] * np.pi / 180 +
-                                               np.pi * self.arrow_direction) * \
-                            self.arrow_size
-                        tyi = -tmi[jj] * np.cos(tai[jj] * np.pi / 180 +
-                                                np.pi * self.arrow_direction) * \
-                            self.arrow_size
-
-                        maxlength = np.sqrt((txi / self.arrow_size) ** 2 +
-                                            (tyi / self.arrow_size) ** 2)
-                        if maxlength > self.arrow_threshold:
-                            pass
-#                        else:
-                        elif ((txr > 0) or (tyr>0)):
-                            self.ax.arrow(offset * self.xstretch,
-                                          np.log10(ff) * self.ystretch,
-                                          txi,
-                                          tyi,
-                                          lw=alw,
-                                          facecolor=self.arrow_color_imag,
-                                          edgecolor=self.arrow_color_imag,
-                                          length_includes_head=False,
-                                          head_width=awidth,
-                                          head_length=aheight)
+            # ellipses and arrows are collected for all stations and drawn
+            # at once below
+            plotx = np.repeat(offset * self.xstretch, n)
+            ploty = np.log10(periodlist) * self.ystretch
+
+            # create ellipses scaled by phimin and phimax and orient
+            # the ellipse so that north is up and east is right
+            # need to add 90 to do so instead of subtracting
+            with np.errstate(invalid='ignore', divide='ignore'):
+                ellipse_data['x'].append(plotx)
+                ellipse_data['y'].append(ploty)
+                ellipse_data['height'].append(phimin / phimax * es)
+                ellipse_data['width'].append(phimax / phimax * es)
+                ellipse_data['angle'].append(azimuth + 90)
+                ellipse_data['color'].append(colorarray)
+
+            # --------- Add induction arrows if desired -------------------
+            if self.plot_tipper.find('y') == 0:
+                txr = tmr * np.sin(tar * np.pi / 180 +
+                                   np.pi * self.arrow_direction) * \
+                    self.arrow_size
+                tyr = -tmr * np.cos(tar * np.pi / 180 +
+                                    np.pi * self.arrow_direction) * \
+                    self.arrow_size
+                txi = tmi * np.sin(tai * np.pi / 180 +
+                                   np.pi * self.arrow_direction) * \
+                    self.arrow_size
+                tyi = -tmi * np.cos(tai * np.pi / 180 +
+                                    np.pi * self.arrow_direction) * \
+                    self.arrow_size
+
+                # arrows longer than the threshold are not plotted, nor are
+                # arrows of periods whose real arrow points west and north
+                pointing = (txr > 0) | (tyr > 0)
+
+                # --> plot real tipper
+                if self.plot_tipper == 'yri' or self.plot_tipper == 'yr':
+                    maxlength = np.sqrt((txr / self.arrow_size) ** 2 +
+                                        (tyr / self.arrow_size) ** 2)
+                    plot_arrow = (maxlength <= self.arrow_threshold) & \
+                        pointing
+                    arrow_data['real'].append(np.array([plotx, ploty, txr,
+                                                        tyr])[:, plot_arrow])
+
+                # --> plot imaginary tipper
+                if self.plot_tipper == 'yri' or self.plot_tipper == 'yi':
+                    maxlength = np.sqrt((txi / self.arrow_size) ** 2 +
+                                        (tyi / self.arrow_size) ** 2)
+                    plot_arrow = (maxlength <= self.arrow_threshold) & \
+                        pointing
+                    arrow_data['imag'].append(np.array([plotx, ploty, txi,
+                                                        tyi])[:, plot_arrow])
+
+        # == =add the ellipses to the plot == ========
+        self._renderer = ptcol.PTCollectionRenderer(self.ax)
+        ellipse_data = dict([(key, np.hstack(value))
+                             for key, value in ellipse_data.items()])
+
+        # get ellipse color
+        if cmap.find('seg') > 0:
+            ellipse_colors = mtcl.get_plot_colors(ellipse_data['color'],
+                                                  self.ellipse_colorby,
+                                                  cmap, ckmin, ckmax,
+                                                  bounds=bounds)
+        else:
+            ellipse_colors = mtcl.get_plot_colors(ellipse_data['color'],
+                                                  self.ellipse_colorby,
+                                                  cmap, ckmin, ckmax)
+        self._renderer.draw_ellipses(ellipse_data['x'], ellipse_data['y'],
+                                     ellipse_data['width'],
+                                     ellipse_data['height'],
+                                     ellipse_data['angle'],
+                                     facecolors=ellipse_colors,
+                                     edgecolor='k',
+                                     lw=0.5)
+
+        # add the induction arrows
+        for key, color in [('real', self.arrow_color_real),
+                           ('imag', self.arrow_color_imag)]:
+            if len(arrow_data[key]) == 0:
+                continue
+            tx, ty, dx, dy = np.hstack(arrow_data[key])
+            if tx.size > 0:
+                self._renderer.draw_arrows(tx, ty, dx, dy, color=color,
+                                           lw=alw,
+                                           head_width=awidth,
+                                           head_length=aheight,
+                                           length_includes_head=False)
 
         # --> Set plot parameters
         self._plot_periodlist = plot_periodlist
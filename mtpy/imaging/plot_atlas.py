@@ -0,0 +1,440 @@
+#!/usr/bin/env python
+
+"""
+mtpy/imaging/plot_atlas.py
+
+Render an atlas of many plots of one survey.
+
+The .edi files of the survey are read once, and so are the ModEM model,
+data and residual files, however many plots use them.  Each plot is
+described by a spec.  The atlas is written as the pages of one pdf, or
+as a directory of figures with an index.json and index.html listing what
+was plotted.  The figures of a directory atlas are rendered in a process
+pool on the non-interactive Agg backend when more than one worker is used,
+the pages of a pdf are rendered one at a time in the calling process.
+
+A spec is a dictionary:
+
+    ================ ==========================================================
+    Key              Description
+    ================ ==========================================================
+    type             kind of plot, one of PLOT_TYPES
+    name             name of the plot and of its file in a directory atlas
+                     *default* is type_000, type_001, ...
+    freq             frequency to plot (Hz) for phase_tensor_map and
+                     resphase_map
+    period           period to plot (s) instead of freq, also for rms_map
+    period_index     index of the period for rms_map
+    plane            'N-E', 'N-Z' or 'E-Z' for slice, *default* is 'N-E'
+    index            index of the slice in the model grid for slice
+    options          keyword arguments of the plot class
+    plot_options     keyword arguments of the plot method
+    ================ ==========================================================
+
+    ============================ ===============================================
+    type                         plot
+    ============================ ===============================================
+    phase_tensor_map             phase_tensor_maps.PlotPhaseTensorMaps
+    phase_tensor_pseudosection   phase_tensor_pseudosection.PlotPhaseTensorPseudoSection
+    resphase_map                 plot_resphase_maps.PlotResPhaseMaps
+    resphase_pseudosection       plotpseudosection.PlotResPhasePseudoSection
+    strike                       plotstrike.PlotStrike
+    rms_map                      modem.plot_rms_maps.PlotRMSMaps, needs residual_fn
+    slice                        modem.plot_slices.PlotSlices.export_slices,
+                                 needs model_fn
+    ============================ ===============================================
+
+:Example: ::
+
+    >>> import numpy as np
+    >>> import mtpy.imaging.plot_atlas as plot_atlas
+    >>> specs = [{'type': 'phase_tensor_map', 'period': period,
+    >>> ...       'options': {'ellipse_size': .01, 'plot_tipper': 'yri'}}
+    >>> ...      for period in np.logspace(-2, 3, 30)]
+    >>> specs += [{'type': 'slice', 'index': index} for index in range(10, 40)]
+    >>> index = plot_atlas.make_atlas(specs, r"/home/mt/qc/atlas.pdf",
+    >>> ...                           edi_path=r"/home/mt/edi_files",
+    >>> ...                           model_fn=r"/home/modem/Modular_NLCG_100.rho",
+    >>> ...                           data_fn=r"/home/modem/ModEM_Data.dat",
+    >>> ...                           n_workers=8)
+
+"""
+
+#=================================================================
+import concurrent.futures
+import copy
+import json
+import os
+import time
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.backends.backend_pdf import PdfPages
+
+import mtpy.imaging.mtplottools as mtpl
+from mtpy.imaging.phase_tensor_maps import PlotPhaseTensorMaps
+from mtpy.imaging.phase_tensor_pseudosection import \
+    PlotPhaseTensorPseudoSection
+from mtpy.imaging.plot_resphase_maps import PlotResPhaseMaps
+from mtpy.imaging.plotpseudosection import PlotResPhasePseudoSection
+from mtpy.imaging.plotstrike import PlotStrike
+from mtpy.modeling.modem.plot_rms_maps import PlotRMSMaps
+from mtpy.modeling.modem.plot_slices import PlotSlices
+
+#=================================================================
+INDEX_BASENAME = 'index.json'
+HTML_BASENAME = 'index.html'
+
+# options that rotate the survey, specs using them get their own copy
+ROTATION_KEYS = ['rot_z', 'rotation_angle']
+
+# survey and files read in by each worker process, see _init_worker
+_survey = None
+_files = {}
+_file_cache = {}
+
+#=================================================================
+
+
+class PlotAtlasError(Exception):
+    pass
+
+
+def read_survey(edi_path):
+    """
+    Read all the .edi files in edi_path for plotting.
+
+    :param edi_path: directory of .edi files
+    :type edi_path: string
+
+    :returns: list of mtpy.imaging.mtplottools.MTplot objects sorted by file
+              name
+    """
+    edi_fns = sorted([os.path.join(edi_path, fn) for fn in os.listdir(edi_path)
+                      if fn.endswith('.edi')])
+    if len(edi_fns) == 0:
+        raise PlotAtlasError('No .edi files found in {0}'.format(edi_path))
+
+    return mtpl.get_mtlist(fn_list=edi_fns)
+
+
+def _get_freq(spec):
+    """
+    get the frequency to plot from freq or period
+    """
+    if 'freq' in spec:
+        return float(spec['freq'])
+    if 'period' in spec:
+        return 1. / float(spec['period'])
+    raise PlotAtlasError('{0} needs freq or period'.format(spec['name']))
+
+
+def _get_cached(key, read_func):
+    """
+    read each file once per process
+    """
+    if key not in _file_cache:
+        _file_cache[key] = read_func()
+    return _file_cache[key]
+
+
+def _options_key(options):
+    return repr(sorted(options.items()))
+
+
+def plot_phase_tensor_map(spec, mt_list):
+    ptmap = PlotPhaseTensorMaps(mt_object_list=mt_list,
+                                plot_freq=_get_freq(spec),
+                                plot_yn='n', **spec['options'])
+    ptmap.plot(show=False, **spec['plot_options'])
+    return ptmap.fig
+
+
+def plot_phase_tensor_pseudosection(spec, mt_list):
+    ptps = PlotPhaseTensorPseudoSection(mt_object_list=mt_list,
+                                        plot_yn='n', **spec['options'])
+    ptps.plot(show=False, **spec['plot_options'])
+    return ptps.fig
+
+
+def plot_resphase_map(spec, mt_list):
+    plot_options = dict(spec['plot_options'])
+    plot_type = plot_options.pop('type', 'res')
+    if plot_type == 'res':
+        vmin, vmax = plot_options.pop('vmin', 0), plot_options.pop('vmax', 4)
+    else:
+        vmin, vmax = plot_options.pop('vmin', 0), plot_options.pop('vmax', 90)
+    rpmap = PlotResPhaseMaps(mt_object_list=mt_list, plot_yn='n',
+                             **spec['options'])
+    return rpmap.plot(_get_freq(spec), plot_type, vmin, vmax,
+                      save_path=None, show=False, **plot_options)
+
+
+def plot_resphase_pseudosection(spec, mt_list):
+    rpps = PlotResPhasePseudoSection(mt_object_list=mt_list, plot_yn='n',
+                                     **spec['options'])
+    rpps.plot(show=False, **spec['plot_options'])
+    return rpps.fig
+
+
+def plot_strike(spec, mt_list):
+    strike = PlotStrike(mt_object_list=mt_list, plot_yn='n',
+                        **spec['options'])
+    strike.plot(show=False, **spec['plot_options'])
+    return strike.fig
+
+
+def plot_rms_map(spec, mt_list):
+    if _files.get('residual_fn') is None:
+        raise PlotAtlasError('rms_map needs a residual_fn')
+    options = spec['options']
+    rms_map = _get_cached(('rms_map', _options_key(options)),
+                          lambda: PlotRMSMaps(_files['residual_fn'],
+                                              plot_yn='n', **options))
+    if 'period' in spec:
+        rms_map.period_index = int(np.argmin(np.fabs(
+            rms_map.residual.period_list - float(spec['period']))))
+    else:
+        rms_map.period_index = spec.get('period_index', 0)
+    rms_map.plot(**spec['plot_options'])
+    return rms_map.fig
+
+
+def _read_slices(options):
+    """
+    read the model once, export_slices needs the meshes and labels that are
+    made by plot
+    """
+    slices = PlotSlices(_files['model_fn'], data_fn=_files.get('data_fn'),
+                        plot_yn='n', **options)
+    slices.plot()
+    return slices
+
+
+def plot_slice(spec, mt_list):
+    if _files.get('model_fn') is None:
+        raise PlotAtlasError('slice needs a model_fn')
+    if 'index' not in spec:
+        raise PlotAtlasError('{0} needs an index'.format(spec['name']))
+    options = spec['options']
+    slices = _get_cached(('slice', _options_key(options)),
+                         lambda: _read_slices(options))
+    fig_list, fn_list = slices.export_slices(plane=spec.get('plane', 'N-E'),
+                                             indexlist=[spec['index']],
+                                             save=False,
+                                             **spec['plot_options'])
+    return fig_list[0]
+
+
+PLOT_TYPES = {'phase_tensor_map': plot_phase_tensor_map,
+              'phase_tensor_pseudosection': plot_phase_tensor_pseudosection,
+              'resphase_map': plot_resphase_map,
+              'resphase_pseudosection': plot_resphase_pseudosection,
+              'strike': plot_strike,
+              'rms_map': plot_rms_map,
+              'slice': plot_slice}
+
+
+def _json_value(value):
+    """
+    convert numpy types in spec options for the index
+    """
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def _set_survey(mt_list, files):
+    """
+    keep the survey and file names for the plots of this process
+    """
+    global _survey, _files
+    _survey = mt_list
+    _files = files
+    _file_cache.clear()
+
+
+def _init_worker(mt_list, files):
+    """
+    keep the survey and file names in the worker process so they are sent
+    only once, plots are rendered without a display
+    """
+    plt.switch_backend('Agg')
+    _set_survey(mt_list, files)
+
+
+def _render_spec(spec, save_fn=None, fig_dpi=None, pdf=None):
+    """
+    render one plot, the figure is saved to save_fn or added to pdf.
+    Errors are returned in the index entry instead of raised, so one bad
+    spec does not stop the atlas.
+    """
+    mt_list = _survey
+    if set(ROTATION_KEYS) & set(spec['options'].keys()):
+        mt_list = copy.deepcopy(mt_list)
+
+    entry = {'name': spec['name'],
+             'type': spec['type'],
+             'spec': spec}
+    st = time.time()
+    try:
+        fig = PLOT_TYPES[spec['type']](spec, mt_list)
+        try:
+            if save_fn is not None:
+                fig.savefig(save_fn, dpi=fig_dpi, bbox_inches='tight')
+                entry['fn'] = save_fn
+            elif pdf is not None:
+                pdf.savefig(fig, dpi=fig_dpi, bbox_inches='tight')
+        finally:
+            plt.close(fig)
+        entry['status'] = 'ok'
+    except Exception as error:
+        entry['status'] = 'failed'
+        entry['error'] = '{0}: {1}'.format(type(error).__name__, error)
+    entry['render_time'] = time.time() - st
+
+    return entry
+
+
+def write_html_index(index, save_path, html_basename=HTML_BASENAME):
+    """
+    Write an html page showing the figures of a directory atlas.
+
+    :param index: list of index entries returned by make_atlas
+    :param save_path: directory of the atlas
+
+    :returns: full path to the html file
+    """
+    lines = ['<html>',
+             '<head><title>MTpy plot atlas</title></head>',
+             '<body>']
+    for entry in index:
+        lines.append('<h3>{0} ({1})</h3>'.format(entry['name'],
+                                                 entry['type']))
+        if entry['status'] == 'ok':
+            fn = os.path.basename(entry['fn'])
+            lines.append('<a href="{0}"><img src="{0}" width="600"></a>'.format(
+                         fn))
+        else:
+            lines.append('<p>{0}</p>'.format(entry['error']))
+    lines += ['</body>', '</html>']
+
+    html_fn = os.path.join(save_path, html_basename)
+    with open(html_fn, 'w') as hfid:
+        hfid.write('\n'.join(lines) + '\n')
+
+    return html_fn
+
+
+def make_atlas(specs, save_fn, edi_path=None, mt_list=None, model_fn=None,
+               data_fn=None, residual_fn=None, n_workers=None,
+               file_format='png', fig_dpi=None):
+    """
+    Render the plots described by specs into one pdf or into a directory.
+
+    The survey is read once from edi_path, or given as mt_list, and the
+    ModEM files are read once by each worker.  Plots that fail are skipped
+    and their error is written to the index.
+
+    :param specs: list of dictionaries describing the plots, see module docs
+    :param save_fn: full path of a .pdf file to write each plot as a page,
+                    otherwise a directory to save each plot to as
+                    name.file_format with index.json and index.html
+    :param edi_path: directory of .edi files of the survey
+    :param mt_list: list of mtpy.imaging.mtplottools.MTplot objects instead
+                    of edi_path
+    :param model_fn: ModEM model file for slice plots
+    :param data_fn: ModEM data file for the stations on slice plots
+    :param residual_fn: ModEM residual file for rms_map plots
+    :param n_workers: number of worker processes for a directory atlas,
+                      *default* is the number of cpus, 1 renders the plots
+                      in this process.  The pages of a pdf are always
+                      rendered in this process, as pages drawn by other
+                      processes can not be added to one pdf
+    :param file_format: file type of the plots in a directory atlas
+    :param fig_dpi: resolution of the saved plots, *default* is that of
+                    each figure
+
+    :returns: list of index entries in the order of specs
+
+    """
+    specs = [dict(spec) for spec in specs]
+    for ii, spec in enumerate(specs):
+        if spec.get('type') not in PLOT_TYPES:
+            raise PlotAtlasError('type must be one of {0}, not {1}'.format(
+                                 sorted(PLOT_TYPES.keys()), spec.get('type')))
+        spec.setdefault('name', '{0}_{1:03}'.format(spec['type'], ii))
+        spec['options'] = dict(spec.get('options', {}))
+        spec['plot_options'] = dict(spec.get('plot_options', {}))
+    names = [spec['name'] for spec in specs]
+    if len(set(names)) != len(names):
+        raise PlotAtlasError('Plot names must be unique')
+
+    if mt_list is None:
+        if edi_path is not None:
+            mt_list = read_survey(edi_path)
+        elif set(spec['type'] for spec in specs) - set(['rms_map', 'slice']):
+            raise PlotAtlasError('Need to input edi_path or mt_list')
+    files = {'model_fn': model_fn,
+             'data_fn': data_fn,
+             'residual_fn': residual_fn}
+
+    as_pdf = save_fn.lower().endswith('.pdf')
+    if as_pdf:
+        save_path = os.path.dirname(os.path.abspath(save_fn))
+        save_fns = [None] * len(specs)
+    else:
+        save_path = save_fn
+        save_fns = [os.path.join(save_path, '{0}.{1}'.format(name,
+                                                              file_format))
+                    for name in names]
+    if not os.path.isdir(save_path):
+        os.makedirs(save_path)
+
+    if as_pdf:
+        n_workers = 1
+    elif n_workers is None:
+        n_workers = os.cpu_count() or 1
+    n_workers = max(1, min(int(n_workers), len(specs)))
+
+    pdf = PdfPages(save_fn) if as_pdf else None
+    try:
+        if n_workers == 1:
+            _set_survey(mt_list, files)
+            results = [_render_spec(spec, spec_fn, fig_dpi, pdf)
+                       for spec, spec_fn in zip(specs, save_fns)]
+            _set_survey(None, {})
+        else:
+            with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=n_workers, initializer=_init_worker,
+                    initargs=(mt_list, files)) as executor:
+                results = list(executor.map(_render_spec, specs, save_fns,
+                                            [fig_dpi] * len(specs)))
+
+        index = results
+        if as_pdf:
+            page = 0
+            for entry in index:
+                if entry['status'] == 'ok':
+                    page += 1
+                    entry['fn'] = save_fn
+                    entry['page'] = page
+    finally:
+        if pdf is not None:
+            pdf.close()
+
+    if as_pdf:
+        index_fn = os.path.splitext(save_fn)[0] + '_' + INDEX_BASENAME
+    else:
+        index_fn = os.path.join(save_path, INDEX_BASENAME)
+        write_html_index(index, save_path)
+    with open(index_fn, 'w') as ifid:
+        json.dump(index, ifid, indent=2, default=_json_value)
+
+    n_failed = len([entry for entry in index if entry['status'] != 'ok'])
+    print('Rendered {0} of {1} plots to {2}, wrote index to {3}'.format(
+          len(index) - n_failed, len(index), save_fn, index_fn))
+
+    return index
@@ -25,9 +25,8 @@ import mtpy.imaging.mtcolors as mtcl
 import mtpy.imaging.mtplottools as mtpl
 from mtpy.utils.mtpylog import MtPyLog
 import mtpy.analysis.pt as MTpt
-import matplotlib.tri as tri
-from scipy.spatial import cKDTree
-from scipy.spatial import Delaunay
+from mtpy.utils.bulk_export import get_survey_arrays
+from mtpy.utils.map_gridding import MapGridder
 from matplotlib import ticker
 from matplotlib import colors
 
@@ -42,6 +41,9 @@ class PlotResPhaseMaps(mtpl.PlotSettings):
         **fn_list** : list of strings
                           full paths to .edi files to plot
 
+        **mt_object_list** : list of mtpy.core.mt.MT objects
+                             already read in, used if fn_list is not given
+
         **fig_size** : tuple or list (x, y) in inches
                       dimensions of the figure box in inches, this is a default
                       unit of matplotlib.  You can use this so make the plot
@@ -83,11 +85,15 @@ class PlotResPhaseMaps(mtpl.PlotSettings):
         self._logger = MtPyLog.get_mtpy_logger(self.__class__.__name__)
 
         fn_list = kwargs.pop('fn_list', [])
+        mt_object_list = kwargs.pop('mt_object_list', None)
 
-        if(len(fn_list)==0): raise NameError('File list is empty.')
+        if(len(fn_list)==0 and mt_object_list is None): raise NameError('File list is empty.')
 
         # ----set attributes for the class-------------------------
-        self.mt_list = mtpl.get_mtlist(fn_list=fn_list)
+        if(len(fn_list)==0):
+            self.mt_list = mtpl.get_mtlist(mt_object_list=mt_object_list)
+        else:
+            self.mt_list = mtpl.get_mtlist(fn_list=fn_list)
 
         # read in map scale
         self.mapscale = kwargs.pop('mapscale', 'deg')
@@ -114,6 +120,102 @@ class PlotResPhaseMaps(mtpl.PlotSettings):
             self.kwargs.pop(key, None)
 
         self.axesList = []
+        self._gridder = None
+        self._gridder_key = None
+    # end func
+
+    def get_gridder(self, extrapolation_buffer_degrees=1):
+        """
+        Get the gridder of the station layout, it is only built again when the
+        map scale, the extrapolation buffer or the station locations change.
+
+        :param extrapolation_buffer_degrees: extrapolation buffer in degrees
+        :return: mtpy.utils.map_gridding.MapGridder of the stations in map
+                 coordinates, the hull is the stations with the outermost
+                 ones moved out by the buffer
+        """
+        lon = np.array([mt_obj.lon for mt_obj in self.mt_list], dtype=np.float64)
+        lat = np.array([mt_obj.lat for mt_obj in self.mt_list], dtype=np.float64)
+
+        key = (self.mapscale, extrapolation_buffer_degrees, lon.tobytes(),
+               lat.tobytes())
+        if self._gridder is not None and self._gridder_key == key:
+            return self._gridder
+
+        elon = np.array(lon)
+        elat = np.array(lat)
+
+        elon[np.argmin(elon)] -= extrapolation_buffer_degrees
+        elon[np.argmax(elon)] += extrapolation_buffer_degrees
+        elat[np.argmin(elat)] -= extrapolation_buffer_degrees
+        elat[np.argmax(elat)] += extrapolation_buffer_degrees
+
+        x, y, ex, ey = lon, lat, elon, elat
+        # transform coordinates if necessary
+        if (self.mapscale == 'm' or self.mapscale=='km'):
+            east, north, zl = self._project(lat, lon)
+            e_east, e_north, zle = self._project(elat, elon)
+
+            if (len(set(zl)) > 1 or len(set(zle)) > 1):
+                print('Warning: multiple UTM zones detected. ' \
+                      'Using geographical coordinates instead')
+            else:
+                x, y, ex, ey = east, north, e_east, e_north
+            # end if
+        # end if
+
+        self._gridder = MapGridder(x, y, hull_x=ex, hull_y=ey)
+        self._gridder_key = key
+
+        return self._gridder
+    # end func
+
+    def _project(self, lat, lon):
+        east = np.zeros(lon.shape)
+        north = np.zeros(lon.shape)
+        zones = []
+        for k in range(len(lon)):
+            east[k], north[k], zone = gis_tools.project_point_ll2utm(lat[k], lon[k])
+            zones.append(zone)
+        # end for
+
+        return east / self.dscale, north / self.dscale, zones
+    # end func
+
+    def get_maps(self, freq_list,
+                 extrapolation_buffer_degrees=1,
+                 regular_grid_nx=100, regular_grid_ny=100,
+                 nn=7,
+                 p=4):
+        """
+        Grid the apparent resistivity and phase of all four components at a list
+        of frequencies in one go.
+
+        :param freq_list: list of frequencies
+        :param extrapolation_buffer_degrees: extrapolation buffer in degrees
+        :param regular_grid_nx: number of longitudinal grid points to use during interpolation
+        :param regular_grid_ny: number of latitudinal grid points to use during interpolation
+        :param nn: number of nearest neighbours to use in inverse distance weighted interpolation
+        :param p: power parameter in inverse distance weighted interpolation
+        :return: (grid_x, grid_y, res, phase), np.ndarray(n_points) of the grid
+                 coordinates and np.ndarray(n_freq, 2, 2, n_points) of gridded
+                 resistivity and phase
+        """
+        freq_list = np.atleast_1d(np.asarray(freq_list, dtype=np.float64))
+        gridder = self.get_gridder(extrapolation_buffer_degrees)
+        grid_x, grid_y = gridder.get_grid(regular_grid_nx, regular_grid_ny)
+
+        # interpolate data, z is (n_freq, n_stations, 2, 2)
+        z = get_survey_arrays(self.mt_list, freq_list)[0]
+        res = np.abs(z) ** 2 / freq_list[:, None, None, None] * 0.2
+        phase = np.rad2deg(np.angle(z))
+        phase[:, :, 1, 0] += 180
+
+        # stations first for the gridder
+        res = gridder.grid(res.swapaxes(0, 1), grid_x, grid_y, nn=nn, p=p)
+        phase = gridder.grid(phase.swapaxes(0, 1), grid_x, grid_y, nn=nn, p=p)
+
+        return grid_x, grid_y, res, phase
     # end func
 
     # -----------------------------------------------
@@ -140,54 +242,15 @@ class PlotResPhaseMaps(mtpl.PlotSettings):
         :param regular_grid_ny: number of latitudinal grid points to use during interpolation
         :param nn: number of nearest neighbours to use in inverse distance weighted interpolation
         :param p: power parameter in inverse distance weighted interpolation
-        :param save_path: path where plot is saved
+        :param save_path: path where plot is saved, None to not save the plot
         :param file_ext: file extension
         :param show: boolean to toggle display of plot
         :return: fig object
         """
 
         if(type not in ['res', 'phase']): raise NameError("type must be 'res' or 'phase'")
-        if(not os.path.isdir(save_path)): raise NameError("Invalid save_path")
-
-        def in_hull(p, hull):
-            """
-            Test if points in p are within the convex hull
-            """
-
-            try:
-                if not isinstance(hull, Delaunay):
-                    hull = Delaunay(hull)
-
-                return hull.find_simplex(p)>=0
-            except:
-                from scipy.optimize import linprog
-
-                # Delaunay triangulation will fail if there are collinear points; in those instances
-                # use linear programming (much slower) to define a convex hull.
-                def in_hull_lp(points, x):
-                    """
-                    :param points:
-                    :param x:
-                    :return:
-                    """
-                    n_points = len(points)
-                    n_dim = len(x)
-                    c = np.zeros(n_points)
-                    A = np.r_[points.T, np.ones((1, n_points))]
-                    b = np.r_[x, np.ones(1)]
-                    lp = linprog(c, A_eq=A, b_eq=b)
-                    return not lp.success
-                # end func
-
-                result = []
-                for cp in p:
-                    result.append(in_hull_lp(hull, cp))
-                # end for
-
-                return np.array(result)
-            # end try
-        # end func
-        
+        if(save_path is not None and not os.path.isdir(save_path)): raise NameError("Invalid save_path")
+
         # change vmin, vmax to 2x2 array
         if not np.iterable(vmin):
             vmin = np.ones((2,2))*vmin
@@ -210,131 +273,29 @@ class PlotResPhaseMaps(mtpl.PlotSettings):
         # clear the figure if there is already one up
         plt.clf()
 
-        # interpolate data
-        res, phase, lat, lon = [], [], [], []
-        for mt_obj in self.mt_list:
-            z_obj_i, tipper_obj_i = mt_obj.interpolate([freq], bounds_error=False)
-            z_obj_i.compute_resistivity_phase()
-            res.append(z_obj_i.resistivity[0])
-            phase.append(z_obj_i.phase[0])
-            lat = np.append(lat, mt_obj.lat)
-            lon = np.append(lon, mt_obj.lon)
-        # end for
-
-        lon = np.array(lon)
-        lat = np.array(lat)
-        res = np.array(res)
-        phase = np.array(phase)
-        phase[:,1,0] += 180
-
-        elon = np.array(lon)
-        elat = np.array(lat)
-
-        elon[np.argmin(elon)] -= extrapolation_buffer_degrees
-        elon[np.argmax(elon)] += extrapolation_buffer_degrees
-        elat[np.argmin(elat)] -= extrapolation_buffer_degrees
-        elat[np.argmax(elat)] += extrapolation_buffer_degrees
-
-        x = np.zeros(lon.shape)
-        y = np.zeros(lon.shape)
-        ex = np.zeros(lon.shape)
-        ey = np.zeros(lon.shape)
+        # grid all the components at once, the gridder of the stations is reused
+        # by the following plots
+        rx, ry, res, phase = self.get_maps([freq],
+                                           extrapolation_buffer_degrees=extrapolation_buffer_degrees,
+                                           regular_grid_nx=regular_grid_nx,
+                                           regular_grid_ny=regular_grid_ny,
+                                           nn=nn, p=p)
+        gridder = self.get_gridder(extrapolation_buffer_degrees)
+        triangulation = gridder.get_triangulation(rx, ry)
+        insideIndices = ~triangulation.mask
+        x, y = gridder.x, gridder.y
+        lon = np.array([mt_obj.lon for mt_obj in self.mt_list])
+        lat = np.array([mt_obj.lat for mt_obj in self.mt_list])
+        vs = res[0] if type == 'res' else phase[0]
 
         # plot results
-        insideIndices = []
-        tree = None
-        triangulation = None
-        foundCoordinates = False
         plotIdx = 1
         for i in range(2):
             for j in range(2):
                 ax = self.fig.add_subplot(2, 2, plotIdx)
                 self.axesList.append(ax)
 
-                nx = regular_grid_nx
-                ny = regular_grid_ny
-                if (not foundCoordinates):
-                    # transform coordinates if necessary
-                    if (self.mapscale == 'm' or self.mapscale=='km'):
-                        zl = []
-                        zle = []
-                        for k in range(len(lon)):
-                            east, north, zone = gis_tools.project_point_ll2utm(lat[k],
-                                                                               lon[k])
-                            x[k] = east / self.dscale
-                            y[k] = north / self.dscale
-                            zl.append(zone)
-
-                            east, north, zone = gis_tools.project_point_ll2utm(elat[k],
-                                                                               elon[k])
-                            ex[k] = east / self.dscale
-                            ey[k] = north / self.dscale
-                            zle.append(zone)
-                        # end for
-
-                        if (len(set(zl)) > 1 or len(set(zle)) > 1):
-                            print('Warning: multiple UTM zones detected. ' \
-                                  'Using geographical coordinates instead')
-                            x = lon
-                            y = lat
-                            ex = elon
-                            ey = elat
-                        # end if
-                    else:
-                        x = lon
-                        y = lat
-                        ex = elon
-                        ey = elat
-                    # end if
-
-                    rx = np.linspace(ex.min(), ex.max(), nx)
-                    ry = np.linspace(ey.min(), ey.max(), ny)
-                    rx, ry = np.meshgrid(rx, ry)
-                    rx = rx.flatten()
-                    ry = ry.flatten()
-
-                    triangulation = tri.Triangulation(rx, ry)
-
-                    mx = rx[triangulation.triangles].mean(axis=1)
-                    my = ry[triangulation.triangles].mean(axis=1)
-
-                    mxmy = np.array([mx, my]).T
-                    exey = np.array([ex, ey]).T
-
-                    insideIndices = in_hull(mxmy, exey)
-                    insideIndices = np.bool_(insideIndices)
-                    triangulation.set_mask(~insideIndices)
-
-                    foundCoordinates = True
-
-                    tree = cKDTree(np.array([x, y]).T)
-                # end if
-
-                xy = np.array([rx, ry]).T
-                d, l = tree.query(xy, k=nn)
-
-                img = None
-                vs = res if type == 'res' else phase
-
-                if (nn == 1):
-                    # extract nearest neighbour values
-                    img = vs[:, i, j][l]
-                else:
-                    vals = vs[:, i, j]
-                    img = np.zeros((xy.shape[0]))
-
-                    # field values are directly assigned for coincident locations
-                    coincidentValIndices = d[:, 0] == 0
-                    img[coincidentValIndices] = vals[l[coincidentValIndices, 0]]
-
-                    # perform idw interpolation for non-coincident locations
-                    idwIndices = d[:, 0] != 0
-                    w = np.zeros(d.shape)
-                    w[idwIndices, :] = 1. / np.power(d[idwIndices, :], p)
-
-                    img[idwIndices] = np.sum(w[idwIndices, :] * vals[l[idwIndices, :]], axis=1) / \
-                                      np.sum(w[idwIndices, :], axis=1)
-                # end if
+                img = vs[i, j]
 
                 if(isinstance(cmap, str)):
                     cmap = plt.get_cmap(cmap)
@@ -423,8 +384,9 @@ class PlotResPhaseMaps(mtpl.PlotSettings):
         plt.tight_layout(rect=[0, 0.025, 1, 0.975])
         if (show): plt.show()
 
-        fn = os.path.join(save_path, '%s.%0.2f.%s'%(type, freq, file_ext))
-        self.fig.savefig(fn, dpi=self.fig_dpi)
+        if(save_path is not None):
+            fn = os.path.join(save_path, '%s.%0.2f.%s'%(type, freq, file_ext))
+            self.fig.savefig(fn, dpi=self.fig_dpi)
 
         return self.fig
     # end func
@@ -20,6 +20,7 @@ import matplotlib.colors as colors
 import matplotlib.patches as patches
 import matplotlib.colorbar as mcb
 import mtpy.imaging.mtcolors as mtcl
+import mtpy.imaging.pt_collections as ptcol
 import mtpy.imaging.mtplottools as mtpl
 import mtpy.analysis.pt as mtpt
 import scipy.signal as sps
@@ -887,58 +888,43 @@ class PlotResidualPTMaps(mtpl.MTEllipse):
         else:
             emax = self.ellipse_scale
         
-        #--> plot        
-        for ii, rpt in enumerate(self.rpt_array):
-            #--> get ellipse properties
-            #if the ellipse size is not physically correct make it a dot
-            if rpt['phimax'][f_index] == 0 and \
-               rpt['phimax'][f_index] == 0: 
-                eheight = .0000001*es
-                ewidth = .0000001*es
-            
-            elif rpt['phimax'][f_index] > 100 or \
-               rpt['phimax'][f_index] > 100: 
-                eheight = .0000001*es
-                ewidth = .0000001*es
-                print('Bad data at {0}'.format(rpt['station']))
-            
-            else:
-                scaling = es/emax
-                eheight = rpt['phimin'][f_index]*scaling
-                ewidth = rpt['phimax'][f_index]*scaling
-            
-            #make an ellipse
-            if self.rot90 == True:
-                ellipd = patches.Ellipse((rpt['plotx'],rpt['ploty']),
-                                         width=ewidth,
-                                         height=eheight,
-                                         angle=rpt['azimuth'][f_index]-90)
-            elif self.rot90 == False:
-                ellipd = patches.Ellipse((rpt['plotx'],rpt['ploty']),
-                                         width=ewidth,
-                                         height=eheight,
-                                         angle=rpt['azimuth'][f_index])
-                                   
-            #get ellipse color
-            if cmap.find('seg')>0:
-                ellipd.set_facecolor(mtcl.get_plot_color(rpt[ckey][f_index],
-                                                         ckey,
-                                                         cmap,
-                                                         ckmin,
-                                                         ckmax,
-                                                         bounds=bounds))
-            else:
-                ellipd.set_facecolor(mtcl.get_plot_color(rpt[ckey][f_index],
-                                                         ckey,
-                                                         cmap,
-                                                         ckmin,
-                                                         ckmax))
-            
-            #==> add ellipse to the plot
-            self.ax.add_artist(ellipd)
-                    
-            #------------Plot station name------------------------------
-            if self.plot_station_name == True:
+        #--> get ellipse properties
+        phimin = self.rpt_array['phimin'][:, f_index]
+        phimax = self.rpt_array['phimax'][:, f_index]
+
+        #if the ellipse size is not physically correct make it a dot
+        bad = phimax > 100
+        for station in self.rpt_array['station'][bad]:
+            print('Bad data at {0}'.format(station))
+        dot = (phimax == 0) | bad
+        scaling = es/emax
+        eheight = np.where(dot, .0000001*es, phimin*scaling)
+        ewidth = np.where(dot, .0000001*es, phimax*scaling)
+
+        if self.rot90 == True:
+            eangle = self.rpt_array['azimuth'][:, f_index]-90
+        else:
+            eangle = self.rpt_array['azimuth'][:, f_index]
+
+        #get ellipse colors
+        if cmap.find('seg')>0:
+            ellipse_colors = mtcl.get_plot_colors(
+                self.rpt_array[ckey][:, f_index], ckey, cmap, ckmin, ckmax,
+                bounds=bounds)
+        else:
+            ellipse_colors = mtcl.get_plot_colors(
+                self.rpt_array[ckey][:, f_index], ckey, cmap, ckmin, ckmax)
+
+        #==> add the ellipses to the plot as one collection
+        self._renderer = ptcol.PTCollectionRenderer(self.ax)
+        self._renderer.draw_ellipses(self.rpt_array['plotx'],
+                                     self.rpt_array['ploty'],
+                                     ewidth, eheight, eangle,
+                                     facecolors=ellipse_colors)
+
+        #------------Plot station name------------------------------
+        if self.plot_station_name == True:
+            for rpt in self.rpt_array:
                 self.ax.text(rpt['plotx'], rpt['ploty']+self.station_pad,
                              rpt['station'],
                              horizontalalignment='center',
@@ -55,6 +55,7 @@ class PlotTF(object):
         self.tf_nhwv = kwargs.pop('nhwv', None)
         self.tf_thresh = kwargs.pop('thresh', None)
         self.tf_robust_type = kwargs.pop('robusttype', 'median')
+        self.tf_chunk_bytes = kwargs.pop('chunk_bytes', mttf.TF_CHUNK_BYTES)
 
 
         self.fig_num = kwargs.pop('fig_num', 1)
@@ -127,7 +128,8 @@ class PlotTF(object):
                       'tstep': self.tf_tstep,
                       'ng':self.tf_ng,
                       'nfbins':self.tf_nfbins,
-                      'df':self.df}
+                      'df':self.df,
+                      'chunk_bytes':self.tf_chunk_bytes}
 
             tf_tuple = mttf.stft(self.time_series, **kwargs)
             self.tf_array = tf_tuple[0]
@@ -148,7 +150,8 @@ class PlotTF(object):
                       'nfbins':self.tf_nfbins,
                       'alpha':self.tf_alpha,
                       'threshold':self.tf_thresh,
-                      'df':self.df}
+                      'df':self.df,
+                      'chunk_bytes':self.tf_chunk_bytes}
 
             tf_tuple = mttf.reassigned_stft(self.time_series, **kwargs)
             self.tf_array = tf_tuple[0]
@@ -163,7 +166,8 @@ class PlotTF(object):
             kwargs = {'nh':self.tf_nh,
                       'tstep': self.tf_tstep,
                       'nfbins':self.tf_nfbins,
-                      'df':self.df}
+                      'df':self.df,
+                      'chunk_bytes':self.tf_chunk_bytes}
 
             tf_tuple = mttf.wvd(self.time_series, **kwargs)
             self.tf_array = tf_tuple[0]
@@ -178,7 +182,8 @@ class PlotTF(object):
                       'sigmaf':self.tf_sigmaf,
                       'tstep': self.tf_tstep,
                       'nfbins':self.tf_nfbins,
-                      'df':self.df}
+                      'df':self.df,
+                      'chunk_bytes':self.tf_chunk_bytes}
 
             tf_tuple = mttf.spwvd(self.time_series, **kwargs)
             self.tf_array = tf_tuple[0]
@@ -198,7 +203,8 @@ class PlotTF(object):
                       'sigmaf':self.tf_sigmaf,
                       'tstep': self.tf_tstep,
                       'nfbins':self.tf_nfbins,
-                      'df':self.df}
+                      'df':self.df,
+                      'chunk_bytes':self.tf_chunk_bytes}
             tf_tuple = mttf.robust_wvd(self.time_series, **kwargs)
             self.tf_array = tf_tuple[0]
             self.time_list = tf_tuple[1]
@@ -214,13 +220,14 @@ class PlotTF(object):
                 self.tf_ngwv = 2**3-1
 
             kwargs = {'nhs':self.tf_nh,
-                      'nhwv':self.tf_nh,
-                      'ngwv':self.tf_ng,
+                      'nhwv':self.tf_nhwv,
+                      'ngwv':self.tf_ngwv,
                       'sigmat':self.tf_sigmat,
                       'sigmaf':self.tf_sigmaf,
                       'tstep': self.tf_tstep,
                       'nfbins':self.tf_nfbins,
-                      'df':self.df}
+                      'df':self.df,
+                      'chunk_bytes':self.tf_chunk_bytes}
 
             tf_tuple = mttf.specwv(self.time_series, **kwargs)
             self.tf_array = tf_tuple[0]
@@ -236,7 +243,8 @@ class PlotTF(object):
                       'beta':self.tf_beta,
                       'tstep': self.tf_tstep,
                       'nfbins':self.tf_nfbins,
-                      'df':self.df}
+                      'df':self.df,
+                      'chunk_bytes':self.tf_chunk_bytes}
 
             tf_tuple = mttf.modifiedb(self.time_series, **kwargs)
             self.tf_array = tf_tuple[0]
@@ -251,7 +259,8 @@ class PlotTF(object):
             kwargs = {'nh':self.tf_nh,
                       'tstep': self.tf_tstep,
                       'nfbins':self.tf_nfbins,
-                      'df':self.df}
+                      'df':self.df,
+                      'chunk_bytes':self.tf_chunk_bytes}
 
             tf_tuple = mttf.robust_stft_median(self.time_series, **kwargs)
             self.tf_array = tf_tuple[0]
@@ -269,7 +278,8 @@ class PlotTF(object):
                       'alpha':self.tf_alpha,
                       'tstep': self.tf_tstep,
                       'nfbins':self.tf_nfbins,
-                      'df':self.df}
+                      'df':self.df,
+                      'chunk_bytes':self.tf_chunk_bytes}
 
             tf_tuple = mttf.robust_stft_L(self.time_series, **kwargs)
             self.tf_array = tf_tuple[0]
@@ -290,7 +300,8 @@ class PlotTF(object):
                       'tstep': self.tf_tstep,
                       'nfbins':self.tf_nfbins,
                       'sigmaL':self.tf_sigmaL,
-                      'df':self.df}
+                      'df':self.df,
+                      'chunk_bytes':self.tf_chunk_bytes}
 
             tf_tuple = mttf.smethod(self.time_series, **kwargs)
             self.tf_array = tf_tuple[0]
@@ -314,7 +325,8 @@ class PlotTF(object):
                       'nfbins':self.tf_nfbins,
                       'sigmaL':self.tf_sigmaL,
                       'robusttype':self.tf_robust_type,
-                      'df':self.df}
+                      'df':self.df,
+                      'chunk_bytes':self.tf_chunk_bytes}
 
             tf_tuple = mttf.robust_smethod(self.time_series, **kwargs)
             self.tf_array = tf_tuple[0]
@@ -340,7 +352,8 @@ class PlotTF(object):
                       'nfbins':self.tf_nfbins,
                       'threshold':self.tf_thresh,
                       'robusttype':self.tf_robust_type,
-                      'df':self.df}
+                      'df':self.df,
+                      'chunk_bytes':self.tf_chunk_bytes}
 
             tf_tuple = mttf.reassigned_smethod(self.time_series, **kwargs)
             self.tf_array = tf_tuple[0]
@@ -445,18 +458,21 @@ class PlotTF(object):
                            lw=self.lw)
             self.axts.axis('tight')
 
-            FX = np.fft.fft(mttf.padzeros(self.time_series))
-            FXfreq = np.fft.fftfreq(len(FX), 1./self.df)
+            #spectrum of the whole time series as a single window
+            ts_pad = mttf.padzeros(self.time_series)
+            FX = mttf.batched_fft(ts_pad[None, :], len(ts_pad),
+                                  chunk_bytes=self.tf_chunk_bytes)[0]
+            FXfreq = np.fft.fftfreq(len(ts_pad), 1./self.df)[0:len(FX)]
 
             #plot power spectra
             if self.freq_scale == 'log':
-                self.axps.loglog(abs(FX[0:len(FX)/2]/max(abs(FX))),
-                                   FXfreq[0:len(FX)/2],
+                self.axps.loglog(abs(FX/max(abs(FX))),
+                                   FXfreq,
                                           color=self.line_color_ps,
                                           lw=self.lw)
             else:
-                self.axps.semilogx(abs(FX[0:len(FX)/2]/max(abs(FX))),
-                                   FXfreq[0:len(FX)/2],
+                self.axps.semilogx(abs(FX/max(abs(FX))),
+                                   FXfreq,
                                    color=self.line_color_ps,
                                    lw=self.lw)
             self.axps.axis('tight')
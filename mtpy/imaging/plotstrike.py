@@ -12,7 +12,7 @@ import os
 import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib.ticker import MultipleLocator
-from mtpy.analysis.zinvariants import Zinvariants
+import mtpy.analysis.strike as strike
 import mtpy.imaging.mtplottools as mtpl
 
 #==============================================================================
@@ -228,129 +228,45 @@ class PlotStrike(object):
         """
         make strike array
         """
-        inv_list = []
-        pt_list = []
-        tip_list = []
-        # initialize some parameters
-        nc = len(self.mt_list)
-        nt = 0
-        kk = 0
-        
-        for dd, mt in enumerate(self.mt_list):
-            
-            if mt.period.size > nt:
-                nt = mt.period.size
-            #-----------get strike angle from invariants-----------------------
-            zinv = Zinvariants(mt.Z)
-
-            # add 90 degrees because invariants assume 0 is north, but plotting
-            # assumes that 90 is north and measures clockwise, thus the negative
-            # because the strike angle from invariants is measured
-            # counter-clockwise
-
-            zs = 90 - zinv.strike
-
-            # fold so the angle goes from 0 to 180
-            if self.fold == True:
-                # for plotting put the NW angles into the SE quadrant
-                zs[np.where(zs > 90)] -= 180
-                zs[np.where(zs < -90)] += 180
-
-            # leave as the total unit circle 0 to 360
-            elif self.fold == False:
-                zs %= 360
-                
-            # make a dictionary of strikes with keys as period
-            mdictinv = dict([(ff, jj) for ff, jj in zip(mt.period, zs)])
-            inv_list.append(mdictinv)
-
-            #------------get strike from phase tensor strike angle-------------
-            pt = mt.pt
-            az = 90 - pt.azimuth
-            az_err = pt.azimuth_err
-            az[pt.phimax == 0] = np.nan
-
-            # need to add 90 because pt assumes 0 is north and
-            # negative because measures clockwise.
-            # put an error max on the estimation of strike angle
-            if self.pt_error_floor:
-                az[np.where(az_err > self.pt_error_floor)] = 0.0
-
-            # fold so the angle goes from 0 to 180
-            if self.fold:
-                az[np.where(az > 90)] -= 180
-                az[np.where(az < -90)] += 180
-
-            # leave as the total unit circle 0 to 360
-            elif self.fold == False:
-                az %= 360
-                
-            # make a dictionary of strikes with keys as period
-            mdictpt = dict([(ff, jj) for ff, jj in zip(mt.period, az)])
-            pt_list.append(mdictpt)
-
-            #-----------get tipper strike------------------------------------
-            tip = mt.Tipper
-            if tip.tipper is None:
-                tip.tipper = np.zeros((len(mt.period), 1, 2),
-                                              dtype='complex')
-                tip.compute_components()
-
-            # needs to be negative because measures clockwise
-            tipr = -tip.angle_real
-
-            tipr[np.where(tipr == 180.)] = 0.0
-
-            # fold so the angle goes from 0 to 180
-            if self.fold == True:
-                tipr[np.where(tipr > 90)] -= 180
-                tipr[np.where(tipr < -90)] += 180
-
-            # leave as the total unit circle 0 to 360
-            elif self.fold == False:
-                tipr %= 360
-                tipr[np.where(tipr == 360.0)] = 0.0
-
-            # make a dictionary of strikes with keys as period
-            tiprdict = dict([(ff, jj) for ff, jj in zip(mt.period, tipr)])
-            tip_list.append(tiprdict)
+        # compute the strike of all stations and periods at once
+        s_obj = strike.SurveyStrike(self.mt_list,
+                                    period_tolerance=self.period_tolerance)
+
+        #-----------get strike angle from invariants---------------------------
+        # add 90 degrees because invariants assume 0 is north, but plotting
+        # assumes that 90 is north and measures clockwise, thus the negative
+        # because the strike angle from invariants is measured
+        # counter-clockwise
+        zs = strike.fold_angles(90 - s_obj.inv_strike, fold=self.fold)
+
+        #------------get strike from phase tensor strike angle-----------------
+        # need to add 90 because pt assumes 0 is north and
+        # negative because measures clockwise.
+        az = 90 - s_obj.pt_azimuth
+        az[s_obj.pt_phimax == 0] = np.nan
+
+        # put an error max on the estimation of strike angle
+        if self.pt_error_floor:
+            with np.errstate(invalid='ignore'):
+                az[s_obj.pt_azimuth_err > self.pt_error_floor] = 0.0
+        az = strike.fold_angles(az, fold=self.fold)
+
+        #-----------get tipper strike------------------------------------------
+        tipr = strike.fold_angles(s_obj.tipper_strike, fold=self.fold)
 
         #--> get min and max period
-        self.max_per = np.amax([np.max(list(mm.keys())) for mm in inv_list], axis=0)
-        self.min_per = np.amin([np.min(list(mm.keys())) for mm in pt_list], axis=0)
-
-        # make empty arrays to put data into for easy manipulation
-        medinv = np.zeros((nt, nc))
-        medpt = np.zeros((nt, nc))
-        medtipr = np.zeros((nt, nc))
+        self.max_per = s_obj.period.max()
+        self.min_per = s_obj.period.min()
 
         # make a list of periods from the longest period list
-        self.period_arr = np.logspace(np.log10(self.min_per),
-                                      np.log10(self.max_per),
-                                      num=nt,
-                                      base=10)
+        self.period_arr = s_obj.get_period_arr()
         self.period_dict = dict([(ii, jj) for jj, ii in 
                                  enumerate(self.period_arr)])
 
-        # put data into arrays
-        for ii, mm in enumerate(inv_list):
-            mperiod = mm.keys()
-            for jj, mp in enumerate(mperiod):
-                for kk in self.period_dict.keys():
-                    if mp > kk * (1 - self.period_tolerance) and \
-                            mp < kk * (1 + self.period_tolerance):
-                        ll = self.period_dict[kk]
-                        medinv[ll, ii] = inv_list[ii][mp]
-                        medpt[ll, ii] = pt_list[ii][mp]
-                        medtipr[ll, ii] = tip_list[ii][mp]
-                    else:
-                        pass
-        
-        # make the arrays local variables
-        self.med_inv = medinv
-        self.med_pt = medpt
-        self.med_tip = medtipr
-        
+        # put data into arrays of (period, station), 0 where there is no data
+        self.med_inv = s_obj.get_grid(zs, self.period_arr)
+        self.med_pt = s_obj.get_grid(az, self.period_arr)
+        self.med_tip = s_obj.get_grid(tipr, self.period_arr)
         
     def get_mean(self, st_array):
         """
@@ -417,9 +333,35 @@ class PlotStrike(object):
         
         if self.fold:
             plot_array %= 180
-        
+
         return plot_array
-    
+
+    def get_histograms(self, period_edges):
+        """
+        get the rose histograms of the invariant, phase tensor and tipper
+        strike for all the period bands between period_edges (log10 of the
+        period) at once.
+
+        Returns a dictionary with keys inv, pt and tip, each holding the
+        counts as an array (n_bands, n_bins) and the bin edges in degrees.
+        """
+        if self.fold == True:
+            histrange = (0, 180)
+        elif self.fold == False:
+            histrange = (0, 360)
+
+        hist_dict = {}
+        for key, st_array in [('inv', self.med_inv),
+                              ('pt', self.med_pt),
+                              ('tip', self.med_tip)]:
+            rose = strike.get_rose_angles(st_array, fold=self.fold,
+                                          orthogonal=self.plot_orthogonal)
+            hist_dict[key] = strike.get_rose_histograms(
+                rose, self.period_arr, period_edges,
+                bin_width=self.bin_width, hist_range=histrange)
+
+        return hist_dict
+
     def plot(self, show=True):
         """
         plot Strike angles as rose plots
@@ -440,11 +382,6 @@ class PlotStrike(object):
         plt.rcParams['figure.subplot.wspace'] = .2
         plt.rcParams['figure.subplot.hspace'] = .4
 
-        if self.fold == True:
-            histrange = (0, 180)
-        elif self.fold == False:
-            histrange = (0, 360)
-
         #-----Plot Histograms of the strike angles-----------------------------
         ### get the range in periods to plot
         if self.plot_range == 'data':
@@ -461,6 +398,10 @@ class PlotStrike(object):
             plt.rcParams['figure.subplot.hspace'] = .3
             plt.rcParams['figure.subplot.wspace'] = .3
 
+            # compute the histograms of all the decades at once
+            hist_dict = self.get_histograms(
+                np.append(self._bin_range, self._bin_range[-1:] + 1))
+
             self.fig = plt.figure(self.fig_num, dpi=self.fig_dpi)
             plt.clf()
             
@@ -494,10 +435,8 @@ class PlotStrike(object):
                     ax_list.append(self.ax_tip)
 
                 # make a list of indicies for each decades
-                bin_list = []
-                for ii, ff in enumerate(self.period_arr):
-                    if ff > 10**bb and ff < 10**(bb + 1):
-                        bin_list.append(ii)
+                bin_list = (self.period_arr > 10**bb) & \
+                           (self.period_arr < 10**(bb + 1))
 
                 # extract just the subset for each decade
                 plot_inv = self.get_plot_array(self.med_inv[bin_list, :])
@@ -505,10 +444,9 @@ class PlotStrike(object):
                 
                 if self.plot_tipper:
                     tr = self.get_plot_array(self.med_tip[bin_list, :])
-                    # compute the historgram for the tipper strike
-                    tr_hist = np.histogram(tr[np.nonzero(tr)].flatten(),
-                                              bins=int(360/bw),
-                                              range=histrange)
+                    # histogram of the tipper strike for the decade
+                    tr_hist = (hist_dict['tip'][0][jj - 1],
+                               hist_dict['tip'][1])
 
                     # make a bar graph with each bar being width of bw degrees
                     bar_tr = self.ax_tip.bar((tr_hist[1][:-1]) * np.pi / 180,
@@ -527,13 +465,9 @@ class PlotStrike(object):
                         else:
                             bar.set_facecolor(self.color_tip)
 
-                # estimate the histogram for the decade for invariants and pt
-                inv_hist = np.histogram(plot_inv[np.nonzero(plot_inv)].flatten(),
-                                        bins= int(360/bw),
-                                        range=histrange)
-                pt_hist = np.histogram(plot_pt,
-                                       bins=int(360/bw),
-                                       range=histrange)
+                # histograms of the decade for invariants and pt
+                inv_hist = (hist_dict['inv'][0][jj - 1], hist_dict['inv'][1])
+                pt_hist = (hist_dict['pt'][0][jj - 1], hist_dict['pt'][1])
         
                 # plot the histograms
                 self.bar_inv = self.ax_inv.bar((inv_hist[1][:-1]) * np.pi / 180,
@@ -736,14 +670,11 @@ class PlotStrike(object):
             plot_inv = self.get_plot_array(self.med_inv[bin_list, :])
             plot_pt = self.get_plot_array(self.med_pt[bin_list, :])
 
-            # estimate the histogram for the decade for invariants and pt
-            inv_hist = np.histogram(plot_inv[np.nonzero(plot_inv)].flatten(),
-                                   bins=int(360/bw),
-                                   range=histrange)
-                
-            pt_hist = np.histogram(plot_pt,
-                                  bins=int(360/bw),
-                                  range=histrange)
+            # estimate the histogram for all periods
+            hist_dict = self.get_histograms([self._bin_range.min(),
+                                             self._bin_range.max()])
+            inv_hist = (hist_dict['inv'][0][0], hist_dict['inv'][1])
+            pt_hist = (hist_dict['pt'][0][0], hist_dict['pt'][1])
 
             # plot the histograms
             self.bar_inv = self.ax_inv.bar((inv_hist[1][:-1]) * np.pi / 180,
@@ -773,10 +704,7 @@ class PlotStrike(object):
             # plot tipper if desired
             if self.plot_tipper:
                 tr = self.get_plot_array(self.med_tip[bin_list, :])
-
-                tr_hist = np.histogram(tr[np.nonzero(tr)].flatten(),
-                                      bins= int(360/bw),
-                                      range=histrange)
+                tr_hist = (hist_dict['tip'][0][0], hist_dict['tip'][1])
 
                 self.bar_tr = self.ax_tip.bar((tr_hist[1][:-1]) * np.pi / 180,
                                              tr_hist[0],
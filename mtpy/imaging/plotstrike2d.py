@@ -12,7 +12,7 @@ import numpy as np
 import os
 from matplotlib.ticker import MultipleLocator
 import mtpy.imaging.mtplottools as mtpl
-import mtpy.analysis.geometry as MTgy
+import mtpy.analysis.strike as MTstrike
 
 #==============================================================================
 
@@ -282,96 +282,44 @@ class PlotStrike2D(object):
         bw = self.bin_width
         histrange = (0, 360)
 
-        # set empty lists that will hold dictionaries with keys as the period
-        ptlist = []
-        tiprlist = []
+        # compute the strike of all stations and periods at once
+        s_obj = MTstrike.SurveyStrike(self.mt_list,
+                                      period_tolerance=self.period_tolerance,
+                                      skew_threshold=self.skew_threshold)
 
-        # initialize some parameters
-        nc = len(self.mt_list)
-        nt = 0
-        kk = 0
+        # estimate where only the 2D sections are
+        index_2d = s_obj.dimensionality == 2
 
-        for dd, mt in enumerate(self.mt_list):
+        #------------get strike from phase tensor strike angle-----------------
+        # need to add 90 because pt assumes 0 is north and
+        # negative because measures clockwise.
+        az = (90 - s_obj.pt_azimuth) % 360
 
-            #--> set the period
-            period = mt.period
+        # put an error max on the estimation of strike angle
+        if self.pt_error_floor:
+            with np.errstate(invalid='ignore'):
+                az[s_obj.pt_azimuth_err > self.pt_error_floor] = 0.0
 
-            # get maximum length of periods
-            if len(period) > nt:
-                nt = len(period)
+        #-----------get tipper strike------------------------------------------
+        tipr = s_obj.tipper_strike
+        tipr[tipr == -180.] = 0.0
 
-            # estimate where only the 2D sections are
-            dim_2d = MTgy.dimensionality(z_object=mt._Z,
-                                         skew_threshold=self.skew_threshold)
-            index_2d = np.where(dim_2d == 2)[0]
-            #------------get strike from phase tensor strike angle-------------
-            pt = mt.pt
-            az = (90 - pt.azimuth[index_2d]) % 360
-            az_err = pt.azimuth_err[index_2d]
-
-            # need to add 90 because pt assumes 0 is north and
-            # negative because measures clockwise.
-
-            # put an error max on the estimation of strike angle
-            if self.pt_error_floor:
-                az[np.where(az_err > self.pt_error_floor)] = 0.0
-
-            # make a dictionary of strikes with keys as period
-            mdictpt = dict([(ff, jj)
-                            for ff, jj in zip(mt.period[index_2d], az)])
-            ptlist.append(mdictpt)
-
-            #-----------get tipper strike------------------------------------
-            tip = mt.Tipper
-            if tip.tipper is None:
-                tip.tipper = np.zeros((len(mt.period), 1, 2),
-                                              dtype='complex')
-                tip.compute_components()
-
-            # needs to be negative because measures clockwise
-            tipr = -tip.angle_real[index_2d]
-
-            tipr[np.where(tipr == 180.)] = 0.0
-            tipr[np.where(tipr == -180.)] = 0.0
-
-            # make sure the angle is between 0 and 360
-            tipr = tipr % 360
-
-            # make a dictionary of strikes with keys as period
-            tiprdict = dict([(ff, jj)
-                             for ff, jj in zip(mt.period[index_2d], tipr)])
-            tiprlist.append(tiprdict)
+        # make sure the angle is between 0 and 360
+        tipr = tipr % 360
 
         #--> get min and max period
-        maxper = np.max([np.max(list(mm.keys())) for mm in ptlist if list(mm.keys())])
-        minper = np.min([np.min(list(mm.keys())) for mm in ptlist if list(mm.keys())])
-
-        # make empty arrays to put data into for easy manipulation
-        medpt = np.zeros((nt, nc))
-        medtipr = np.zeros((nt, nc))
+        maxper = s_obj.period[index_2d].max()
+        minper = s_obj.period[index_2d].min()
 
         # make a list of periods from the longest period list
-        plist = np.logspace(
-            np.log10(minper),
-            np.log10(maxper),
-            num=nt,
-            base=10)
+        plist = s_obj.get_period_arr(mask=index_2d)
         pdict = dict([(ii, jj) for jj, ii in enumerate(plist)])
 
         self._plist = plist
 
-        # put data into arrays
-        for ii, mm in enumerate(ptlist):
-            mperiod = list(mm.keys())
-            for jj, mp in enumerate(mperiod):
-                for kk in list(pdict.keys()):
-                    if mp > kk * (1 - self.period_tolerance) and \
-                            mp < kk * (1 + self.period_tolerance):
-                        ll = pdict[kk]
-                        medpt[ll, ii] = ptlist[ii][mp]
-                        medtipr[ll, ii] = tiprlist[ii][mp]
-                    else:
-                        pass
+        # put the 2D estimates into arrays of (period, station)
+        medpt = s_obj.get_grid(az, plist, mask=index_2d)
+        medtipr = s_obj.get_grid(tipr, plist, mask=index_2d)
 
         # make the arrays local variables
         self._medpt = medpt
@@ -396,6 +344,17 @@ class PlotStrike2D(object):
             plt.rcParams['figure.subplot.hspace'] = .3
             plt.rcParams['figure.subplot.wspace'] = .3
 
+            # compute the histograms of all the decades at once
+            decade_edges = np.append(brange, brange[-1:] + 1)
+            pthist_arr = MTstrike.get_rose_histograms(medpt, plist,
+                                                      decade_edges,
+                                                      bin_width=bw,
+                                                      hist_range=histrange)
+            trhist_arr = MTstrike.get_rose_histograms(medtipr, plist,
+                                                      decade_edges,
+                                                      bin_width=bw,
+                                                      hist_range=histrange)
+
             self.fig = plt.figure(self.fig_num, dpi=self.fig_dpi)
             plt.clf()
             nb = len(brange)
@@ -412,20 +371,15 @@ class PlotStrike2D(object):
                     axlist = [self.axhpt, self.axhtip]
 
                 # make a list of indicies for each decades
-                binlist = []
-                for ii, ff in enumerate(plist):
-                    if ff > 10**bb and ff < 10**(bb + 1):
-                        binlist.append(ii)
+                binlist = (plist > 10**bb) & (plist < 10**(bb + 1))
 
                 # extract just the subset for each decade
                 gg = medpt[binlist, :]
                 if self.plot_tipper == 'y':
                     tr = medtipr[binlist, :]
 
-                    # compute the historgram for the tipper strike
-                    trhist = np.histogram(tr[np.nonzero(tr)].flatten(),
-                                          bins=int(360/bw),
-                                          range=histrange)
+                    # histogram of the tipper strike for the decade
+                    trhist = (trhist_arr[0][jj - 1], trhist_arr[1])
 
                     # make a bar graph with each bar being width of bw degrees
                     bartr = self.axhtip.bar((trhist[1][:-1]) * np.pi / 180,
@@ -441,10 +395,8 @@ class PlotStrike2D(object):
                             fc = 1.0
                         bar.set_facecolor((0, 1 - fc / 2, fc))
 
-                # estimate the histogram for the decade for invariants and pt
-                pthist = np.histogram(gg[np.nonzero(gg)].flatten(),
-                                      bins=int(360/bw),
-                                      range=histrange)
+                # histogram of the decade for pt
+                pthist = (pthist_arr[0][jj - 1], pthist_arr[1])
 
                 # plot the histograms
                 self.barpt = self.axhpt.bar((pthist[1][:-1]) * np.pi / 180,
@@ -593,10 +545,12 @@ class PlotStrike2D(object):
             # extract just the subset for each decade
             gg = medpt[binlist, :]
 
-            # estimate the histogram for the decade for invariants and pt
-            pthist = np.histogram(gg[np.nonzero(gg)].flatten(),
-                                  bins=int(360/bw),
-                                  range=histrange)
+            # estimate the histogram for all periods for pt
+            all_edges = [brange.min(), brange.max()]
+            pthist = MTstrike.get_rose_histograms(medpt, plist, all_edges,
+                                                  bin_width=bw,
+                                                  hist_range=histrange)
+            pthist = (pthist[0][0], pthist[1])
 
             # plot the histograms
             self.barpt = self.axhpt.bar((pthist[1][:-1]) * np.pi / 180,
@@ -612,9 +566,11 @@ class PlotStrike2D(object):
             if self.plot_tipper == 'y':
                 tr = self._medtp[binlist, :]
 
-                trhist = np.histogram(tr[np.nonzero(tr)].flatten(),
-                                      bins=int(360/bw),
-                                      range=histrange)
+                trhist = MTstrike.get_rose_histograms(medtipr, plist,
+                                                      all_edges,
+                                                      bin_width=bw,
+                                                      hist_range=histrange)
+                trhist = (trhist[0][0], trhist[1])
 
                 self.bartr = self.axhtip.bar((trhist[1][:-1]) * np.pi / 180,
                                              trhist[0],
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+mtpy/imaging/pt_collections.py
+
+Draw phase tensor ellipses and induction arrows as matplotlib collections.
+
+Adding an Ellipse patch and a FancyArrow per station and period makes maps
+and pseudo sections of large surveys slow to draw and to save, every patch
+is a separate artist.  PTCollectionRenderer draws all the ellipses of a
+panel as one EllipseCollection and all the arrows of one colour as one
+PolyCollection.  The ellipses are colored in one go with
+mtcolors.get_plot_colors and the arrow outlines are computed for all arrows
+at once with the same geometry as matplotlib.patches.FancyArrow.
+
+The collections drawn by a renderer can be removed with clear, so a
+figure and its axes can be reused to render one period after the other.
+
+:Example: ::
+
+    >>> import mtpy.imaging.pt_collections as ptcol
+    >>> renderer = ptcol.PTCollectionRenderer(ax)
+    >>> renderer.draw_ellipses(x, y, widths, heights, angles,
+    >>> ...                    facecolors=mtcl.get_plot_colors(skew, 'skew',
+    >>> ...                                                    'mt_bl2gr2rd',
+    >>> ...                                                    -9, 9))
+    >>> renderer.draw_arrows(x, y, tx, ty, color='k', width=.0005,
+    >>> ...                  head_width=.003, head_length=.005)
+
+"""
+
+import numpy as np
+from matplotlib.collections import EllipseCollection, PolyCollection
+
+#==============================================================================
+
+
+def get_arrow_vertices(x, y, dx, dy, width=0.001, head_width=None,
+                       head_length=None, length_includes_head=False):
+    """
+    Get the outlines of arrows, the same polygons as
+    matplotlib.patches.FancyArrow with shape='full' and no overhang.
+
+    :param x, y: arrays of the arrow tails
+    :param dx, dy: arrays of the arrow lengths in x and y
+    :param width: width of the arrow tail
+    :param head_width: width of the arrow head, *default* is 3 * width
+    :param head_length: length of the arrow head, *default* is
+                        1.5 * head_width
+    :param length_includes_head: True if the head is part of dx, dy
+
+    :returns: array of shape (n_arrows, 7, 2), arrows of length 0 with the
+              head included have all vertices on the tail
+    """
+    x, y, dx, dy = [np.asarray(arr, dtype=np.float64).ravel()
+                    for arr in np.broadcast_arrays(x, y, dx, dy)]
+    if head_width is None:
+        head_width = 3 * width
+    if head_length is None:
+        head_length = 1.5 * head_width
+
+    distance = np.hypot(dx, dy)
+    if length_includes_head:
+        length = distance
+    else:
+        length = distance + head_length
+
+    # horizontal arrow pointing at (0, 0), going round from the tip
+    hw, hl, lw = head_width, head_length, width
+    coords = np.zeros((x.size, 7, 2))
+    coords[:, :, 0] = [0, -hl, -hl, 0, 0, -hl, -hl]
+    coords[:, 3:5, 0] = -length[:, None]
+    coords[:, :, 1] = [0, -hw / 2., -lw / 2., -lw / 2., lw / 2., lw / 2.,
+                       hw / 2.]
+    if not length_includes_head:
+        coords[:, :, 0] += head_length
+
+    # rotate onto the arrow direction
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cx = np.where(distance != 0, dx / distance, 0)
+        sx = np.where(distance != 0, dy / distance, 1)
+    verts = np.empty_like(coords)
+    verts[:, :, 0] = coords[:, :, 0] * cx[:, None] - \
+        coords[:, :, 1] * sx[:, None] + (x + dx)[:, None]
+    verts[:, :, 1] = coords[:, :, 0] * sx[:, None] + \
+        coords[:, :, 1] * cx[:, None] + (y + dy)[:, None]
+
+    # FancyArrow draws nothing when the arrow has no length
+    verts[length == 0] = np.array([x, y]).T[length == 0][:, None, :]
+
+    return verts
+
+
+class PTCollectionRenderer(object):
+    """
+    Draw the phase tensor ellipses and induction arrows of a panel as
+    collections on an axes.
+
+    Arguments:
+    -------------
+        **ax** : matplotlib.axes instance to draw on
+
+        **zorder** : zorder of the ellipses, arrows are drawn on top
+                     *default* is None, the default of a collection
+
+    ======================= ===================================================
+    Attributes              Description
+    ======================= ===================================================
+    ax                      axes the collections are drawn on
+    collections             list of the collections drawn since the last
+                            clear
+    ======================= ===================================================
+
+    """
+
+    def __init__(self, ax, zorder=None):
+        self.ax = ax
+        self.zorder = zorder
+        self.collections = []
+
+    def draw_ellipses(self, x, y, widths, heights, angles, facecolors=None,
+                      **kwargs):
+        """
+        Draw ellipses in data coordinates, like matplotlib.patches.Ellipse
+        added to the axes.
+
+        :param x, y: arrays of the ellipse centres
+        :param widths, heights: arrays of the full lengths of the axes
+        :param angles: array of the angles of the width axes in degrees
+                       anticlockwise from the x axis
+        :param facecolors: color or array of RGBA colors for each ellipse
+        :param kwargs: properties of the collection (edgecolors,
+                       linewidths, alpha, ...)
+
+        :returns: matplotlib.collections.EllipseCollection
+        """
+        x = np.asarray(x, dtype=np.float64).ravel()
+        y = np.asarray(y, dtype=np.float64).ravel()
+        # convert keywords of a patch to those of a collection
+        for key, ckey in [('lw', 'linewidths'), ('linewidth', 'linewidths'),
+                          ('edgecolor', 'edgecolors'), ('ec', 'edgecolors'),
+                          ('facecolor', 'facecolors'),
+                          ('fc', 'facecolors')]:
+            if key in kwargs:
+                kwargs[ckey] = kwargs.pop(key)
+        if facecolors is not None:
+            kwargs['facecolors'] = facecolors
+        if self.zorder is not None:
+            kwargs.setdefault('zorder', self.zorder)
+
+        ellipses = EllipseCollection(np.asarray(widths).ravel(),
+                                     np.asarray(heights).ravel(),
+                                     np.asarray(angles).ravel(),
+                                     units='xy',
+                                     offsets=np.vstack([x, y]).T,
+                                     transOffset=self.ax.transData,
+                                     **kwargs)
+        self.ax.add_collection(ellipses, autolim=False)
+        self.collections.append(ellipses)
+
+        return ellipses
+
+    def draw_arrows(self, x, y, dx, dy, color='k', width=0.001,
+                    head_width=None, head_length=None,
+                    length_includes_head=False, **kwargs):
+        """
+        Draw arrows of one color, like calls to ax.arrow.
+
+        :param x, y: arrays of the arrow tails
+        :param dx, dy: arrays of the arrow lengths in x and y
+        :param color: face and edge color of the arrows
+        :param width, head_width, head_length, length_includes_head:
+               see get_arrow_vertices
+        :param kwargs: properties of the collection (linewidths, ...)
+
+        :returns: matplotlib.collections.PolyCollection
+        """
+        verts = get_arrow_vertices(x, y, dx, dy, width=width,
+                                   head_width=head_width,
+                                   head_length=head_length,
+                                   length_includes_head=length_includes_head)
+        for key, ckey in [('lw', 'linewidths'), ('linewidth', 'linewidths')]:
+            if key in kwargs:
+                kwargs[ckey] = kwargs.pop(key)
+        kwargs.setdefault('facecolors', color)
+        kwargs.setdefault('edgecolors', color)
+        if self.zorder is not None:
+            kwargs.setdefault('zorder', self.zorder + 1)
+
+        arrows = PolyCollection(verts, closed=True, **kwargs)
+        self.ax.add_collection(arrows, autolim=True)
+        self.collections.append(arrows)
+
+        return arrows
+
+    def clear(self):
+        """
+        Remove the collections drawn so far, the axes, labels and colorbar
+        are kept so the next period can be drawn on the same axes.
+        """
+        for collection in self.collections:
+            collection.remove()
+        self.collections = []
@@ -0,0 +1,350 @@
+#!/usr/bin/env python
+
+"""
+mtpy/modeling/batch_inputs.py
+
+Build the input files for many variants of an inversion of one survey.
+
+The .edi files of the survey are read once.  Each variant (profile line,
+strike or rotation, error floors, mesh parameters, ...) is built from its
+own copy of the survey, in a process pool when more than one worker is
+used, and written to its own directory under save_path.  The print out of
+each build goes to a log file in the variant directory and a manifest of
+what was generated for every variant is written to save_path.
+
+A variant is a dictionary, the sections 'data', 'mesh' and 'startup' hold
+attributes that are set on the data, mesh/regularization and startup
+objects of the modeling program before they are built:
+
+    ================ ==========================================================
+    Key              Description
+    ================ ==========================================================
+    name             name of the variant and of its directory
+                     *default* is variant_000, variant_001, ...
+    station_list     stations to use, matched against the start of the .edi
+                     file names as in occam2d.Profile. *default* is all
+    rotation_angle   ws3dinv only, rotation of the data and the mesh
+                     clockwise from north
+    data             attributes of occam2d.Data or ws3dinv.WSData
+    mesh             attributes of occam2d.Regularization or ws3dinv.WSMesh
+    startup          attributes of occam2d.Startup or ws3dinv.WSStartup
+    ================ ==========================================================
+
+:Example: ::
+
+    >>> import mtpy.modeling.batch_inputs as batch_inputs
+    >>> variants = [{'name': 'strike_{0:02.0f}'.format(strike),
+    >>> ...          'data': {'geoelectric_strike': strike,
+    >>> ...                   'res_te_err': err, 'res_tm_err': err},
+    >>> ...          'mesh': {'cell_width': 200}}
+    >>> ...         for strike in [0, 15, 30] for err in [5, 10]]
+    >>> manifest = batch_inputs.build_inputs(variants, r"/home/occam2d/line1",
+    >>> ...                                  edi_path=r"/home/mt/edi_files",
+    >>> ...                                  n_workers=4)
+
+"""
+
+#=================================================================
+import concurrent.futures
+import contextlib
+import copy
+import json
+import os
+import time
+
+import numpy as np
+
+import mtpy.core.mt as mt
+import mtpy.modeling.occam2d as occam2d
+import mtpy.modeling.ws3dinv as ws
+
+#=================================================================
+MANIFEST_BASENAME = 'manifest.json'
+LOG_BASENAME = 'build.log'
+
+# survey read in by each worker process, see _init_worker
+_survey = None
+
+#=================================================================
+
+
+class BatchInputError(Exception):
+    pass
+
+
+def read_survey(edi_path):
+    """
+    Read all the .edi files in edi_path.
+
+    :param edi_path: directory of .edi files
+    :type edi_path: string
+
+    :returns: list of mtpy.core.mt.MT objects sorted by file name
+    """
+    edi_fns = sorted([fn for fn in os.listdir(edi_path)
+                      if fn.endswith('.edi')])
+    if len(edi_fns) == 0:
+        raise BatchInputError('No .edi files found in {0}'.format(edi_path))
+
+    return [mt.MT(os.path.join(edi_path, fn)) for fn in edi_fns]
+
+
+def select_stations(mt_list, station_list=None):
+    """
+    Pick the stations in station_list out of mt_list, matching the station
+    names against the start of the .edi file names like occam2d.Profile.
+
+    :param mt_list: list of mtpy.core.mt.MT objects
+    :param station_list: station names, if None all of mt_list is returned
+
+    :returns: list of mtpy.core.mt.MT objects in the order of station_list
+    """
+    if station_list is None:
+        return list(mt_list)
+
+    edi_names = [os.path.basename(mt_obj.fn) if mt_obj.fn
+                 else '{0}.edi'.format(mt_obj.station) for mt_obj in mt_list]
+    selected = []
+    for station in station_list:
+        for mt_obj, edi_name in zip(mt_list, edi_names):
+            if edi_name.find(station) == 0:
+                selected.append(mt_obj)
+                break
+        else:
+            raise BatchInputError('Could not find station {0}'.format(station))
+
+    return selected
+
+
+def _set_attributes(obj, attributes):
+    """
+    set attributes on obj, only existing attributes can be set so that
+    misspelled keys do not pass silently
+    """
+    if attributes is None:
+        return
+    for key, value in attributes.items():
+        if not hasattr(obj, key):
+            raise BatchInputError('{0} has no attribute {1}'.format(
+                                  type(obj).__name__, key))
+        setattr(obj, key, value)
+
+
+def build_occam2d_inputs(mt_list, variant, save_path):
+    """
+    Build the data, mesh, regularization and startup files of one Occam2D
+    variant.
+
+    The MT objects are rotated in place so give a copy if they are used
+    again.
+
+    :param mt_list: list of mtpy.core.mt.MT objects of the survey
+    :param variant: dictionary describing the variant, see module docs
+    :param save_path: directory to write the files to
+
+    :returns: dictionary of the files written and a summary of the inputs
+    """
+    ocd = occam2d.Data(mt_list=mt_list, save_path=save_path,
+                       station_list=variant.get('station_list'),
+                       show_profile=False)
+    _set_attributes(ocd, variant.get('data'))
+    ocd.write_data_file()
+
+    ocr = occam2d.Regularization()
+    ocr.station_locations = np.array(ocd.station_locations, copy=True)
+    ocr.save_path = save_path
+    _set_attributes(ocr, variant.get('mesh'))
+    ocr.build_mesh()
+    ocr.build_regularization()
+    ocr.write_mesh_file()
+    ocr.write_regularization_file()
+
+    ocs = occam2d.Startup(data_fn=ocd.data_fn, model_fn=ocr.reg_fn,
+                          param_count=ocr.num_free_param,
+                          save_path=save_path)
+    _set_attributes(ocs, variant.get('startup'))
+    ocs.write_startup_file()
+
+    return {'files': {'data_fn': ocd.data_fn,
+                      'mesh_fn': ocr.mesh_fn,
+                      'reg_fn': ocr.reg_fn,
+                      'startup_fn': ocs.startup_fn},
+            'stations': [sdict['station'] for sdict in ocd.data],
+            'n_frequencies': int(ocd.freq.shape[0]),
+            'geoelectric_strike': float(ocd.geoelectric_strike),
+            'profile_angle': float(ocd.profile_angle),
+            'num_free_param': int(ocr.num_free_param)}
+
+
+def build_ws3dinv_inputs(mt_list, variant, save_path):
+    """
+    Build the station, initial model, data and startup files of one
+    ws3dinv variant.  The data section has to give a period_list.
+
+    The MT objects are rotated in place so give a copy if they are used
+    again.
+
+    :param mt_list: list of mtpy.core.mt.MT objects of the survey
+    :param variant: dictionary describing the variant, see module docs
+    :param save_path: directory to write the files to
+
+    :returns: dictionary of the files written and a summary of the inputs
+    """
+    mt_list = select_stations(mt_list, variant.get('station_list'))
+    rotation_angle = variant.get('rotation_angle')
+
+    wsmesh = ws.WSMesh(edi_list=mt_list, save_path=save_path)
+    _set_attributes(wsmesh, variant.get('mesh'))
+    if rotation_angle is not None:
+        wsmesh.rotation_angle = rotation_angle
+    wsmesh.make_mesh()
+    wsmesh.write_initial_file(save_path=save_path)
+
+    wsdata = ws.WSData(edi_list=mt_list, save_path=save_path,
+                       station_locations=wsmesh.station_locations)
+    _set_attributes(wsdata, variant.get('data'))
+    if rotation_angle is not None:
+        wsdata.rotation_angle = rotation_angle
+    wsdata.write_data_file()
+
+    wsstartup = ws.WSStartup(data_fn=wsdata.data_fn,
+                             initial_fn=wsmesh.initial_fn,
+                             save_path=save_path)
+    _set_attributes(wsstartup, variant.get('startup'))
+    wsstartup.write_startup_file()
+
+    return {'files': {'data_fn': wsdata.data_fn,
+                      'initial_fn': wsmesh.initial_fn,
+                      'station_fn': wsmesh.station_fn,
+                      'startup_fn': wsstartup.startup_fn},
+            'stations': [mt_obj.station for mt_obj in mt_list],
+            'n_periods': len(wsdata.period_list),
+            'grid_shape': [int(wsmesh.nodes_north.shape[0]),
+                           int(wsmesh.nodes_east.shape[0]),
+                           int(wsmesh.nodes_z.shape[0])]}
+
+
+BUILDERS = {'occam2d': build_occam2d_inputs,
+            'ws3dinv': build_ws3dinv_inputs}
+
+
+def _json_value(value):
+    """
+    convert numpy types in variant parameters for the manifest
+    """
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, bytes):
+        return value.decode()
+    return str(value)
+
+
+def _init_worker(mt_list):
+    """
+    keep the survey in the worker process so it is sent only once
+    """
+    global _survey
+    _survey = mt_list
+
+
+def _build_variant(program, variant, save_path, mt_list=None):
+    """
+    build one variant from a copy of the survey, the print out is written
+    to a log file in the variant directory and errors are returned in the
+    manifest entry instead of raised, so one bad variant does not stop the
+    batch.
+    """
+    if mt_list is None:
+        mt_list = _survey
+
+    entry = {'name': variant['name'],
+             'program': program,
+             'save_path': save_path,
+             'parameters': variant}
+    if not os.path.isdir(save_path):
+        os.makedirs(save_path)
+
+    st = time.time()
+    log_fn = os.path.join(save_path, LOG_BASENAME)
+    with open(log_fn, 'w') as log_fid, contextlib.redirect_stdout(log_fid):
+        try:
+            entry.update(BUILDERS[program](copy.deepcopy(mt_list), variant,
+                                           save_path))
+            entry['status'] = 'ok'
+        except Exception as error:
+            entry['status'] = 'failed'
+            entry['error'] = '{0}: {1}'.format(type(error).__name__, error)
+    entry['log_fn'] = log_fn
+    entry['build_time'] = time.time() - st
+
+    return entry
+
+
+def build_inputs(variants, save_path, program='occam2d', edi_path=None,
+                 mt_list=None, n_workers=None,
+                 manifest_basename=MANIFEST_BASENAME):
+    """
+    Build the input files of many variants of an inversion.
+
+    The survey is read once from edi_path, or given as mt_list, and each
+    variant is built in save_path/variant_name.  A manifest with the
+    parameters, files and status of each variant is written to
+    save_path/manifest_basename.
+
+    :param variants: list of dictionaries describing the variants
+    :param save_path: directory to write the variant directories to
+    :param program: [ 'occam2d' | 'ws3dinv' ]
+    :param edi_path: directory of .edi files of the survey
+    :param mt_list: list of mtpy.core.mt.MT objects instead of edi_path
+    :param n_workers: number of worker processes, *default* is the number
+                      of cpus, 1 builds the variants in this process
+
+    :returns: list of manifest entries in the order of variants
+
+    """
+    if program not in BUILDERS:
+        raise BatchInputError('program must be one of {0}, not {1}'.format(
+                              sorted(BUILDERS.keys()), program))
+
+    if mt_list is None:
+        if edi_path is None:
+            raise BatchInputError('Need to input edi_path or mt_list')
+        mt_list = read_survey(edi_path)
+
+    variants = [dict(variant) for variant in variants]
+    for ii, variant in enumerate(variants):
+        variant.setdefault('name', 'variant_{0:03}'.format(ii))
+    names = [variant['name'] for variant in variants]
+    if len(set(names)) != len(names):
+        raise BatchInputError('Variant names must be unique')
+
+    if not os.path.isdir(save_path):
+        os.makedirs(save_path)
+    save_paths = [os.path.join(save_path, name) for name in names]
+
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    n_workers = max(1, min(int(n_workers), len(variants)))
+
+    if n_workers == 1:
+        manifest = [_build_variant(program, variant, variant_path, mt_list)
+                    for variant, variant_path in zip(variants, save_paths)]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=n_workers, initializer=_init_worker,
+                initargs=(mt_list,)) as executor:
+            manifest = list(executor.map(_build_variant,
+                                         [program] * len(variants),
+                                         variants, save_paths))
+
+    manifest_fn = os.path.join(save_path, manifest_basename)
+    with open(manifest_fn, 'w') as mfid:
+        json.dump(manifest, mfid, indent=2, default=_json_value)
+
+    n_failed = len([entry for entry in manifest if entry['status'] != 'ok'])
+    print('Built {0} of {1} {2} variants, wrote manifest to {3}'.format(
+          len(manifest) - n_failed, len(manifest), program, manifest_fn))
+
+    return manifest
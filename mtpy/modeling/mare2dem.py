@@ -16,7 +16,7 @@ import matplotlib.pyplot as plt
 import scipy
 
 import mtpy.modeling.occam2d as o2d
-from mtpy.utils import mesh_tools, gis_tools, filehandling
+from mtpy.utils import gis_tools, filehandling, dem_tools
 
 
 def line_length(x0, y0, x1, y1):
@@ -276,18 +276,11 @@ def occam2d_to_mare2dem(o2d_data, rot_o2d_data, surface_file, elevation_sample_n
         generate_profile_line(site_easts_proj, site_norths_proj, rot_x0, rot_y0, rot_x1, rot_y1,
                               elevation_sample_n)
 
-    # Interpolate elevation across profile points as a grid
+    # Interpolate elevation onto the profile points
     # We want the elevation of the non-rotated profile line
-    elevation = mesh_tools.interpolate_elevation_to_grid(
-        prof_easts, prof_norths, epsg=epsg, surfacefile=surface_file,
-        method='cubic')
-    elevation = elevation * -1 if flip_elevation else elevation
-
-    # Get profile elevation (which is a straight line through the elevation grid)
-    profile_elevation = []
-    for i in range(len(prof_easts)):
-        profile_elevation.append(elevation[i, i])
-    profile_elevation = np.array(profile_elevation)
+    profile_elevation = dem_tools.interpolate_to_points(
+        surface_file, prof_easts, prof_norths, epsg=epsg, method='cubic')
+    profile_elevation = profile_elevation * -1 if flip_elevation else profile_elevation
 
     # Convert profile to Mare2D system
     # This is the projected profile
@@ -3,25 +3,42 @@ from .station import Stations
 from .data import Data
 from .model import Model
 from .residual import Residual
+from .inversion_monitor import InversionMonitor
 from .control_inv import ControlInv
 from .control_fwd import ControlFwd
 from .convariance import Covariance
 from .config import ModEMConfig
 from .model_manipulator import ModelManipulator
-from .plot_response import PlotResponse
 # from .plot_pt_maps import PlotPTMaps
 # from .plot_depth_slice import PlotDepthSlice
 # from mtpy.imaging.modem_phase_tensor_maps import PlotPTMaps  # can cause circular import error
 # from mtpy.imaging.plot_depth_slice import PlotDepthSlice     # can cause circular import error
-from .plot_slices import PlotSlices
-from .plot_rms_maps import PlotRMSMaps
-from .phase_tensor_maps import PlotPTMaps
+
+# the plotting classes pull in pyplot, geopandas and the seismic readers,
+# they are imported when they are first used so that reading and writing
+# ModEM files does not pay for them
+_plot_classes = {
+    'PlotResponse': 'plot_response',
+    'PlotSlices': 'plot_slices',
+    'PlotRMSMaps': 'plot_rms_maps',
+    'PlotPTMaps': 'phase_tensor_maps',
+}
 
 __all__ = [
-            'ModEMError', 'DataError', 'Stations', 'Data', 'Model', 'Residual',
+            'ModEMError', 'DataError', 'Stations', 'Data', 'Model', 'Residual', 'InversionMonitor',
            'ControlInv', 'ControlFwd', 'Covariance', 'ModEMConfig', 'ModelManipulator',
            'PlotResponse',  'PlotSlices', 'PlotRMSMaps'
            # ,'PlotPTMaps', 'PlotDepthSlice'
            ]
 
 
+def __getattr__(name):
+    if name in _plot_classes:
+        import importlib
+        module = importlib.import_module('.' + _plot_classes[name], __name__)
+        return getattr(module, name)
+    raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_plot_classes))
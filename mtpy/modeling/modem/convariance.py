@@ -13,6 +13,7 @@ import os
 
 import numpy as np
 
+from mtpy.utils import instrumentation
 from mtpy.utils.mtpylog import MtPyLog
 from .exception import CovarianceError
 from .model import Model
@@ -26,6 +27,70 @@ except ImportError:
 __all__ = ['Covariance']
 
 
+def read_res_model(model_fn):
+    """
+    get the resistivity model of a ModEM model file, or of a .npy file of the
+    resistivity model which is memory mapped.
+
+    :return: np.ndarray(nx, ny, nz) of resistivity
+    """
+    if model_fn.endswith('.npy'):
+        return np.load(model_fn, mmap_mode='r')
+
+    mod_obj = Model()
+    mod_obj.read_model_file(model_fn)
+    return mod_obj.res_model
+
+
+def encode_mask_layer(layer):
+    """
+    format a layer of masks as the rows of a covariance file, each value
+    centered in 3 characters.
+
+    the formatted values are looked up from the unique values of the layer,
+    which are few, and put together as an array of characters.
+
+    :param layer: np.ndarray(n_rows, n_cols) of masks
+    :return: string of n_rows lines
+    """
+    values, inverse = np.unique(layer, return_inverse=True)
+    strings = ['{0:^3.0f}'.format(value) for value in values]
+    width = len(strings[0])
+    if any(len(string) != width for string in strings):
+        # values wider than 3 characters, join the rows one by one
+        strings = np.array(strings, dtype=object)[inverse].reshape(layer.shape)
+        return ''.join([''.join(row) + '\n' for row in strings])
+
+    chars = np.array([list(string) for string in strings], dtype='S1')
+    chars = chars[inverse].reshape(layer.shape[0], layer.shape[1] * width)
+    chars = np.hstack([chars, np.full((layer.shape[0], 1), b'\n', dtype='S1')])
+    return chars.tobytes().decode()
+
+
+def decode_mask_layers(mask_str, grid_dimensions):
+    """
+    read the mask layers of a covariance file, each a line with the first
+    and last layer index, starting at 1, and n_rows lines of n_cols masks.
+
+    :param mask_str: string of the mask layers
+    :param grid_dimensions: (nx, ny, nz)
+    :return: np.ndarray(nx, ny, nz) of int masks, rows in the order of the
+             file
+    """
+    nx, ny, nz = grid_dimensions
+    values = np.array(mask_str.split(), dtype=int)
+    mask_arr = np.ones((nx, ny, nz), dtype=int)
+    block_size = 2 + nx * ny
+    start = 0
+    while start + block_size <= values.size:
+        index_00, index_01 = values[start:start + 2] - 1
+        mask_arr[:, :, index_00:index_01 + 1] = \
+            values[start + 2:start + block_size].reshape((nx, ny, 1))
+        start += block_size
+
+    return mask_arr
+
+
 class Covariance(object):
     """
     read and write covariance files
@@ -74,28 +139,30 @@ class Covariance(object):
 
 
 
+    @instrumentation.timed('modem.covariance.write_covariance_file')
     def write_covariance_file(self, cov_fn=None, save_path=None,
                               cov_fn_basename=None, model_fn=None,
-                              sea_water=0.3, air=1e12):  #
+                              sea_water=0.3, air=1e12, res_model=None):  #
         """
         write a covariance file
+
+        the air and sea masks are computed from res_model, a
+        mtpy.modeling.modem.Model or a np.ndarray of resistivity, if it is
+        given, else from model_fn, a ModEM model file or a .npy file of the
+        resistivity model which is memory mapped instead of read in.
         """
 
         if model_fn is not None:
-            mod_obj = Model()
-            mod_obj.read_model_file(model_fn)
-
             # update save_path from model path if not provided separately
             if save_path is None:
                 save_path = os.path.dirname(model_fn)
 
-            print('Reading {0}'.format(model_fn))
-            self.grid_dimensions = mod_obj.res_model.shape
-            if self.mask_arr is None:
-                self.mask_arr = np.ones_like(mod_obj.res_model)
-            self.mask_arr[np.where(mod_obj.res_model >= air * .9)] = 0
-            self.mask_arr[np.where((mod_obj.res_model <= sea_water * 1.1) &
-                                   (mod_obj.res_model >= sea_water * .9))] = 9
+            if res_model is None:
+                print('Reading {0}'.format(model_fn))
+                res_model = read_res_model(model_fn)
+
+        if res_model is not None:
+            self.compute_mask_arr(res_model, sea_water=sea_water, air=air)
 
         if self.grid_dimensions is None:
             raise CovarianceError('Grid dimensions are None, input as (Nx, Ny, Nz)')
@@ -157,14 +224,10 @@ class Covariance(object):
                                      self.grid_dimensions[2]))
 
         # need to flip north and south.
-        write_mask_arr = self.mask_arr[::-1, :, :].copy()
+        write_mask_arr = self.mask_arr[::-1, :, :]
         for zz in range(self.mask_arr.shape[2]):
             clines.append(' {0:<8.0f}{0:<8.0f}\n'.format(zz + 1))
-            for nn in range(self.mask_arr.shape[0]):
-                cline = ''
-                for ee in range(self.mask_arr.shape[1]):
-                    cline += '{0:^3.0f}'.format(write_mask_arr[nn, ee, zz])
-                clines.append(cline + '\n')
+            clines.append(encode_mask_layer(write_mask_arr[:, :, zz]))
 
         with open(self.cov_fn, 'w') as cfid:
             cfid.writelines(clines)
@@ -173,6 +236,30 @@ class Covariance(object):
 
         self._logger.info('Wrote covariance file to {0}'.format(self.cov_fn))
 
+    def compute_mask_arr(self, res_model, sea_water=0.3, air=1e12):
+        """
+        set the air (0) and sea (9) masks from a resistivity model, layer by
+        layer so that a memory mapped model is not read in all at once.
+
+        :param res_model: mtpy.modeling.modem.Model or np.ndarray(nx, ny, nz)
+        :param sea_water: resistivity of the sea, cells within 10 % are sea
+        :param air: resistivity of the air, cells above 90 % are air
+        """
+        if isinstance(res_model, Model):
+            res_model = res_model.res_model
+
+        self.grid_dimensions = res_model.shape
+        if self.mask_arr is None:
+            self.mask_arr = np.ones(res_model.shape)
+        for zz in range(res_model.shape[2]):
+            layer = np.asarray(res_model[:, :, zz])
+            self.mask_arr[:, :, zz][layer >= air * .9] = 0
+            self.mask_arr[:, :, zz][(layer <= sea_water * 1.1) &
+                                    (layer >= sea_water * .9)] = 9
+
+        return self.mask_arr
+
+    @instrumentation.timed('modem.covariance.read_cov_file')
     def read_cov_file(self, cov_fn):
         """
         read a covariance file
@@ -190,15 +277,19 @@ class Covariance(object):
         num_find = False
         east_find = False
         north_find = False
-        count = 0
 
-        for line in lines:
+        for ii, line in enumerate(lines):
             if line.find('+') >= 0 or line.find('|') >= 0:
                 continue
             else:
                 line_list = line.strip().split()
                 if len(line_list) == 0:
                     continue
+                elif len(line_list) == 2 and north_find and east_find:
+                    # the mask layers start here, read them all in one go
+                    self.mask_arr = decode_mask_layers(''.join(lines[ii:]),
+                                                       self.grid_dimensions)
+                    break
                 elif len(line_list) == 1 and not num_find and line_list[0].find('.') == -1:
                     self.smoothing_num = int(line_list[0])
                     num_find = True
@@ -212,22 +303,12 @@ class Covariance(object):
                     self.mask_arr = np.ones((nx, ny, nz), dtype=np.int)
                     self.smoothing_east = np.zeros(ny)
                     self.smoothing_north = np.zeros(nx)
-                elif len(line_list) == 2:
-                    # starts at 1 but python starts at 0
-                    index_00, index_01 = [int(ii) - 1 for ii in line_list]
-                    count = 0
                 elif line_list[0].find('.') >= 0 and north_find == False:
                     self.smoothing_north = np.array(line_list, dtype=np.float)
                     north_find = True
                 elif line_list[0].find('.') >= 0 and north_find == True:
                     self.smoothing_east = np.array(line_list, dtype=np.float)
                     east_find = True
-                elif north_find and east_find:
-                    line_list = np.array(line_list, dtype=np.int)
-                    line_list = line_list.reshape((ny, 1))
-
-                    self.mask_arr[count, :, index_00:index_01 + 1] = line_list
-                    count += 1
 
     def get_parameters(self):
 
@@ -22,10 +22,12 @@ from mtpy.core import mt as mt
 from mtpy.core import z as mtz
 from mtpy.modeling import ws3dinv as ws
 from mtpy.utils import gis_tools as gis_tools
+from mtpy.utils import instrumentation
 from mtpy.utils.mtpy_decorator import deprecated
 from mtpy.utils.mtpylog import MtPyLog
 
 from mtpy.modeling.modem.exception import ModEMError, DataError
+from mtpy.modeling.modem.error_models import compute_z_error
 from mtpy.modeling.modem.station import Stations
 from mtpy.modeling.modem.model import Model
 
@@ -117,8 +119,15 @@ class Data(object):
                                 * 'median'  sets error to
                                             error_value_z * median([Zxx, Zxy, Zyx, Zyy])
                                             (non zeros)
+                                * 'off_diagonals' sets error of xx, xy to
+                                            error_value_z * Zxy, of yx, yy to
+                                            error_value_z * Zyx
+                                * 'percent' sets error to error_value_z * Z
+                                            of each component
                            A 2x2 numpy array of error_type_z can be specified to
                            explicitly set the error_type_z for each component.
+                           More error types can be added to
+                           mtpy.modeling.modem.error_models.ERROR_MODELS
 
     error_value_z          percentage to multiply Z by to set error
                            *default* is 5 for 5% of Z as error
@@ -270,6 +279,19 @@ class Data(object):
 
     """
 
+    # formats of the fields of a data line of each formatting, the data values
+    # are formatted with % as they are the only fields of every line
+    _data_line_formats = {'1': {'per': '{0:<12.5e}', 'sta': '{0:>7}',
+                                'lat': '{0:> 9.3f}', 'lon': '{0:> 9.3f}',
+                                'nor': '{0:> 12.3f}', 'eas': '{0:> 12.3f}',
+                                'ele': '{0:> 12.3f}', 'com': '{0:>4}',
+                                'value': '% 14.6e'},
+                          '2': {'per': '{0:<14.6e}', 'sta': '{0:<10}',
+                                'lat': '{0:> 14.6f}', 'lon': '{0:> 14.6f}',
+                                'nor': '{0:> 15.3f}', 'eas': '{0:> 12.3f}',
+                                'ele': '{0:> 10.3f}', 'com': '{0:>12}',
+                                'value': '% 17.6e'}}
+
     def __init__(self, edi_list=None, **kwargs):
 
         self._logger = MtPyLog.get_mtpy_logger(self.__class__.__name__)
@@ -646,6 +668,7 @@ class Data(object):
 
         self.get_relative_station_locations()
 
+    @instrumentation.timed('modem.data.fill_data_array')
     def fill_data_array(self, new_edi_dir=None, use_original_freq=False, longitude_format='LON'):
         """
         fill the data array from mt_dict
@@ -853,6 +876,7 @@ class Data(object):
                                  _set_station_locations,
                                  doc="""location of stations""")
 
+    @instrumentation.timed('modem.data.compute_inv_error')
     def compute_inv_error(self):
         """
         compute the error from the given parameters
@@ -870,91 +894,13 @@ class Data(object):
         else:
             raise DataError("Unsupported error type (tipper): {}".format(self.error_type_tipper))
 
-        # consistency checks
-        error_type_z_list = np.atleast_1d(self.error_type_z)
-
-        if (error_type_z_list.size != 1 and error_type_z_list.size != 4):
-            raise DataError('Either specify a single error_type_z for all components, or ' \
-                            'a 2x2 numpy array of error_type_z.')
-        # end if
-        
-        # compute error for z
-        err_value = self.error_value_z / 100.
-        for ss in range(self.data_array.shape[0]):
-            for ff in range(max([self._t_shape[0], self._z_shape[0]])):
-                d_xx = abs(self.data_array['z'][ss, ff, 0, 0])
-                d_xy = abs(self.data_array['z'][ss, ff, 0, 1])
-                d_yx = abs(self.data_array['z'][ss, ff, 1, 0])
-                d_yy = abs(self.data_array['z'][ss, ff, 1, 1])
-                d = np.array([d_xx, d_xy, d_yx, d_yy])
-                nz = np.nonzero(d)
-
-                if d.sum() == 0.0:  # YG: only works if all d >= 0
-                    continue
-
-                err = np.zeros((error_type_z_list.size,
-                                np.atleast_2d(err_value).shape[0],
-                                np.atleast_2d(err_value).shape[1]))
-                for ei, error_type_z in enumerate(error_type_z_list.flatten()):
-                    if 'egbert' in error_type_z:
-                        # if both components masked, then take error floor from
-                        # max of z_xx or z_yy
-                        if (d_xy==0.0 and d_yx==0.0):
-                            err[ei] = err_value * np.max([d_xx,d_yy])
-                        # else use the off diagonals depending on data availability
-                        else:
-                            if d_xy == 0.0:
-                                d_xy = d_yx
-                            if d_yx == 0.0:
-                                d_yx = d_xy
-                            err[ei] = err_value * np.sqrt(d_xy * d_yx)
-
-                    elif 'median' in error_type_z:
-                        err[ei] = err_value * np.median(d[nz])
-
-                    elif 'mean_od' in error_type_z:
-                        dod = np.array([d_xy, d_yx])
-                        nzod = np.nonzero(dod)
-                        err[ei] = err_value * np.mean(dod[nzod])
-
-                    elif 'eigen' in error_type_z:
-                        d2d = d.reshape((2, 2))
-                        err[ei] = err_value * np.abs(np.linalg.eigvals(d2d)).mean()
-                        if np.atleast_1d(err[ei]).sum() == 0:
-                            err[ei] = err_value * d[nz].mean()
-
-                    elif 'off_diagonals' in error_type_z:
-                        # apply same error to xy and xx, and to yx and yy
-                        # value is a % of xy and yx respectively
-                        err[ei] = np.array([[d_xy, d_xy],[d_yx, d_yx]])*err_value
-
-                    elif 'percent' in error_type_z:
-                        # apply separate error floors to each component
-                        err[ei] = err_value * np.abs(d[ei])
-                    else:
-                        raise DataError('error type (z) {0} not understood'.format(error_type_z))
-                # end for
-
-                if(error_type_z_list.size == 1):
-                    self.data_array['z_inv_err'][ss, ff, :, :] = err[0]
-                else:
-                    for ei in np.arange(error_type_z_list.size):
-                        ix, iy = np.divmod(ei, 2)
-                        if (err.shape[1] > 1):
-                            self.data_array['z_inv_err'][ss, ff, ix, iy] = err[ei, ix, iy]
-                        else:
-                            self.data_array['z_inv_err'][ss, ff, ix, iy] = err[ei, 0, 0]
-                        # end if
-                    # end for
-                # end if
-
-        # if there is an error floor
-        if 'floor' in self.error_type_z:
-            f_index = np.where(self.data_array['z_inv_err'] < self.data_array['z_err'])
-            self.data_array['z_inv_err'][f_index] = self.data_array['z_err'][f_index]
-
-
+        # compute error for z, all the stations and periods in one go
+        self.data_array['z_inv_err'] = compute_z_error(self.data_array['z'],
+                                                       self.data_array['z_err'],
+                                                       self.error_type_z,
+                                                       self.error_value_z)
 
+    @instrumentation.timed('modem.data.write_data_file')
     def write_data_file(self, save_path=None, fn_basename=None,
                         rotation_angle=None, compute_error=True, fill=True,
                         elevation=False, use_original_freq=False, longitude_format='LON'):
@@ -1063,78 +1009,84 @@ class Data(object):
             if compute_error:
                 self.compute_inv_error()
 
-            for ss in range(self.data_array['z'].shape[0]):
-                for ff in range(self.data_array['z'].shape[1]):
-                    for comp in self.inv_comp_dict[inv_mode]:
-                        # index values for component with in the matrix
-                        z_ii, z_jj = self.comp_index_dict[comp]
-
-                        # get the correct key for data array according to comp
-                        if comp.find('z') == 0:
-                            c_key = 'z'
-                        elif comp.find('t') == 0:
-                            c_key = 'tip'
-
-                        # get the value for that competent at that frequency
-                        zz = self.data_array[ss][c_key][ff, z_ii, z_jj]
-                        if zz.real != 0.0 and zz.imag != 0.0 and zz.real != 1e32 and zz.imag != 1e32:
-                            if self.formatting == '1':
-                                per = '{0:<12.5e}'.format(self.period_list[ff])
-                                sta = '{0:>7}'.format(self.data_array[ss]['station'])#.decode('UTF-8'))
-                                lat = '{0:> 9.3f}'.format(self.data_array[ss]['lat'])
-                                lon = '{0:> 9.3f}'.format(self.data_array[ss]['lon'])
-                                eas = '{0:> 12.3f}'.format(self.data_array[ss]['rel_east'])
-                                nor = '{0:> 12.3f}'.format(self.data_array[ss]['rel_north'])
-                                ele = '{0:> 12.3f}'.format(self.data_array[ss]['rel_elev'])
-                                com = '{0:>4}'.format(comp.upper())
-                                if self.units.lower() == 'ohm':
-                                    rea = '{0:> 14.6e}'.format(zz.real / 796.)
-                                    ima = '{0:> 14.6e}'.format(zz.imag / 796.)
-                                elif self.units.lower() not in ("[v/m]/[t]", "[mv/km]/[nt]"):
-                                    raise DataError("Unsupported unit \"{}\"".format(self.units))
-                                else:
-                                    rea = '{0:> 14.6e}'.format(zz.real)
-                                    ima = '{0:> 14.6e}'.format(zz.imag)
-
-                            elif self.formatting == '2':
-                                per = '{0:<14.6e}'.format(self.period_list[ff])
-                                sta = '{0:<10}'.format(self.data_array[ss]['station'])
-                                lat = '{0:> 14.6f}'.format(self.data_array[ss]['lat'])
-                                lon = '{0:> 14.6f}'.format(self.data_array[ss]['lon'])
-                                eas = '{0:> 12.3f}'.format(self.data_array[ss]['rel_east'])
-                                nor = '{0:> 15.3f}'.format(self.data_array[ss]['rel_north'])
-                                ele = '{0:> 10.3f}'.format(self.data_array[ss]['rel_elev'])
-                                com = '{0:>12}'.format(comp.upper())
-                                if self.units.lower() == 'ohm':
-                                    rea = '{0:> 17.6e}'.format(zz.real / 796.)
-                                    ima = '{0:> 17.6e}'.format(zz.imag / 796.)
-                                elif self.units.lower() not in ("[v/m]/[t]", "[mv/km]/[nt]"):
-                                    raise DataError("Unsupported unit \"{}\"".format(self.units))
-                                else:
-                                    rea = '{0:> 17.6e}'.format(zz.real)
-                                    ima = '{0:> 17.6e}'.format(zz.imag)
-                            else:
-                                raise NotImplementedError(
-                                    "format {}({}) is not supported".format(self.formatting, type(self.formatting)))
-
-                            # get error from inversion error
-                            abs_err = self.data_array['{0}_inv_err'.format(c_key)][ss, ff, z_ii, z_jj]
-
-                            if np.isinf(abs_err) or np.isnan(abs_err):
-                                abs_err = 10 ** (np.floor(np.log10(abs(max([float(rea),
-                                                                            float(ima)])))))
-                            abs_err = '{0:> 14.6e}'.format(abs(abs_err))
-                            # make sure that x==north, y==east, z==+down
-                            dline = ''.join([per, sta, lat, lon, nor, eas, ele, com, rea, ima, abs_err, '\n'])
-
-                            d_lines.append(dline)
+            d_lines.append(self._get_data_block(inv_mode))
         print("self.data_fn ==",  self.data_fn)
         with open(self.data_fn, 'w') as dfid:
             dfid.writelines(d_lines)
+            instrumentation.count('bytes', dfid.tell())
 
         self._logger.info('Wrote ModEM data file to {0}'.format(self.data_fn))
         return self.data_fn
 
+    def _get_data_block(self, inv_mode):
+        """
+        format the data lines of all the stations, periods and components of
+        an inversion mode in one go.
+
+        the non zero data are indexed with numpy, the fields that only depend
+        on the station, the period or the component are formatted once and
+        each line is made by a single format of those and the data values.
+
+        :param inv_mode: key of inv_comp_dict
+        :return: string of data lines
+        """
+        comps = self.inv_comp_dict[inv_mode]
+        c_keys = ['z' if comp.find('z') == 0 else 'tip' for comp in comps]
+        values = np.stack([self.data_array[c_key][:, :, z_ii, z_jj] for c_key, (z_ii, z_jj)
+                           in zip(c_keys, [self.comp_index_dict[comp] for comp in comps])],
+                          axis=-1)
+        errors = np.stack([self.data_array['{0}_inv_err'.format(c_key)][:, :, z_ii, z_jj]
+                           for c_key, (z_ii, z_jj)
+                           in zip(c_keys, [self.comp_index_dict[comp] for comp in comps])],
+                          axis=-1)
+
+        # (station, period, component) of the data to write, in that order
+        ss, ff, cc = np.nonzero((values.real != 0.0) & (values.imag != 0.0) &
+                                (values.real != 1e32) & (values.imag != 1e32))
+        instrumentation.count('records', ss.size)
+        if ss.size == 0:
+            return ''
+
+        if self.formatting not in self._data_line_formats:
+            raise NotImplementedError(
+                "format {}({}) is not supported".format(self.formatting, type(self.formatting)))
+        fmt = self._data_line_formats[self.formatting]
+
+        real = values.real[ss, ff, cc]
+        imag = values.imag[ss, ff, cc]
+        if self.units.lower() == 'ohm':
+            real = real / 796.
+            imag = imag / 796.
+        elif self.units.lower() not in ("[v/m]/[t]", "[mv/km]/[nt]"):
+            raise DataError("Unsupported unit \"{}\"".format(self.units))
+
+        # get error from inversion error, an order of magnitude of the written
+        # values where it is not finite
+        abs_err = errors[ss, ff, cc]
+        bad_err = ~np.isfinite(abs_err)
+        if bad_err.any():
+            rea = np.array([float(fmt['value'] % value) for value in real[bad_err]])
+            ima = np.array([float(fmt['value'] % value) for value in imag[bad_err]])
+            abs_err[bad_err] = 10 ** (np.floor(np.log10(np.abs(np.where(ima > rea, ima, rea)))))
+        abs_err = np.abs(abs_err)
+
+        per = [fmt['per'].format(period) for period in self.period_list[:values.shape[1]]]
+        # make sure that x==north, y==east, z==+down
+        sta = [''.join([fmt['sta'].format(self.data_array[ii]['station']),
+                        fmt['lat'].format(self.data_array[ii]['lat']),
+                        fmt['lon'].format(self.data_array[ii]['lon']),
+                        fmt['nor'].format(self.data_array[ii]['rel_north']),
+                        fmt['eas'].format(self.data_array[ii]['rel_east']),
+                        fmt['ele'].format(self.data_array[ii]['rel_elev'])])
+               for ii in range(values.shape[0])]
+        com = [fmt['com'].format(comp.upper()) for comp in comps]
+
+        line_fmt = '%s%s%s' + fmt['value'] * 2 + '% 14.6e\n'
+        return ''.join([line_fmt % (per[f_index], sta[s_index], com[c_index], re, im, err)
+                        for s_index, f_index, c_index, re, im, err
+                        in zip(ss.tolist(), ff.tolist(), cc.tolist(), real.tolist(),
+                               imag.tolist(), abs_err.tolist())])
+
     @deprecated("error type from GA implementation, not fully tested yet")
     def _impedance_components_error_meansqr(self, c_key, ss, z_ii, z_jj):
         """
@@ -1343,6 +1295,7 @@ class Data(object):
 
         return ws_data.data_fn, station_info.station_fn
 
+    @instrumentation.timed('modem.data.read_data_file')
     def read_data_file(self, data_fn=None, center_utm=None):
         """ Read ModEM data file
 
@@ -1373,6 +1326,8 @@ class Data(object):
 
         with open (self.data_fn, 'r') as dfid:
             dlines = dfid.readlines()
+        instrumentation.count('bytes', os.path.getsize(self.data_fn))
+        instrumentation.count('records', len(dlines))
 
         # dfid.close()
 
@@ -1778,32 +1733,24 @@ class Data(object):
         # sy = self.station_locations.station_locations['rel_north']
 
         # find index of each station on grid
-        station_index_x = []
-        station_index_y = []
-        for sname in self.station_locations.station_locations['station']:
-            ss = np.where(self.station_locations.station_locations['station'] == sname)[0][0]
-            # relative locations of stations
-            sx, sy = self.station_locations.station_locations['rel_east'][ss], \
-                     self.station_locations.station_locations['rel_north'][ss]
-            # indices of stations on model grid
-            sxi = np.where((sx <= model_object.grid_east[1:]) & (
-                sx > model_object.grid_east[:-1]))[0][0]
-            syi = np.where((sy <= model_object.grid_north[1:]) & (
-                sy > model_object.grid_north[:-1]))[0][0]
-
-            # first, check if there are any air cells
-            if np.any(model_object.res_model[syi, sxi] > 0.95 * air_resistivity):
-                szi = np.amin(
-                    np.where((model_object.res_model[syi, sxi] < 0.95 * air_resistivity))[0])
-            # otherwise place station at the top of the model
-            else:
-                szi = 0
+        station_index_x, station_index_y = model_object.get_station_cells(
+            self.station_locations.station_locations['rel_east'],
+            self.station_locations.station_locations['rel_north'])[:2]
+        if np.any(station_index_x < 0):
+            raise DataError('stations {0} are outside of the model mesh'.format(
+                self.station_locations.station_locations['station'][station_index_x < 0]))
+
+        # the stations are on the first cell that is not air, or at the
+        # top of the model if there are no air cells
+        station_index_z = np.argmax(
+            model_object.res_model[station_index_y, station_index_x] <
+            0.95 * air_resistivity, axis=1)
+
+        for ss, sname in enumerate(self.station_locations.station_locations['station']):
+            sxi, syi = station_index_x[ss], station_index_y[ss]
             
             # get relevant grid point elevation
-            topoval = model_object.grid_z[szi]
-            
-            station_index_x.append(sxi)
-            station_index_y.append(syi)
+            topoval = model_object.grid_z[station_index_z[ss]]
 
             # update elevation in station locations and data array, +1 m as
             # data elevation needs to be below the topography (as advised by Naser)
@@ -1831,7 +1778,7 @@ class Data(object):
 
         # debug self.Data.write_data_file(save_path='/e/tmp', fill=False)
 
-        return station_index_x, station_index_y
+        return station_index_x.tolist(), station_index_y.tolist()
 
     # FZ: moved from the modem_data_to_phase_tensor.py ref: AUSLAMP-112
     def compute_phase_tensor(self, datfile, outdir):
@@ -112,18 +112,12 @@ class DataModelAnalysis(object):
         station_lats = self.datObj.station_locations.lat
         station_lons = self.datObj.station_locations.lon
 
-        # get grid centres (finite element cells centres)
-        gceast, gcnorth = [np.mean([arr[:-1], arr[1:]], axis=0) for arr in
-                           [self.modObj.grid_east, self.modObj.grid_north]]
-        n_stations = len(sX)
-        for n in range(n_stations):
-            xdist = np.abs(gceast - sX[n])
-            snos = np.where(xdist == np.amin(xdist))
-            ix = snos[0][0]
-            ydist = np.abs(gcnorth - sY[n])
-            snos = np.where(ydist == np.amin(ydist))
-            iy = snos[0][0]
-
+        # get the cells of all the stations at once
+        index_east, index_north = self.modObj.get_station_cells(sX, sY)[:2]
+        for n, (ix, iy) in enumerate(zip(index_east, index_north)):
+            if ix < 0:
+                logger.warning("Station %s is outside of the mesh", station_names[n])
+                continue
             logger.debug("Station Index: (%s, %s)", ix, iy)
 
             station_dict[(ix, iy)] = [station_names[n], sX[n], sY[n], station_lats[n],
@@ -0,0 +1,166 @@
+"""
+==================
+ModEM
+==================
+
+# Error models of the impedance tensor for ModEM data files
+
+Every error model is a vectorised function of the amplitudes |Z| of a stack
+of impedance tensors np.ndarray(..., 2, 2) that returns the error of each
+component as np.ndarray(..., 2, 2), before it is multiplied by the error
+value.  Tensors with zero components are masked by the models themselves,
+the engine skips tensors that are all zero.
+
+An error type is matched to a model by the first name in ERROR_MODELS it
+contains, so 'egbert_floor' uses 'egbert'.  A new model is added with
+
+    >>> from mtpy.modeling.modem import error_models
+    >>> error_models.ERROR_MODELS['max_od'] = lambda d: np.repeat(
+    >>> ...     np.maximum(d[..., 0, 1], d[..., 1, 0])[..., None, None],
+    >>> ...     2, axis=-2).repeat(2, axis=-1)
+
+"""
+from collections import OrderedDict
+
+import numpy as np
+
+from mtpy.modeling.modem.exception import DataError
+
+__all__ = ['ERROR_MODELS', 'get_error_model', 'compute_z_error']
+
+
+def _fill(value):
+    """the same value for all the components of a tensor"""
+    return np.repeat(np.repeat(value[..., None, None], 2, axis=-2), 2, axis=-1)
+
+
+def _nonzero_mean(values, axis=-1):
+    """mean of the non zero values along axis, np.nan if all of them are zero"""
+    count = np.count_nonzero(values, axis=axis)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(count > 0, values.sum(axis=axis) / count, np.nan)
+
+
+def _nonzero_median(values):
+    """median of the non zero values along the last axis, np.nan if any is nan"""
+    count = np.count_nonzero(values, axis=-1)
+    ordered = np.sort(np.where(values == 0, np.inf, values), axis=-1)
+    lower = np.take_along_axis(ordered, np.maximum((count - 1) // 2, 0)[..., None], axis=-1)
+    upper = np.take_along_axis(ordered, (count // 2)[..., None], axis=-1)
+    median = (lower[..., 0] + upper[..., 0]) / 2.
+    median[(count == 0) | np.isnan(values).any(axis=-1)] = np.nan
+    return median
+
+
+def egbert_error(d):
+    """
+    sqrt(|Zxy| |Zyx|), a missing off diagonal is replaced by the other one,
+    max(|Zxx|, |Zyy|) if both of them are missing.
+    """
+    d_xy = d[..., 0, 1]
+    d_yx = d[..., 1, 0]
+    both_zero = (d_xy == 0) & (d_yx == 0)
+    d_xy, d_yx = np.where(d_xy == 0, d_yx, d_xy), np.where(d_yx == 0, d_xy, d_yx)
+    return _fill(np.where(both_zero, np.maximum(d[..., 0, 0], d[..., 1, 1]),
+                          np.sqrt(d_xy * d_yx)))
+
+
+def median_error(d):
+    """median of the non zero |Z|"""
+    return _fill(_nonzero_median(d.reshape(d.shape[:-2] + (4,))))
+
+
+def mean_od_error(d):
+    """mean of the non zero |Zxy| and |Zyx|"""
+    return _fill(_nonzero_mean(np.stack([d[..., 0, 1], d[..., 1, 0]], axis=-1)))
+
+
+def eigen_error(d):
+    """
+    mean of the absolute eigenvalues of |Z|, the mean of the non zero |Z|
+    where they are zero.
+    """
+    trace = d[..., 0, 0] + d[..., 1, 1]
+    det = d[..., 0, 0] * d[..., 1, 1] - d[..., 0, 1] * d[..., 1, 0]
+    root = np.sqrt((trace ** 2 - 4 * det).astype(np.complex128))
+    eigen = (np.abs(trace + root) + np.abs(trace - root)) / 4.
+    return _fill(np.where(eigen == 0, _nonzero_mean(d.reshape(d.shape[:-2] + (4,))),
+                          eigen))
+
+
+def off_diagonals_error(d):
+    """|Zxy| for the xx and xy components, |Zyx| for yx and yy"""
+    return np.repeat(np.stack([d[..., 0, 1], d[..., 1, 0]], axis=-1)[..., None],
+                     2, axis=-1)
+
+
+def percent_error(d):
+    """|Z| of each component"""
+    return d
+
+
+ERROR_MODELS = OrderedDict([('egbert', egbert_error),
+                            ('median', median_error),
+                            ('mean_od', mean_od_error),
+                            ('eigen', eigen_error),
+                            ('off_diagonals', off_diagonals_error),
+                            ('percent', percent_error)])
+
+
+def get_error_model(error_type):
+    """
+    get the error model of an error type, the first name in ERROR_MODELS
+    that the error type contains.
+    """
+    for name, error_model in ERROR_MODELS.items():
+        if name in error_type:
+            return error_model
+    raise DataError('error type (z) {0} not understood'.format(error_type))
+
+
+def compute_z_error(z, z_err, error_type, error_value):
+    """
+    compute the inversion error of a stack of impedance tensors.
+
+    :param z: complex np.ndarray(..., 2, 2) e.g. data_array['z'] of
+              (n_stations, n_periods, 2, 2)
+    :param z_err: np.ndarray(..., 2, 2) of data errors, kept for the
+                  tensors that are all zero and used as floor
+    :param error_type: error type or 2x2 array of error types of each
+                       component, '_floor' in the type of a component keeps
+                       its data error where that is larger
+    :param error_value: percentage of the error model or 2x2 array of
+                        percentages of each component
+
+    :returns: np.ndarray(..., 2, 2) of errors
+    """
+    error_type = np.atleast_1d(error_type)
+    if error_type.size != 1 and error_type.size != 4:
+        raise DataError('Either specify a single error_type_z for all components, or '
+                        'a 2x2 numpy array of error_type_z.')
+    error_type = np.broadcast_to(error_type.reshape((2, 2) if error_type.size == 4 else (1, 1)),
+                                 (2, 2))
+    err_value = np.broadcast_to(np.asarray(error_value, dtype=np.float64) / 100.,
+                                (2, 2))
+
+    d = np.abs(z)
+    z_err = np.asarray(z_err, dtype=np.float64)
+    has_data = d.sum(axis=(-2, -1)) != 0
+
+    z_inv_err = z_err.copy()
+    component_err = {}
+    for error_model in set(get_error_model(et) for et in error_type.flat):
+        with np.errstate(invalid='ignore'):
+            component_err[error_model] = error_model(d[has_data]) * err_value
+
+    err = z_inv_err[has_data]
+    for ii in range(2):
+        for jj in range(2):
+            err[..., ii, jj] = component_err[get_error_model(error_type[ii, jj])][..., ii, jj]
+            if 'floor' in error_type[ii, jj]:
+                floor = z_err[has_data][..., ii, jj]
+                err[..., ii, jj] = np.where(err[..., ii, jj] < floor, floor,
+                                            err[..., ii, jj])
+    z_inv_err[has_data] = err
+
+    return z_inv_err
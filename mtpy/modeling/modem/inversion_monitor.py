@@ -0,0 +1,493 @@
+"""
+==================
+ModEM
+==================
+
+Monitor a running ModEM inversion.
+
+The run directory is scanned for the residual (.res), log (.log) and model
+(.rho) files ModEM writes as it goes.  Only the files that are new, or that
+changed since the last scan, are parsed, in a process pool when more than
+one worker is used.  The RMS of every iteration by station, period and
+component, the values of the log files and a summary of the models are kept
+in a single .npz history file in the run directory, so a plot of a long
+inversion reads one small file instead of every iteration, see
+plot_rms_iterations.read_history and the inversion_monitor argument of
+PlotRMSMaps.
+
+The iteration of a .res or .rho file is the number at the end of its name,
+e.g. Modular_MPI_NLCG_012.res, files without a number are not monitored.
+
+:Example: ::
+
+    >>> from mtpy.modeling.modem import InversionMonitor
+    >>> monitor = InversionMonitor(r"/home/modem/inv_01", n_workers=4)
+    >>> monitor.update()
+    >>> iterations, rms = monitor.get_rms_history(station='Synth10')
+    >>> monitor.watch(interval=300)
+
+"""
+import concurrent.futures
+import contextlib
+import io
+import os
+import re
+import time
+
+import numpy as np
+
+from mtpy.utils import instrumentation
+from mtpy.utils import plot_rms_iterations
+from mtpy.utils.mtpylog import MtPyLog
+from .exception import ModEMError
+from .model import Model
+from .residual import Residual
+
+__all__ = ['InversionMonitor', 'build_rms_history']
+
+HISTORY_BASENAME = 'rms_history.npz'
+
+# extension of the monitored files and what they hold
+FILE_KINDS = {'.res': 'res', '.log': 'log', '.rho': 'rho'}
+
+# index of each component in the z and tip arrays
+COMPONENT_INDEX = {'zxx': ('z', 0, 0), 'zxy': ('z', 0, 1),
+                   'zyx': ('z', 1, 0), 'zyy': ('z', 1, 1),
+                   'tx': ('tip', 0, 0), 'ty': ('tip', 0, 1)}
+
+LOG_METRICS = ['f', 'm2', 'rms', 'lambda', 'alpha']
+
+# history key of each field of Residual.rms_array
+RMS_ARRAY_KEYS = {'rms': 'station_rms', 'rms_z': 'station_rms_z',
+                  'rms_tip': 'station_rms_tip', 'rms_period': 'rms_period',
+                  'rms_z_period': 'rms_z_period',
+                  'rms_tip_period': 'rms_tip_period',
+                  'rms_z_component': 'rms_z_component',
+                  'rms_tip_component': 'rms_tip_component',
+                  'rms_z_component_period': 'rms_z_component_period',
+                  'rms_tip_component_period': 'rms_tip_component_period'}
+
+
+def get_iteration(fn):
+    """
+    get the iteration of a ModEM output file from the number at the end of
+    its name, None if there is no number
+    """
+    match = re.search(r'_(\d+)$', os.path.splitext(os.path.basename(fn))[0])
+    if match is None:
+        return None
+    return int(match.group(1))
+
+
+def _parse_residual(res_fn, model_epsg=None):
+    res_obj = Residual(residual_fn=res_fn, model_epsg=model_epsg)
+    with contextlib.redirect_stdout(io.StringIO()):
+        res_obj.get_rms()
+    rms_array = res_obj.rms_array
+    return {'station': np.array(rms_array['station'], dtype=str),
+            'period': np.array(res_obj.period_list, dtype=float),
+            'rms': res_obj.rms,
+            'rms_z': res_obj.rms_z,
+            'rms_tip': res_obj.rms_tip,
+            'station_rms': rms_array['rms'],
+            'station_rms_z': rms_array['rms_z'],
+            'station_rms_tip': rms_array['rms_tip'],
+            'rms_period': rms_array['rms_period'],
+            'rms_z_period': rms_array['rms_z_period'],
+            'rms_tip_period': rms_array['rms_tip_period'],
+            'rms_z_component': rms_array['rms_z_component'],
+            'rms_tip_component': rms_array['rms_tip_component'],
+            'rms_z_component_period': rms_array['rms_z_component_period'],
+            'rms_tip_component_period': rms_array['rms_tip_component_period']}
+
+
+def _parse_log(log_fn):
+    with open(log_fn, 'r') as log_file:
+        concatenated = log_file.readline() == 'Concatenated log files\n'
+    try:
+        if concatenated:
+            # made by plot_rms_iterations.concatenate_log_files from the
+            # other log files, which are in the history already
+            raise ValueError('concatenated log file')
+        metrics = plot_rms_iterations.read(log_fn)
+    except ValueError:
+        # no iteration has finished yet
+        metrics = dict((metric, []) for metric in LOG_METRICS)
+    return dict(('log_' + metric,
+                 np.array([np.nan if value is None else value
+                           for value in metrics.get(metric, [])], dtype=float))
+                for metric in LOG_METRICS)
+
+
+def _parse_model(model_fn):
+    model_obj = Model()
+    with contextlib.redirect_stdout(io.StringIO()):
+        model_obj.read_model_file(model_fn=model_fn)
+    log_res = np.log10(model_obj.res_model)
+    return {'model_log10_min': np.nanmin(log_res),
+            'model_log10_median': np.nanmedian(log_res),
+            'model_log10_max': np.nanmax(log_res)}
+
+
+def _parse_file(kind, fn, model_epsg=None):
+    """
+    parse a monitored file in a worker, a file that cannot be read, for
+    instance because ModEM is still writing it, returns its error
+    """
+    try:
+        if kind == 'res':
+            return _parse_residual(fn, model_epsg=model_epsg)
+        elif kind == 'log':
+            return _parse_log(fn)
+        return _parse_model(fn)
+    except Exception as error:
+        return {'error': '{0}: {1}'.format(type(error).__name__, error)}
+
+
+def _merge_rows(history, rows, drop=None):
+    """
+    drop the rows of the history arrays named in rows where drop is True
+    and append rows, which have a leading axis of new rows
+    """
+    for key, value in rows.items():
+        value = np.asarray(value)
+        old = history.get(key)
+        if old is None:
+            history[key] = value
+        else:
+            if drop is not None:
+                old = old[~drop]
+            history[key] = np.concatenate([old, value])
+
+
+class InversionMonitor(object):
+    """
+    keep the RMS history of a ModEM run directory up to date
+
+    ====================== ====================================================
+    Attributes             Description
+    ====================== ====================================================
+    run_dir                directory ModEM writes its output files to
+    history_fn             .npz file of the history
+                           *default* is run_dir/rms_history.npz
+    n_workers              number of worker processes to parse the new files
+                           *default* is the number of cpus, 1 parses them in
+                           this process
+    model_epsg             epsg of the model, passed to Residual
+    history                dictionary of the history arrays:
+                               * file_name, file_size, file_mtime --> files
+                                 parsed so far
+                               * station, period --> stations and periods of
+                                 the residual files
+                               * iteration --> iteration of each residual
+                                 file (n_iterations)
+                               * rms, rms_z, rms_tip --> total rms
+                                 (n_iterations)
+                               * station_rms, station_rms_z, station_rms_tip
+                                 --> (n_iterations, n_stations)
+                               * rms_period, rms_z_period, rms_tip_period
+                                 --> (n_iterations, n_stations, n_periods)
+                               * rms_z_component, rms_tip_component -->
+                                 (n_iterations, n_stations, 2 or 1, 2)
+                               * rms_z_component_period,
+                                 rms_tip_component_period -->
+                                 (n_iterations, n_stations, n_periods,
+                                 2 or 1, 2)
+                               * log_fn, log_iteration, log_f, log_m2,
+                                 log_rms, log_lambda, log_alpha --> values of
+                                 the log files, by file and iteration
+                               * model_iteration, model_log10_min,
+                                 model_log10_median, model_log10_max -->
+                                 log10 resistivity of the models
+    ====================== ====================================================
+    """
+
+    def __init__(self, run_dir, history_fn=None, n_workers=None, model_epsg=None):
+        self._logger = MtPyLog.get_mtpy_logger(self.__class__.__name__)
+        self.run_dir = run_dir
+        self.history_fn = history_fn
+        if self.history_fn is None:
+            self.history_fn = os.path.join(run_dir, HISTORY_BASENAME)
+        self.n_workers = n_workers
+        self.model_epsg = model_epsg
+        self.history = self.read_history()
+
+    def read_history(self):
+        """
+        read the history file, an empty history if there is none
+        """
+        if not os.path.isfile(self.history_fn):
+            return {'file_name': np.zeros(0, dtype=str),
+                    'file_size': np.zeros(0, dtype=int),
+                    'file_mtime': np.zeros(0, dtype=float)}
+        with np.load(self.history_fn) as npz:
+            return dict((key, npz[key]) for key in npz.files)
+
+    def write_history(self):
+        """
+        write the history file, through a temporary file so that a plot
+        never reads half a history
+        """
+        temp_fn = self.history_fn + '.tmp'
+        with open(temp_fn, 'wb') as fid:
+            np.savez(fid, **self.history)
+        os.replace(temp_fn, self.history_fn)
+
+    def find_new_files(self):
+        """
+        find the monitored files in run_dir that are new or changed since
+        they were parsed
+
+        :returns: list of (kind, file name, size, modification time)
+        """
+        parsed = dict(zip(self.history['file_name'],
+                          zip(self.history['file_size'], self.history['file_mtime'])))
+        new_files = []
+        for fn in sorted(os.listdir(self.run_dir)):
+            kind = FILE_KINDS.get(os.path.splitext(fn)[1].lower())
+            if kind is None or (kind != 'log' and get_iteration(fn) is None):
+                continue
+            stat = os.stat(os.path.join(self.run_dir, fn))
+            if parsed.get(fn) == (stat.st_size, stat.st_mtime):
+                continue
+            new_files.append((kind, fn, stat.st_size, stat.st_mtime))
+        return new_files
+
+    @instrumentation.timed('modem.inversion_monitor.update')
+    def update(self):
+        """
+        parse the new and changed files of run_dir and write the history
+
+        :returns: list of the names of the files parsed
+        """
+        new_files = self.find_new_files()
+        if not new_files:
+            return []
+        instrumentation.count('records', len(new_files))
+
+        kinds = [kind for kind, _, _, _ in new_files]
+        fns = [os.path.join(self.run_dir, fn) for _, fn, _, _ in new_files]
+        n_workers = self.n_workers
+        if n_workers is None:
+            n_workers = os.cpu_count() or 1
+        n_workers = max(1, min(int(n_workers), len(new_files)))
+
+        if n_workers == 1:
+            results = [_parse_file(kind, fn, self.model_epsg)
+                       for kind, fn in zip(kinds, fns)]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=n_workers) as executor:
+                results = list(executor.map(_parse_file, kinds, fns,
+                                            [self.model_epsg] * len(fns)))
+
+        parsed = []
+        for (kind, fn, size, mtime), result in zip(new_files, results):
+            if 'error' in result:
+                # try again at the next update
+                self._logger.warning('Could not parse {0}, {1}'.format(fn, result['error']))
+                continue
+            if kind == 'res':
+                self._add_residual(fn, result)
+            elif kind == 'log':
+                self._add_log(fn, result)
+            else:
+                self._add_model(fn, result)
+            self._add_file(fn, size, mtime)
+            parsed.append(fn)
+
+        self.write_history()
+        return parsed
+
+    def watch(self, interval=60., max_updates=None, callback=None):
+        """
+        update the history every interval seconds
+
+        :param interval: seconds between updates
+        :param max_updates: number of updates before returning, *default*
+                            is to watch until interrupted
+        :param callback: function called with the monitor and the list of
+                         files parsed after every update that parsed files
+        """
+        n_updates = 0
+        while max_updates is None or n_updates < max_updates:
+            parsed = self.update()
+            if parsed and callback is not None:
+                callback(self, parsed)
+            n_updates += 1
+            if max_updates is None or n_updates < max_updates:
+                time.sleep(interval)
+
+    def _add_file(self, fn, size, mtime):
+        drop = self.history['file_name'] == fn
+        _merge_rows(self.history, {'file_name': [fn], 'file_size': [size],
+                                   'file_mtime': [mtime]}, drop=drop)
+
+    def _add_residual(self, fn, result):
+        station = result.pop('station')
+        period = result.pop('period')
+        if 'station' not in self.history:
+            self.history['station'] = station
+            self.history['period'] = period
+        elif not (np.array_equal(station, self.history['station']) and
+                  period.shape == self.history['period'].shape and
+                  np.allclose(period, self.history['period'])):
+            self._logger.warning('Stations or periods of {0} are not those of the '
+                                 'history, not added'.format(fn))
+            return
+
+        iteration = get_iteration(fn)
+        drop = None
+        if 'iteration' in self.history:
+            drop = self.history['iteration'] == iteration
+        rows = dict((key, [value]) for key, value in result.items())
+        rows['iteration'] = [iteration]
+        _merge_rows(self.history, rows, drop=drop)
+
+        order = np.argsort(self.history['iteration'], kind='stable')
+        for key in rows:
+            self.history[key] = self.history[key][order]
+
+    def _add_log(self, fn, result):
+        log_fn = os.path.basename(fn)
+        n_rows = result['log_f'].size
+        drop = None
+        if 'log_fn' in self.history:
+            drop = self.history['log_fn'] == log_fn
+        rows = dict(result)
+        rows['log_fn'] = np.repeat(log_fn, n_rows)
+        rows['log_iteration'] = np.arange(1, n_rows + 1)
+        _merge_rows(self.history, rows, drop=drop)
+
+        # restarts are written to new log files, which are in name order
+        order = np.lexsort((self.history['log_iteration'], self.history['log_fn']))
+        for key in rows:
+            self.history[key] = self.history[key][order]
+
+    def _add_model(self, fn, result):
+        iteration = get_iteration(fn)
+        drop = None
+        if 'model_iteration' in self.history:
+            drop = self.history['model_iteration'] == iteration
+        rows = dict((key, [value]) for key, value in result.items())
+        rows['model_iteration'] = [iteration]
+        _merge_rows(self.history, rows, drop=drop)
+
+        order = np.argsort(self.history['model_iteration'], kind='stable')
+        for key in rows:
+            self.history[key] = self.history[key][order]
+
+    def _get_station_index(self, station):
+        if 'station' not in self.history:
+            raise ModEMError('No residual files in the history of {0}'.format(self.run_dir))
+        index = np.where(self.history['station'] == station)[0]
+        if index.size == 0:
+            raise ModEMError('Station {0} is not in the history'.format(station))
+        return index[0]
+
+    def get_rms_history(self, station=None, component=None):
+        """
+        get the rms of every iteration
+
+        :param station: station name, *default* is all the stations
+        :param component: None for all the data, 'z', 'tip' or, with a
+                          station, one of 'zxx', 'zxy', 'zyx', 'zyy', 'tx',
+                          'ty'
+
+        :returns: iterations, np.ndarray(n_iterations) of rms
+        """
+        if 'iteration' not in self.history:
+            return np.zeros(0, dtype=int), np.zeros(0)
+        iterations = self.history['iteration']
+        suffix = '' if component is None else '_' + str(component)
+
+        if station is None:
+            if component not in [None, 'z', 'tip']:
+                raise ModEMError('Need a station for the rms of component {0}'.format(component))
+            return iterations, self.history['rms' + suffix]
+
+        s_index = self._get_station_index(station)
+        if component in [None, 'z', 'tip']:
+            return iterations, self.history['station_rms' + suffix][:, s_index]
+        c_key, ii, jj = self._get_component_index(component)
+        return iterations, \
+            self.history['rms_{0}_component'.format(c_key)][:, s_index, ii, jj]
+
+    def get_rms_period_history(self, station, component=None):
+        """
+        get the rms of every period of a station for every iteration
+
+        :param station: station name
+        :param component: None for all the data or one of 'zxx', 'zxy',
+                          'zyx', 'zyy', 'tx', 'ty'
+
+        :returns: iterations, np.ndarray(n_iterations, n_periods) of rms
+        """
+        s_index = self._get_station_index(station)
+        iterations = self.history['iteration']
+        if component is None:
+            return iterations, self.history['rms_period'][:, s_index]
+        c_key, ii, jj = self._get_component_index(component)
+        return iterations, \
+            self.history['rms_{0}_component_period'.format(c_key)][:, s_index, :, ii, jj]
+
+    def get_iteration_rms(self, iteration, station=None):
+        """
+        get the rms of all the stations for one iteration, keyed as the
+        fields of Residual.rms_array, so a residual file in the history does
+        not need Residual.get_rms
+
+        :param iteration: iteration of the residual file
+        :param station: station names the arrays should be in the order of,
+                        *default* is the order of the history
+
+        :returns: dictionary of arrays with a leading axis of stations, None
+                  if the iteration, a station or an array is not in the
+                  history
+        """
+        if 'iteration' not in self.history or \
+                any([key not in self.history for key in RMS_ARRAY_KEYS.values()]):
+            return None
+        i_index = np.where(self.history['iteration'] == iteration)[0]
+        if i_index.size == 0:
+            return None
+        s_index = slice(None)
+        if station is not None:
+            s_index = [np.where(self.history['station'] == name)[0] for name in station]
+            if any([index.size == 0 for index in s_index]):
+                return None
+            s_index = np.array([index[0] for index in s_index], dtype=int)
+        return dict((field, self.history[key][i_index[-1]][s_index])
+                    for field, key in RMS_ARRAY_KEYS.items())
+
+    @staticmethod
+    def _get_component_index(component):
+        try:
+            return COMPONENT_INDEX[component.lower()]
+        except (KeyError, AttributeError):
+            raise ModEMError('component must be one of {0}, not {1}'.format(
+                             sorted(COMPONENT_INDEX.keys()), component))
+
+    def get_log_history(self, metric='rms'):
+        """
+        get a value of the log files for every iteration, in the order of
+        the log files, as plot_rms_iterations.read does
+
+        :param metric: one of 'f', 'm2', 'rms', 'lambda', 'alpha'
+
+        :returns: np.ndarray of values
+        """
+        if metric not in LOG_METRICS:
+            raise ModEMError('metric must be one of {0}, not {1}'.format(LOG_METRICS, metric))
+        return self.history.get('log_' + metric, np.zeros(0))
+
+
+def build_rms_history(run_dir, history_fn=None, n_workers=None, model_epsg=None):
+    """
+    parse the output files of a ModEM run directory into its history file
+
+    :returns: InversionMonitor with the history up to date
+    """
+    monitor = InversionMonitor(run_dir, history_fn=history_fn, n_workers=n_workers,
+                               model_epsg=model_epsg)
+    monitor.update()
+    return monitor
@@ -11,8 +11,10 @@ ModEM
 """
 from __future__ import print_function
  
+import gc
 import os
 import sys
+import tempfile
 
 import numpy as np
 from matplotlib import pyplot as plt
@@ -23,6 +25,7 @@ from scipy import stats as stats, interpolate as spi
 import mtpy.utils.calculator as mtcc
 from mtpy.modeling import ws3dinv as ws
 from mtpy.utils import mesh_tools as mtmesh, gis_tools as gis_tools, filehandling as mtfh
+from mtpy.utils import instrumentation
 from mtpy.utils.mtpylog import MtPyLog
 from .exception import ModelError
 import mtpy.utils.gocad as mtgocad
@@ -113,6 +116,9 @@ class Model(object):
                          *default* is 500
     cell_size_north      mesh block width in north direction
                          *default* is 500
+    covariance_mask      mask of the model cells for the covariance file,
+                         0 for air, 9 for sea and 1 for earth.  Set by
+                         add_topography_to_model2. *default* is None
     grid_center          center of the mesh grid
     grid_east            overall distance of grid nodes in east direction
     grid_north           overall distance of grid nodes in north direction
@@ -146,8 +152,13 @@ class Model(object):
                            'log' or 'log10' - for log with base 10
                            'linear' - linear scale
                          *default* is 'loge'
+    res_dtype            data type of res_model, np.float32 halves the memory
+                         of large models. *default* is np.float64
     res_list             list of resistivity values for starting model
     res_model            starting resistivity model
+    res_model_npy_fn     .npy file to memory map res_model to, for models
+                         too large for memory. *default* is None, res_model
+                         is held in memory
     res_initial_value    resistivity initial value for the resistivity model
                          *default* is 100
     mesh_rotation_angle  Angle to rotate the grid to. Angle is measured
@@ -299,6 +310,9 @@ class Model(object):
         # resistivity model
         self.res_initial_value = 100.0
         self.res_model = None
+        self.res_dtype = np.float64
+        self.res_model_npy_fn = None
+        self.covariance_mask = None
 
         # initial file stuff
         self.model_fn = None
@@ -381,6 +395,87 @@ class Model(object):
     def plot_z(self):
         return np.array([self.nodes_z[0:ii].sum() 
                          for ii in range(self.nodes_z.size)])
+
+    def _allocate_res_model(self, shape, fill_value=None, copy_index=None):
+        """
+        allocate a resistivity model of res_dtype, memory mapped to
+        res_model_npy_fn if it is set
+
+        :param shape: shape of the new model
+        :param fill_value: value to fill the new model with
+        :param copy_index: index of the new model to copy the current
+                           res_model into, e.g. np.s_[:, :, n_air:] to add
+                           n_air layers on top
+        :returns: the new model, res_model is released when the new model
+                  is memory mapped, so it has to be assigned to res_model
+
+        A memory mapped model is made in a temporary file in the directory of
+        res_model_npy_fn, which replaces res_model_npy_fn once the current
+        model is copied, so the file of the current model is never removed
+        or overwritten while it is mapped (which fails on Windows).
+        """
+        if self.res_model_npy_fn is None:
+            res_model = np.empty(shape, dtype=self.res_dtype)
+            if fill_value is not None:
+                res_model[:] = fill_value
+            if copy_index is not None:
+                res_model[copy_index] = self.res_model
+            return res_model
+
+        npy_fn = os.path.abspath(self.res_model_npy_fn)
+        tmp_fid, tmp_fn = tempfile.mkstemp(suffix='.npy',
+                                           dir=os.path.dirname(npy_fn))
+        os.close(tmp_fid)
+        try:
+            res_model = np.lib.format.open_memmap(tmp_fn, mode='w+',
+                                                  dtype=self.res_dtype,
+                                                  shape=tuple(shape))
+            if fill_value is not None:
+                res_model[:] = fill_value
+            if copy_index is not None:
+                res_model[copy_index] = self.res_model
+            res_model.flush()
+            # close both mappings before the file is replaced
+            del res_model
+            self.res_model = None
+            gc.collect()
+            os.replace(tmp_fn, npy_fn)
+        except BaseException:
+            if os.path.isfile(tmp_fn):
+                os.remove(tmp_fn)
+            raise
+        return np.load(npy_fn, mmap_mode='r+')
+
+    def get_station_cells(self, station_east=None, station_north=None,
+                          station_z=None, origin=(0., 0.), rotation_angle=0.):
+        """
+        get the cells of the mesh containing the stations, see
+        mesh_tools.get_station_cells.
+
+        :param station_east: station east locations, *default* is the
+                             rel_east of station_locations
+        :param station_north: station north locations, *default* is the
+                              rel_north of station_locations
+        :param station_z: station depths positive down, index_z is None if
+                          they are not given
+        :param origin: position of the (0, 0) point of the mesh in the
+                       station coordinates
+        :param rotation_angle: angle the mesh is rotated by relative to the
+                               station coordinates, mesh_rotation_angle for
+                               stations that are not rotated onto the mesh
+        :returns: index_east, index_north, index_z arrays of cell indices,
+                  -1 for stations outside of the mesh
+        """
+        if station_east is None or station_north is None:
+            if self.station_locations is None:
+                raise ModelError('No station locations to find the cells of')
+            station_east = self.station_locations.rel_east
+            station_north = self.station_locations.rel_north
+
+        return mtmesh.get_station_cells(self.grid_east, self.grid_north,
+                                        station_east, station_north,
+                                        grid_z=self.grid_z, station_z=station_z,
+                                        origin=origin, rotation_angle=rotation_angle)
     
     def make_mesh(self):
         """
@@ -475,28 +570,12 @@ class Model(object):
                                     padding_north + inner_north.max())
 
         # --> need to make sure none of the stations lie on the nodes
-        for s_east in sorted(self.station_locations.rel_east):
-            try:
-                node_index = np.where(abs(s_east - self.grid_east) <
-                                      .02 * self.cell_size_east)[0][0]
-                if s_east - self.grid_east[node_index] > 0:
-                    self.grid_east[node_index] -= .02 * self.cell_size_east
-                elif s_east - self.grid_east[node_index] < 0:
-                    self.grid_east[node_index] += .02 * self.cell_size_east
-            except IndexError:
-                continue
-
-        # --> need to make sure none of the stations lie on the nodes
-        for s_north in sorted(self.station_locations.rel_north):
-            try:
-                node_index = np.where(abs(s_north - self.grid_north) <
-                                      .02 * self.cell_size_north)[0][0]
-                if s_north - self.grid_north[node_index] > 0:
-                    self.grid_north[node_index] -= .02 * self.cell_size_north
-                elif s_north - self.grid_north[node_index] < 0:
-                    self.grid_north[node_index] += .02 * self.cell_size_north
-            except IndexError:
-                continue
+        self.grid_east = mtmesh.move_nodes_off_stations(self.grid_east,
+                                                        self.station_locations.rel_east,
+                                                        .02 * self.cell_size_east)
+        self.grid_north = mtmesh.move_nodes_off_stations(self.grid_north,
+                                                         self.station_locations.rel_north,
+                                                         .02 * self.cell_size_north)
 
         if self.z_mesh_method == 'custom':
             if self.grid_z is None:
@@ -519,10 +598,10 @@ class Model(object):
         self.grid_center = np.array([center_north, center_east, center_z])
         
         # make the resistivity array
-        self.res_model = np.zeros((self.nodes_north.size,
-                                  self.nodes_east.size,
-                                  self.nodes_z.size))
-        self.res_model[:, :, :] = self.res_initial_value
+        self.res_model = self._allocate_res_model((self.nodes_north.size,
+                                                   self.nodes_east.size,
+                                                   self.nodes_z.size),
+                                                  self.res_initial_value)
 
         # --> print out useful information
         self.print_mesh_params()
@@ -634,24 +713,22 @@ class Model(object):
         project_surface)
 
         **inputs**
-        surfacename = name of surface (must correspond to key in surface_dict)
-        resistivity_value = value to assign
-        where = 'above' or 'below' - assign resistivity above or below the
-                surface
+        top_surface = depth of the top surface on the model grid
+        bottom_surface = depth of the bottom surface on the model grid
+        resistivity_value = value to assign to the cells with centres
+                            below top_surface and above bottom_surface
+
+        **returns**
+        mask = boolean array the shape of res_model of the assigned cells
         """
 
         # FZ: should ref-define the self.res_model if its shape has changed after topo air layer are added
 
-        gcz = np.mean([self.grid_z[:-1], self.grid_z[1:]], axis=0)
-
-        self._logger.debug("gcz is the cells centre coordinates: %s, %s" %
-                           (len(gcz), gcz))
-
         # assign resistivity value
-        for j in range(len(self.res_model)):
-            for i in range(len(self.res_model[j])):
-                ii = np.where((gcz > top_surface[j, i]) & (gcz <= bottom_surface[j, i]))[0]
-                self.res_model[j, i, ii] = resistivity_value
+        mask = mtmesh.get_layer_mask(self.grid_z, top_surface, bottom_surface)
+        self.res_model[mask] = resistivity_value
+
+        return mask
 
     def plot_mesh(self, east_limits=None, north_limits=None, z_limits=None,
                   **kwargs):
@@ -1074,6 +1151,7 @@ class Model(object):
         
         
         
+    @instrumentation.timed('modem.model.write_model_file')
     def write_model_file(self, **kwargs):
         """
         will write an initial file for ModEM.
@@ -1148,17 +1226,17 @@ class Model(object):
 
         # get resistivity model
         if self.res_model is None:
-            self.res_model = np.zeros((self.nodes_north.size,
-                                       self.nodes_east.size,
-                                       self.nodes_z.size))
-            self.res_model[:, :, :] = self.res_initial_value
+            self.res_model = self._allocate_res_model((self.nodes_north.size,
+                                                       self.nodes_east.size,
+                                                       self.nodes_z.size),
+                                                      self.res_initial_value)
 
         elif type(self.res_model) in [float, int]:
             self.res_initial_value = self.res_model
-            self.res_model = np.zeros((self.nodes_north.size,
-                                       self.nodes_east.size,
-                                       self.nodes_z.size))
-            self.res_model[:, :, :] = self.res_initial_value
+            self.res_model = self._allocate_res_model((self.nodes_north.size,
+                                                       self.nodes_east.size,
+                                                       self.nodes_z.size),
+                                                      self.res_initial_value)
 
         # --> write file
         with open(self.model_fn, 'w') as ifid:
@@ -1187,22 +1265,23 @@ class Model(object):
 
             # write the resistivity in log e format
             if self.res_scale.lower() == 'loge':
-                write_res_model = np.log(self.res_model[::-1, :, :])
+                scale_layer = np.log
             elif self.res_scale.lower() == 'log' or \
                             self.res_scale.lower() == 'log10':
-                write_res_model = np.log10(self.res_model[::-1, :, :])
+                scale_layer = np.log10
             elif self.res_scale.lower() == 'linear':
-                write_res_model = self.res_model[::-1, :, :]
+                scale_layer = np.asarray
             else:
                 raise ModelError("resistivity scale \"{}\" is not supported.".format(self.res_scale))
 
-            # write out the layers from resmodel
+            # write out the layers from resmodel, one layer at a time so that
+            # the scaled model is never held in memory as a whole.  each line
+            # is the values of an east index from north to south
+            layer_format = ('%13.5E' * self.nodes_north.size + '\n') * self.nodes_east.size
             for zz in range(self.nodes_z.size):
+                write_layer = scale_layer(self.res_model[::-1, :, zz])
                 ifid.write('\n')
-                for ee in range(self.nodes_east.size):
-                    for nn in range(self.nodes_north.size):
-                        ifid.write('{0:>13.5E}'.format(write_res_model[nn, ee, zz]))
-                    ifid.write('\n')
+                ifid.write(layer_format % tuple(write_layer.T.ravel()))
 
             if self.grid_center is None:
                 # compute grid center
@@ -1223,6 +1302,7 @@ class Model(object):
 
         self._logger.info('Wrote file to: {0}'.format(self.model_fn))
 
+    @instrumentation.timed('modem.model.read_model_file')
     def read_model_file(self, model_fn=None):
         """
         read an initial file and return the pertinent information including
@@ -1280,61 +1360,50 @@ class Model(object):
 
         self.save_path = os.path.dirname(self.model_fn)
 
+        # the file is read a layer at a time into res_model, so that a large
+        # model is never held in memory as text
         with open(self.model_fn, 'r') as ifid:
-            ilines = ifid.readlines()
-
-        self.title = ilines[0].strip()
-
-        # get size of dimensions, remembering that x is N-S, y is E-W, z is + down
-        nsize = ilines[1].strip().split()
-        n_north = int(nsize[0])
-        n_east = int(nsize[1])
-        n_z = int(nsize[2])
-        log_yn = nsize[4]
-
-        # get nodes
-        self.nodes_north = np.array([np.float(nn)
-                                     for nn in ilines[2].strip().split()])
-        self.nodes_east = np.array([np.float(nn)
-                                    for nn in ilines[3].strip().split()])
-        self.nodes_z = np.array([np.float(nn)
-                                 for nn in ilines[4].strip().split()])
-
-        self.res_model = np.zeros((n_north, n_east, n_z))
-
-        # get model
-        count_z = 0
-        line_index = 6
-        count_e = 0
-        while count_z < n_z:
-            iline = ilines[line_index].strip().split()
-            # blank lines spit the depth blocks, use those as a marker to
-            # set the layer number and start a new block
-            if len(iline) == 0:
-                count_z += 1
-                count_e = 0
-                line_index += 1
-            # 3D grid model files don't have a space at the end
-            # additional condition to account for this.
-            elif (len(iline) == 3) & (count_z == n_z - 1):
-                count_z += 1
-                count_e = 0
-                line_index += 1
-            # each line in the block is a line of N-->S values for an east value
-            else:
-                north_line = np.array([float(nres) for nres in iline])
+            self.title = ifid.readline().strip()
+
+            # get size of dimensions, remembering that x is N-S, y is E-W, z is + down
+            nsize = ifid.readline().strip().split()
+            n_north = int(nsize[0])
+            n_east = int(nsize[1])
+            n_z = int(nsize[2])
+            log_yn = nsize[4]
+
+            # get nodes
+            self.nodes_north = np.array(ifid.readline().split(), dtype=float)
+            self.nodes_east = np.array(ifid.readline().split(), dtype=float)
+            self.nodes_z = np.array(ifid.readline().split(), dtype=float)
+
+            self.res_model = self._allocate_res_model((n_north, n_east, n_z))
+
+            # get model, blank lines split the depth blocks, except after the
+            # last block of 3D grid model files.  each line in the block is a
+            # line of N-->S values for an east value
+            for count_z in range(n_z):
+                block = []
+                while len(block) < n_east:
+                    iline = ifid.readline()
+                    if not iline:
+                        raise ModelError('{0} ends in layer {1} of {2}'.format(
+                                         self.model_fn, count_z, n_z))
+                    if iline.strip():
+                        block.append(iline)
+                layer = np.array(''.join(block).split(),
+                                 dtype=self.res_dtype).reshape(n_east, n_north)
 
                 # Need to be sure that the resistivity array matches
                 # with the grids, such that the first index is the
                 # furthest south
-                self.res_model[:, count_e, count_z] = north_line[::-1]
+                self.res_model[:, :, count_z] = layer[:, ::-1].T
 
-                count_e += 1
-                line_index += 1
+            ilines = ifid.readlines()
 
         # --> get grid center and rotation angle
-        if len(ilines) > line_index:
-            for iline in ilines[line_index:]:
+        if len(ilines) > 0:
+            for iline in ilines:
                 print(iline)
                 ilist = iline.strip().split()
                 # grid center
@@ -1348,9 +1417,9 @@ class Model(object):
 
         # --> make sure the resistivity units are in linear Ohm-m
         if log_yn.lower() == 'loge':
-            self.res_model = np.e ** self.res_model
+            np.power(np.e, self.res_model, out=self.res_model)
         elif log_yn.lower() == 'log' or log_yn.lower() == 'log10':
-            self.res_model = 10 ** self.res_model
+            np.power(10., self.res_model, out=self.res_model)
 
         # center the grids
         if self.grid_center is None:
@@ -1859,25 +1928,35 @@ class Model(object):
         # update the z-centre as the top air layer
         self.grid_center[2] = self.grid_z[0]
 
-        # update the resistivity model
-        new_res_model = np.ones((self.nodes_north.size,
-                                 self.nodes_east.size,
-                                 self.nodes_z.size)) * self.res_initial_value
-
+        # update the resistivity model, the air layers are added on top of a
+        # copy of the model, which is the only copy made
         if 'down' not in airlayer_type:
-            new_res_model[:, :, self.n_air_layers:] = self.res_model
-        
+            copy_index = np.s_[:, :, self.n_air_layers:]
+        else:
+            copy_index = None
+        new_res_model = self._allocate_res_model((self.nodes_north.size,
+                                                  self.nodes_east.size,
+                                                  self.nodes_z.size),
+                                                 self.res_initial_value,
+                                                 copy_index)
+
         self.res_model = new_res_model
 
         # assign topography
         top = np.zeros_like(self.surface_dict['topography']) + self.grid_z[0]
         bottom = -self.surface_dict['topography']
-        self.assign_resistivity_from_surfacedata(top,bottom, 
-                                                 air_resistivity)
+        air_mask = self.assign_resistivity_from_surfacedata(top,bottom, 
+                                                            air_resistivity)
         # assign bathymetry
-        self.assign_resistivity_from_surfacedata(np.zeros_like(top),
-                                                 bottom,
-                                                 0.3)
+        sea_mask = self.assign_resistivity_from_surfacedata(np.zeros_like(top),
+                                                            bottom,
+                                                            0.3)
+
+        # keep the masks for the covariance file, the sea overrides the air
+        # between sea level and the sea floor
+        self.covariance_mask = np.ones(self.res_model.shape, dtype=np.int8)
+        self.covariance_mask[air_mask] = 0
+        self.covariance_mask[sea_mask] = 9
 
         return
 
@@ -10,10 +10,10 @@ import matplotlib.gridspec as gridspec
 import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib.colors import Normalize
-from matplotlib.patches import Ellipse
 
 import mtpy.analysis.pt as mtpt
 import mtpy.imaging.mtcolors as mtcl
+import mtpy.imaging.pt_collections as ptcol
 import mtpy.imaging.mtplottools as mtplottools
 import mtpy.modeling.ws3dinv as ws
 import mtpy.utils.exceptions as mtex
@@ -419,44 +419,46 @@ class PlotPTMaps(mtplottools.MTEllipse):
         k = periodIdx
         pt_array = getattr(self, 'pt_' + ptarray + '_arr')
 
-        for i in range(len(pt_array[k])):
-            lon = pt_array[k]['lon'][i]
-            lat = pt_array[k]['lat'][i]
+        lon = pt_array[k]['lon']
+        lat = pt_array[k]['lat']
+        with np.errstate(invalid='ignore', divide='ignore'):
             if self.normalise_ellipses:
-                phimax = pt_array[k]['phimax'][i] / pt_array[k]['phimax'][i]
-                phimin = pt_array[k]['phimin'][i] / pt_array[k]['phimax'][i]
+                phimax = pt_array[k]['phimax'] / pt_array[k]['phimax']
+                phimin = pt_array[k]['phimin'] / pt_array[k]['phimax']
             else:
-                phimax = pt_array[k]['phimax'][i] / pt_array[k]['phimax'].max()
-                phimin = pt_array[k]['phimin'][i] / pt_array[k]['phimax'].max()
-            az = pt_array[k]['azimuth'][i]
-            if ptarray == 'resid':
-                phimin = np.abs(phimin)
-            nskew = pt_array[k]['skew'][i]
-
-            # print az
-            if (phimax > 0 and phimin > 0):
-                c = None
-                if (cvals is not None): c = cvals[i]
-                if (c is not None): kwargs['facecolor'] = c
-
-                if m is None:
-                    x = pt_array[k]['east'][i]
-                    y = pt_array[k]['north'][i]
-                    if map_scale == 'km':
-                        x /= 1e3
-                        y /= 1e3
-                else:
-                    x, y = m(lon, lat)
-
-                # matplotlib angles are defined as degrees anticlockwise from positive x direction.
-                # therefore we need to adjust az accordingly
-                e = Ellipse([x, y],
-                            phimax * ellipse_size_factor,
-                            phimin * ellipse_size_factor,
-                            90. - az, **kwargs)
-                ax.add_artist(e)
-            # end if
-        # end for
+                phimax = pt_array[k]['phimax'] / pt_array[k]['phimax'].max()
+                phimin = pt_array[k]['phimin'] / pt_array[k]['phimax'].max()
+        az = pt_array[k]['azimuth']
+        if ptarray == 'resid':
+            phimin = np.abs(phimin)
+
+        # only physically correct ellipses are plotted
+        with np.errstate(invalid='ignore'):
+            valid = (phimax > 0) & (phimin > 0)
+
+        if m is None:
+            x = pt_array[k]['east']
+            y = pt_array[k]['north']
+            if map_scale == 'km':
+                x = x / 1e3
+                y = y / 1e3
+        else:
+            x, y = m(lon, lat)
+        x = np.asarray(x)
+        y = np.asarray(y)
+
+        ellipse_kwargs = dict(kwargs)
+        if cvals is not None:
+            ellipse_kwargs['facecolor'] = np.asarray(cvals)[valid]
+
+        # matplotlib angles are defined as degrees anticlockwise from positive x direction.
+        # therefore we need to adjust az accordingly
+        renderer = ptcol.PTCollectionRenderer(ax)
+        renderer.draw_ellipses(x[valid], y[valid],
+                               phimax[valid] * ellipse_size_factor,
+                               phimin[valid] * ellipse_size_factor,
+                               90. - az[valid], **ellipse_kwargs)
+
         if 'y' in plot_tipper:
             # if neither r or i provided, assume that we want to plot both
             if plot_tipper == 'y':
@@ -602,107 +604,64 @@ class PlotPTMaps(mtplottools.MTEllipse):
 
             # --> plot data phase tensors
             print(kwargs)
-            for pt in self.pt_data_arr[data_ii]:
-                eheight = pt['phimin'] / \
-                    self.pt_data_arr[data_ii]['phimax'].max() * \
-                    self.ellipse_size
-                ewidth = pt['phimax'] / \
-                    self.pt_data_arr[data_ii]['phimax'].max() * \
-                    self.ellipse_size
-
-                ellipse = Ellipse((pt['east'],
-                                   pt['north']),
-                                  width=ewidth,
-                                  height=eheight,
-                                  angle=90 - pt['azimuth'],
-                                  **kwargs)
-
-                # get ellipse color
-                if self.ellipse_cmap.find('seg') > 0:
-                    ellipse.set_facecolor(mtcl.get_plot_color(pt[self.ellipse_colorby],
-                                                              self.ellipse_colorby,
-                                                              self.ellipse_cmap,
-                                                              ckmin,
-                                                              ckmax,
-                                                              bounds=bounds))
-                else:
-                    ellipse.set_facecolor(mtcl.get_plot_color(pt[self.ellipse_colorby],
-                                                              self.ellipse_colorby,
-                                                              self.ellipse_cmap,
-                                                              ckmin,
-                                                              ckmax))
-
-                axd.add_artist(ellipse)
+            if self.ellipse_cmap.find('seg') > 0:
+                color_bounds = bounds
+            else:
+                color_bounds = None
+
+            pt = self.pt_data_arr[data_ii]
+            axd_renderer = ptcol.PTCollectionRenderer(axd)
+            axd_renderer.draw_ellipses(pt['east'], pt['north'],
+                                       pt['phimax'] / pt['phimax'].max() *
+                                       self.ellipse_size,
+                                       pt['phimin'] / pt['phimax'].max() *
+                                       self.ellipse_size,
+                                       90 - pt['azimuth'],
+                                       facecolors=mtcl.get_plot_colors(pt[self.ellipse_colorby],
+                                                                       self.ellipse_colorby,
+                                                                       self.ellipse_cmap,
+                                                                       ckmin,
+                                                                       ckmax,
+                                                                       bounds=color_bounds),
+                                       **kwargs)
 
             # -----------plot response phase tensors---------------
             if self.resp_fn is not None:
                 rcmin = np.floor(self.pt_resid_arr['geometric_mean'].min())
                 rcmax = np.floor(self.pt_resid_arr['geometric_mean'].max())
-                for mpt, rpt in zip(self.pt_resp_arr[data_ii],
-                                    self.pt_resid_arr[data_ii]):
-                    eheight = mpt['phimin'] / \
-                        self.pt_resp_arr[data_ii]['phimax'].max() * \
-                        self.ellipse_size
-                    ewidth = mpt['phimax'] / \
-                        self.pt_resp_arr[data_ii]['phimax'].max() * \
-                        self.ellipse_size
-
-                    ellipsem = Ellipse((mpt['east'],
-                                        mpt['north']),
-                                       width=ewidth,
-                                       height=eheight,
-                                       angle=90 - mpt['azimuth'],
-                                       **kwargs)
-
-                    # get ellipse color
-                    if self.ellipse_cmap.find('seg') > 0:
-                        ellipsem.set_facecolor(mtcl.get_plot_color(mpt[self.ellipse_colorby],
-                                                                   self.ellipse_colorby,
-                                                                   self.ellipse_cmap,
-                                                                   ckmin,
-                                                                   ckmax,
-                                                                   bounds=bounds))
-                    else:
-                        ellipsem.set_facecolor(mtcl.get_plot_color(mpt[self.ellipse_colorby],
-                                                                   self.ellipse_colorby,
-                                                                   self.ellipse_cmap,
-                                                                   ckmin,
-                                                                   ckmax))
-
-                    axm.add_artist(ellipsem)
-
-                    # -----------plot residual phase tensors---------------
-                    eheight = rpt['phimin'] / \
-                        self.pt_resid_arr[data_ii]['phimax'].max() * \
-                        self.ellipse_size
-                    ewidth = rpt['phimax'] / \
-                        self.pt_resid_arr[data_ii]['phimax'].max() * \
-                        self.ellipse_size
-
-                    ellipser = Ellipse((rpt['east'],
-                                        rpt['north']),
-                                       width=ewidth,
-                                       height=eheight,
-                                       angle=rpt['azimuth'],
-                                       **kwargs)
-
-                    # get ellipse color
-                    rpt_color = np.sqrt(abs(rpt['phimin'] * rpt['phimax']))
-                    if self.ellipse_cmap.find('seg') > 0:
-                        ellipser.set_facecolor(mtcl.get_plot_color(rpt_color,
-                                                                   'geometric_mean',
-                                                                   self.residual_cmap,
-                                                                   ckmin,
-                                                                   ckmax,
-                                                                   bounds=bounds))
-                    else:
-                        ellipser.set_facecolor(mtcl.get_plot_color(rpt_color,
-                                                                   'geometric_mean',
-                                                                   self.residual_cmap,
-                                                                   ckmin,
-                                                                   ckmax))
-
-                    axr.add_artist(ellipser)
+                mpt = self.pt_resp_arr[data_ii]
+                axm_renderer = ptcol.PTCollectionRenderer(axm)
+                axm_renderer.draw_ellipses(mpt['east'], mpt['north'],
+                                           mpt['phimax'] / mpt['phimax'].max() *
+                                           self.ellipse_size,
+                                           mpt['phimin'] / mpt['phimax'].max() *
+                                           self.ellipse_size,
+                                           90 - mpt['azimuth'],
+                                           facecolors=mtcl.get_plot_colors(mpt[self.ellipse_colorby],
+                                                                           self.ellipse_colorby,
+                                                                           self.ellipse_cmap,
+                                                                           ckmin,
+                                                                           ckmax,
+                                                                           bounds=color_bounds),
+                                           **kwargs)
+
+                # -----------plot residual phase tensors---------------
+                rpt = self.pt_resid_arr[data_ii]
+                rpt_color = np.sqrt(abs(rpt['phimin'] * rpt['phimax']))
+                axr_renderer = ptcol.PTCollectionRenderer(axr)
+                axr_renderer.draw_ellipses(rpt['east'], rpt['north'],
+                                           rpt['phimax'] / rpt['phimax'].max() *
+                                           self.ellipse_size,
+                                           rpt['phimin'] / rpt['phimax'].max() *
+                                           self.ellipse_size,
+                                           rpt['azimuth'],
+                                           facecolors=mtcl.get_plot_colors(rpt_color,
+                                                                           'geometric_mean',
+                                                                           self.residual_cmap,
+                                                                           ckmin,
+                                                                           ckmax,
+                                                                           bounds=color_bounds),
+                                           **kwargs)
 
             # --> set axes properties
             # data
@@ -869,11 +828,11 @@ class PlotPTMaps(mtplottools.MTEllipse):
                       'head_length': size_factor*0.1}
         kwargs_tip.update(kwargs)
         
-        for sidx in range(len(self.data_obj.data_array)):
-            if 'r' in plot_tipper:
-                ax.arrow(x[sidx],y[sidx],size_factor*rx[sidx],size_factor*ry[sidx],color='k',**kwargs_tip)
-            if 'i' in plot_tipper:
-                ax.arrow(x[sidx],y[sidx],size_factor*ix[sidx],size_factor*iy[sidx],color='b',**kwargs_tip)
+        renderer = ptcol.PTCollectionRenderer(ax)
+        if 'r' in plot_tipper:
+            renderer.draw_arrows(x, y, size_factor*rx, size_factor*ry, color='k', **kwargs_tip)
+        if 'i' in plot_tipper:
+            renderer.draw_arrows(x, y, size_factor*ix, size_factor*iy, color='b', **kwargs_tip)
 
 
     def _get_pt_data_list(self, attribute, xykeys=['east', 'north']):
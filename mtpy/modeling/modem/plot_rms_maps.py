@@ -30,6 +30,7 @@ from mtpy.utils.plot_geotiff_imshow import plot_geotiff_on_axes
 from mtpy.utils.mtpylog import MtPyLog
 from mtpy.utils.gis_tools import epsg_project
 from mtpy.modeling.modem import Data, Residual
+from mtpy.modeling.modem.inversion_monitor import get_iteration
 
 __all__ = ['PlotRMSMaps']
 _logger = MtPyLog.get_mtpy_logger(__name__)
@@ -56,6 +57,10 @@ class PlotRMSMaps(object):
                         *default* is [7,6]
     font_size           font size of tick labels, axis labels are +2
                         *default* is 8
+    inversion_monitor   InversionMonitor of the run directory of residual_fn,
+                        the rms is taken from its history when the iteration
+                        of residual_fn is in it, instead of being computed
+                        from the residuals. *default* is None
     marker              marker style for station rms,
                         see matplotlib.line for options,
                         *default* is 's' --> square
@@ -130,6 +135,7 @@ class PlotRMSMaps(object):
         self.residual = None
         self.residual_fn = residual_fn
         self.model_epsg = kwargs.pop('model_epsg', None)
+        self.inversion_monitor = kwargs.pop('inversion_monitor', None)
         self.read_residual_fn()
 
         self.save_path = kwargs.pop('save_path', os.path.dirname(self.residual_fn))
@@ -242,7 +248,6 @@ class PlotRMSMaps(object):
         jj = plot_dict['index'][1]
 
         rms = np.zeros(self.residual.residual_array.shape[0])
-        self.residual.get_rms()
 
         if plot_dict['label'].startswith('$Z'):
             if self.period_index == 'all':
@@ -295,10 +300,30 @@ class PlotRMSMaps(object):
             self.residual = Residual(residual_fn=self.residual_fn,
                                      model_epsg=self.model_epsg)
             self.residual.read_residual_file()
-            self.residual.get_rms()
+            if not self._read_rms_history():
+                self.residual.get_rms()
         else:
             pass
 
+    def _read_rms_history(self):
+        """
+        fill the rms of the residual from the history of inversion_monitor,
+        False if it is not in the history
+        """
+        iteration = get_iteration(self.residual_fn)
+        if self.inversion_monitor is None or iteration is None:
+            return False
+        rms_dict = self.inversion_monitor.get_iteration_rms(
+            iteration, station=self.residual.rms_array['station'])
+        if rms_dict is None:
+            return False
+        for key, value in rms_dict.items():
+            self.residual.rms_array[key] = value.reshape(self.residual.rms_array[key].shape)
+        for attr, component in [('rms', None), ('rms_z', 'z'), ('rms_tip', 'tip')]:
+            iterations, rms = self.inversion_monitor.get_rms_history(component=component)
+            setattr(self.residual, attr, rms[iterations == iteration][-1])
+        return True
+
     def create_shapefiles(self, dst_epsg, save_path=None):
         """
         Creates RMS map elements as shapefiles which can displayed in a
@@ -756,7 +781,9 @@ class PlotRMSMaps(object):
 
     def plot_loop(self, fig_format='png', style='point'):
         """
-        loop over all periods and save figures accordingly
+        loop over all periods and save figures accordingly, the rms is
+        computed (or read from the history of inversion_monitor) once
+        when residual_fn is read, not for every period
 
         :param: style [ 'point' | 'map' ]
         """
@@ -22,11 +22,11 @@ from mtpy.modeling.modem.data import Model
 from mtpy.utils import exceptions as mtex,basemap_tools
 from mtpy.utils.gis_tools import get_epsg,epsg_project
 from mtpy.utils.calculator import nearest_index
-from mtpy.utils.mesh_tools import rotate_mesh
+from mtpy.utils.matplotlib_utils import SliceCache, blit_axes, update_mesh
+from mtpy.utils.mesh_tools import rotate_mesh, get_nearest_cells
 
 from mtpy.imaging.seismic import Segy, VelocityModel
 
-from scipy.spatial import cKDTree
 from scipy.interpolate import interp1d, UnivariateSpline
 from matplotlib import colors,cm
 from matplotlib.ticker import LogLocator
@@ -122,6 +122,8 @@ class PlotSlices(object):
                             *default* is 'y'
     plot_stations           default False
     plot_grid               show grid on exported plot; default False
+    res_dtype               data type of res_model, np.float32 halves the
+                            memory of large models. *default* is np.float64
     res_model               np.ndarray(n_north, n_east, n_vertical) of
                             model resistivity values in linear scale
     save_format             exported format; default png
@@ -190,6 +192,7 @@ class PlotSlices(object):
         self.z_limits = kwargs.pop('z_limits', None)
 
         self.res_model = None
+        self.res_dtype = kwargs.pop('res_dtype', np.float64)
         self.grid_east = None
         self.grid_north = None
         self.grid_z = None
@@ -227,6 +230,8 @@ class PlotSlices(object):
         self.save_format = kwargs.pop('save_format', 'png')
         
 
+        self._slice_cache = None
+
         # read data
         self.read_files()
         self.get_station_grid_locations()
@@ -250,18 +255,9 @@ class PlotSlices(object):
         self._mcy = (self._my[1:] + self._my[:-1]) / 2.
         self._mcz = (self._mz[1:] + self._mz[:-1]) / 2.
 
-        # Create mesh-grid based on cell-centre coordinates
-        self._mgx, self._mgy, self._mgz = np.meshgrid(self._mcx,
-                                                      self._mcy,
-                                                      self._mcz)
-
-        # List of xyz coodinates of mesh-grid
-        self._mgxyz = np.vstack([self._mgx.flatten(),
-                                 self._mgy.flatten(),
-                                 self._mgz.flatten()]).T
-
-        # Create Kd-Tree based on mesh-grid coordinates
-        self._tree = cKDTree(self._mgxyz)
+        # the cells are found from the 1-D cell-centre coordinates with
+        # get_nearest_cells, the model is rectilinear so there is no need to
+        # meshgrid the coordinates of every cell into a Kd-Tree
     # end func
 
     def get_slice(self, option='STA', coords=[], nsteps=-1, nn=1, p=4,
@@ -437,16 +433,18 @@ class PlotSlices(object):
             xyz_list[:, 1] -= self.md_data.center_point['north']
         # end if
 
-        # query Kd-tree instance to retrieve distances and
-        # indices of k nearest neighbours
-        d, l = self._tree.query(xyz_list, k=nn)
+        # retrieve distances and indices of k nearest neighbours, the
+        # columns of xyz_list are east, north, z and the model is
+        # north, east, z
+        d, l = get_nearest_cells([self._mcy, self._mcx, self._mcz],
+                                 xyz_list[:, [1, 0, 2]], k=nn)
 
         img = None
         if (nn == 1):
             # extract nearest neighbour values
-            img = self.res_model.flatten()[l]
+            img = self.res_model.ravel()[l]
         else:
-            vals = self.res_model.flatten()
+            vals = self.res_model.ravel()
             img = np.zeros((xyz_list.shape[0]))
 
             # field values are directly assigned for coincident locations
@@ -465,14 +463,14 @@ class PlotSlices(object):
         if (extrapolate == False):
             # if extrapolate is false, set interpolation values to NaN for locations
             # outside the model domain
-            minX = np.min(self._mgxyz[:, 0])
-            maxX = np.max(self._mgxyz[:, 0])
+            minX = np.min(self._mcx)
+            maxX = np.max(self._mcx)
 
-            minY = np.min(self._mgxyz[:, 1])
-            maxY = np.max(self._mgxyz[:, 1])
+            minY = np.min(self._mcy)
+            maxY = np.max(self._mcy)
 
-            minZ = np.min(self._mgxyz[:, 2])
-            maxZ = np.max(self._mgxyz[:, 2])
+            minZ = np.min(self._mcz)
+            maxZ = np.max(self._mcz)
 
             xFilter = np.array(xyz_list[:, 0] < minX) + \
                       np.array(xyz_list[:, 0] > maxX)
@@ -496,7 +494,7 @@ class PlotSlices(object):
         # --> read in model file
         if self.model_fn is not None:
             if os.path.isfile(self.model_fn) == True:
-                md_model = Model()
+                md_model = Model(res_dtype=self.res_dtype)
                 md_model.read_model_file(self.model_fn)
                 self.res_model = md_model.res_model
                 self.grid_east = md_model.grid_east / self.dscale
@@ -752,6 +750,18 @@ class PlotSlices(object):
                                                             self.grid_north,
                                                             indexing='ij')
 
+        # the slice artists are made once and then only updated
+        self._mesh_ez = None
+        self._mesh_nz = None
+        self._mesh_en = None
+        self._depth_line_nz = None
+        self._stations_ez = []
+        self._stations_nz = []
+        self._stations_en = []
+        self._map_east_line = None
+        self._map_north_line = None
+        self._map_depth_text = None
+
         # --> plot east vs vertical
         self._update_ax_ez()
 
@@ -836,7 +846,7 @@ class PlotSlices(object):
         self.ax_span.set_aspect(0.05)
 
         self.ax_span.set_title('Depth Extent: Click+Drag to Select Sub-range')
-        def updateRange(label):
+        def updateRange(label, draw=True):
             self.current_label = label
             if(label == 'N-E'):
                 self.current_range = self.z_limits
@@ -866,7 +876,8 @@ class PlotSlices(object):
             self.ax_span.set_xlim(self.current_range)
             self.ax_span.set_ylim(self.current_range)
             self.ax_span.set_aspect(0.05)
-            self.fig.canvas.draw_idle()
+            if draw:
+                self.fig.canvas.draw_idle()
 
             self.selected_indices = []
         # end func
@@ -972,20 +983,20 @@ class PlotSlices(object):
             ax1.tick_params(axis='both', length=2)
 
             if (plane == 'N-E'):
-                plot_res = np.log10(self.res_model[:, :, ii].T)
+                plot_res = self._get_slice(2, ii).T
                 ax1.set_xlim(self.ew_limits)
                 ax1.set_ylim(self.ns_limits)
                 ax1.set_ylabel('Northing (' + self.map_scale + ')', fontdict=fdict)
                 ax1.set_xlabel('Easting (' + self.map_scale + ')', fontdict=fdict)
             elif (plane == 'N-Z'):
-                plot_res = np.log10(self.res_model[:, ii, :])
+                plot_res = self._get_slice(1, ii)
                 ax1.set_xlim(self.ns_limits)
                 ax1.set_ylim(self.z_limits)
                 ax1.invert_yaxis()
                 ax1.set_ylabel('Depth (' + self.map_scale + ')', fontdict=fdict)
                 ax1.set_xlabel('Northing (' + self.map_scale + ')', fontdict=fdict)
             elif (plane == 'E-Z'):
-                plot_res = np.log10(self.res_model[ii, :, :])
+                plot_res = self._get_slice(0, ii)
                 ax1.set_xlim(self.ew_limits)
                 ax1.set_ylim(self.z_limits)
                 ax1.invert_yaxis()
@@ -1134,184 +1145,219 @@ class PlotSlices(object):
         """
 
         key_press = event.key
+        n_north, n_east, n_vertical = self.res_model.shape
 
         if key_press == 'n':
-            if self.index_north == self.grid_north.size:
+            if self.index_north >= n_north - 1:
                 print('Already at northern most grid cell')
             else:
                 self.index_north += 1
-                if self.index_north > self.grid_north.size:
-                    self.index_north = self.grid_north.size
             self._update_ax_ez()
-            self._update_map()
+            changed_axes = [self.ax_ez]
 
-        if key_press == 'm':
+        elif key_press == 'm':
             if self.index_north == 0:
                 print('Already at southern most grid cell')
             else:
                 self.index_north -= 1
-                if self.index_north < 0:
-                    self.index_north = 0
             self._update_ax_ez()
-            self._update_map()
+            changed_axes = [self.ax_ez]
 
-        if key_press == 'e':
-            if self.index_east == self.grid_east.size:
+        elif key_press == 'e':
+            if self.index_east >= n_east - 1:
                 print('Already at eastern most grid cell')
             else:
                 self.index_east += 1
-                if self.index_east > self.grid_east.size:
-                    self.index_east = self.grid_east.size
             self._update_ax_nz()
-            self._update_map()
+            changed_axes = [self.ax_nz]
 
-        if key_press == 'w':
+        elif key_press == 'w':
             if self.index_east == 0:
                 print('Already at western most grid cell')
             else:
                 self.index_east -= 1
-                if self.index_east < 0:
-                    self.index_east = 0
             self._update_ax_nz()
-            self._update_map()
+            changed_axes = [self.ax_nz]
 
-        if key_press == 'd':
-            if self.index_vertical == self.grid_z.size:
+        elif key_press == 'd':
+            if self.index_vertical >= n_vertical - 1:
                 print('Already at deepest grid cell')
             else:
                 self.index_vertical += 1
-                if self.index_vertical > self.grid_z.size:
-                    self.index_vertical = self.grid_z.size
             self._update_ax_en()
             self._update_ax_nz()
+            changed_axes = [self.ax_en, self.ax_nz]
             print('Depth = {0:.5g} ({1})'.format(self.grid_z[self.index_vertical],
                                                  self.map_scale))
 
-        if key_press == 'u':
+        elif key_press == 'u':
             if self.index_vertical == 0:
                 print('Already at surface grid cell')
             else:
                 self.index_vertical -= 1
-                if self.index_vertical < 0:
-                    self.index_vertical = 0
             self._update_ax_en()
             self._update_ax_nz()
-            print('Depth = {0:.5gf} ({1})'.format(self.grid_z[self.index_vertical],
-                                                  self.map_scale))
-        self.update_range_func(self.current_label)
+            changed_axes = [self.ax_en, self.ax_nz]
+            print('Depth = {0:.5g} ({1})'.format(self.grid_z[self.index_vertical],
+                                                 self.map_scale))
+        else:
+            return
+
+        self._update_map()
+        self.update_range_func(self.current_label, draw=False)
+        # only the data changed, redraw the inside of those axes
+        blit_axes(*(changed_axes + [self.ax_map, self.ax_span]))
     # end func
 
+    def _get_slice(self, axis, index):
+        """
+        get log10 of the resistivity model at index along axis from the
+        slice cache, the cache is reset if res_model was replaced
+        """
+        if self._slice_cache is None or \
+                self._slice_cache.res_model is not self.res_model:
+            self._slice_cache = SliceCache(self.res_model)
+        return self._slice_cache.get_slice(axis, index)
+
+    def _update_station_markers(self, ax, markers, locations):
+        """
+        replace the station markers along the top of a vertical slice
+        """
+        for marker in markers:
+            marker.remove()
+        return [ax.text(ss,
+                        0,
+                        self.station_marker,
+                        horizontalalignment='center',
+                        verticalalignment='baseline',
+                        fontdict={'size': self.ms,
+                                  'color': self.station_color})
+                for ss in locations]
+
     def _update_ax_ez(self):
         """
         update east vs vertical plot
         """
-        self.ax_ez.cla()
-        plot_ez = np.log10(self.res_model[self.index_north, :, :])
-        self.ax_ez.pcolormesh(self.mesh_ez_east,
-                              self.mesh_ez_vertical,
-                              plot_ez,
-                              cmap=self.cmap,
-                              vmin=self.climits[0],
-                              vmax=self.climits[1])
+        plot_ez = self._get_slice(0, self.index_north)
+        if self._mesh_ez is None:
+            self.ax_ez.cla()
+            self._mesh_ez = self.ax_ez.pcolormesh(self.mesh_ez_east,
+                                                  self.mesh_ez_vertical,
+                                                  plot_ez,
+                                                  cmap=self.cmap,
+                                                  vmin=self.climits[0],
+                                                  vmax=self.climits[1])
+            self.ax_ez.set_xlim(self.ew_limits)
+            self.ax_ez.set_ylim(self.z_limits[1], self.z_limits[0])
+            self.ax_ez.set_ylabel('Depth ({0})'.format(self.map_scale),
+                                  fontdict=self.font_dict)
+            self.ax_ez.set_xlabel('Easting ({0})'.format(self.map_scale),
+                                  fontdict=self.font_dict)
+        else:
+            update_mesh(self._mesh_ez, self.mesh_ez_east, plot_ez)
+
         # plot stations
-        for sx in self.station_dict_north[self.grid_north[self.index_north]]:
-            self.ax_ez.text(sx,
-                            0,
-                            self.station_marker,
-                            horizontalalignment='center',
-                            verticalalignment='baseline',
-                            fontdict={'size': self.ms,
-                                      'color': self.station_color})
-
-        self.ax_ez.set_xlim(self.ew_limits)
-        self.ax_ez.set_ylim(self.z_limits[1], self.z_limits[0])
-        self.ax_ez.set_ylabel('Depth ({0})'.format(self.map_scale),
-                              fontdict=self.font_dict)
-        self.ax_ez.set_xlabel('Easting ({0})'.format(self.map_scale),
-                              fontdict=self.font_dict)
-        self.fig.canvas.draw()
-        self._update_map()
+        self._stations_ez = self._update_station_markers(
+            self.ax_ez, self._stations_ez,
+            self.station_dict_north[self.grid_north[self.index_north]])
 
     def _update_ax_nz(self):
         """
-        update east vs vertical plot
+        update north vs vertical plot
         """
-        self.ax_nz.cla()
-        plot_nz = np.log10(self.res_model[:, self.index_east, :])
-        self.ax_nz.pcolormesh(self.mesh_nz_north,
-                              self.mesh_nz_vertical,
-                              plot_nz,
-                              cmap=self.cmap,
-                              vmin=self.climits[0],
-                              vmax=self.climits[1])
-
-        # --> depth indication line
-        self.ax_nz.plot([self.grid_north.min(),
-                         self.grid_north.max()],
-                        [self.grid_z[self.index_vertical],
-                         self.grid_z[self.index_vertical]],
-                         lw=1,
-                         color='r')
+        plot_nz = self._get_slice(1, self.index_east)
+        depth = self.grid_z[self.index_vertical]
+        if self._mesh_nz is None:
+            self.ax_nz.cla()
+            self._mesh_nz = self.ax_nz.pcolormesh(self.mesh_nz_north,
+                                                  self.mesh_nz_vertical,
+                                                  plot_nz,
+                                                  cmap=self.cmap,
+                                                  vmin=self.climits[0],
+                                                  vmax=self.climits[1])
+
+            # --> depth indication line
+            self._depth_line_nz, = self.ax_nz.plot([self.grid_north.min(),
+                                                    self.grid_north.max()],
+                                                   [depth, depth],
+                                                   lw=1,
+                                                   color='r')
+            self.ax_nz.set_xlim(self.ns_limits)
+            self.ax_nz.set_ylim(self.z_limits[1], self.z_limits[0])
+            self.ax_nz.set_xlabel('Northing ({0})'.format(self.map_scale),
+                                  fontdict=self.font_dict)
+            self.ax_nz.set_ylabel('Depth ({0})'.format(self.map_scale),
+                                  fontdict=self.font_dict)
+        else:
+            update_mesh(self._mesh_nz, self.mesh_nz_north, plot_nz)
+            self._depth_line_nz.set_ydata([depth, depth])
 
         # plot stations
-        for sy in self.station_dict_east[self.grid_east[self.index_east]]:
-            self.ax_nz.text(sy,
-                            0,
-                            self.station_marker,
-                            horizontalalignment='center',
-                            verticalalignment='baseline',
-                            fontdict={'size': self.ms,
-                                      'color': self.station_color})
-        self.ax_nz.set_xlim(self.ns_limits)
-        self.ax_nz.set_ylim(self.z_limits[1], self.z_limits[0])
-        self.ax_nz.set_xlabel('Northing ({0})'.format(self.map_scale),
-                              fontdict=self.font_dict)
-        self.ax_nz.set_ylabel('Depth ({0})'.format(self.map_scale),
-                              fontdict=self.font_dict)
-        self.fig.canvas.draw()
-        self._update_map()
+        self._stations_nz = self._update_station_markers(
+            self.ax_nz, self._stations_nz,
+            self.station_dict_east[self.grid_east[self.index_east]])
 
     def _update_ax_en(self):
         """
-        update east vs vertical plot
+        update east vs north plot
         """
+        plot_en = self._get_slice(2, self.index_vertical).T
+        if self._mesh_en is None:
+            self.ax_en.cla()
+            self._mesh_en = self.ax_en.pcolormesh(self.mesh_en_east,
+                                                  self.mesh_en_north,
+                                                  plot_en,
+                                                  cmap=self.cmap,
+                                                  vmin=self.climits[0],
+                                                  vmax=self.climits[1])
+            self.ax_en.set_xlim(self.ew_limits)
+            self.ax_en.set_ylim(self.ns_limits)
+            self.ax_en.set_ylabel('Northing ({0})'.format(self.map_scale),
+                                  fontdict=self.font_dict)
+            self.ax_en.set_xlabel('Easting ({0})'.format(self.map_scale),
+                                  fontdict=self.font_dict)
+        else:
+            update_mesh(self._mesh_en, self.mesh_en_east, plot_en)
 
-        self.ax_en.cla()
-        plot_en = np.log10(self.res_model[:, :, self.index_vertical].T)
-        self.ax_en.pcolormesh(self.mesh_en_east,
-                              self.mesh_en_north,
-                              plot_en,
-                              cmap=self.cmap,
-                              vmin=self.climits[0],
-                              vmax=self.climits[1])
-        self.ax_en.set_xlim(self.ew_limits)
-        self.ax_en.set_ylim(self.ns_limits)
-        self.ax_en.set_ylabel('Northing ({0})'.format(self.map_scale),
-                              fontdict=self.font_dict)
-        self.ax_en.set_xlabel('Easting ({0})'.format(self.map_scale),
-                              fontdict=self.font_dict)
-        # --> plot the stations
+        # --> plot the stations above the depth slice
+        for marker in self._stations_en:
+            marker.remove()
+        self._stations_en = []
         if self.station_east is not None and self.plot_stations:
             for ee, nn, elev, name in zip(self.station_east,
                                           self.station_north,
                                           self.station_elev,
                                           self.station_names):
                 if elev <= self.grid_z[self.index_vertical]:
-                    self.ax_en.text(ee, nn, '+',
-                                    verticalalignment='center',
-                                    horizontalalignment='center',
-                                    fontdict={'size': 1, 'weight': 'bold',
-                                              'color': (.75, 0, 0)})
-                    self.ax_en.text(ee, nn, name[2:],
-                                    verticalalignment='center',
-                                    horizontalalignment='center',
-                                    fontdict={'size': 1, 'weight': 'bold',
-                                              'color': (.75, 0, 0)})
-
-        self.fig.canvas.draw()
-        self._update_map()
+                    self._stations_en.append(
+                        self.ax_en.text(ee, nn, '+',
+                                        verticalalignment='center',
+                                        horizontalalignment='center',
+                                        fontdict={'size': 1, 'weight': 'bold',
+                                                  'color': (.75, 0, 0)}))
+                    self._stations_en.append(
+                        self.ax_en.text(ee, nn, name[2:],
+                                        verticalalignment='center',
+                                        horizontalalignment='center',
+                                        fontdict={'size': 1, 'weight': 'bold',
+                                                  'color': (.75, 0, 0)}))
 
     def _update_map(self):
+        """
+        update the map of the grid with the slice indication lines
+        """
+        east_line_y = [self.grid_north[self.index_north],
+                       self.grid_north[self.index_north]]
+        north_line_x = [self.grid_east[self.index_east],
+                        self.grid_east[self.index_east]]
+        depth_text = '{0:.5g} ({1})'.format(self.grid_z[self.index_vertical],
+                                            self.map_scale)
+        if self._map_depth_text is not None:
+            self._map_east_line.set_ydata(east_line_y)
+            self._map_north_line.set_xdata(north_line_x)
+            self._map_depth_text.set_text(depth_text)
+            return
+
         self.ax_map.cla()
         self.east_line_xlist = []
         self.east_line_ylist = []
@@ -1339,20 +1385,18 @@ class PlotSlices(object):
                          lw=.25,
                          color='k')
         # --> e-w indication line
-        self.ax_map.plot([self.grid_east.min(),
-                          self.grid_east.max()],
-                         [self.grid_north[self.index_north],
-                          self.grid_north[self.index_north]],
-                         lw=1,
-                         color='g')
-
-        # --> e-w indication line
-        self.ax_map.plot([self.grid_east[self.index_east],
-                          self.grid_east[self.index_east]],
-                         [self.grid_north.min(),
-                          self.grid_north.max()],
-                         lw=1,
-                         color='b')
+        self._map_east_line, = self.ax_map.plot([self.grid_east.min(),
+                                                 self.grid_east.max()],
+                                                east_line_y,
+                                                lw=1,
+                                                color='g')
+
+        # --> n-s indication line
+        self._map_north_line, = self.ax_map.plot(north_line_x,
+                                                 [self.grid_north.min(),
+                                                  self.grid_north.max()],
+                                                 lw=1,
+                                                 color='b')
         # --> plot the stations
         if self.station_east is not None:
             for ee, nn in zip(self.station_east, self.station_north):
@@ -1368,16 +1412,14 @@ class PlotSlices(object):
         self.ax_map.set_xlabel('Easting ({0})'.format(self.map_scale),
                                fontdict=self.font_dict)
 
-        # plot stations
-        self.ax_map.text(self.ew_limits[0] * .95, self.ns_limits[1] * .95,
-                         '{0:.5g} ({1})'.format(self.grid_z[self.index_vertical],
-                                                self.map_scale),
-                         horizontalalignment='left',
-                         verticalalignment='top',
-                         bbox={'facecolor': 'white'},
-                         fontdict=self.font_dict)
-
-        self.fig.canvas.draw()
+        # plot depth of the depth slice
+        self._map_depth_text = self.ax_map.text(self.ew_limits[0] * .95,
+                                                self.ns_limits[1] * .95,
+                                                depth_text,
+                                                horizontalalignment='left',
+                                                verticalalignment='top',
+                                                bbox={'facecolor': 'white'},
+                                                fontdict=self.font_dict)
 
     def get_station_grid_locations(self):
         """
@@ -1387,13 +1429,18 @@ class PlotSlices(object):
         self.station_dict_east = dict([(gx, []) for gx in self.grid_east])
         self.station_dict_north = dict([(gy, []) for gy in self.grid_north])
         if self.station_east is not None:
-            for ss, sx in enumerate(self.station_east):
-                gx = np.where(self.grid_east <= sx)[0][-1]
-                self.station_dict_east[self.grid_east[gx]].append(self.station_north[ss])
-
-            for ss, sy in enumerate(self.station_north):
-                gy = np.where(self.grid_north <= sy)[0][-1]
-                self.station_dict_north[self.grid_north[gy]].append(self.station_east[ss])
+            # the last grid line at or below each station, a station below
+            # the first grid line is left out of that direction only
+            index_east = np.searchsorted(self.grid_east, self.station_east,
+                                         side='right') - 1
+            index_north = np.searchsorted(self.grid_north, self.station_north,
+                                          side='right') - 1
+            for gx, sy in zip(index_east, self.station_north):
+                if gx >= 0:
+                    self.station_dict_east[self.grid_east[gx]].append(sy)
+            for gy, sx in zip(index_north, self.station_east):
+                if gy >= 0:
+                    self.station_dict_north[self.grid_north[gy]].append(sx)
         else:
             return
 
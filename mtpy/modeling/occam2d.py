@@ -30,6 +30,7 @@ Functions:
 
 """
 # ==============================================================================
+import functools
 import numpy as np
 import scipy as sp
 from scipy.stats import mode
@@ -906,6 +907,11 @@ class Profile():
     ======================= ===================================================
     edi_list                list of mtpy.core.mt.MT instances for each .edi
                             file found in edi_path 
+    mt_list                 list of mtpy.core.mt.MT instances already read in
+                            to use instead of reading the files in edi_path.
+                            The impedance tensors and tippers of these are
+                            rotated in place by generate_profile.
+                            *default* is None
     elevation_model         numpy.ndarray(3, num_elevation_points) elevation
                             values for the profile line (east, north, elev)
     geoelectric_strike      geoelectric strike direction assuming N == 0
@@ -951,6 +957,7 @@ class Profile():
     def __init__(self, edi_path=None, **kwargs):
 
         self.edi_path = edi_path
+        self.mt_list = kwargs.pop('mt_list', None)
         self.station_list = kwargs.pop('station_list', None)
         self.geoelectric_strike = kwargs.pop('geoelectric_strike', None)
         self.profile_angle = kwargs.pop('profile_angle', None)
@@ -1008,6 +1015,17 @@ class Profile():
         inds = [np.where(coords == p)[0][0] for p in path]
         return inds
 
+    def _read_edi_path(self):
+        """
+        list of mtpy.core.mt.MT objects for all the .edi files in edi_path,
+        or mt_list if it is given
+        """
+        if self.mt_list is not None:
+            return list(self.mt_list)
+
+        return [mt.MT(os.path.join(self.edi_path, edi)) for
+                edi in os.listdir(self.edi_path) if edi.endswith('.edi')]
+
     def _get_edi_list(self):
         """
         Get a list of edi files that coorespond to the station list.
@@ -1026,19 +1044,29 @@ class Profile():
 
             3. Sort the station names alphabetically.
         
-        each element of the list is a mtpy.core.mt.MT object
+        each element of the list is a mtpy.core.mt.MT object, if mt_list is
+        given the objects are taken from there instead of read from edi_path.
         """
 
+        self.edi_list = []
         if self.station_list is not None:
+            if self.mt_list is not None:
+                edi_names = [os.path.basename(mt_obj.fn) if mt_obj.fn
+                             else '{0}.edi'.format(mt_obj.station)
+                             for mt_obj in self.mt_list]
+            else:
+                edi_names = os.listdir(self.edi_path)
             for station in self.station_list:
-                for edi in os.listdir(self.edi_path):
+                for ii, edi in enumerate(edi_names):
                     if edi.find(station) == 0 and edi[-3:] == 'edi':
-                        self.edi_list.append(mt.MT(os.path.join(self.edi_path,
-                                                                edi)))
+                        if self.mt_list is not None:
+                            self.edi_list.append(self.mt_list[ii])
+                        else:
+                            self.edi_list.append(
+                                mt.MT(os.path.join(self.edi_path, edi)))
                         break
         elif self.optimize_line:
-            edis = [mt.MT(os.path.join(self.edi_path, edi)) for
-                    edi in os.listdir(self.edi_path) if edi.endswith('.edi')]
+            edis = self._read_edi_path()
             eastings = np.array([edi.east for edi in edis])
             northings = np.array([edi.north for edi in edis])
             optimal_inds = Profile._optimized_path(eastings, northings)
@@ -1046,8 +1074,7 @@ class Profile():
             self.station_list = [os.path.splitext(os.path.basename(edi.fn))[0]
                                  for edi in self.edi_list]
         else:
-            self.edi_list = [mt.MT(os.path.join(self.edi_path, edi)) for
-                             edi in os.listdir(self.edi_path) if edi.endswith('.edi')]
+            self.edi_list = self._read_edi_path()
             self.station_list = [os.path.splitext(os.path.basename(edi.fn))[0]
                                  for edi in self.edi_list]
         for edi in self.edi_list:
@@ -1569,9 +1596,6 @@ class Regularization(Mesh):
 
         # At the top of the mesh model blocks will be 2 combined mesh blocks
         # Note that the padding cells are combined into one model block
-        var = (self.x_nodes.shape[0] - 2 * self.num_x_pad_cells)
-        print ("******* var=", var)
-
         station_col = [2] *int((self.x_nodes.shape[0] - 2 * self.num_x_pad_cells) / 2)
         model_cols = [self.num_x_pad_cells] + station_col + [self.num_x_pad_cells]
         station_widths = [self.x_nodes[ii] + self.x_nodes[ii + 1] for ii in
@@ -1594,30 +1618,28 @@ class Regularization(Mesh):
         columns = list(model_cols)
         widths = list(model_widths)
         for zz, thickness in enumerate(model_thickness):
-            # index for model column blocks from first_row, start at 1 because
-            # 0 is for padding cells            
-            block_index = 1
             num_rows = 1
             if zz == 0:
                 num_rows += 1
             if zz == len(model_thickness) - 1:
                 num_rows = self.num_z_pad_cells
-            while block_index + 1 < num_cols - 1:
-                # check to see if horizontally merged mesh cells are not larger
-                # than the thickness times trigger
-                if thickness < self.trigger * (widths[block_index] + \
-                                                       widths[block_index + 1]):
-                    block_index += 1
-                    continue
-                # merge 2 neighboring cells to avoid vertical exaggerations
-                else:
-                    widths[block_index] += widths[block_index + 1]
-                    columns[block_index] += columns[block_index + 1]
-                    # remove one of the merged cells
-                    widths.pop(block_index + 1)
-                    columns.pop(block_index + 1)
-
-                    num_cols -= 1
+            # merge neighboring blocks from left to right while 2 merged
+            # blocks are not wider than the thickness times trigger to
+            # avoid vertical exaggerations.  The padding blocks on either
+            # side are never merged.
+            if num_cols > 3:
+                merged_columns = columns[0:2]
+                merged_widths = widths[0:2]
+                for column, width in zip(columns[2:-1], widths[2:-1]):
+                    if thickness < self.trigger * (merged_widths[-1] + width):
+                        merged_columns.append(column)
+                        merged_widths.append(width)
+                    else:
+                        merged_columns[-1] += column
+                        merged_widths[-1] += width
+                columns = merged_columns + columns[-1:]
+                widths = merged_widths + widths[-1:]
+                num_cols = len(columns)
             self.num_param += num_cols
 
             self.model_columns.append(list(columns))
@@ -2121,6 +2143,8 @@ class Data(Profile):
     res_tm_err            percent error in resistivity for TM mode.
                           *default* is 10
     save_path             directory to save files to
+    show_profile          [ True | False ] plot the profile line when the
+                          data are filled. *default* is True
     station_list          list of station for inversion
     station_locations     station locations along profile line
     tipper_err            percent error in tipper. *default* is 5
@@ -2171,6 +2195,7 @@ class Data(Profile):
         self.data = kwargs.pop('data', None)
         self.data_list = None
         self.model_epsg = kwargs.pop('model_epsg',None)
+        self.show_profile = kwargs.pop('show_profile', True)
 
         self.res_te_err = kwargs.pop('res_te_err', 10)
         self.res_tm_err = kwargs.pop('res_tm_err', 10)
@@ -2441,7 +2466,8 @@ class Data(Profile):
         # create a profile line, this sorts the stations by offset and rotates
         # data.
         self.generate_profile()
-        self.plot_profile()
+        if self.show_profile:
+            self.plot_profile()
 
         # --> get frequencies to invert for
         self._get_frequencies()
@@ -3080,6 +3106,145 @@ class Response(object):
                 self.resp[ss][key][1, ff] = line['err']
 
 
+# ==============================================================================
+# map the regularization grid onto the finite element mesh
+# ==============================================================================
+def get_model_index(model_rows, model_columns, n_z, n_x):
+    """
+    Get the index of the model parameter of each cell of the finite element
+    mesh, model parameters are numbered row by row from the top left.
+
+    Arguments:
+    -----------
+        **model_rows** : list or np.ndarray(num_layers, 2)
+                         number of mesh layers and number of model blocks
+                         of each regularization layer
+
+        **model_columns** : list
+                            number of mesh columns of each model block for
+                            each regularization layer
+
+        **n_z** : int
+                  number of vertical nodes in the mesh
+
+        **n_x** : int
+                  number of horizontal nodes in the mesh
+
+    Returns:
+    ---------
+        **model_index** : np.ndarray(n_z, n_x)
+                          model parameter index of each mesh cell, -1 where
+                          the regularization grid does not cover the mesh
+    """
+    num_rows = np.array(model_rows, dtype=int).reshape(-1, 2)[:, 0]
+    num_blocks = np.array([len(col) for col in model_columns], dtype=int)
+    block_widths = np.array([cc for col in model_columns for cc in col],
+                            dtype=int)
+
+    # number the model blocks, one entry for each mesh column they cover,
+    # regularization layer ii starts at row_start[ii] in this list
+    block_index = np.repeat(np.arange(block_widths.size), block_widths)
+    row_width = np.add.reduceat(block_widths,
+                                np.cumsum(num_blocks) - num_blocks) \
+        if block_widths.size > 0 else np.zeros(num_blocks.size, dtype=int)
+    row_start = np.cumsum(row_width) - row_width
+
+    x_index = np.arange(n_x)
+    layer_index = np.full((num_rows.size, n_x), -1, dtype=int)
+    covered = x_index[None, :] < row_width[:, None]
+    layer_index[covered] = block_index[(row_start[:, None] +
+                                        x_index[None, :])[covered]]
+
+    # repeat each regularization layer over the mesh layers it covers
+    model_index = np.full((n_z, n_x), -1, dtype=int)
+    mesh_layers = np.repeat(np.arange(num_rows.size), num_rows)[:n_z]
+    model_index[:mesh_layers.size] = layer_index[mesh_layers]
+
+    return model_index
+
+
+def map_model_values(model_values, model_index, fill_value=0):
+    """
+    Map model values onto the finite element mesh with a model index from
+    get_model_index.
+
+    Arguments:
+    -----------
+        **model_values** : np.ndarray(num_param) or
+                           np.ndarray(num_models, num_param)
+                           model values of one or more models
+
+        **model_index** : np.ndarray(n_z, n_x)
+                          model parameter index of each mesh cell
+
+        **fill_value** : float
+                         value of mesh cells not covered by the model.
+                         *default* is 0
+
+    Returns:
+    ---------
+        **mesh_values** : np.ndarray(n_z, n_x) or
+                          np.ndarray(num_models, n_z, n_x)
+    """
+    model_values = np.asarray(model_values)
+    num_param = model_index.max() + 1
+    if model_values.shape[-1] < num_param:
+        raise OccamInputError('Model has {0} values, the regularization grid '
+                              'needs {1}'.format(model_values.shape[-1],
+                                                 num_param))
+
+    # put the fill value at the end so the index -1 picks it up
+    fill = np.full(model_values.shape[:-1] + (1,), fill_value,
+                   dtype=np.result_type(model_values, fill_value))
+    padded = np.concatenate((model_values[..., :num_param], fill), axis=-1)
+
+    return padded[..., model_index]
+
+
+@functools.lru_cache(maxsize=16)
+def _read_model_grid(model_fn, mtime):
+    """
+    read a regularization file and its mesh file and build the model index,
+    cached on the file name and modification time
+    """
+    r1 = Regularization()
+    r1.read_regularization_file(model_fn)
+    r1.model_rows = np.array(r1.model_rows)
+    r1.read_mesh_file(r1.mesh_fn)
+
+    # make sure that the number of rows and number of columns are the same
+    assert len(r1.model_rows) == len(r1.model_columns)
+
+    r1.model_index = get_model_index(r1.model_rows, r1.model_columns,
+                                     r1.z_nodes.shape[0], r1.x_nodes.shape[0])
+    for array in [r1.model_rows, r1.model_index, r1.x_nodes, r1.z_nodes]:
+        array.setflags(write=False)
+
+    return r1
+
+
+def get_model_grid(model_fn):
+    """
+    Get the regularization grid of a model file with its mesh and the
+    model index of the mesh cells (attribute model_index).
+
+    The grid is read once for each version of the file and shared, so
+    do not change its attributes.
+
+    Arguments:
+    -----------
+        **model_fn** : string
+                       full path to regularization file
+
+    Returns:
+    ---------
+        **r1** : Regularization
+    """
+    model_fn = os.path.abspath(model_fn)
+
+    return _read_model_grid(model_fn, os.path.getmtime(model_fn))
+
+
 class Model(Startup):
     """
     Read .iter file output by Occam2d.  Builds the resistivity model from 
@@ -3129,6 +3294,8 @@ class Model(Startup):
     build_model           get the resistivity model from the .iter file
                           in a regular grid according to the mesh file
                           with resistivity values according to the model file
+    build_models          get the resistivity models of several .iter files
+                          of the same inversion at once
     read_iter_file        read .iter file and fill appropriate attributes
     write_iter_file       write an .iter file incase you want to set it as the
                           starting model or a priori model
@@ -3177,7 +3344,7 @@ class Model(Startup):
         """
 
         if iter_fn is not None:
-            self.iter_fn == iter_fn
+            self.iter_fn = iter_fn
 
         if self.iter_fn is None:
             raise OccamInputError('iter_fn is None, input iteration file')
@@ -3251,58 +3418,64 @@ class Model(Startup):
         # first read in the iteration file
         self.read_iter_file()
 
-        # read in the regulariztion file
-        r1 = Regularization()
-        r1.read_regularization_file(self.model_fn)
-        r1.model_rows = np.array(r1.model_rows)
+        # read in the regulariztion file and the mesh and map the
+        # regularization blocks onto the FE mesh, this is cached so it is
+        # only done once for all the iterations of an inversion
+        r1 = get_model_grid(self.model_fn)
+
+        # put the model values into the FE mesh cells of their
+        # regularization blocks so that the model can be plotted as an
+        # image or regular mesh.
+        self.res_model = map_model_values(self.model_values, r1.model_index)
+
+        self._set_plot_grid(r1)
+
+        # flip the resmodel upside down so that the top is the stations
+        self.res_model = np.flipud(self.res_model)
+
+    def build_models(self, iter_fn_list):
+        """
+        build the models of several iteration files of the same inversion
+        with one mapping onto the mesh.  The attributes are set from the
+        last iteration file.
+
+        Arguments:
+        -----------
+            **iter_fn_list** : list
+                               full paths to iteration files
+
+        Returns:
+        ---------
+            **res_models** : np.ndarray(num_iter, z_nodes, x_nodes)
+                             resistivity models flipped like res_model
+        """
+        model_values = []
+        for iter_fn in iter_fn_list:
+            self.read_iter_file(iter_fn)
+            model_values.append(self.model_values)
+
+        r1 = get_model_grid(self.model_fn)
+        res_models = map_model_values(np.array(model_values), r1.model_index)
+
+        self._set_plot_grid(r1)
+        self.res_model = res_models[-1, ::-1]
+
+        return res_models[:, ::-1]
+
+    def _set_plot_grid(self, r1):
+        """
+        set the plotting grid from the regularization grid r1
+        """
         self.model_rows = r1.model_rows
         self.model_columns = r1.model_columns
 
-        # read in mesh file
-        r1.read_mesh_file(r1.mesh_fn)
-
-        # get the binding offset which is the right side of the furthest left
-        # block, this helps locate the model in relative space
-        bndgoff = r1.binding_offset
-
-        # make sure that the number of rows and number of columns are the same
-        assert len(r1.model_rows) == len(r1.model_columns)
-
-        # initiate the resistivity model to the shape of the FE mesh
-        self.res_model = np.zeros((r1.z_nodes.shape[0], r1.x_nodes.shape[0]))
-
-        # read in the model and set the regularization block values to map onto
-        # the FE mesh so that the model can be plotted as an image or regular
-        # mesh.
-        mm = 0
-        for ii in range(len(r1.model_rows)):
-            # get the number of layers to combine
-            # this index will be the first index in the vertical direction
-            ny1 = r1.model_rows[:ii, 0].sum()
-            # the second index  in the vertical direction
-            ny2 = ny1 + r1.model_rows[ii][0]
-            # make the list of amalgamated columns an array for ease
-            lc = np.array(r1.model_columns[ii])
-            # loop over the number of amalgamated blocks
-            for jj in range(len(r1.model_columns[ii])):
-                # get first in index in the horizontal direction
-                nx1 = lc[:jj].sum()
-                # get second index in horizontal direction
-                nx2 = nx1 + lc[jj]
-                # put the apporpriate resistivity value into all the amalgamated
-                # model blocks of the regularization grid into the forward model
-                # grid
-                self.res_model[ny1:ny2, nx1:nx2] = self.model_values[mm]
-                mm += 1
-
         # make some arrays for plotting the model
-        self.plot_x = np.array([r1.x_nodes[:ii + 1].sum()
-                                for ii in range(len(r1.x_nodes))])
-        self.plot_z = np.array([r1.z_nodes[:ii + 1].sum()
-                                for ii in range(len(r1.z_nodes))])
+        self.plot_x = np.cumsum(r1.x_nodes)
+        self.plot_z = np.cumsum(r1.z_nodes)
 
-        # center the grid onto the station coordinates
-        x0 = bndgoff - self.plot_x[r1.model_columns[0][0]]
+        # center the grid onto the station coordinates, the binding offset
+        # is the right side of the furthest left block
+        x0 = r1.binding_offset - self.plot_x[r1.model_columns[0][0]]
         self.plot_x += x0
 
         # flip the arrays around for plotting purposes
@@ -3312,9 +3485,6 @@ class Model(Startup):
         # make a mesh grid to plot in the model coordinates
         self.mesh_x, self.mesh_z = np.meshgrid(self.plot_x, self.plot_z)
 
-        # flip the resmodel upside down so that the top is the stations
-        self.res_model = np.flipud(self.res_model)
-
 
 # ==============================================================================
 # plot the MT and model responses            
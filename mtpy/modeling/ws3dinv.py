@@ -84,8 +84,10 @@ import matplotlib.colors as colors
 import matplotlib.cm as cm
 import mtpy.modeling.winglink as wl
 import mtpy.utils.exceptions as mtex
+import mtpy.utils.mesh_tools as mtmesh
 import mtpy.analysis.pt as mtpt
 import mtpy.imaging.mtcolors as mtcl
+from mtpy.utils.matplotlib_utils import SliceCache, blit_axes, update_mesh
 
 try:
     from evtk.hl import gridToVTK, pointsToVTK
@@ -138,7 +140,9 @@ class WSData(object):
                                                 error map applied
                                * *z_err_map --> error map from data file
     data_fn                full path to data file
-    edi_list               list of edi files used to make data file
+    edi_list               list of edi files used to make data file, can
+                           also be mtpy.core.mt.MT objects already read in,
+                           which are rotated in place by rotation_angle
     n_z                    [ 4 | 8 ] number of impedance tensor elements
                            *default* is 8
     ncol                   number of columns in out file from winglink
@@ -213,7 +217,8 @@ class WSData(object):
         self.period_list = kwargs.pop('period_list', None)
         self.edi_list = kwargs.pop('edi_list', None)
         self.station_locations = kwargs.pop('station_locations', None)
-        self.rotation_angle = kwargs.pop('roatation_angle', None)
+        self.rotation_angle = kwargs.pop('rotation_angle',
+                                         kwargs.pop('roatation_angle', None))
 
         self.station_east = None
         self.station_north = None
@@ -230,6 +235,12 @@ class WSData(object):
 
         self.data = None
 
+        self._check_errors()
+
+    def _check_errors(self):
+        """
+        make sure the errors are given as decimal percents
+        """
         # make sure the error given is a decimal percent
         if type(self.z_err) is not str and self.z_err > 1:
             self.z_err /= 100.
@@ -276,7 +287,7 @@ class WSData(object):
         self.data = np.zeros(n_stations, dtype=data_dtype)
 
         #------get station locations-------------------------------------------
-        if self.wl_site_fn != None:
+        if self.wl_site_fn is not None:
             if self.wl_out_fn is None:
                 raise IOError('Need to input an .out file to get station'
                               'locations, this should be output by Winglink')
@@ -291,7 +302,7 @@ class WSData(object):
             self.data['north'] = north_list
 
         #if a station location file is input
-        if self.station_fn != None:
+        if self.station_fn is not None:
             stations = WSStation(self.station_fn)
             stations.read_station_file()
             self.data['station'] = stations.names
@@ -299,20 +310,20 @@ class WSData(object):
             self.data['north'] = stations.north
 
         #if the user made a grid in python or some other fashion
-        if self.station_locations != None:
+        if self.station_locations is not None:
             try:
                 for dd, sd in enumerate(self.station_locations):
                     self.data['east'][dd] = sd['east_c']
                     self.data['north'][dd] = sd['north_c']
                     self.data['station'][dd] = sd['station']
 
-                    stations = WSStation()
-                    stations.station_fn = os.path.join(self.save_path,
-                                                    'WS_Station_locations.txt')
-                    stations.east = self.data['east']
-                    stations.north = self.data['north']
-                    stations.names = self.data['station']
-                    stations.write_station_file()
+                stations = WSStation()
+                stations.write_station_file(east=self.data['east'],
+                                            north=self.data['north'],
+                                            station_list=self.data['station'],
+                                            save_path=os.path.join(
+                                                self.save_path,
+                                                'WS_Station_locations.txt'))
 
             except (KeyError, ValueError):
                 self.data['east'] = self.station_locations[:, 0]
@@ -320,10 +331,13 @@ class WSData(object):
 
         #--------find frequencies----------------------------------------------
         for ss, edi in enumerate(self.edi_list):
-            if not os.path.isfile(edi):
-                raise IOError('Could not find '+edi)
+            if isinstance(edi, mt.MT):
+                mt_obj = edi
+            else:
+                if not os.path.isfile(edi):
+                    raise IOError('Could not find '+edi)
 
-            mt_obj = mt.MT(edi)
+                mt_obj = mt.MT(edi)
             if self.rotation_angle is not None:
                 mt_obj.rotation_angle = self.rotation_angle
             print('{0}{1}{0}'.format('-'*20, mt_obj.station))
@@ -348,6 +362,7 @@ class WSData(object):
         """
         compute the errors from the given attributes
         """
+        self._check_errors()
 
         for d_arr in self.data:
             if self.z_err == 'data':
@@ -410,13 +425,13 @@ class WSData(object):
         n_stations = len(self.data)
         n_periods = self.data[0]['z_data'].shape[0]
 
-        ofid = file(self.data_fn, 'w')
+        ofid = open(self.data_fn, 'w')
         ofid.write('{0:d} {1:d} {2:d}\n'.format(n_stations, n_periods,
                                                 self.n_z))
 
         #write N-S locations
         ofid.write('Station_Location: N-S \n')
-        for ii in range(n_stations/self.n_z+1):
+        for ii in range(n_stations//self.n_z+1):
             for ll in range(self.n_z):
                 index = ii*self.n_z+ll
                 try:
@@ -427,7 +442,7 @@ class WSData(object):
 
         #write E-W locations
         ofid.write('Station_Location: E-W \n')
-        for ii in range(n_stations/self.n_z+1):
+        for ii in range(n_stations//self.n_z+1):
             for ll in range(self.n_z):
                 index = ii*self.n_z+ll
                 try:
@@ -441,7 +456,7 @@ class WSData(object):
             ofid.write('DATA_Period: {0:3.6f}\n'.format(p1))
             for ss in range(n_stations):
                 zline = self.data[ss]['z_data'][ii].reshape(4,)
-                for jj in range(self.n_z/2):
+                for jj in range(self.n_z//2):
                     ofid.write('{0:+.4e} '.format(zline[jj].real))
                     ofid.write('{0:+.4e} '.format(-zline[jj].imag))
                 ofid.write('\n')
@@ -451,7 +466,7 @@ class WSData(object):
             ofid.write('ERROR_Period: {0:3.6f}\n'.format(p1))
             for ss in range(n_stations):
                 zline = self.data[ss]['z_data_err'][ii].reshape(4,)
-                for jj in range(self.n_z/2):
+                for jj in range(self.n_z//2):
                     ofid.write('{0:+.4e} '.format(zline[jj].real))
                     ofid.write('{0:+.4e} '.format(zline[jj].imag))
                 ofid.write('\n')
@@ -461,7 +476,7 @@ class WSData(object):
             ofid.write('ERMAP_Period: {0:3.6f}\n'.format(p1))
             for ss in range(n_stations):
                 zline = self.data[ss]['z_err_map'][ii].reshape(4,)
-                for jj in range(self.n_z/2):
+                for jj in range(self.n_z//2):
                     ofid.write('{0:.5e} '.format(self.z_err_map[jj]))
                     ofid.write('{0:.5e} '.format(self.z_err_map[jj]))
                 ofid.write('\n')
@@ -748,7 +763,7 @@ class WSStation(object):
             self.station_fn = os.path.join(self.save_path,
                                            'WS_Station_Locations.txt')
 
-        sfid = file(self.station_fn, 'w')
+        sfid = open(self.station_fn, 'w')
         sfid.write('{0:<14}{1:^14}{2:^14}{3:^14}\n'.format('station', 'east',
                                                     'north', 'elev'))
         for ee, nn, zz, ss in zip(self.east, self.north, self.elev, self.names):
@@ -889,7 +904,8 @@ class WSMesh(object):
                          *default* is 500
     cell_size_north      mesh block width in north direction
                          *default* is 500
-    edi_list             list of .edi files to invert for
+    edi_list             list of .edi files to invert for, or
+                         mtpy.core.mt.MT objects already read in
     grid_east            overall distance of grid nodes in east direction 
     grid_north           overall distance of grid nodes in north direction 
     grid_z               overall distance of grid nodes in z direction 
@@ -1025,7 +1041,10 @@ class WSMesh(object):
                                                      ('elev', np.float)])
             #get station locations in meters
             for ii, edi in enumerate(self.edi_list):
-                mt_obj = mt.MT(edi)
+                if isinstance(edi, mt.MT):
+                    mt_obj = edi
+                else:
+                    mt_obj = mt.MT(edi)
                 self.station_locations[ii]['station'] = mt_obj.station
                 self.station_locations[ii]['east'] = mt_obj.east
                 self.station_locations[ii]['north'] = mt_obj.north
@@ -1148,16 +1167,16 @@ class WSMesh(object):
         #   wsinv3d
         east_nodes = east_gridr.copy()
         nx = east_gridr.shape[0]
-        east_nodes[:nx/2] = np.array([abs(east_gridr[ii]-east_gridr[ii+1])
+        east_nodes[:nx//2] = np.array([abs(east_gridr[ii]-east_gridr[ii+1])
                                           for ii in range(int(nx/2))])
-        east_nodes[nx/2:] = np.array([abs(east_gridr[ii]-east_gridr[ii+1])
+        east_nodes[nx//2:] = np.array([abs(east_gridr[ii]-east_gridr[ii+1])
                                           for ii in range(int(nx/2)-1, nx-1)])
 
         north_nodes = north_gridr.copy()
         ny = north_gridr.shape[0]
-        north_nodes[:ny/2] = np.array([abs(north_gridr[ii]-north_gridr[ii+1])
+        north_nodes[:ny//2] = np.array([abs(north_gridr[ii]-north_gridr[ii+1])
                                        for ii in range(int(ny/2))])
-        north_nodes[ny/2:] = np.array([abs(north_gridr[ii]-north_gridr[ii+1])
+        north_nodes[ny//2:] = np.array([abs(north_gridr[ii]-north_gridr[ii+1])
                                        for ii in range(int(ny/2)-1, ny-1)])
 
         #--put the grids into coordinates relative to the center of the grid
@@ -1185,32 +1204,21 @@ class WSMesh(object):
 
         #make sure that the stations are in the center of the cell as requested
         #by the code.
-        for ii in range(n_stations):
-            #look for the closest grid line
-            xx = [nn for nn, xf in enumerate(east_grid)
-                if xf>(self.station_locations[ii]['east']-self.cell_size_east)
-                and xf<(self.station_locations[ii]['east']+self.cell_size_east)]
-
-            #shift the station to the center in the east-west direction
-            if east_grid[xx[0]] < self.station_locations[ii]['east']:
-                self.station_locations[ii]['east_c'] = \
-                                        east_grid[xx[0]]+self.cell_size_east/2
-            elif east_grid[xx[0]] > self.station_locations[ii]['east']:
-                self.station_locations[ii]['east_c'] = \
-                                        east_grid[xx[0]]-self.cell_size_east/2
-
-            #look for closest grid line
-            yy = [mm for mm, yf in enumerate(north_grid)
-                 if yf>(self.station_locations[ii]['north']-self.cell_size_north)
-                 and yf<(self.station_locations[ii]['north']+self.cell_size_north)]
-
-            #shift station to center of cell in north-south direction
-            if north_grid[yy[0]] < self.station_locations[ii]['north']:
-                self.station_locations[ii]['north_c'] = \
-                                    north_grid[yy[0]]+self.cell_size_north/2
-            elif north_grid[yy[0]] > self.station_locations[ii]['north']:
-                self.station_locations[ii]['north_c'] = \
-                                    north_grid[yy[0]]-self.cell_size_north/2
+        index_east, index_north = mtmesh.get_station_cells(
+            east_grid, north_grid, self.station_locations['east'],
+            self.station_locations['north'])[:2]
+        for key, grid, index, cell_size in [('east', east_grid, index_east,
+                                             self.cell_size_east),
+                                            ('north', north_grid, index_north,
+                                             self.cell_size_north)]:
+            location = self.station_locations[key]
+            #the closest grid line is the lower edge of the station's cell
+            #if it is within a cell size, otherwise the upper edge
+            lower = grid[index] > location-cell_size
+            centre = np.where(lower, grid[index]+cell_size/2,
+                              grid[index+1]-cell_size/2)
+            shift = lower | (grid[index+1] > location)
+            self.station_locations[key+'_c'][shift] = centre[shift]
 
         #--> print out useful information
         print('-'*15)
@@ -1524,7 +1532,7 @@ class WSMesh(object):
             nr = len(self.res_list)
 
         #--> write file
-        ifid = file(self.initial_fn, 'w')
+        ifid = open(self.initial_fn, 'w')
         ifid.write('# {0}\n'.format(self.title.upper()))
         ifid.write('{0} {1} {2} {3}\n'.format(self.nodes_north.shape[0],
                                               self.nodes_east.shape[0],
@@ -1563,7 +1571,7 @@ class WSMesh(object):
         else:
             pass
 
-        if self.res_model == None:
+        if self.res_model is None:
             ifid.close()
         else:
             if nr > 0:
@@ -2052,6 +2060,7 @@ class WSModelManipulator(object):
         self.east_line_ylist = None
         self.north_line_xlist = None
         self.north_line_ylist = None
+        self._slice_cache = None
 
         #make a default resistivity list to change values
         self.res_dict = None
@@ -2211,7 +2220,8 @@ class WSModelManipulator(object):
         self.ax1 = self.fig.add_subplot(1, 1, 1, aspect='equal')
 
         #transpose to make x--east and y--north
-        plot_res = np.log10(self.res_model[:,:,self.depth_index].T)
+        self._slice_cache = SliceCache(self.res_model)
+        plot_res = self._slice_cache.get_slice(2, self.depth_index).T
 
         self.mesh_plot = self.ax1.pcolormesh(self.mesh_east,
                                              self.mesh_north,
@@ -2325,69 +2335,35 @@ class WSModelManipulator(object):
 
     def redraw_plot(self):
         """
-        redraws the plot
+        redraws the plot, only the colours of the mesh and the title are
+        updated, the inside of the axes is blitted if the title did not change
         """
 
-        current_xlimits = self.ax1.get_xlim()
-        current_ylimits = self.ax1.get_ylim()
-
-        self.ax1.cla()
-
-        plot_res = np.log10(self.res_model[:,:,self.depth_index].T)
-
-        self.mesh_plot = self.ax1.pcolormesh(self.mesh_east,
-                                             self.mesh_north,
-                                             plot_res,
-                                             cmap=self.cmap,
-                                             vmin=self.cmin,
-                                             vmax=self.cmax)
-
-         #plot the stations
-        if self.station_east is not None:
-            for ee,nn in zip(self.station_east, self.station_north):
-                self.ax1.text(ee/self.dscale, nn/self.dscale,
-                              '*',
-                              verticalalignment='center',
-                              horizontalalignment='center',
-                              fontdict={'size':self.font_size-2,
-                                        'weight':'bold'})
+        plot_res = self._slice_cache.get_slice(2, self.depth_index).T
+        update_mesh(self.mesh_plot, self.mesh_east, plot_res)
 
         #set axis properties
         if self.xlimits is not None:
             self.ax1.set_xlim(self.xlimits)
-        else:
-            self.ax1.set_xlim(current_xlimits)
-
         if self.ylimits is not None:
             self.ax1.set_ylim(self.ylimits)
-        else:
-            self.ax1.set_ylim(current_ylimits)
-
-        self.ax1.set_ylabel('Northing ('+self.map_scale+')',
-                            fontdict=self.fdict)
-        self.ax1.set_xlabel('Easting ('+self.map_scale+')',
-                            fontdict=self.fdict)
 
         depth_title = self.grid_z[self.depth_index]/self.dscale
-
-        self.ax1.set_title('Depth = {:.3f} '.format(depth_title)+\
-                           '('+self.map_scale+')',
-                           fontdict=self.fdict)
-
-        #plot finite element mesh
-        self.ax1.plot(self.east_line_xlist,
-                      self.east_line_ylist,
-                      lw=.25,
-                      color='k')
-
-
-        self.ax1.plot(self.north_line_xlist,
-                      self.north_line_ylist,
-                      lw=.25,
-                      color='k')
+        title = 'Depth = {:.3f} '.format(depth_title)+'('+self.map_scale+')'
 
         #be sure to redraw the canvas
-        self.fig.canvas.draw()
+        if self.ax1.get_title() != title:
+            self.ax1.set_title(title, fontdict=self.fdict)
+            self.fig.canvas.draw_idle()
+        else:
+            blit_axes(self.ax1)
+
+    def _model_changed(self):
+        """
+        the model was edited in place, drop the cached slices and redraw
+        """
+        self._slice_cache.clear()
+        self.redraw_plot()
 
     def set_res_value(self, label):
         self.res_value = float(label)
@@ -2444,7 +2420,7 @@ class WSModelManipulator(object):
             except IndexError:
                 print('No layers above')
 
-            self.redraw_plot()
+            self._model_changed()
 
         #copy the layer below
         elif self.event_change_depth.key == 'b':
@@ -2454,7 +2430,7 @@ class WSModelManipulator(object):
             except IndexError:
                 print('No more layers below')
 
-            self.redraw_plot()
+            self._model_changed()
 
         #undo
         elif self.event_change_depth.key == 'u':
@@ -2467,7 +2443,7 @@ class WSModelManipulator(object):
                         self.res_model[yy, xx, self.depth_index] = \
                         self.res_copy[yy, xx, self.depth_index]
 
-            self.redraw_plot()
+            self._model_changed()
 
     def change_model_res(self, xchange, ychange):
         """
@@ -2481,7 +2457,7 @@ class WSModelManipulator(object):
                 for yy in ychange:
                     self.res_model[yy, xx, self.depth_index] = self.res_value
 
-        self.redraw_plot()
+        self._model_changed()
 
     def rect_onselect(self, eclick, erelease):
         """
@@ -6059,7 +6035,7 @@ class WSStartup(object):
             raise IOError('Need to input initial model file name')
 
         #create the output filename
-        if self.save_path == None and self.data_fn != None:
+        if self.save_path is None and self.data_fn is not None:
             self.startup_fn = os.path.join(os.path.dirname(self.data_fn),
                                            'startup')
         elif os.path.isdir(self.save_path) == True:
@@ -6106,7 +6082,7 @@ class WSStartup(object):
                                              self.error_tol))
         slines.append('{0:<20}{1} \n'.format('STATIC_FILE', self.static_fn))
 
-        sfid = file(self.startup_fn, 'w')
+        sfid = open(self.startup_fn, 'w')
         sfid.write(''.join(slines))
         sfid.close()
 
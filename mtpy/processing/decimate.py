@@ -0,0 +1,375 @@
+#!/usr/bin/env python
+
+"""
+mtpy/processing/decimate.py
+
+Multi-stage polyphase FIR decimation of time series.
+
+A decimation factor is split into a chain of small integer stages.  Each
+stage low-pass filters with a linear phase FIR filter (the same Kaiser
+windowed design used by scipy.signal.resample_poly) and keeps every n-th
+sample.  The filter is applied in polyphase form: the data are viewed as
+frames of n samples and multiplied with the matrix of filter phases, so
+only the retained samples are computed and the work is done by BLAS.
+
+The filter banks of a factor chain are designed once and kept in an LRU
+cache.
+Data are pushed through the chain in chunks, which gives exactly the same
+result as filtering the whole array at once, so long time series can be
+streamed without holding intermediate copies in memory.  The filters are
+centred, so the first output sample sits on the first input sample and
+the start time of the time series does not change.
+
+"""
+
+#=================================================================
+import functools
+
+import numpy as np
+import scipy.signal as signal
+
+#=================================================================
+# largest decimation factor applied in a single stage
+MAX_STAGE_FACTOR = 8
+# half length of the FIR filter in units of the stage factor
+HALF_LENGTH = 10
+# shape parameter of the Kaiser window used to design the filters
+KAISER_BETA = 5.0
+# number of input samples pushed through the chain at a time
+CHUNK_SIZE = 2**18
+
+#=================================================================
+
+
+def get_decimation_stages(dec_factor, max_stage=MAX_STAGE_FACTOR):
+    """
+    Split a decimation factor into a list of integer stages.
+
+    The factor is broken into its prime factors which are then combined,
+    largest first, into stages no larger than max_stage.  Prime factors
+    larger than max_stage get a stage of their own.  The product of the
+    stages is always dec_factor.
+
+    :param dec_factor: total decimation factor
+    :type dec_factor: int
+
+    :param max_stage: largest factor for a single stage
+    :type max_stage: int
+
+    :returns: list of stage factors, largest first
+
+    :Example: ::
+
+        >>> get_decimation_stages(1024)
+        [8, 8, 8, 2]
+
+    """
+    dec_factor = int(dec_factor)
+    if dec_factor < 1:
+        raise ValueError('decimation factor must be >= 1, not {0}'.format(
+                         dec_factor))
+
+    primes = []
+    remainder = dec_factor
+    divisor = 2
+    while divisor * divisor <= remainder:
+        while remainder % divisor == 0:
+            primes.append(divisor)
+            remainder //= divisor
+        divisor += 1
+    if remainder > 1:
+        primes.append(remainder)
+
+    stages = []
+    for prime in sorted(primes, reverse=True):
+        for ii, stage in enumerate(stages):
+            if stage * prime <= max_stage:
+                stages[ii] = stage * prime
+                break
+        else:
+            stages.append(prime)
+
+    return sorted(stages, reverse=True)
+
+
+@functools.lru_cache(maxsize=64)
+def get_stage_filter(factor, dtype='float32'):
+    """
+    Design the anti-alias FIR filter for a single decimation stage.
+
+    The filter has 2 * HALF_LENGTH * factor + 1 taps and a cut off at the
+    new Nyquist frequency, it is returned read only as it is shared through
+    the cache.
+
+    :param factor: decimation factor of the stage
+    :type factor: int
+
+    :param dtype: data type of the filter coefficients
+    :type dtype: string
+
+    :returns: filter coefficients
+    :rtype: np.ndarray
+    """
+    half_len = HALF_LENGTH * factor
+    h = signal.firwin(2 * half_len + 1, 1. / factor,
+                      window=('kaiser', KAISER_BETA))
+    h = h.astype(dtype)
+    h.setflags(write=False)
+
+    return h
+
+
+@functools.lru_cache(maxsize=64)
+def get_polyphase_bank(factor, dtype='float32'):
+    """
+    Polyphase decomposition of the filter of a decimation stage.
+
+    The filter is padded with zeros to a multiple of factor taps and
+    reshaped so that column j holds taps j * factor to (j + 1) * factor - 1.
+
+    :param factor: decimation factor of the stage
+    :type factor: int
+
+    :param dtype: data type of the filter coefficients
+    :type dtype: string
+
+    :returns: filter phases, shape (factor, n_phases)
+    :rtype: np.ndarray
+    """
+    h = get_stage_filter(factor, dtype)
+    n_phases = -(-h.size // factor)
+    bank = np.zeros(n_phases * factor, dtype=dtype)
+    bank[:h.size] = h
+    bank = np.ascontiguousarray(bank.reshape(n_phases, factor).T)
+    bank.setflags(write=False)
+
+    return bank
+
+
+@functools.lru_cache(maxsize=32)
+def get_filter_bank(dec_factor, dtype='float32', max_stage=MAX_STAGE_FACTOR):
+    """
+    Get the stages and polyphase filter banks for a decimation factor.
+
+    :param dec_factor: total decimation factor
+    :type dec_factor: int
+
+    :param dtype: data type the filters are applied in
+    :type dtype: string
+
+    :param max_stage: largest factor for a single stage
+    :type max_stage: int
+
+    :returns: tuple of (stage factor, polyphase bank) pairs
+    """
+    return tuple((factor, get_polyphase_bank(factor, dtype))
+                 for factor in get_decimation_stages(dec_factor, max_stage))
+
+
+def get_decimated_length(n_samples, dec_factor):
+    """
+    number of samples after decimating n_samples by dec_factor
+    """
+    return -(-int(n_samples) // int(dec_factor))
+
+
+class DecimationStage(object):
+    """
+    Streaming decimation by a single integer factor.
+
+    Samples are buffered until enough have arrived to compute the next
+    output samples with the centred filter.  The signal is assumed to be
+    zero before the first and after the last sample, as in
+    scipy.signal.resample_poly.
+
+    :param factor: decimation factor
+    :type factor: int
+
+    :param bank: polyphase filter bank from get_polyphase_bank
+    :type bank: np.ndarray
+
+    """
+
+    def __init__(self, factor, bank):
+        self.factor = int(factor)
+        self.bank = bank
+        self.n_phases = bank.shape[1]
+        # the filters from get_stage_filter have 2 * k * factor + 1 taps
+        self.half_len = (self.n_phases - 1) * self.factor // 2
+
+        self._buffer = np.zeros(self.half_len, dtype=bank.dtype)
+        # absolute sample index of the first sample in the buffer
+        self._offset = -self.half_len
+        self.n_in = 0
+        self.n_out = 0
+
+    def _compute(self, last):
+        """
+        compute output samples n_out to last inclusive from the buffer
+        """
+        if last < self.n_out:
+            return np.zeros(0, dtype=self._buffer.dtype)
+
+        n_samples = last - self.n_out + 1
+        n_frames = n_samples + self.n_phases - 1
+        start = self.n_out * self.factor - self.half_len - self._offset
+        frames = self._buffer[start:start + n_frames * self.factor]
+        if frames.size < n_frames * self.factor:
+            # the taps past the end of the filter are zero
+            frames = np.concatenate((frames,
+                                     np.zeros(n_frames * self.factor -
+                                              frames.size,
+                                              dtype=frames.dtype)))
+
+        # output sample i is the sum over phases j of frame i + j times
+        # phase j, so sum the diagonals of the frame-phase products
+        products = np.dot(frames.reshape(n_frames, self.factor), self.bank)
+        y = products[0:n_samples, 0].copy()
+        for jj in range(1, self.n_phases):
+            y += products[jj:jj + n_samples, jj]
+
+        self.n_out = last + 1
+        # keep only what is needed for the next output sample
+        keep = self.n_out * self.factor - self.half_len - self._offset
+        self._buffer = self._buffer[keep:]
+        self._offset += keep
+
+        return y
+
+    def process(self, data):
+        """
+        Push a block of samples through the stage.
+
+        :param data: new samples
+        :type data: np.ndarray
+
+        :returns: decimated samples that can be computed so far
+        """
+        data = np.asarray(data, dtype=self._buffer.dtype)
+        self._buffer = np.concatenate((self._buffer, data))
+        self.n_in += data.size
+
+        return self._compute((self.n_in - 1 - self.half_len) // self.factor)
+
+    def flush(self):
+        """
+        Compute the remaining output samples padding the end with zeros.
+
+        :returns: last decimated samples
+        """
+        self._buffer = np.concatenate((self._buffer,
+                                       np.zeros(self.half_len + 1,
+                                                dtype=self._buffer.dtype)))
+
+        return self._compute(get_decimated_length(self.n_in, self.factor) - 1)
+
+
+class Decimator(object):
+    """
+    Streaming multi-stage decimator.
+
+    Blocks of data of any length can be pushed through with process, the
+    output of all the calls to process followed by flush is identical to
+    decimating the whole time series in one go.
+
+    :param dec_factor: total decimation factor
+    :type dec_factor: int
+
+    :param dtype: data type the computation is done in
+    :type dtype: string
+
+    :param max_stage: largest factor for a single stage
+    :type max_stage: int
+
+    :Example: ::
+
+        >>> import mtpy.processing.decimate as decimate
+        >>> dec = decimate.Decimator(1024)
+        >>> out = [dec.process(block) for block in blocks]
+        >>> out.append(dec.flush())
+        >>> decimated = np.concatenate(out)
+
+    """
+
+    def __init__(self, dec_factor, dtype='float32', max_stage=MAX_STAGE_FACTOR):
+        self.dec_factor = int(dec_factor)
+        self.dtype = np.dtype(dtype)
+        self.stages = [DecimationStage(factor, h) for factor, h in
+                       get_filter_bank(self.dec_factor, self.dtype.name,
+                                       max_stage)]
+
+    def process(self, data):
+        """
+        Push a block of samples through all the stages.
+
+        :returns: decimated samples that can be computed so far
+        """
+        data = np.asarray(data, dtype=self.dtype)
+        for stage in self.stages:
+            data = stage.process(data)
+
+        return data
+
+    def flush(self):
+        """
+        Flush all the stages.
+
+        :returns: last decimated samples
+        """
+        data = np.zeros(0, dtype=self.dtype)
+        for stage in self.stages:
+            data = np.concatenate((stage.process(data), stage.flush()))
+
+        return data
+
+
+def decimate(data, dec_factor, chunk_size=CHUNK_SIZE, dtype='float32',
+             max_stage=MAX_STAGE_FACTOR):
+    """
+    Decimate a time series with a multi-stage polyphase FIR filter.
+
+    The output has ceil(n / dec_factor) samples and its first sample is at
+    the time of the first input sample.
+
+    :param data: time series
+    :type data: np.ndarray
+
+    :param dec_factor: decimation factor
+    :type dec_factor: int
+
+    :param chunk_size: number of input samples to process at a time
+    :type chunk_size: int
+
+    :param dtype: data type the computation is done in
+    :type dtype: string
+
+    :param max_stage: largest factor for a single stage
+    :type max_stage: int
+
+    :returns: decimated time series
+    :rtype: np.ndarray
+
+    :Example: ::
+
+        >>> import mtpy.processing.decimate as decimate
+        >>> ts_4hz = decimate.decimate(ts_4096hz, 1024)
+
+    """
+    data = np.asarray(data)
+    dec_factor = int(dec_factor)
+    if dec_factor == 1:
+        return data.astype(dtype)
+
+    decimator = Decimator(dec_factor, dtype=dtype, max_stage=max_stage)
+    decimated = np.empty(get_decimated_length(data.size, dec_factor),
+                         dtype=decimator.dtype)
+
+    n_out = 0
+    for index in range(0, data.size, int(chunk_size)):
+        block = decimator.process(data[index:index + int(chunk_size)])
+        decimated[n_out:n_out + block.size] = block
+        n_out += block.size
+    block = decimator.flush()
+    decimated[n_out:n_out + block.size] = block
+
+    return decimated
@@ -18,6 +18,7 @@ import numpy as np
 import  os
 
 import scipy.signal as signal
+import scipy.fftpack as fftpack
 
 #=================================================================
 
@@ -146,12 +147,23 @@ def zero_pad(input_array, power=2, pad_fill=0):
     
 
 def adaptive_notch_filter(bx, df=100, notches=[50, 100], notchradius=.5, 
-                          freqrad=.9, rp=.1, dbstop_limit=5.0):
+                          freqrad=.9, rp=.1, dbstop_limit=5.0, method='fft',
+                          chunk_size=None, kernel_length=None):
     """
     adaptive_notch_filter(bx, df, notches=[50,100], notchradius=.3, freqrad=.9)
     will apply a notch filter to the array bx by finding the nearest peak 
     around the supplied notch locations.  The filter is a zero-phase 
     Chebyshev type 1 bandstop filter with minimal ripples.
+
+    All the peaks are located from one spectrum and all the bandstop
+    filters are removed in a single pass, either by multiplying the
+    spectrum with the combined zero-phase response of the filters
+    (method='fft') or by running the cascade of second order sections 
+    forwards and backwards (method='sos').  For long time series give a
+    chunk_size, then the spectrum used to locate the peaks is averaged over
+    chunks and the filter is applied by overlap-add with a windowed FIR 
+    version of the combined response, so only a chunk is transformed at a
+    time.
     
     Arguments:
     -----------
@@ -179,6 +191,19 @@ def adaptive_notch_filter(bx, df=100, notches=[50, 100], notchradius=.5,
                            above dbstop_limit will be filtered, anything
                            less will not
 
+        **method** : [ 'fft' | 'sos' ]
+                     * 'fft' to filter in the frequency domain
+                     * 'sos' to filter with scipy.signal.sosfiltfilt
+                     
+        **chunk_size** : int
+                         number of samples to transform at a time, only 
+                         used with method 'fft'.  None transforms the
+                         whole time series at once.
+                         
+        **kernel_length** : int
+                            length of the FIR filter used with chunk_size,
+                            defaults to a power of 2 >= 8 * df / notchradius
+
     Outputs:
     ---------
         
@@ -191,7 +216,7 @@ def adaptive_notch_filter(bx, df=100, notches=[50, 100], notchradius=.5,
                       
     ..Example: ::
         
-        >>> import RemovePeriodicNoise_Kate as rmp
+        >>> import mtpy.processing.filter as rmp
         >>> # make a variable for the file to load in
         >>> fn = r"/home/MT/mt01_20130101_000000.BX"
         >>> # load in file, if the time series is not an ascii file
@@ -201,7 +226,7 @@ def adaptive_notch_filter(bx, df=100, notches=[50, 100], notchradius=.5,
         >>> # create a list of frequencies to filter out
         >>> freq_notches = [50, 150, 200]
         >>> # filter data
-        >>> bx_filt, filt_lst = rmp.adaptiveNotchFilter(bx, df=100. 
+        >>> bx_filt, filt_lst = rmp.adaptive_notch_filter(bx, df=100. 
         >>> ...                                         notches=freq_notches)
         >>> #save the filtered data into a file
         >>> np.savetxt(r"/home/MT/Filtered/mt01_20130101_000000.BX", bx_filt)
@@ -221,7 +246,7 @@ def adaptive_notch_filter(bx, df=100, notches=[50, 100], notchradius=.5,
         >>>     os.mkdir(save_path)
         >>> for fn in os.listdir(dirpath):
         >>>     bx = np.loadtxt(os.path.join(dirpath, fn)
-        >>>     bx_filt, filt_lst = rmp.adaptiveNotchFilter(bx, df=100. 
+        >>>     bx_filt, filt_lst = rmp.adaptive_notch_filter(bx, df=100. 
         >>>     ...                                         notches=freq_notches)
         >>>     np.savetxt(os.path.join(save_path, fn), bx_filt)
          
@@ -229,51 +254,263 @@ def adaptive_notch_filter(bx, df=100, notches=[50, 100], notchradius=.5,
     
     bx = np.array(bx)
     
-    if type(notches) is list:
-        notches = np.array(notches)
-    elif type(notches) in [float, int]:
-        notches = np.array([notches], dtype=np.float)
+    notches = np.array(notches, dtype=float).flatten()
     
     df = float(df)         #make sure df is a float
     dt = 1./df             #sampling rate
 
-
     # transform data into frequency domain to find notches
-    BX = np.fft.fft(zero_pad(bx))
-    n = len(BX)            #length of array
+    if chunk_size is None:
+        n = 2**int(np.ceil(np.log2(len(bx))))
+        amp = abs(np.fft.rfft(bx, n))
+    else:
+        chunk_size = int(chunk_size)
+        n = 2**int(np.ceil(np.log2(min(chunk_size, len(bx)))))
+        amp = np.zeros(n//2 + 1)
+        for ii in range(0, len(bx), chunk_size):
+            amp += abs(np.fft.rfft(bx[ii:ii + chunk_size], n))
+        amp /= np.ceil(len(bx)/float(chunk_size))
     dfn = df/n             #frequency step
-    dfnn = int(freqrad/dfn)          #radius of frequency search
-    fn = notchradius               #filter radius
-    freq = np.fft.fftfreq(n,dt)
+
+    filtlst, peaks, dbstops = find_notch_peaks(amp, dfn, notches, freqrad,
+                                               dbstop_limit=dbstop_limit)
+    if len(peaks) == 0:
+        return bx, filtlst
+
+    sos = notch_sos(peaks, dbstops, df, notchradius)
     
-    filtlst = []
-    for notch in notches:
-        if notch > freq.max():
-            break
-            #print 'Frequency too high, skipping {0}'.format(notch)
+    # extend the ends with an odd reflection long enough for the notches 
+    # to ring down, like filtfilt does
+    padlen = min(int(4*df/notchradius), len(bx)-1)
+    if method == 'sos':
+        bx = signal.sosfiltfilt(sos, bx, padlen=padlen)
+    elif method == 'fft':
+        bx_ext = np.concatenate((2*bx[0] - bx[padlen:0:-1], 
+                                 bx, 
+                                 2*bx[-1] - bx[-2:-padlen-2:-1]))
+        if chunk_size is None:
+            n_ext = fftpack.next_fast_len(len(bx_ext))
+            freq = np.fft.rfftfreq(n_ext, dt)
+            response = sos_power_response(sos, freq, df)
+            bx_ext = np.fft.irfft(np.fft.rfft(bx_ext, n_ext)*response, n_ext)
         else:
-            fspot = int(round(notch/dfn))
-            nspot = np.where(abs(BX)== max(abs(BX[max([fspot-dfnn, 0]):\
-                                                 min([fspot+dfnn, n])])))[0][0]   
-
-            med_bx =np.median(abs(BX[max([nspot-dfnn*10, 0]):\
-                                     min([nspot+dfnn*10, n])])**2)
-            
-            #calculate difference between peak and surrounding spectra in dB
-            dbstop = 10*np.log10(abs(BX[nspot])**2/med_bx) 
-            if np.nan_to_num(dbstop) == 0.0 or dbstop < dbstop_limit:
-                filtlst.append('No need to filter \n')
-                pass
-            else:
-                filtlst.append([freq[nspot], dbstop])
-                ws = 2*np.array([freq[nspot]-fn, freq[nspot]+fn])/df
-                wp = 2*np.array([freq[nspot]-2*fn, freq[nspot]+2*fn])/df
-                ford, wn = signal.cheb1ord(wp, ws, 1, dbstop)
-                b, a = signal.cheby1(1, .5, wn, btype='bandstop')
-                bx = signal.filtfilt(b, a, bx)
+            if kernel_length is None:
+                kernel_length = 2**int(np.ceil(np.log2(8*df/notchradius)))
+            freq = np.fft.rfftfreq(kernel_length, dt)
+            response = sos_power_response(sos, freq, df)
+            kernel = np.fft.fftshift(np.fft.irfft(response, kernel_length))
+            kernel *= tukey(kernel_length)
+            bx_ext = overlap_add(bx_ext, kernel, chunk_size)
+        bx = bx_ext[padlen:padlen+len(bx)]
+    else:
+        raise ValueError('method must be fft or sos, not {0}'.format(method))
     
     return bx, filtlst
 
+def find_notch_peaks(amp, dfn, notches, freqrad, dbstop_limit=5.0):
+    """
+    find the spectral peak nearest to each notch frequency and how far it
+    sticks out of the surrounding spectra.
+    
+    All notches are searched at once by indexing the spectrum with a window
+    of indices about each notch.  Notches at or above the highest frequency
+    of the spectrum are skipped along with all notches after them.
+    
+    Arguments:
+    -----------
+        **amp** : np.ndarray
+                  amplitude spectrum of the positive frequencies as 
+                  computed by abs(np.fft.rfft(bx, n)) with n even
+                  
+        **dfn** : float
+                  frequency step of the spectrum (Hz)
+                  
+        **notches** : np.ndarray
+                      frequencies to look for peaks about (Hz)
+                      
+        **freqrad** : float
+                      radius to search for the peak about each notch (Hz)
+                      
+        **dbstop_limit** : float (in decibels)
+                           peaks that stick out less than this are not 
+                           filtered
+
+    Outputs:
+    ---------
+        **filtlst** : list
+                      [frequency, dbstop] of each peak to filter or 
+                      'No need to filter' for each notch that is not 
+                      filtered.
+                      
+        **peaks** : np.ndarray
+                    frequencies of the peaks to filter (Hz)
+                    
+        **dbstops** : np.ndarray
+                      power difference between peaks and the median power
+                      about them (dB)
+    """
+    n_amp = len(amp)
+    n = 2*(n_amp-1)      #length of the full spectrum
+    notches = np.array(notches, dtype=float).flatten()
+    too_high = np.nonzero(notches >= (n_amp-1)*dfn)[0]
+    if len(too_high) > 0:
+        notches = notches[0:too_high[0]]
+    if len(notches) == 0:
+        return [], np.zeros(0), np.zeros(0)
+    
+    def _window_amp(index, fill):
+        # amplitude at indices of the full spectrum, negative frequencies 
+        # are the mirror of the positive ones for a real time series
+        valid = (index >= 0) & (index < n)
+        index = np.clip(index, 0, n-1)
+        index = np.where(index >= n_amp, n-index, index)
+        return np.where(valid, amp[index], fill)
+    
+    dfnn = max(int(freqrad/dfn), 1)  #radius of frequency search
+    fspot = np.round(notches/dfn).astype(int)
+    
+    # find the peak in the window about each notch
+    search = fspot[:, np.newaxis] + np.arange(-dfnn, dfnn)
+    search_amp = _window_amp(search, -np.inf)
+    nspot = search[np.arange(len(fspot)), np.argmax(search_amp, axis=1)]
+    nspot = np.where(nspot >= n_amp, n-nspot, nspot)
+    
+    # median power about each peak
+    around = nspot[:, np.newaxis] + np.arange(-dfnn*10, dfnn*10)
+    med_bx = np.nanmedian(_window_amp(around, np.nan)**2, axis=1)
+    
+    #calculate difference between peak and surrounding spectra in dB
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dbstops = 10*np.log10(amp[nspot]**2/med_bx)
+    keep = (np.nan_to_num(dbstops) != 0.0) & (dbstops >= dbstop_limit)
+    
+    filtlst = [[nspot[ii]*dfn, dbstops[ii]] if keep[ii] else
+               'No need to filter \n' for ii in range(len(nspot))]
+    
+    return filtlst, nspot[keep]*dfn, dbstops[keep]
+
+def notch_sos(peaks, dbstops, df, notchradius):
+    """
+    second order sections of the bandstop filters about each peak, 
+    one Chebyshev type 1 bandstop filter per peak.
+
+    Arguments:
+    -----------
+        **peaks** : np.ndarray
+                    frequencies to filter (Hz)
+                    
+        **dbstops** : np.ndarray
+                      attenuation to design each filter for (dB)
+                      
+        **df** : float
+                 sampling frequency in Hz
+                 
+        **notchradius** : float
+                          radius of the notch in frequency domain (Hz)
+    
+    Outputs:
+    ---------
+        **sos** : np.ndarray(n_peaks, 6)
+                  second order sections for scipy.signal.sosfilt
+    """
+    fn = notchradius
+    sos = []
+    for fpeak, dbstop in zip(peaks, dbstops):
+        ws = 2*np.array([fpeak-fn, fpeak+fn])/df
+        wp = 2*np.array([fpeak-2*fn, fpeak+2*fn])/df
+        ford, wn = signal.cheb1ord(wp, ws, 1, dbstop)
+        sos.append(signal.cheby1(1, .5, wn, btype='bandstop', output='sos'))
+    
+    return np.vstack(sos)
+
+def sos_power_response(sos, freq, df):
+    """
+    power response |H(f)|**2 of a cascade of second order sections, which
+    is the response of the sections applied forwards and backwards.  
+    
+    Uses |b0 + b1*z + b2*z**2|**2 = b0**2 + b1**2 + b2**2 + 
+    2*(b0*b1 + b1*b2)*cos(w) + 2*b0*b2*cos(2*w) on the unit circle so only
+    real arithmetic is needed.
+
+    Arguments:
+    -----------
+        **sos** : np.ndarray(n_sections, 6)
+                  second order sections
+                  
+        **freq** : np.ndarray
+                   frequencies to evaluate the response at (Hz)
+                   
+        **df** : float
+                 sampling frequency in Hz
+    
+    Outputs:
+    ---------
+        **response** : np.ndarray
+                       power response at freq
+    """
+    w = 2*np.pi*np.asarray(freq, dtype=float)/df
+    cos_w = np.cos(w)
+    cos_2w = np.cos(2*w)
+    
+    response = np.ones(len(cos_w))
+    num = np.empty(len(cos_w))
+    den = np.empty(len(cos_w))
+    for b0, b1, b2, a0, a1, a2 in sos:
+        for poly, c0, c1, c2 in [(num, b0**2+b1**2+b2**2, 2*(b0*b1+b1*b2), 
+                                  2*b0*b2),
+                                 (den, a0**2+a1**2+a2**2, 2*(a0*a1+a1*a2), 
+                                  2*a0*a2)]:
+            np.multiply(cos_2w, c2, out=poly)
+            poly += c0
+            poly += c1*cos_w
+        response *= num
+        response /= den
+    
+    return response
+
+def overlap_add(bx, kernel, chunk_size):
+    """
+    convolve bx with a centered FIR kernel by overlap-add, transforming
+    chunk_size samples at a time.  The output is the same length as bx and
+    aligned with it, like np.convolve(bx, kernel, mode='same').
+    
+    Arguments:
+    -----------
+        **bx** : np.ndarray
+                 time series
+                 
+        **kernel** : np.ndarray
+                     FIR filter centered on len(kernel)//2
+                     
+        **chunk_size** : int
+                         number of samples to convolve at a time
+                         
+    Outputs:
+    ---------
+        **bx_filt** : np.ndarray
+                      filtered time series
+    """
+    n_bx = len(bx)
+    n_kernel = len(kernel)
+    center = n_kernel//2
+    chunk_size = int(chunk_size)
+    
+    nfft = 2**int(np.ceil(np.log2(chunk_size+n_kernel-1)))
+    KERNEL = np.fft.rfft(kernel, nfft)
+    
+    bx_filt = np.zeros(n_bx)
+    for ii in range(0, n_bx, chunk_size):
+        chunk = bx[ii:ii+chunk_size]
+        conv = np.fft.irfft(np.fft.rfft(chunk, nfft)*KERNEL, 
+                            nfft)[0:len(chunk)+n_kernel-1]
+        # conv[jj] belongs at ii + jj - center
+        start = ii - center
+        jj0 = max(0, -start)
+        jj1 = min(len(conv), n_bx-start)
+        bx_filt[start+jj0:start+jj1] += conv[jj0:jj1]
+    
+    return bx_filt
+
 def remove_periodic_noise(filename, dt, noiseperiods, save='n'):
     """
     removePeriodicNoise will take a window of length noise period and 
@@ -6,6 +6,11 @@ Functions for the time-frequency analysis of time series data.
 
 Output can be visualised with the help of mtpy/imaging/spectrogram.py
 
+The distributions are computed for all time windows at once: the windows
+are taken as a strided view of the time series (tf_windows) and Fourier
+transformed along an axis in blocks of windows (tf_chunks, batched_fft),
+so the memory used is capped by chunk_bytes.
+
 JP, 2013
 
 """
@@ -14,7 +19,11 @@ JP, 2013
 
 import numpy as np
 import scipy.signal as sps
+from numpy.lib.stride_tricks import as_strided
 
+# =================================================================
+# maximum number of bytes of windowed data held in memory at a time
+TF_CHUNK_BYTES = 2 ** 22
 
 # =================================================================
 
@@ -62,9 +71,9 @@ def padzeros(f, npad=None, pad_pattern=None):
         power = np.log2(n)
         fpow = np.floor(power)
         if power != fpow:
-            npad = 2 ** (fpow + 1)
+            npad = int(2 ** (fpow + 1))
         else:
-            npad = 2 ** power
+            npad = int(2 ** power)
 
     else:
         pass
@@ -306,7 +315,177 @@ def wvd_analytic_signal(fx):
     return fxa
 
 
-def stft(fx, nh=2 ** 8, tstep=2 ** 7, ng=1, df=1.0, nfbins=2 ** 10):
+def tf_windows(fx, nh, tlst):
+    """
+    Make a view of the time series as an array of windows, one row for
+    each time instance, without copying any data.
+
+    Arguments:
+    ----------
+        **fx** : np.ndarray
+                 time series, can be complex
+
+        **nh** : int
+                 window length
+
+        **tlst** : np.ndarray
+                   evenly spaced indices of the first sample of each window
+
+    Returns:
+    --------
+        **windows** : np.ndarray(len(tlst), nh)
+                      read only view where windows[ii] = fx[tlst[ii]:tlst[ii]+nh]
+    """
+    fx = np.asarray(fx)
+    tlst = np.asarray(tlst, dtype='int')
+    nh = int(nh)
+    nt = len(tlst)
+    if nt == 0:
+        return np.zeros((0, nh), dtype=fx.dtype)
+
+    if nt > 1:
+        tstep = tlst[1] - tlst[0]
+        if tstep < 1 or np.any(np.diff(tlst) != tstep):
+            raise ValueError('window indices must be evenly spaced')
+    else:
+        tstep = 1
+    if tlst[0] < 0 or tlst[-1] + nh > fx.shape[0]:
+        raise ValueError('windows extend past the ends of the time series')
+
+    return as_strided(fx[tlst[0]:], shape=(nt, nh),
+                      strides=(tstep * fx.strides[0], fx.strides[0]),
+                      writeable=False)
+
+
+def tf_chunks(nt, row_bytes, chunk_bytes=TF_CHUNK_BYTES):
+    """
+    Split nt time windows into blocks that take up at most chunk_bytes
+    when a single window takes up row_bytes.  A block always has at least
+    one window.
+
+    Arguments:
+    ----------
+        **nt** : int
+                 number of time windows
+
+        **row_bytes** : int
+                        number of bytes needed for a single window
+
+        **chunk_bytes** : int
+                          maximum number of bytes for a block of windows
+
+    Returns:
+    --------
+        generator of slices into the time windows
+    """
+    nrows = max(1, int(chunk_bytes // max(row_bytes, 1)))
+    for start in range(0, nt, nrows):
+        yield slice(start, min(start + nrows, nt))
+
+
+def batched_fft(windows, nfbins, h=None, nf=None, chunk_bytes=TF_CHUNK_BYTES):
+    """
+    Fourier transform every window, multiplied by the taper h and padded
+    with zeros to nfbins, along the window axis.  Real windows are
+    transformed with rfft, complex ones with fft.
+
+    Arguments:
+    ----------
+        **windows** : np.ndarray(nt, nh)
+                      time windows, usually from tf_windows
+
+        **nfbins** : int (should be power of 2 and equal or larger than nh)
+                     number of frequency bins
+
+        **h** : np.ndarray(nh)
+                taper applied to each window, *default* is None
+
+        **nf** : int
+                 number of Fourier coefficients to keep
+                 *default* is nfbins/2, the positive frequencies
+
+        **chunk_bytes** : int
+                          maximum number of bytes transformed at a time
+
+    Returns:
+    --------
+        **spec** : np.ndarray(nt, nf)
+                   Fourier coefficients of each window
+    """
+    nt = windows.shape[0]
+    if nf is None:
+        nf = nfbins // 2
+    if np.iscomplexobj(windows) or np.iscomplexobj(h):
+        fft = np.fft.fft
+    else:
+        fft = np.fft.rfft
+
+    spec = np.zeros((nt, nf), dtype='complex')
+    for tslice in tf_chunks(nt, 32 * nfbins, chunk_bytes):
+        block = windows[tslice]
+        if h is not None:
+            block = block * h
+        spec[tslice] = fft(block, n=nfbins, axis=1)[:, :nf]
+
+    return spec
+
+
+def smooth_frequency(spec, g):
+    """
+    Smooth each row of spec in frequency with the window g, the same as
+    np.convolve(padzeros(row, npad=len(row) + len(g) - 1), g, 'valid') for
+    every row.
+
+    Arguments:
+    ----------
+        **spec** : np.ndarray(nt, nf)
+                   Fourier coefficients of each time window
+
+        **g** : np.ndarray(ng)
+                smoothing window
+
+    Returns:
+    --------
+        **sspec** : np.ndarray(nt, nf)
+                    smoothed Fourier coefficients
+    """
+    nt, nf = spec.shape
+    ng = len(g)
+    spad = np.zeros((nt, nf + ng - 1), dtype=spec.dtype)
+    spad[:, :nf] = spec
+    sspec = np.zeros_like(spec)
+    for kk in range(ng):
+        sspec += g[kk] * spad[:, ng - 1 - kk:ng - 1 - kk + nf]
+
+    return sspec
+
+
+def _nonzero(norm):
+    """
+    replace zeros in an array of window sums by 1 so empty windows give 0
+    """
+    return np.where(norm == 0, 1, norm)
+
+
+def _convolve_same(f, g):
+    """
+    convolve the last axis of f with g, the same as np.convolve(g, f, 'same')
+    along that axis when f is longer than g
+    """
+    n = f.shape[-1]
+    ng = len(g)
+    fpad = np.zeros(f.shape[:-1] + (n + 2 * (ng - 1),), dtype=f.dtype)
+    fpad[..., ng - 1:ng - 1 + n] = f
+    start = (ng - 1) // 2
+    fconv = np.zeros_like(f)
+    for kk in range(ng):
+        fconv += g[kk] * fpad[..., start + ng - 1 - kk:start + ng - 1 - kk + n]
+
+    return fconv
+
+
+def stft(fx, nh=2 ** 8, tstep=2 ** 7, ng=1, df=1.0, nfbins=2 ** 10,
+         chunk_bytes=TF_CHUNK_BYTES):
     """
     calculate the spectrogam of the given function by calculating the fft of
     a window of length nh at each time instance with an interval of tstep.
@@ -337,6 +516,10 @@ def stft(fx, nh=2 ** 8, tstep=2 ** 7, ng=1, df=1.0, nfbins=2 ** 10):
         **nfbins** : int (should be power of 2 and equal or larger than nh)
                      number of frequency bins
 
+        **chunk_bytes** : int
+                          maximum number of bytes of windows transformed
+                          at a time *default* is TF_CHUNK_BYTES
+
     Returns:
     --------
         **tfarray** : np.ndarray(nfbins/2, len(fx)/tstep)
@@ -388,35 +571,131 @@ def stft(fx, nh=2 ** 8, tstep=2 ** 7, ng=1, df=1.0, nfbins=2 ** 10):
     # get only positive frequencies
     flst = np.fft.fftfreq(nfbins, 1 / df)[0:int(nfbins / 2)]
 
-    # initialize the TFD array
-    tfarray = np.zeros((int(nfbins / 2), len(tlst)), dtype='complex128')
-
     # calculate the analytic signal to fold negative frequencies onto the
     # positive ones
     fa = sps.hilbert(dctrend(fx))
 
-    # compute the fft at each window instance
-    for place, ii in enumerate(tlst):
-        fxwin = fa[ii:ii + nh] * h
-
-        # get only positive frequencies
-        FXwin = np.fft.fft(padzeros(fxwin, npad=nfbins))[:int(nfbins / 2)]
+    # compute the fft of all the windows, get only positive frequencies
+    FXwin = batched_fft(tf_windows(fa, nh, tlst), nfbins, h=h,
+                        chunk_bytes=chunk_bytes)
 
-        # smooth in frequency plane
-        if ng != 1:
-            FXwin = np.convolve(padzeros(FXwin, npad=len(FXwin) + ng - 1), g,
-                                'valid')
-        else:
-            pass
+    # smooth in frequency plane
+    if ng != 1:
+        FXwin = smooth_frequency(FXwin, g)
+    else:
+        pass
 
-        # pull out only positive quadrant, flip array for plotting
-        tfarray[:, place] = FXwin[::-1]
+    # pull out only positive quadrant, flip array for plotting
+    tfarray = np.ascontiguousarray(FXwin[:, ::-1].T)
 
     return tfarray, tlst, flst
 
 
+def reassignment_spectra(fx, h, th, dh, tlst, nfbins,
+                         chunk_bytes=TF_CHUNK_BYTES):
+    """
+    Compute the spectrograms with the window h, the time ramped window th
+    and the derivative window dh needed to reassign a spectrogram.  The
+    windows are centred on each time instance and cut off at the ends of
+    the time series.
+
+    Arguments:
+    ----------
+        **fx** : np.ndarray
+                 time series
+
+        **h, th, dh** : np.ndarray(nh)
+                        window, ramped window and derivative of the window,
+                        nh should be odd
+
+        **tlst** : np.ndarray
+                   time instances of the window centres
+
+        **nfbins** : int (should be power of 2 and equal or larger than nh)
+                     number of frequency bins
+
+        **chunk_bytes** : int
+                          maximum number of bytes transformed at a time
+
+    Returns:
+    --------
+        **spech, specth, specdh** : np.ndarray(nfbins/2, len(tlst))
+                                    the upper half of each spectrogram
+    """
+    nx = len(fx)
+    nt = len(tlst)
+    lh = (len(h) - 1) // 2
+    maxlag = min(np.round(nx / 2.), lh)
+
+    # time shift list and the frequency spots each shift goes into
+    tau = np.arange(start=-lh, stop=lh + 1, step=1)
+    ff = np.remainder(nfbins + tau, nfbins)
+
+    specs = [np.zeros((nfbins // 2, nt), dtype='complex') for ii in range(3)]
+    for tslice in tf_chunks(nt, 64 * nfbins, chunk_bytes):
+        tt = tlst[tslice, None]
+        # only the shifts that stay inside the time series
+        valid = (tau >= -np.minimum(maxlag, tt - 1)) & \
+                (tau <= np.minimum(maxlag, nx - tt - 1))
+        xwin = np.where(valid, fx.take(tt + tau, mode='wrap'), 0)
+        normh = np.sqrt(np.sum(valid * abs(h) ** 2, axis=1))[:, None]
+        for win, spec in zip([h, th, dh], specs):
+            tfr = np.zeros((xwin.shape[0], nfbins), dtype='complex')
+            tfr[:, ff] = xwin * win.conj() / normh
+            spec[:, tslice] = np.fft.fft(tfr, axis=1)[:, nfbins // 2:].T
+
+    return specs
+
+
+def reassign(spec, twspec, dwspec, threshold, moved, kept):
+    """
+    Reassign a time-frequency distribution to the centres of gravity of
+    the spectrogram.
+
+    Arguments:
+    ----------
+        **spec** : np.ndarray(nf, nt)
+                   spectrogram used to estimate the reassignment
+
+        **twspec** : np.ndarray(nf, nt)
+                     time shift of the centre of gravity in time steps
+
+        **dwspec** : np.ndarray(nf, nt)
+                     frequency shift of the centre of gravity in bins
+
+        **threshold** : float
+                        points where abs(spec) is above threshold are
+                        reassigned, the others are kept where they are
+
+        **moved** : np.ndarray(nf, nt)
+                    values added at the reassigned points
+
+        **kept** : np.ndarray(nf, nt)
+                   values added at the points that are not reassigned
+
+    Returns:
+    --------
+        **rtfarray** : np.ndarray(nf, nt)
+                       reassigned distribution
+    """
+    nf, nt = spec.shape
+    rtfarray = np.zeros((nf, nt), dtype=np.result_type(moved, kept))
+
+    move = abs(spec) > threshold
+    kk, nn = np.nonzero(move)
+    # get center of gravity index in time direction
+    nhat = np.clip(nn + twspec[move].astype('int'), 1, nt - 1)
+    # get center of gravity index in frequency direction
+    khat = np.remainder((kk - dwspec[move]).astype('int') - 1, nf)
+    # reassign energy, several points can go to the same place
+    np.add.at(rtfarray, (khat, nhat), moved[move])
+    rtfarray[~move] += kept[~move]
+
+    return rtfarray
+
+
 def reassigned_stft(fx, nh=2 ** 6 - 1, tstep=2 ** 5, nfbins=2 ** 10, df=1.0, alpha=4,
-                    threshold=None):
+                    threshold=None, chunk_bytes=TF_CHUNK_BYTES):
     """
     Computes the reassigned spectrogram by estimating the center of gravity of
     the signal and condensing dispersed energy back to that location.  Works
@@ -453,6 +732,10 @@ def reassigned_stft(fx, nh=2 ** 6 - 1, tstep=2 ** 5, nfbins=2 ** 10, df=1.0, alp
                         If None the threshold is automatically calculated
                         *default* is None
 
+        **chunk_bytes** : int
+                          maximum number of bytes of windows transformed
+                          at a time *default* is TF_CHUNK_BYTES
+
     Returns:
         **rtfarray** : np.ndarray(nfbins/2, len(fx)/tstep)
                        reassigned spectrogram in units of amplitude
@@ -481,7 +764,7 @@ def reassigned_stft(fx, nh=2 ** 6 - 1, tstep=2 ** 5, nfbins=2 ** 10, df=1.0, alp
 
     # compute gaussian window
     h = gausswin(nh, alpha=alpha)
-    lh = (nh - 1) / 2
+    lh = (nh - 1) // 2
 
     # compute ramp window
     th = h * np.arange(start=-lh, stop=lh + 1, step=1)
@@ -494,74 +777,32 @@ def reassigned_stft(fx, nh=2 ** 6 - 1, tstep=2 ** 5, nfbins=2 ** 10, df=1.0, alp
     nt = len(tlst)
 
     # make a frequency list
-    flst = np.fft.fftfreq(nfbins, 1. / df)[nfbins / 2:]
-    return_flst = np.fft.fftfreq(nfbins, 1. / df)[0:nfbins / 2]
-
-    # initialize some time-frequency arrays
-    tfr = np.zeros((nfbins, nt), dtype='complex')
-    tf2 = np.zeros((nfbins, nt), dtype='complex')
-    tf3 = np.zeros((nfbins, nt), dtype='complex')
-
-    # compute components for reassignment
-    for ii, tt in enumerate(tlst):
-        # create a time shift list
-        tau = np.arange(start=-min([np.round(nx / 2.), lh, tt - 1]),
-                        stop=min([np.round(nx / 2.), lh, nx - tt - 1]) + 1)
-        # compute the frequency spots to be calculated
-        ff = np.remainder(nfbins + tau, nfbins)
-        xlst = tt + tau
-        hlst = lh + tau
-        normh = np.sqrt(np.sum(abs(h[hlst]) ** 2))
-        tfr[ff, ii] = fx[xlst] * h[hlst].conj() / normh
-        tf2[ff, ii] = fx[xlst] * th[hlst].conj() / normh
-        tf3[ff, ii] = fx[xlst] * dh[hlst].conj() / normh
-
-    # compute Fourier Transform
-    spec = np.fft.fft(tfr, axis=0)
-    spect = np.fft.fft(tf2, axis=0)
-    specd = np.fft.fft(tf3, axis=0)
+    return_flst = np.fft.fftfreq(nfbins, 1. / df)[0:nfbins // 2]
 
-    # get only positive frequencies
-    spec = spec[nfbins / 2:, :]
-    spect = spect[nfbins / 2:, :]
-    specd = specd[nfbins / 2:, :]
+    # compute components for reassignment, only the positive frequencies
+    spec, spect, specd = reassignment_spectra(fx, h, th, dh, tlst, nfbins,
+                                              chunk_bytes=chunk_bytes)
 
     # check to make sure no spurious zeros floating around
     spec[np.where(abs(spec) < 1.E-6)] = 0.0
     zerofind = np.nonzero(abs(spec))
-    twspec = np.zeros((nfbins / 2, nt), dtype='float')
-    dwspec = np.zeros((nfbins / 2, nt), dtype='float')
+    twspec = np.zeros((nfbins // 2, nt), dtype='float')
+    dwspec = np.zeros((nfbins // 2, nt), dtype='float')
     twspec[zerofind] = np.round(np.real(spect[zerofind] / spec[zerofind]) / 1)
     dwspec[zerofind] = np.round(np.imag((nfbins / 2.) *
                                         specd[zerofind] / spec[zerofind]) / (np.pi))
 
-    # compute reassignment
-    rtfarray = np.zeros_like(spec)
-
     if threshold is None:
         threshold = 1.E-4 * np.mean(fx[tlst])
 
-    for nn in range(nt):
-        for kk in range(nfbins / 2):
-            if abs(spec[kk, nn]) > threshold:
-                # get center of gravity index in time direction
-                nhat = int(nn + twspec[kk, nn])
-                nhat = int(min([max([nhat, 1]), nt - 1]))
-                # get center of gravity index in frequency direction
-                khat = int(kk - dwspec[kk, nn])
-                khat = int(np.remainder(np.remainder(khat - 1, nfbins / 2) + nfbins / 2,
-                                        nfbins / 2))
-                # reassign energy
-                rtfarray[khat, nhat] = rtfarray[khat, nhat] + spec[kk, nn]
-                spect[kk, nn] = khat + 1j * nhat
-            else:
-                spect[kk, nn] = np.inf * (1 + 1j)
-                rtfarray[kk, nn] = rtfarray[kk, nn] + spec[kk, nn]
+    # compute reassignment
+    rtfarray = reassign(spec, twspec, dwspec, threshold, spec, spec)
 
     return rtfarray, tlst, return_flst, spec
 
 
-def wvd(fx, nh=2 ** 8 - 1, tstep=2 ** 5, nfbins=2 ** 10, df=1.0):
+def wvd(fx, nh=2 ** 8 - 1, tstep=2 ** 5, nfbins=2 ** 10, df=1.0,
+        chunk_bytes=TF_CHUNK_BYTES):
     """
     calculates the Wigner-Ville distribution of f.
 
@@ -587,6 +828,10 @@ def wvd(fx, nh=2 ** 8 - 1, tstep=2 ** 5, nfbins=2 ** 10, df=1.0):
         **nfbins** : int (should be power of 2 and equal or larger than nh)
                      number of frequency bins
 
+        **chunk_bytes** : int
+                          maximum number of bytes of windows transformed
+                          at a time *default* is TF_CHUNK_BYTES
+
     Returns:
     --------
         **tfarray** : np.ndarray(nfbins/2, len(fx)/tstep)
@@ -612,14 +857,12 @@ def wvd(fx, nh=2 ** 8 - 1, tstep=2 ** 5, nfbins=2 ** 10, df=1.0):
         fm = 1
 
     if fm > 1:
-        fn = fn[0]
         print('computing cross spectra')
         # compute the analytic signal of function f and dctrend
         fa = wvd_analytic_signal(fx[0])
         fb = wvd_analytic_signal(fx[1])
     else:
         # compute the analytic signal of function f and dctrend
-        fa = wvd_analytic_signal(fx)
         fa = sps.hilbert(dctrend(fx))
         fb = fa.copy()
 
@@ -628,7 +871,7 @@ def wvd(fx, nh=2 ** 8 - 1, tstep=2 ** 5, nfbins=2 ** 10, df=1.0):
     df = float(df)
     dt = 1. / df
     # time shift
-    tau = (nh - 1) / 2
+    tau = (nh - 1) // 2
 
     # create a time array such that the first point is centered on time window
     tlst = np.arange(start=0, stop=fn - 1, step=tstep, dtype='int')
@@ -637,24 +880,28 @@ def wvd(fx, nh=2 ** 8 - 1, tstep=2 ** 5, nfbins=2 ** 10, df=1.0):
     tfarray = np.zeros((nfbins, len(tlst)), dtype='complex')
 
     # create a frequency array with just positive frequencies
-    flst = np.fft.fftfreq(nfbins, dt)[0:nfbins / 2]
+    flst = np.fft.fftfreq(nfbins, dt)[0:nfbins // 2]
+
+    # index of each element of the correlation function, the function is
+    # put in reversed at the end of the frequency axis
+    klst = np.arange(2 * tau + 1)
 
-    # calculate pseudo WV
-    for point, nn in enumerate(tlst):
+    # calculate pseudo WV for a block of time instances at a time
+    for tslice in tf_chunks(len(tlst), 64 * nfbins, chunk_bytes):
+        nn = tlst[tslice, None]
         # calculate the smallest timeshift possible
-        tau_min = min(nn, tau, fn - nn - 1)
-        # make a timeshift array
-        tau_lst = np.arange(start=-tau_min, stop=tau_min + 1, step=1,
-                            dtype='int')
+        tau_min = np.minimum(np.minimum(nn, tau), fn - nn - 1)
         # calculate rectangular windowed correlation function of analytic
-        # signal
-        Rnn = 4 * np.conjugate(fa[nn - tau_lst]) * fb[nn + tau_lst]
-        # calculate fft of windowed correlation function
-        # put into tfarray
-        tfarray[:, point] = padzeros(Rnn, npad=nfbins)[::-1]
+        # signal, zero outside of the time shifts possible
+        Rnn = np.where(klst <= 2 * tau_min,
+                       4 * np.conjugate(fa.take(nn + tau_min - klst,
+                                                mode='wrap')) *
+                       fb.take(nn - tau_min + klst, mode='wrap'), 0)
+        tfwin = np.zeros((Rnn.shape[0], nfbins), dtype='complex')
+        tfwin[:, nfbins - 1 - klst] = Rnn
+        # compute Fourier Transform of the correlation functions
+        tfarray[:, tslice] = np.fft.fft(tfwin, axis=1).T
 
-    # compute Fourier Transform of array along the time axis
-    tfarray = np.fft.fft(tfarray, axis=0)
     # normalize
     tfarray = tfarray / nh
 
@@ -662,7 +909,7 @@ def wvd(fx, nh=2 ** 8 - 1, tstep=2 ** 5, nfbins=2 ** 10, df=1.0):
 
 
 def spwvd(fx, tstep=2 ** 5, nfbins=2 ** 10, df=1.0, nh=None, ng=None, sigmat=None,
-          sigmaf=None):
+          sigmaf=None, chunk_bytes=TF_CHUNK_BYTES):
     """
     Calculates the smoothed pseudo Wigner-Ville distribution for an array
     fx. Smoothed with Gaussians windows to get best localization.
@@ -700,6 +947,10 @@ def spwvd(fx, tstep=2 ** 5, nfbins=2 ** 10, df=1.0, nh=None, ng=None, sigmat=Non
                      std of window g, ie full width half max of gaussian
                      *default* is None and sigmaf is calculate automatically
 
+        **chunk_bytes** : int
+                          maximum number of bytes of windows transformed
+                          at a time *default* is TF_CHUNK_BYTES
+
     Returns:
     --------
         **tfarray** : np.ndarray(nfbins/2, len(fx)/tstep)
@@ -731,7 +982,6 @@ def spwvd(fx, tstep=2 ** 5, nfbins=2 ** 10, df=1.0, nh=None, ng=None, sigmat=Non
 
     else:
         # compute the analytic signal of function f and dctrend
-        fa = wvd_analytic_signal(fx)
         fa = sps.hilbert(dctrend(fx))
         fb = fa.copy()
         print('Computed Analytic signal')
@@ -772,8 +1022,8 @@ def spwvd(fx, tstep=2 ** 5, nfbins=2 ** 10, df=1.0, nh=None, ng=None, sigmat=Non
     g = sps.gaussian(ng, sigmag)
     g /= sum(g)
 
-    Lh = (nh - 1) / 2  # midpoint index of window h
-    Lg = (ng - 1) / 2  # midpoint index of window g
+    Lh = (nh - 1) // 2  # midpoint index of window h
+    Lg = (ng - 1) // 2  # midpoint index of window g
 
     # create a time array such that the first point is centered on time window
     tlst = np.arange(start=0, stop=fn + 1, step=tstep, dtype='int')
@@ -783,46 +1033,76 @@ def spwvd(fx, tstep=2 ** 5, nfbins=2 ** 10, df=1.0, nh=None, ng=None, sigmat=Non
     tfarray = np.zeros((nfbins, len(tlst)), dtype='complex')
 
     # create a frequency array with just positive frequencies
-    flst = np.fft.fftfreq(nfbins, dt)[0:nfbins / 2]
-
-    # calculate pseudo WV
-    for point, t in enumerate(tlst):
+    flst = np.fft.fftfreq(nfbins, dt)[0:nfbins // 2]
+
+    # time lags of the smoothing window g and largest time shift
+    taulst = np.arange(start=-Lg, stop=Lg + 1, step=1, dtype='int')
+    mmax = max(min(nfbins // 2, Lh), 0)
+    mlst = np.arange(mmax)[:, None]
+    # frequency index for the weird thing
+    mw = nfbins // 2
+
+    # calculate pseudo WV for a block of time instances at a time
+    for tslice in tf_chunks(len(tlst), 128 * max(mmax, 1) * ng,
+                            chunk_bytes):
+        t = tlst[tslice, None]
         # find the smallest possible time shift
-        tau_max = min(t + Lg - 1, fn - t + Lg, round(nfbins / 2), Lh)
-        # create time lag list
-        taulst = np.arange(start=-min(Lg, fn - t), stop=min(Lg, t - 1) + 1, step=1,
-                           dtype='int')
+        tau_max = np.minimum(np.minimum(t + Lg - 1, fn - t + Lg),
+                             min(nfbins // 2, Lh))
+
         # calculate windowed correlation function of analytic function for
-        # zero frequency
-        tfarray[0, point] = sum(2 * (g[Lg + taulst] / sum(g[Lg + taulst])) *
-                                fa[t - taulst - 1] * np.conjugate(fb[t - taulst - 1]))
+        # zero frequency, only used if there are no time shifts
+        gw = np.where((taulst >= -np.minimum(Lg, fn - t)) &
+                      (taulst <= np.minimum(Lg, t - 1)), g[Lg + taulst], 0)
+        R0 = np.sum(2 * gw * fa.take(t - taulst - 1, mode='wrap') *
+                    np.conjugate(fb.take(t - taulst - 1, mode='wrap')),
+                    axis=1) / _nonzero(gw.sum(axis=1))
+        tfarray[0, tslice] = R0
+
         # calculate tfd by calculating convolution of window and correlation
-        # function as sum of correlation function over the lag period times the
-        # window at that point. Calculate symmetrical segments for FFT later
-        for mm in range(tau_max):
-            taulst = np.arange(start=-min(Lg, fn - t - mm - 1), stop=min(Lg, t - mm - 1) + 1,
-                               step=1, dtype='int')
-            # compute positive half
-            gm = 2 * (g[Lg + taulst] / sum(g[Lg + taulst]))
-            Rmm = sum(gm * fa[t + mm - taulst - 1] *
-                      np.conjugate(fb[t - mm - taulst]))
-            tfarray[mm, point] = h[Lh + mm - 1] * Rmm
-            # compute negative half
-            Rmm = sum(gm * fa[t - mm - taulst] *
-                      np.conjugate(fb[t + mm - taulst - 1]))
-            tfarray[nfbins - mm - 1, point] = h[Lh - mm] * Rmm
-        mm = round(nfbins / 2)
-
-        if t <= fn - mm and t >= mm and mm <= Lh:
-            print('doing weird thing')
-            taulst = np.arange(start=-min(Lg, fn - t - mm), stop=min(Lg, fn - t, mm) + 1,
-                               step=1, dtype='int')
-            gm = g[Lg + taulst] / sum(g[Lg + taulst])
-            tfarray[mm - 1, point] = .5 * \
-                (sum(h[Lh + mm] * (gm * fa[t + mm - taulst - 1] *
-                                   np.conjugate(fb[t - mm - taulst]))) +
-                 sum(h[Lh - mm] * (gm * fa[t - mm - taulst] *
-                                   np.conjugate(fb[t + mm - taulst - 1]))))
+        # function as sum of correlation function over the lag period times
+        # the window at that point. Calculate symmetrical segments for FFT
+        # later.  Axes are (time, time shift, lag).
+        t = t[:, :, None]
+        gw = np.where((taulst >= -np.minimum(Lg, fn - t - mlst - 1)) &
+                      (taulst <= np.minimum(Lg, t - mlst - 1)) &
+                      (mlst < tau_max[:, :, None]), g[Lg + taulst], 0)
+        gm = 2 * gw / _nonzero(gw.sum(axis=2))[:, :, None]
+        # compute positive half
+        Rmm = np.sum(gm * fa.take(t + mlst - taulst - 1, mode='wrap') *
+                     np.conjugate(fb.take(t - mlst - taulst, mode='wrap')),
+                     axis=2)
+        Rmm *= h[Lh + mlst[:, 0] - 1]
+        has_shift = tau_max[:, 0] > 0
+        tfarray[0:mmax, tslice] = np.where(has_shift, Rmm.T,
+                                           tfarray[0:mmax, tslice])
+        # compute negative half
+        Rmm = np.sum(gm * fa.take(t - mlst - taulst, mode='wrap') *
+                     np.conjugate(fb.take(t + mlst - taulst - 1, mode='wrap')),
+                     axis=2)
+        Rmm *= h[Lh - mlst[:, 0]]
+        tfarray[nfbins - 1 - mlst[:, 0], tslice] = Rmm.T
+
+        if mw <= Lh:
+            t = t[:, :, 0]
+            weird = ((t >= mw) & (t <= fn - mw))[:, 0]
+            gw = np.where((taulst >= -np.minimum(Lg, fn - t - mw)) &
+                          (taulst <= np.minimum(np.minimum(Lg, fn - t), mw)),
+                          g[Lg + taulst], 0)
+            gm = gw / _nonzero(gw.sum(axis=1))[:, None]
+            Rw = .5 * \
+                (np.sum(h[Lh + mw] * (gm * fa.take(t + mw - taulst - 1,
+                                                    mode='wrap') *
+                                      np.conjugate(fb.take(t - mw - taulst,
+                                                           mode='wrap'))),
+                        axis=1) +
+                 np.sum(h[Lh - mw] * (gm * fa.take(t - mw - taulst,
+                                                    mode='wrap') *
+                                      np.conjugate(fb.take(t + mw - taulst - 1,
+                                                           mode='wrap'))),
+                        axis=1))
+            tfarray[mw - 1, tslice] = np.where(weird, Rw,
+                                               tfarray[mw - 1, tslice])
 
     tfarray = np.fft.fft(tfarray, axis=0)
     # rotate for plotting purposes so that (t=0,f=0) is at the lower left
@@ -832,7 +1112,7 @@ def spwvd(fx, tstep=2 ** 5, nfbins=2 ** 10, df=1.0, nh=None, ng=None, sigmat=Non
 
 
 def robust_wvd(fx, nh=2 ** 7 - 1, ng=2 ** 4 - 1, tstep=2 ** 4, nfbins=2 ** 8, df=1.0,
-               sigmat=None, sigmaf=None):
+               sigmat=None, sigmaf=None, chunk_bytes=TF_CHUNK_BYTES):
     """
     Calculate the robust Wigner-Ville distribution for an array
     fx. Smoothed with Gaussians windows to get best localization.
@@ -869,6 +1149,10 @@ def robust_wvd(fx, nh=2 ** 7 - 1, ng=2 ** 4 - 1, tstep=2 ** 4, nfbins=2 ** 8, df
                      std of window g, ie full width half max of gaussian
                      *default* is None and sigmaf is calculate automatically
 
+        **chunk_bytes** : int
+                          maximum number of bytes of windows transformed
+                          at a time *default* is TF_CHUNK_BYTES
+
     Returns:
     --------
         **tfarray** : np.ndarray(nfbins/2, len(fx)/tstep)
@@ -900,7 +1184,6 @@ def robust_wvd(fx, nh=2 ** 7 - 1, ng=2 ** 4 - 1, tstep=2 ** 4, nfbins=2 ** 8, df
 
     else:
         # compute the analytic signal of function f and dctrend
-        fa = wvd_analytic_signal(fx)
         fa = sps.hilbert(dctrend(fx))
         fb = fa.copy()
         print('Computed Analytic signal')
@@ -938,28 +1221,32 @@ def robust_wvd(fx, nh=2 ** 7 - 1, ng=2 ** 4 - 1, tstep=2 ** 4, nfbins=2 ** 8, df
     g = sps.gaussian(ng, sigmaf)
     g /= sum(g)
 
-    mlst = np.arange(start=-nh / 2 + 1, stop=nh / 2 + 1, step=1, dtype='int')
-    tlst = np.arange(start=nh / 2, stop=nfx - nh / 2, step=tstep)
+    mlst = np.arange(start=-nh // 2 + 1, stop=nh // 2 + 1, step=1, dtype='int')
+    tlst = np.arange(start=nh // 2, stop=nfx - nh // 2, step=tstep)
     # make a frequency list for plotting exporting only positive frequencies
     # get only positive frequencies
-    flst = np.fft.fftfreq(nfbins, dt)[nfbins / 2:]
+    flst = np.fft.fftfreq(nfbins, dt)[nfbins // 2:]
     flst[-1] = 0
-    flstp = np.fft.fftfreq(nfbins, 2 * dt)[0:nfbins / 2]
+    flstp = np.fft.fftfreq(nfbins, 2 * dt)[0:nfbins // 2]
 
     # create an empty array to put the tf in
-    tfarray = np.zeros((nfbins / 2, len(tlst)), dtype='complex')
+    tfarray = np.zeros((nfbins // 2, len(tlst)), dtype='complex')
+
+    # windows of fa[nn + mlst] and fb[nn - mlst] for each time instance
+    fawin = tf_windows(fa, nh, tlst + mlst[0])
+    fbwin = tf_windows(fb, nh, tlst - mlst[-1])[:, ::-1]
+
+    # frequency shift for each frequency and time shift
+    fshift = np.exp(1j * 4 * np.pi * np.outer(flst, mlst) * dt)
 
-    for tpoint, nn in enumerate(tlst):
+    for tslice in tf_chunks(len(tlst), 48 * fshift.size, chunk_bytes):
         # calculate windowed correlation function of analytic function
-        fxwin = h * fa[nn + mlst] * fb[nn - mlst].conj()
-        for fpoint, mm in enumerate(flst):
-            fxmed = np.convolve(g, fxwin * np.exp(1j * 4 * np.pi * mlst * mm * dt),
-                                mode='same') / (nh * ng)
-            fxmedpoint = np.median(fxmed.real)
-            if fxmedpoint == 0.0:
-                tfarray[fpoint, tpoint] = 1E-10
-            else:
-                tfarray[fpoint, tpoint] = fxmedpoint
+        fxwin = h * fawin[tslice] * fbwin[tslice].conj()
+        # only the real part of the smoothed function is needed
+        fxmed = (fxwin[:, None, :] * fshift).real
+        fxmed = _convolve_same(fxmed, g) / (nh * ng)
+        tfarray[:, tslice] = np.median(fxmed, axis=2).T
+    tfarray[tfarray == 0.0] = 1E-10
 
     tfarray = (4. * nh / dt) * tfarray
 
@@ -967,7 +1254,7 @@ def robust_wvd(fx, nh=2 ** 7 - 1, ng=2 ** 4 - 1, tstep=2 ** 4, nfbins=2 ** 8, df
 
 
 def specwv(fx, tstep=2 ** 5, nfbins=2 ** 10, nhs=2 ** 8, nhwv=2 ** 9 - 1, ngwv=2 ** 3 - 1,
-           df=1.0):
+           df=1.0, sigmat=None, sigmaf=None, chunk_bytes=TF_CHUNK_BYTES):
     """
     Calculates the Wigner-Ville distribution mulitplied by the STFT windowed
     by the common gaussian window h for an array f.  Handy for removing cross
@@ -1001,10 +1288,22 @@ def specwv(fx, tstep=2 ** 5, nfbins=2 ** 10, nhs=2 ** 8, nhwv=2 ** 9 - 1, ngwv=2
         **nfbins** : int (should be power of 2 and equal or larger than nh)
                      number of frequency bins
 
+        **sigmat** : float
+                    std of the WVD window in time
+                    *default* is None and sigmat is calculate automatically
+
+        **sigmaf** : float
+                     std of the WVD window in frequency
+                     *default* is None and sigmaf is calculate automatically
+
+        **chunk_bytes** : int
+                          maximum number of bytes of windows transformed
+                          at a time *default* is TF_CHUNK_BYTES
+
 
     Returns:
     --------
-        **tfarray** : np.ndarray(nfbins/2, len(fx)/tstep)
+        **tfarray** : np.ndarray(nfbins/2, len(tlst))
                       SPWVD spectrogram in units of amplitude
 
         **tlst** : np.array()
@@ -1016,14 +1315,22 @@ def specwv(fx, tstep=2 ** 5, nfbins=2 ** 10, nhs=2 ** 8, nhwv=2 ** 9 - 1, ngwv=2
     """
 
     # calculate stft
-    pst, tlst, flst = stft(fx, nh=nhs, tstep=tstep, nfbins=nfbins, df=df)
+    pst, tlst, flst = stft(fx, nh=nhs, tstep=tstep, nfbins=nfbins, df=df,
+                           chunk_bytes=chunk_bytes)
 
-    # calculate new time step so WVD and STFT will align
-    ntstep = len(fx) / (len(tlst) * 2.)
+    # the STFT windows start at tlst, calculate the WVD at their centres
+    # on a time step that hits every centre
+    tcenter = tlst + nhs // 2
+    ntstep = int(np.gcd(int(tstep), nhs // 2))
 
     # calculate spwvd
     pwv, twv, fwv = spwvd(fx, tstep=ntstep, nfbins=nfbins, df=df,
-                          nh=nhwv, ng=ngwv)
+                          nh=nhwv, ng=ngwv, sigmat=sigmat, sigmaf=sigmaf,
+                          chunk_bytes=chunk_bytes)
+
+    # the WVD frequency bins are half as wide as the STFT ones, keep every
+    # other bin of the positive frequencies in the same order as the STFT
+    pwv = pwv[1::2, tcenter // ntstep]
 
     # multiply the two together normalize
     tfarray = pst / pst.max() * pwv / pwv.max()
@@ -1032,7 +1339,7 @@ def specwv(fx, tstep=2 ** 5, nfbins=2 ** 10, nhs=2 ** 8, nhwv=2 ** 9 - 1, ngwv=2
 
 
 def modifiedb(fx, tstep=2 ** 5, nfbins=2 ** 10,
-              df=1.0, nh=2 ** 8 - 1, beta=.2):
+              df=1.0, nh=2 ** 8 - 1, beta=.2, chunk_bytes=TF_CHUNK_BYTES):
     """
     Calculates the modified b distribution as defined by cosh(n)^-2 beta
     for an array fx.  Supposed to remove cross terms in the WVD.
@@ -1059,6 +1366,10 @@ def modifiedb(fx, tstep=2 ** 5, nfbins=2 ** 10,
         **beta** : float
                    smoothing coefficient ussully between [0, 1]
 
+        **chunk_bytes** : int
+                          maximum number of bytes of windows transformed
+                          at a time *default* is TF_CHUNK_BYTES
+
     Returns:
     --------
         **tfarray** : np.ndarray(nfbins/2, len(fx)/tstep)
@@ -1083,14 +1394,12 @@ def modifiedb(fx, tstep=2 ** 5, nfbins=2 ** 10,
         fm = 1
 
     if fm > 1:
-        fn = fn[0]
         print('computing cross spectra')
         # compute the analytic signal of function f and dctrend
         fa = wvd_analytic_signal(fx[0])
         fb = wvd_analytic_signal(fx[1])
     else:
         # compute the analytic signal of function f and dctrend
-        fa = wvd_analytic_signal(fx)
         fa = sps.hilbert(dctrend(fx))
         fb = fa.copy()
 
@@ -1098,7 +1407,7 @@ def modifiedb(fx, tstep=2 ** 5, nfbins=2 ** 10,
     df = float(df)
     dt = 1. / df
 
-    tau = (nh - 1) / 2  # midpoint index of window h
+    tau = (nh - 1) // 2  # midpoint index of window h
 
     # create a time array such that the first point is centered on time window
     tlst = np.arange(start=0, stop=fn - 1, step=tstep, dtype='int')
@@ -1107,25 +1416,31 @@ def modifiedb(fx, tstep=2 ** 5, nfbins=2 ** 10,
     tfarray = np.zeros((nfbins, len(tlst)), dtype='complex')
 
     # create a frequency array with just positive frequencies
-    flst = np.fft.fftfreq(nfbins, dt)[0:nfbins / 2]
+    flst = np.fft.fftfreq(nfbins, dt)[0:nfbins // 2]
 
-    # calculate pseudo WV
-    for point, nn in enumerate(tlst):
+    # index of each time shift in the windows
+    klst = np.arange(2 * tau + 1)
+
+    # calculate pseudo WV for a block of time instances at a time
+    for tslice in tf_chunks(len(tlst), 96 * nfbins, chunk_bytes):
+        nn = tlst[tslice, None]
         # calculate the smallest timeshift possible
-        tau_min = min(nn, tau, fn - nn - 1)
-        # make a timeshift array
-        taulst = np.arange(start=-tau_min, stop=tau_min +
-                           1, step=1, dtype='int')
+        tau_min = np.minimum(np.minimum(nn, tau), fn - nn - 1)
+        # make a timeshift array, only the first 2*tau_min+1 are used
+        taulst = klst - tau_min
+        valid = klst <= 2 * tau_min
         # create modified b window
-        mbwin = np.cosh(taulst) ** (-2 * beta)
-        mbwin = mbwin / sum(mbwin)
-        MBwin = np.fft.fft(padzeros(mbwin, npad=nfbins))
+        mbwin = np.where(valid, np.cosh(taulst) ** (-2 * beta), 0)
+        mbwin = mbwin / mbwin.sum(axis=1)[:, None]
+        MBwin = np.fft.fft(mbwin, n=nfbins, axis=1)
         # calculate windowed correlation function of analytic function
-        Rnn = np.conjugate(fa[nn - taulst]) * fb[nn + taulst]
+        Rnn = np.where(valid,
+                       np.conjugate(fa.take(nn - taulst, mode='wrap')) *
+                       fb.take(nn + taulst, mode='wrap'), 0)
         # calculate fft of windowed correlation function
-        FTRnn = MBwin * np.fft.fft(padzeros(Rnn, npad=nfbins))
+        FTRnn = MBwin * np.fft.fft(Rnn, n=nfbins, axis=1)
         # put into tfarray
-        tfarray[:, point] = FTRnn[::-1]
+        tfarray[:, tslice] = FTRnn[:, ::-1].T
 
     # need to cut the time frequency array in half due to the WVD assuming
     # time series sampled at twice nyquist.
@@ -1134,7 +1449,8 @@ def modifiedb(fx, tstep=2 ** 5, nfbins=2 ** 10,
     return tfarray, tlst, flst
 
 
-def robust_stft_median(fx, nh=2 ** 8, tstep=2 ** 5, df=1.0, nfbins=2 ** 10):
+def robust_stft_median(fx, nh=2 ** 8, tstep=2 ** 5, df=1.0, nfbins=2 ** 10,
+                       chunk_bytes=TF_CHUNK_BYTES):
     """
     Calculates the robust spectrogram using the vector median simplification.
 
@@ -1158,6 +1474,10 @@ def robust_stft_median(fx, nh=2 ** 8, tstep=2 ** 5, df=1.0, nfbins=2 ** 10):
         **nfbins** : int (should be power of 2 and equal or larger than nh)
                      number of frequency bins
 
+        **chunk_bytes** : int
+                          maximum number of bytes of windows transformed
+                          at a time *default* is TF_CHUNK_BYTES
+
     Returns:
     --------
         **tfarray** : np.ndarray(nfbins/2, len(fx)/tstep)
@@ -1175,16 +1495,16 @@ def robust_stft_median(fx, nh=2 ** 8, tstep=2 ** 5, df=1.0, nfbins=2 ** 10):
     nfx = len(fx)
 
     # compute time shift list
-    mlst = np.arange(start=-nh / 2 + 1, stop=nh / 2 + 1, step=1, dtype='int')
+    mlst = np.arange(start=-nh // 2 + 1, stop=nh // 2 + 1, step=1, dtype='int')
     # compute time locations to take STFT
     tlst = np.arange(start=0, stop=nfx - nh + 1, step=tstep)
 
     # make a frequency list for plotting exporting only positive frequencies
     flst = np.fft.fftfreq(nfbins, 1 / df)
-    flstc = flst[nfbins / 2:]
+    flstc = flst[nfbins // 2:]
     # Note: these are actually the negative frequencies but works better for
     # calculations
-    flstp = flst[0:nfbins / 2]
+    flstp = flst[0:nfbins // 2]
 
     # make time window and normalize
     sigmanh = nh / (6 * np.sqrt(2 * np.log(2)))
@@ -1192,28 +1512,24 @@ def robust_stft_median(fx, nh=2 ** 8, tstep=2 ** 5, df=1.0, nfbins=2 ** 10):
     h = h / sum(h)
 
     # create an empty array to put the tf in and initialize a complex value
-    tfarray = np.zeros((nfbins / 2, len(tlst)), dtype='complex')
+    tfarray = np.zeros((nfbins // 2, len(tlst)), dtype='complex')
 
     # take the hilbert transform of the signal to make complex and remove
     # negative frequencies
     fa = sps.hilbert(dctrend(fx))
     fa = fa / fa.std()
 
-    # make a frequency list for plotting exporting only positive frequencies
-    # get only positive frequencies
-    flst = np.fft.fftfreq(nfbins, 1 / df)[nfbins / 2:]
+    # frequency shift for each frequency and time shift
+    fshift = np.exp(1j * 2 * np.pi * np.outer(flstc, mlst) / df)
 
-    for tpoint, nn in enumerate(tlst):
+    fawin = tf_windows(fa, nh, tlst)
+    for tslice in tf_chunks(len(tlst), 48 * fshift.size, chunk_bytes):
         # calculate windowed correlation function of analytic function
-        fxwin = h * fa[nn:nn + nh]
-        for fpoint, mm in enumerate(flstc):
-            fxmed = fxwin * np.exp(1j * 2 * np.pi * mlst * mm / df)
-            fxmedreal = np.median(fxmed.real)
-            fxmedimag = np.median(fxmed.imag)
-            if fxmedreal + 1j * fxmedimag == 0.0:
-                tfarray[fpoint, tpoint] = 1E-10
-            else:
-                tfarray[fpoint, tpoint] = fxmedreal + 1j * fxmedimag
+        fxmed = (h * fawin[tslice])[:, None, :] * fshift
+        fxmedreal = np.median(fxmed.real, axis=2)
+        fxmedimag = np.median(fxmed.imag, axis=2)
+        tfarray[:, tslice] = (fxmedreal + 1j * fxmedimag).T
+    tfarray[tfarray == 0.0] = 1E-10
     # normalize tfarray
     tfarray = (4. * nh * df) * tfarray
 
@@ -1221,7 +1537,7 @@ def robust_stft_median(fx, nh=2 ** 8, tstep=2 ** 5, df=1.0, nfbins=2 ** 10):
 
 
 def robust_stft_L(fx, alpha=.325, nh=2 ** 8, tstep=2 **
-                  5, df=1.0, nfbins=2 ** 10):
+                  5, df=1.0, nfbins=2 ** 10, chunk_bytes=TF_CHUNK_BYTES):
     """
     Calculates the robust spectrogram by estimating the vector median and
     summing terms estimated by alpha coefficients.
@@ -1251,6 +1567,10 @@ def robust_stft_L(fx, alpha=.325, nh=2 ** 8, tstep=2 **
         **nfbins** : int (should be power of 2 and equal or larger than nh)
                      number of frequency bins
 
+        **chunk_bytes** : int
+                          maximum number of bytes of windows transformed
+                          at a time *default* is TF_CHUNK_BYTES
+
     Returns:
     --------
         **tfarray** : np.ndarray(nfbins/2, len(fx)/tstep)
@@ -1269,16 +1589,16 @@ def robust_stft_L(fx, alpha=.325, nh=2 ** 8, tstep=2 **
     nfx = len(fx)
 
     # compute time shift list
-    mlst = np.arange(start=-nh / 2 + 1, stop=nh / 2 + 1, step=1, dtype='int')
+    mlst = np.arange(start=-nh // 2 + 1, stop=nh // 2 + 1, step=1, dtype='int')
     # compute time locations to take STFT
     tlst = np.arange(start=0, stop=nfx - nh + 1, step=tstep)
 
     # make a frequency list for plotting exporting only positive frequencies
     flst = np.fft.fftfreq(nfbins, 1 / df)
-    flstc = flst[nfbins / 2:]
+    flstc = flst[nfbins // 2:]
     # Note: these are actually the negative frequencies but works better for
     # calculations
-    flstp = flst[0:nfbins / 2]
+    flstp = flst[0:nfbins // 2]
 
     # make time window and normalize
     sigmanh = nh / (6 * np.sqrt(2 * np.log(2)))
@@ -1286,34 +1606,29 @@ def robust_stft_L(fx, alpha=.325, nh=2 ** 8, tstep=2 **
     h /= sum(h)
 
     # create an empty array to put the tf in and initialize a complex value
-    tfarray = np.zeros((nfbins / 2, len(tlst)), dtype='complex')
+    tfarray = np.zeros((nfbins // 2, len(tlst)), dtype='complex')
 
     # take the hilbert transform of the signal to make complex and remove
     # negative frequencies
     fa = sps.hilbert(dctrend(fx))
     fa /= fa.std()
 
-    # make a frequency list for plotting exporting only positive frequencies
-    # get only positive frequencies
-    flst = np.fft.fftfreq(nfbins, 1 / df)[nfbins / 2:]
-
     # create list of coefficients
     a = np.zeros(nh)
-    a[(nh - 2) * alpha:alpha * (2 - nh) + nh - 1] = 1. / \
+    a[int((nh - 2) * alpha):int(alpha * (2 - nh) + nh - 1)] = 1. / \
         (nh * (1 - 2 * alpha) + 4 * alpha)
 
-    for tpoint, nn in enumerate(tlst):
+    # frequency shift for each frequency and time shift
+    fshift = np.exp(1j * 2 * np.pi * np.outer(flstc, mlst) / df)
+
+    fawin = tf_windows(fa, nh, tlst)
+    for tslice in tf_chunks(len(tlst), 48 * fshift.size, chunk_bytes):
         # calculate windowed correlation function of analytic function
-        fxwin = h * fa[nn:nn + nh]
-        for fpoint, mm in enumerate(flstc):
-            fxelement = fxwin * np.exp(1j * 2 * np.pi * mlst * mm / df)
-            fxreal = np.sort(fxelement.real)[::-1]
-            fximag = np.sort(fxelement.imag)[::-1]
-            tfpoint = sum(a * (fxreal + 1j * fximag))
-            if tfpoint == 0.0:
-                tfarray[fpoint, tpoint] = 1E-10
-            else:
-                tfarray[fpoint, tpoint] = tfpoint
+        fxelement = (h * fawin[tslice])[:, None, :] * fshift
+        fxreal = np.sort(fxelement.real, axis=2)[:, :, ::-1]
+        fximag = np.sort(fxelement.imag, axis=2)[:, :, ::-1]
+        tfarray[:, tslice] = (np.dot(fxreal, a) + 1j * np.dot(fximag, a)).T
+    tfarray[tfarray == 0.0] = 1E-10
     # normalize tfarray
     tfarray = (4. * nh * df) * tfarray
 
@@ -1321,7 +1636,7 @@ def robust_stft_L(fx, alpha=.325, nh=2 ** 8, tstep=2 **
 
 
 def smethod(fx, L=11, nh=2 ** 8, tstep=2 ** 7, ng=1, df=1.0, nfbins=2 ** 10,
-            sigmaL=None):
+            sigmaL=None, chunk_bytes=TF_CHUNK_BYTES):
     """
     Calculates the smethod by estimating the STFT first and computing the WV
     of window length L in the frequency domain.
@@ -1355,6 +1670,10 @@ def smethod(fx, L=11, nh=2 ** 8, tstep=2 ** 7, ng=1, df=1.0, nfbins=2 ** 10,
         **nfbins** : int (should be power of 2 and equal or larger than nh)
                      number of frequency bins
 
+        **chunk_bytes** : int
+                          maximum number of bytes of windows transformed
+                          at a time *default* is TF_CHUNK_BYTES
+
     Returns:
     --------
         **tfarray** : np.ndarray(nfbins/2, len(fx)/tstep)
@@ -1394,9 +1713,9 @@ def smethod(fx, L=11, nh=2 ** 8, tstep=2 ** 7, ng=1, df=1.0, nfbins=2 ** 10,
         fa = fa.reshape(fn)
         fb = fb.reshape(fn)
         pxa, tlst, flst = stft(fa, nh=nh, tstep=tstep, ng=ng, df=df,
-                               nfbins=nfbins)
+                               nfbins=nfbins, chunk_bytes=chunk_bytes)
         pxb, tlst, flst = stft(fb, nh=nh, tstep=tstep, ng=ng, df=df,
-                               nfbins=nfbins)
+                               nfbins=nfbins, chunk_bytes=chunk_bytes)
         pxx = pxa * pxb.conj()
     else:
         # compute the analytic signal of function f and dctrend
@@ -1405,27 +1724,29 @@ def smethod(fx, L=11, nh=2 ** 8, tstep=2 ** 7, ng=1, df=1.0, nfbins=2 ** 10,
         fa = fa.reshape(fn)
         fb = fa
         pxx, tlst, flst = stft(fa, nh=nh, tstep=tstep, ng=ng, df=df,
-                               nfbins=nfbins)
+                               nfbins=nfbins, chunk_bytes=chunk_bytes)
 
     # make an new array to put the new tfd in
     tfarray = abs(pxx) ** 2
     # get shape of spectrogram
     nf, nt = tfarray.shape
     # create a list of frequency shifts
-    Llst = np.arange(start=-L / 2 + 1, stop=L / 2 + 1, step=1, dtype='int')
+    Llst = np.arange(start=-L // 2 + 1, stop=L // 2 + 1, step=1, dtype='int')
     # create a frequency gaussian window
     if sigmaL is None:
         sigmaL = L / (1 * np.sqrt(2 * np.log(2)))
     p = sps.gaussian(L, sigmaL)
-    # make a matrix of windows
-    pm = np.zeros((L, nt))
-    for kk in range(nt):
-        pm[:, kk] = p
-
-    # loop over frequency and calculate the s-method
-    for ff in range(int(L / 2), nf - int(L / 2) - 1):
-        tfarray[ff, :] = tfarray[ff, :] + 2 * np.real(np.sum(pm * pxx[ff + Llst, :] *
-                                                             pxx[ff - Llst, :].conj(), axis=0))
+
+    # calculate the s-method for all frequencies at once, one frequency
+    # shift at a time, real(a * b.conj()) = a.real * b.real + a.imag * b.imag
+    pxr = np.ascontiguousarray(pxx.real)
+    pxi = np.ascontiguousarray(pxx.imag)
+    f0, f1 = int(L / 2), nf - int(L / 2) - 1
+    for pp, ll in zip(p, Llst):
+        tfarray[f0:f1, :] += 2 * pp * (pxr[f0 + ll:f1 + ll, :] *
+                                       pxr[f0 - ll:f1 - ll, :] +
+                                       pxi[f0 + ll:f1 + ll, :] *
+                                       pxi[f0 - ll:f1 - ll, :])
     # normalize
     tfarray[int(L / 2):int(-L / 2)] /= L
 
@@ -1433,7 +1754,8 @@ def smethod(fx, L=11, nh=2 ** 8, tstep=2 ** 7, ng=1, df=1.0, nfbins=2 ** 10,
 
 
 def robust_smethod(fx, L=5, nh=2 ** 7, tstep=2 ** 5, nfbins=2 ** 10, df=1.0,
-                   robusttype='median', sigmaL=None, alpha=.325):
+                   robusttype='median', sigmaL=None, alpha=.325,
+                   chunk_bytes=TF_CHUNK_BYTES):
     """
     Computes the robust Smethod via the robust spectrogram.
 
@@ -1470,6 +1792,10 @@ def robust_smethod(fx, L=5, nh=2 ** 7, tstep=2 ** 5, nfbins=2 ** 10, df=1.0,
         **simgaL** : float
                     full-width half max of gaussian window applied in frequency
 
+        **chunk_bytes** : int
+                          maximum number of bytes of windows transformed
+                          at a time *default* is TF_CHUNK_BYTES
+
     Returns:
     --------
         **tfarray** : np.ndarray(nfbins/2, len(fx)/tstep)
@@ -1502,14 +1828,18 @@ def robust_smethod(fx, L=5, nh=2 ** 7, tstep=2 ** 5, nfbins=2 ** 10, df=1.0,
         fb = fx[1].reshape(fn)
         if robusttype == 'median':
             pxa, tlst, flst = robust_stft_median(fa, nh=nh, tstep=tstep, df=df,
-                                                 nfbins=nfbins)
+                                                 nfbins=nfbins,
+                                                 chunk_bytes=chunk_bytes)
             pxb, tlst, flst = robust_stft_median(fb, nh=nh, tstep=tstep, df=df,
-                                                 nfbins=nfbins)
+                                                 nfbins=nfbins,
+                                                 chunk_bytes=chunk_bytes)
         elif robusttype == 'L':
             pxa, tlst, flst = robust_stft_L(fa, nh=nh, tstep=tstep, df=df,
-                                            nfbins=nfbins, alpha=alpha)
+                                            nfbins=nfbins, alpha=alpha,
+                                            chunk_bytes=chunk_bytes)
             pxb, tlst, flst = robust_stft_L(fb, nh=nh, tstep=tstep, df=df,
-                                            nfbins=nfbins, alpha=alpha)
+                                            nfbins=nfbins, alpha=alpha,
+                                            chunk_bytes=chunk_bytes)
         else:
             raise NameError('robusttype {0} undefined'.format(robusttype))
         pxx = pxa * pxb.conj()
@@ -1517,32 +1847,31 @@ def robust_smethod(fx, L=5, nh=2 ** 7, tstep=2 ** 5, nfbins=2 ** 10, df=1.0,
         fa = fx.reshape(fn)
         if robusttype == 'median':
             pxx, tlst, flst = robust_stft_median(fa, nh=nh, tstep=tstep, df=df,
-                                                 nfbins=nfbins)
+                                                 nfbins=nfbins,
+                                                 chunk_bytes=chunk_bytes)
         elif robusttype == 'L':
             pxx, tlst, flst = robust_stft_L(fa, nh=nh, tstep=tstep, df=df,
-                                            nfbins=nfbins, alpha=alpha)
+                                            nfbins=nfbins, alpha=alpha,
+                                            chunk_bytes=chunk_bytes)
         else:
             raise NameError('robusttype {0} undefined'.format(robusttype))
 
     # compute frequency shift list
-    Llst = np.arange(start=-L / 2 + 1, stop=L / 2 + 1, step=1, dtype='int')
+    Llst = np.arange(start=-L // 2 + 1, stop=L // 2 + 1, step=1, dtype='int')
 
     # compute the frequency window of length L
     if sigmaL is None:
         sigmaL = L / 3 * (np.sqrt(2 * np.log(2)))
     lwin = gausswin(L, sigmaL)
     lwin /= sum(lwin)
-    pm = np.zeros((L, len(tlst)))
-    for kk in range(len(tlst)):
-        pm[:, kk] = lwin
 
     smarray = pxx.copy()
-    # compute S-method
-    for ff in range(L / 2, nfbins / 2 - L / 2):
-        smarray[ff, :] = smarray[ff, :] + 2 * np.real(np.sum(pm * pxx[ff + Llst, :] *
-                                                             pxx[ff - Llst,
-                                                                 :].conj(),
-                                                             axis=0))
+    # compute S-method for all frequencies at once, one frequency shift at a
+    # time
+    f0, f1 = L // 2, nfbins // 2 - L // 2
+    for pp, ll in zip(lwin, Llst):
+        smarray[f0:f1, :] += 2 * np.real(pp * pxx[f0 + ll:f1 + ll, :] *
+                                         pxx[f0 - ll:f1 - ll, :].conj())
     # normalize
     smarray = (2. / (L * nh)) * smarray
 
@@ -1550,7 +1879,7 @@ def robust_smethod(fx, L=5, nh=2 ** 7, tstep=2 ** 5, nfbins=2 ** 10, df=1.0,
 
 
 def reassigned_smethod(fx, nh=2 ** 7 - 1, tstep=2 ** 4, nfbins=2 ** 9, df=1.0, alpha=4,
-                       thresh=.01, L=5):
+                       thresh=.01, L=5, chunk_bytes=TF_CHUNK_BYTES):
     """
     Calulates the reassigned S-method as described by Djurovic[1999] by
     using the spectrogram to estimate the reassignment.
@@ -1587,6 +1916,10 @@ def reassigned_smethod(fx, nh=2 ** 7 - 1, tstep=2 ** 4, nfbins=2 ** 9, df=1.0, a
         **nfbins** : int (should be power of 2 and equal or larger than nh)
                      number of frequency bins
 
+        **chunk_bytes** : int
+                          maximum number of bytes of windows transformed
+                          at a time *default* is TF_CHUNK_BYTES
+
     Returns:
     --------
         **tfarray** : np.ndarray(nfbins/2, len(fx)/tstep)
@@ -1628,7 +1961,7 @@ def reassigned_smethod(fx, nh=2 ** 7 - 1, tstep=2 ** 4, nfbins=2 ** 9, df=1.0, a
 
     # compute gaussian window
     h = gausswin(nh, alpha=alpha)
-    lh = (nh - 1) / 2
+    lh = (nh - 1) // 2
 
     # compute ramp window
     th = h * np.arange(start=-lh, stop=lh + 1, step=1)
@@ -1641,44 +1974,18 @@ def reassigned_smethod(fx, nh=2 ** 7 - 1, tstep=2 ** 4, nfbins=2 ** 9, df=1.0, a
     nt = len(tlst)
 
     # make frequency list for plotting
-    flst = np.fft.fftfreq(nfbins, 1. / df)[:nfbins / 2]
-
-    # initialize some time-frequency arrays
-    tfh = np.zeros((nfbins, nt), dtype='complex')
-    tfth = np.zeros((nfbins, nt), dtype='complex')
-    tfdh = np.zeros((nfbins, nt), dtype='complex')
-
-    # compute components for reassignment
-    for ii, tt in enumerate(tlst):
-        # create a time shift list
-        tau = np.arange(start=-min([np.round(nx / 2.), lh, tt - 1]),
-                        stop=min([np.round(nx / 2.), lh, nx - tt - 1]) + 1)
-        # compute the frequency spots to be calculated
-        ff = np.remainder(nfbins + tau, nfbins)
-        # make lists of data points for each window calculation
-        xlst = tt + tau
-        hlst = lh + tau
-        normh = np.sqrt(np.sum(abs(h[hlst]) ** 2))
-        tfh[ff, ii] = fx[xlst] * h[hlst].conj() / normh
-        tfth[ff, ii] = fx[xlst] * th[hlst].conj() / normh
-        tfdh[ff, ii] = fx[xlst] * dh[hlst].conj() / normh
-
-    # compute Fourier Transform
-    spech = np.fft.fft(tfh, axis=0)
-    specth = np.fft.fft(tfth, axis=0)
-    specdh = np.fft.fft(tfdh, axis=0)
+    flst = np.fft.fftfreq(nfbins, 1. / df)[:nfbins // 2]
 
-    # get only positive frequencies
-    spech = spech[nfbins / 2:, :]
-    specth = specth[nfbins / 2:, :]
-    specdh = specdh[nfbins / 2:, :]
+    # compute components for reassignment, only the positive frequencies
+    spech, specth, specdh = reassignment_spectra(fx, h, th, dh, tlst, nfbins,
+                                                 chunk_bytes=chunk_bytes)
 
     # check to make sure no spurious zeros floating around
     szf = np.where(abs(spech) < 1.E-6)
     spech[szf] = 0.0 + 0.0j
     zerofind = np.nonzero(abs(spech))
-    twspec = np.zeros((nfbins / 2, nt), dtype='float')
-    dwspec = np.zeros((nfbins / 2, nt), dtype='float')
+    twspec = np.zeros((nfbins // 2, nt), dtype='float')
+    dwspec = np.zeros((nfbins // 2, nt), dtype='float')
     twspec[zerofind] = np.round(np.real(specth[zerofind] / spech[zerofind]))
     dwspec[zerofind] = np.round(np.imag((nfbins / 2.) * specdh[zerofind] /
                                         spech[zerofind]) / (np.pi))
@@ -1687,43 +1994,32 @@ def reassigned_smethod(fx, nh=2 ** 7 - 1, tstep=2 ** 4, nfbins=2 ** 9, df=1.0, a
     nf, nt = spech.shape
 
     # -----calculate s-method-----
-    Llst = np.arange(start=-L / 2 + 1, stop=L / 2 + 1, step=1, dtype='int')
+    Llst = np.arange(start=-L // 2 + 1, stop=L // 2 + 1, step=1, dtype='int')
 
     # make and empty array of zeros
     sm = np.zeros_like(spech)
 
     # put values where L cannot be value of L, near top and bottom
-    sm[0:L / 2, :] = abs(spech[0:L / 2, :]) ** 2
-    sm[-L / 2:, :] = abs(spech[-L / 2:, :]) ** 2
+    sm[0:L // 2, :] = abs(spech[0:L // 2, :]) ** 2
+    sm[-L // 2:, :] = abs(spech[-L // 2:, :]) ** 2
 
-    # calculate s-method
-    for ff in range(L / 2, nf - L / 2 - 1):
-        sm[ff, :] = 2 * np.real(np.sum(spech[ff + Llst, :] * spech[ff - Llst, :].conj(),
-                                       axis=0)) / L
+    # calculate s-method for all frequencies at once, one frequency shift at
+    # a time
+    f0, f1 = L // 2, nf - L // 2 - 1
+    for ll in Llst:
+        sm[f0:f1, :] += spech[f0 + ll:f1 + ll, :] * \
+            spech[f0 - ll:f1 - ll, :].conj()
+    sm[f0:f1, :] = 2 * np.real(sm[f0:f1, :]) / L
 
     # ------compute reassignment-----
-    rtfarray = np.zeros((nfbins / 2, nt))
-
     threshold = thresh * np.max(abs(sm))
 
-    for nn in range(nt):
-        for kk in range(nf):
-            if abs(spech[kk, nn]) > threshold:
-                # get center of gravity index in time direction from
-                # spectrogram
-                nhat = int(nn + twspec[kk, nn])
-                nhat = int(min([max([nhat, 1]), nt - 1]))
-                # get center of gravity index in frequency direction from spec
-                khat = int(kk - dwspec[kk, nn])
-                khat = int(np.remainder(np.remainder(khat - 1, nfbins / 2) + nfbins / 2,
-                                        nfbins / 2))
-                rtfarray[khat, nhat] = rtfarray[khat, nhat] + abs(sm[kk, nn])
-            else:
-                rtfarray[kk, nn] = rtfarray[kk, nn] + sm[kk, nn]
+    rtfarray = reassign(spech, twspec, dwspec, threshold, abs(sm),
+                        np.real(sm))
 
     # place values where L cannot be L
-    rtfarray[:L / 2, :] = abs(sm[:L / 2, :])
-    rtfarray[-L / 2:, :] = abs(sm[-L / 2:, :])
+    rtfarray[:L // 2, :] = abs(sm[:L // 2, :])
+    rtfarray[-L // 2:, :] = abs(sm[-L // 2:, :])
 
     # for plotting purposes set anything that is 0 to 1, so that log(1) will
     # plot as zero
@@ -24,6 +24,7 @@ import pandas as pd
 import logging
 
 from mtpy.core import ts
+import mtpy.utils.instrumentation as instrumentation
 
 from matplotlib import pyplot as plt
 
@@ -1110,6 +1111,7 @@ class NIMS(NIMSHeader):
         
         return return_info_array, return_data_array, duplicate_list
         
+    @instrumentation.timed('usgs.nims.read_nims')
     def read_nims(self, fn=None):
         """
         Read NIMS DATA.BIN file.
@@ -1149,7 +1151,6 @@ class NIMS(NIMSHeader):
         if fn is not None:
             self.fn = fn
 
-        st = datetime.datetime.now()
         ### read in header information and get the location of end of header
         self.read_header(self.fn)
         
@@ -1158,6 +1159,7 @@ class NIMS(NIMSHeader):
         with open(self.fn, 'rb') as fid:
             fid.seek(self.data_start_seek)
             data_str = fid.read()
+        instrumentation.count('bytes', len(data_str))
             
         ### read in full string as unsigned integers
         data = np.frombuffer(data_str, dtype=np.uint8)
@@ -1235,9 +1237,7 @@ class NIMS(NIMSHeader):
                                                        self.gps_list)
         ### align data 
         self.ts = self.align_data(data_array, self.stamps) 
-        et = datetime.datetime.now()
-        
-        print('--> Took {0:.2f} seconds'.format((et-st).total_seconds()))
+        instrumentation.count('records', self.ts.shape[0])
 
     def _get_first_gps_stamp(self, stamps):
         """
@@ -20,6 +20,7 @@ from pathlib import Path
 
 from mtpy.usgs import zen
 from mtpy.core import ts as mtts
+import mtpy.utils.instrumentation as instrumentation
 
 # =============================================================================
 # Collection of Z3D Files
@@ -393,6 +394,7 @@ class Z3DCollection(object):
 
         return z3d_df
 
+    @instrumentation.timed('usgs.z3d_collection.combine_z3d_files')
     def combine_z3d_files(self, z3d_df, new_sampling_rate=4, t_buffer=3600,
                           remote=False):
         """
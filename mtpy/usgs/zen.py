@@ -23,7 +23,9 @@ import shutil
 import numpy as np
 
 import mtpy.imaging.plotspectrogram as plotspectrogram
+import mtpy.processing.tf as mttf
 import mtpy.core.ts as mtts
+import mtpy.utils.instrumentation as instrumentation
 
 try:
     import win32api
@@ -1094,6 +1096,7 @@ class Zen3D(object):
             self._read_metadata(fid=file_id)
 
     #======================================
+    @instrumentation.timed('usgs.zen.read_z3d')
     def read_z3d(self, Z3Dfn=None):
         """
         read in z3d file and populate attributes accordingly
@@ -1113,11 +1116,9 @@ class Zen3D(object):
         if Z3Dfn is not None:
             self.fn = Z3Dfn
 
-        #print(u'------- Reading {0} ---------'.format(self.fn))
-        st = time.time()
-
         #get the file size to get an estimate of how many data points there are
         file_size = os.path.getsize(self.fn)
+        instrumentation.count('bytes', file_size)
 
         # using the with statement works in Python versions 2.7 or higher
         # the added benefit of the with statement is that it will close the
@@ -1193,10 +1194,7 @@ class Zen3D(object):
 
         print('    found {0} GPS time stamps'.format(self.gps_stamps.shape[0]))
         print('    found {0} data points'.format(self.ts_obj.ts.data.size))
-
-        # time it
-        et = time.time()
-        print('INFO: --> Reading data took: {0:.3f} seconds'.format(et-st))
+        instrumentation.count('records', self.ts_obj.ts.data.size)
 
     #=================================================
     def _fill_ts_obj(self, ts_data):
@@ -1480,7 +1478,7 @@ class Zen3D(object):
         except AttributeError:
             self.read_z3d()
 
-        self.ts_obj.ts = self.ts_obj.apply_addaptive_notch_filter(**notch_dict)
+        self.ts_obj.apply_addaptive_notch_filter(**notch_dict)
 
     #==================================================
     def write_ascii_mt_file(self, save_fn=None, fmt='%.8e', notch_dict=None,
@@ -1596,7 +1594,8 @@ class Zen3D(object):
 
     #==================================================
     def plot_spectrogram(self, time_window=2**8, time_step=2**6, s_window=11,
-                         frequency_window=1, n_freq_bins=2**9, sigma_L=None):
+                         frequency_window=1, n_freq_bins=2**9, sigma_L=None,
+                         chunk_bytes=mttf.TF_CHUNK_BYTES):
         """
         plot the spectrogram of the data using the S-method
         Arguments:
@@ -1617,6 +1616,9 @@ class Zen3D(object):
             **n_freq_bins** : int
                             (should be power of 2 and equal or larger than nh)
                             number of frequency bins
+            **chunk_bytes** : int
+                            maximum number of bytes of time windows
+                            transformed at a time
         Returns:
         ---------
             **ptf** : mtpy.imaging.plotspectrogram.PlotTF object
@@ -1624,8 +1626,12 @@ class Zen3D(object):
 
         kwargs = {'nh':time_window, 'tstep':time_step, 'L':s_window,
                   'ng':frequency_window, 'df':self.df, 'nfbins':n_freq_bins,
-                  'sigmaL': sigma_L}
-        ptf = plotspectrogram.PlotTF(self.ts_obj.ts.data.to_numpy(), **kwargs)
+                  'sigmaL': sigma_L, 'chunk_bytes': chunk_bytes}
+        # the time windows are strided views of this array, so keep it
+        # contiguous and in double precision for the Hilbert transform
+        ts_array = np.ascontiguousarray(self.ts_obj.ts.data.to_numpy(),
+                                        dtype=np.float64)
+        ptf = plotspectrogram.PlotTF(ts_array, **kwargs)
 
         return ptf
 
@@ -0,0 +1,699 @@
+#!/usr/bin/env python
+
+"""
+mtpy/utils/bulk_export.py
+
+Export the attributes of all the stations and periods of a survey in bulk.
+
+The impedance tensors and tipper of a survey are put onto a list of
+frequencies once, either interpolated or picked within a tolerance, and the
+phase tensor, tipper, resistivity and phase attributes are computed as
+(frequency, station) arrays in one go.  SurveyExport writes them as one
+csv file of all the periods and a csv file per period, as phase tensor
+ellipses and induction arrows in a GeoPackage or shape files, and as
+GeoTIFF rasters.  The files of the periods are written by a pool of worker
+processes.  EdiCollection and ShapefilesCreator export through this module.
+
+    * get_survey_arrays : impedance and tipper of a survey on a frequency list
+    * get_ellipse_polygons : phase tensor ellipses as shapely polygons
+    * get_tipper_lines : induction arrows as shapely lines
+    * write_csv_files : combined csv and a csv file for each frequency
+
+:Example: ::
+
+    >>> import mtpy.utils.bulk_export as bulk_export
+    >>> import mtpy.core.mt as mt
+    >>> mt_obj_list = [mt.MT(edi) for edi in edi_list]
+    >>> s_export = bulk_export.SurveyExport(mt_obj_list, freq_list,
+    >>> ...                                 interpolate=False, ptol=0.05)
+    >>> s_export.write_csv(r"/home/mt/gis/phase_tensor.csv",
+    >>> ...                bulk_export.PT_COLUMNS, n_workers=4)
+    >>> s_export.write_gis(r"/home/mt/gis", ellipsize=0.01,
+    >>> ...                line_length=0.02, target_epsg_code=4283)
+
+"""
+
+# =================================================================
+import concurrent.futures
+import csv
+import os
+
+import numpy as np
+
+import mtpy.analysis.strike as strike
+from mtpy.utils.mtpylog import MtPyLog
+
+# =================================================================
+_logger = MtPyLog.get_mtpy_logger(__name__)
+
+# columns of EdiCollection.create_phase_tensor_csv
+PT_COLUMNS = ['station', 'freq', 'lon', 'lat', 'phi_min', 'phi_max',
+              'azimuth', 'skew', 'n_skew', 'elliptic', 'tip_mag_re',
+              'tip_mag_im', 'tip_ang_re', 'tip_ang_im']
+
+# columns of EdiCollection.create_measurement_csv
+MEASUREMENT_COLUMNS = ['FREQ', 'STATION', 'LON', 'LAT', 'ZXXre', 'ZXXim',
+                       'ZXYre', 'ZXYim', 'ZYXre', 'ZYXim', 'ZYYre', 'ZYYim',
+                       'TXre', 'TXim', 'TYre', 'TYim', 'RHOxx', 'RHOxy',
+                       'RHOyx', 'RHOyy', 'PHSxx', 'PHSxy', 'PHSyx', 'PHSyy']
+
+# attributes written as rasters by SurveyExport.write_rasters
+RASTER_COLUMNS = ['phi_min', 'phi_max', 'skew', 'elliptic', 'tip_mag_re']
+
+# attributes of the geometries of SurveyExport.write_gis, as
+# EdiCollection.get_phase_tensor_tippers
+GIS_COLUMNS = ['station', 'period', 'lon', 'lat', 'phi_min', 'phi_max',
+               'azimuth', 'skew', 'n_skew', 'elliptic', 'tip_mag_re',
+               'tip_mag_im', 'tip_ang_re', 'tip_ang_im']
+
+GIS_ELEMENTS = ['Phase_Tensor', 'Tipper_Real', 'Tipper_Imag']
+
+_COMPONENTS = {'xx': (0, 0), 'xy': (0, 1), 'yx': (1, 0), 'yy': (1, 1)}
+_TIPPER_COMPONENTS = {'X': 0, 'Y': 1}
+
+
+class SurveyExportError(Exception):
+    pass
+
+
+def get_survey_arrays(mt_obj_list, freq_list, interpolate=True, ptol=0.05,
+                      by_period=False):
+    """
+    Put the impedance tensors and tipper of a survey onto a list of
+    frequencies.
+
+    Interpolated stations are zero outside their frequency range, as
+    mtpy.core.mt.MT.interpolate with bounds_error=False, and are always
+    valid.  Otherwise the first frequency of a station strictly within
+    ptol of each frequency is used.
+
+    :param mt_obj_list: list of mtpy.core.mt.MT objects
+    :param freq_list: list or np.ndarray(n_freq) of frequencies
+    :param interpolate: interpolate the stations onto freq_list
+    :param ptol: relative tolerance of a matching frequency
+    :param by_period: apply ptol to the periods instead of the frequencies,
+                      as EdiCollection.get_phase_tensor_tippers does
+
+    :returns: tuple (z, tipper, data_freq, valid), np.ndarray(n_freq,
+              n_stations, 2, 2), np.ndarray(n_freq, n_stations, 1, 2),
+              np.ndarray(n_freq, n_stations) of the frequency of the data of
+              each station and np.ndarray(n_freq, n_stations) True where a
+              station has data
+    """
+    freq_list = np.atleast_1d(np.asarray(freq_list, dtype=np.float64))
+    n_freq = freq_list.size
+    n_stations = len(mt_obj_list)
+
+    z = np.zeros((n_freq, n_stations, 2, 2), dtype=np.complex128)
+    tipper = np.zeros((n_freq, n_stations, 1, 2), dtype=np.complex128)
+    data_freq = np.repeat(freq_list[:, None], n_stations, axis=1)
+    valid = np.zeros((n_freq, n_stations), dtype=np.bool_)
+
+    for ii, mt_obj in enumerate(mt_obj_list):
+        if interpolate:
+            new_z, new_tipper = mt_obj.interpolate(freq_list,
+                                                   bounds_error=False)
+            z[:, ii] = new_z.z
+            tipper[:, ii] = new_tipper.tipper
+            valid[:, ii] = True
+            continue
+
+        station_freq = mt_obj.Z.freq
+        if by_period:
+            match = (1. / station_freq > (1 - ptol) / freq_list[:, None]) & \
+                (1. / station_freq < (1 + ptol) / freq_list[:, None])
+        else:
+            match = (station_freq > freq_list[:, None] * (1 - ptol)) & \
+                (station_freq < freq_list[:, None] * (1 + ptol))
+        if np.any(match.sum(axis=1) > 1):
+            _logger.debug("more than one freq found for station %s",
+                          mt_obj.station)
+
+        has_freq = match.any(axis=1)
+        index = match.argmax(axis=1)[has_freq]
+        valid[:, ii] = has_freq
+        z[has_freq, ii] = mt_obj.Z.z[index]
+        if mt_obj.Tipper.tipper is not None:
+            tipper[has_freq, ii] = mt_obj.Tipper.tipper[index]
+        data_freq[has_freq, ii] = station_freq[index]
+
+    return z, tipper, data_freq, valid
+
+
+def get_ellipse_polygons(lon, lat, phi_min, phi_max, azimuth, ellipsize,
+                         n_points=60):
+    """
+    Get the outlines of phase tensor ellipses as shapely polygons.
+
+    The ellipses are scaled so that the major axis is ellipsize, ellipses
+    with a principal phase of 0 or above 100 degrees are drawn as dots as
+    ShapefilesCreator.create_phase_tensor_shp does.
+
+    :param lon: np.ndarray(n) of ellipse centres in x
+    :param lat: np.ndarray(n) of ellipse centres in y
+    :param phi_min: np.ndarray(n) of phi_min in degrees
+    :param phi_max: np.ndarray(n) of phi_max in degrees
+    :param azimuth: np.ndarray(n) of azimuth in degrees, 0 is North
+    :param ellipsize: length of the major axis in the units of lon and lat
+    :param n_points: number of points on each outline
+
+    :returns: list of shapely.geometry.Polygon
+    """
+    from shapely.geometry import Polygon
+
+    phi_min = np.asarray(phi_min, dtype=np.float64)
+    phi_max = np.asarray(phi_max, dtype=np.float64)
+    theta = np.arange(0, 2 * np.pi, 2 * np.pi / n_points)
+    azimuth = -np.deg2rad(azimuth)[:, None]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scaling = ellipsize / phi_max
+    height = (phi_min * scaling)[:, None]
+    width = (phi_max * scaling)[:, None]
+    bad = (phi_min == 0) | (phi_min > 100) | (phi_max == 0) | (phi_max > 100)
+    height[bad] = 0.0000001 * ellipsize
+    width[bad] = 0.0000001 * ellipsize
+
+    x = np.asarray(lon)[:, None] + \
+        height * np.cos(theta) * np.cos(azimuth) - \
+        width * np.sin(theta) * np.sin(azimuth)
+    y = np.asarray(lat)[:, None] + \
+        height * np.cos(theta) * np.sin(azimuth) + \
+        width * np.sin(theta) * np.cos(azimuth)
+
+    return [Polygon(xy) for xy in np.stack([x, y], axis=-1)]
+
+
+def get_tipper_lines(lon, lat, magnitude, angle, line_length):
+    """
+    Get induction arrows as shapely lines from the station to the tip.
+
+    :param lon: np.ndarray(n) of stations in x
+    :param lat: np.ndarray(n) of stations in y
+    :param magnitude: np.ndarray(n) of tipper magnitudes
+    :param angle: np.ndarray(n) of tipper angles in degrees, 0 is North
+    :param line_length: length of an arrow of magnitude 1
+
+    :returns: list of shapely.geometry.LineString
+    """
+    from shapely.geometry import LineString
+
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.asarray(lat, dtype=np.float64)
+    length = line_length * np.asarray(magnitude)
+    angle = -np.deg2rad(angle)
+    end_lon = lon + length * np.cos(angle)
+    end_lat = lat + length * np.sin(angle)
+
+    return [LineString([(x0, y0), (x1, y1)]) for x0, y0, x1, y1 in
+            zip(lon, lat, end_lon, end_lat)]
+
+
+def write_csv_files(csv_fn, header, freq_rows, n_workers=None):
+    """
+    Write a csv file of all the frequencies and a csv file for each
+    frequency named name_{freq}Hz.csv next to it.
+
+    :param csv_fn: full path of the combined csv file
+    :param header: list of column names
+    :param freq_rows: list of (freq, rows) in the order to write them, rows
+                      is a list of lists
+    :param n_workers: number of worker processes writing the files of the
+                      frequencies, *default* is the number of cpus
+
+    :returns: list of the csv files of the frequencies
+    """
+    name = os.path.splitext(csv_fn)
+    freq_fns = [os.path.join(os.path.dirname(csv_fn),
+                             '{name[0]}_{freq}Hz{name[1]}'.format(
+                                 freq=str(freq),
+                                 name=os.path.splitext(
+                                     os.path.basename(csv_fn))))
+                for freq, rows in freq_rows]
+
+    with open(csv_fn, "w", newline="") as csvf:
+        writer = csv.writer(csvf)
+        writer.writerow(header)
+        for freq, rows in freq_rows:
+            writer.writerows(rows)
+
+    all_rows = [rows for freq, rows in freq_rows]
+    n_workers = _get_n_workers(n_workers, len(freq_rows))
+    if n_workers == 1:
+        for freq_fn, rows in zip(freq_fns, all_rows):
+            _write_csv(freq_fn, header, rows)
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=n_workers) as executor:
+            list(executor.map(_write_csv, freq_fns, [header] * len(freq_fns),
+                              all_rows))
+    _logger.info("wrote %s and %d files of the frequencies", name[0] + name[1],
+                 len(freq_fns))
+
+    return freq_fns
+
+
+def _write_csv(csv_fn, header, rows):
+    with open(csv_fn, "w", newline="") as csvf:
+        writer = csv.writer(csvf)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return csv_fn
+
+
+def _write_gdf(gdf, out_fn, driver, layer=None):
+    if layer is None:
+        gdf.to_file(out_fn, driver=driver)
+    else:
+        gdf.to_file(out_fn, driver=driver, layer=layer)
+    return out_fn
+
+
+def _get_n_workers(n_workers, n_jobs):
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    return max(1, min(int(n_workers), n_jobs))
+
+
+class SurveyExport(object):
+    """
+    Phase tensor, tipper, resistivity and phase of all the stations of a
+    survey at a list of frequencies, for bulk export.
+
+    Arguments
+    ------------
+        **mt_obj_list** : list of mtpy.core.mt.MT objects
+
+        **freq_list** : list of frequencies to export
+
+        **period_list** : list of periods to export instead of freq_list
+
+        **interpolate** : [ True | False ] interpolate the stations onto
+                          freq_list, otherwise use the frequencies of the
+                          stations within ptol
+                          *default* is True
+
+        **ptol** : tolerance of a matching frequency
+                   *default* is 0.05
+
+        **by_period** : apply ptol to periods, see get_survey_arrays
+
+    ======================= ===================================================
+    Attributes              Description
+    ======================= ===================================================
+    station                 np.ndarray(n_stations) of station names
+    lon                     np.ndarray(n_stations) of longitudes
+    lat                     np.ndarray(n_stations) of latitudes
+    freq                    np.ndarray(n_freq) of the frequencies
+    period                  np.ndarray(n_freq) of the periods
+    valid                   np.ndarray(n_freq, n_stations), True where the
+                            station has data at the frequency
+    z                       np.ndarray(n_freq, n_stations, 2, 2) impedance
+    tipper                  np.ndarray(n_freq, n_stations, 1, 2) tipper
+    data_freq               frequency of the data of each station
+    phi_min, phi_max        principal phases of the phase tensor (deg)
+    azimuth                 azimuth of the phase tensor (deg), 0 is North
+    skew, n_skew            skew angle beta and 2 beta (deg)
+    elliptic                ellipticity of the phase tensor
+    tip_mag_re, tip_mag_im  magnitude of the real and imaginary tipper
+    tip_ang_re, tip_ang_im  angle of the real and imaginary tipper (deg),
+                            in the Parkinson convention
+    resistivity             np.ndarray(n_freq, n_stations, 2, 2) apparent
+                            resistivity (Ohm-m)
+    phase                   np.ndarray(n_freq, n_stations, 2, 2) phase (deg),
+                            yx in the first quadrant as
+                            mtplottools.ResPhase
+    ======================= ===================================================
+
+    Any attribute, and the columns of MEASUREMENT_COLUMNS, can be asked for
+    by name with get_column.
+
+    """
+
+    def __init__(self, mt_obj_list, freq_list=None, interpolate=True,
+                 ptol=0.05, by_period=False, period_list=None):
+        self.mt_obj_list = mt_obj_list
+        if period_list is not None:
+            self.period = np.atleast_1d(np.asarray(period_list,
+                                                   dtype=np.float64))
+            self.freq = 1. / self.period
+        elif freq_list is not None:
+            self.freq = np.atleast_1d(np.asarray(freq_list, dtype=np.float64))
+            self.period = 1. / self.freq
+        else:
+            raise SurveyExportError("Need to input freq_list or period_list")
+        self.interpolate = interpolate
+        self.ptol = ptol
+        self.by_period = by_period
+
+        self.compute_attributes()
+
+    def compute_attributes(self):
+        """
+        Put the survey onto the frequencies and compute the attributes.
+        """
+        self.station = np.array([mt_obj.station
+                                 for mt_obj in self.mt_obj_list])
+        self.lon = np.array([mt_obj.lon for mt_obj in self.mt_obj_list])
+        self.lat = np.array([mt_obj.lat for mt_obj in self.mt_obj_list])
+
+        self.z, self.tipper, self.data_freq, self.valid = get_survey_arrays(
+            self.mt_obj_list, self.freq, interpolate=self.interpolate,
+            ptol=self.ptol, by_period=self.by_period)
+
+        #--> phase tensor
+        pt_dict = strike.get_pt_parameters(strike.get_phase_tensor(self.z))
+        self.phi_min = pt_dict['phimin']
+        self.phi_max = pt_dict['phimax']
+        self.azimuth = pt_dict['azimuth']
+        self.skew = pt_dict['beta']
+        self.n_skew = 2 * pt_dict['beta']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.elliptic = (self.phi_max - self.phi_min) / \
+                (self.phi_max + self.phi_min)
+
+        #--> tipper, see mtpy.core.z.Tipper.compute_mag_direction
+        tipper = self.tipper[:, :, 0]
+        self.tip_mag_re = np.sqrt(tipper[..., 0].real ** 2 +
+                                  tipper[..., 1].real ** 2)
+        self.tip_mag_im = np.sqrt(tipper[..., 0].imag ** 2 +
+                                  tipper[..., 1].imag ** 2)
+        self.tip_ang_re = np.rad2deg(np.arctan2(-tipper[..., 1].real,
+                                                -tipper[..., 0].real))
+        self.tip_ang_im = np.rad2deg(np.arctan2(-tipper[..., 1].imag,
+                                                -tipper[..., 0].imag))
+
+        #--> resistivity and phase, see mtpy.core.z.Z
+        self.resistivity = np.abs(self.z) ** 2 / \
+            self.data_freq[:, :, None, None] * 0.2
+        self.phase = np.rad2deg(np.angle(self.z))
+        self.phase[..., 1, 0] += 180
+
+    def get_column(self, name):
+        """
+        Get an attribute of the stations at all the frequencies.
+
+        :param name: name of an attribute or a column of PT_COLUMNS or
+                     MEASUREMENT_COLUMNS, e.g. 'phi_max', 'ZXYre', 'RHOyx'
+
+        :returns: np.ndarray(n_freq, n_stations)
+        """
+        shape = self.valid.shape
+        key = name.lower()
+        if key in ('station', 'lon', 'lat'):
+            return np.broadcast_to(getattr(self, key), shape)
+        elif key == 'freq':
+            return np.broadcast_to(self.freq[:, None], shape)
+        elif key == 'period':
+            return np.broadcast_to(self.period[:, None], shape)
+        elif name[0] == 'Z' and name[1:3].lower() in _COMPONENTS:
+            values = self.z[(Ellipsis,) + _COMPONENTS[name[1:3].lower()]]
+            return values.real if name[3:] == 're' else values.imag
+        elif name[0] == 'T' and name[1] in _TIPPER_COMPONENTS:
+            values = self.tipper[:, :, 0, _TIPPER_COMPONENTS[name[1]]]
+            return values.real if name[2:] == 're' else values.imag
+        elif name[:3] == 'RHO' and name[3:] in _COMPONENTS:
+            return self.resistivity[(Ellipsis,) + _COMPONENTS[name[3:]]]
+        elif name[:3] == 'PHS' and name[3:] in _COMPONENTS:
+            return self.phase[(Ellipsis,) + _COMPONENTS[name[3:]]]
+        elif hasattr(self, name) and \
+                np.shape(getattr(self, name)) == shape:
+            return getattr(self, name)
+
+        raise SurveyExportError("unknown column {}".format(name))
+
+    def get_rows(self, columns, freq_index):
+        """
+        Get the rows of the stations with data at one frequency.
+
+        :param columns: list of column names, see get_column
+        :param freq_index: index of the frequency
+
+        :returns: list of lists, one for each station
+        """
+        valid = self.valid[freq_index]
+        values = [self.get_column(name)[freq_index][valid].tolist()
+                  for name in columns]
+
+        return [list(row) for row in zip(*values)]
+
+    def write_csv(self, csv_fn, columns, n_workers=None):
+        """
+        Write a csv file of all the frequencies and a csv file for each
+        frequency, see write_csv_files.
+
+        :param csv_fn: full path of the combined csv file
+        :param columns: list of column names, see get_column
+        :param n_workers: number of worker processes writing the files
+
+        :returns: dictionary {freq: rows}
+        """
+        for freq, valid in zip(self.freq, self.valid):
+            for station in self.station[~valid]:
+                _logger.warning("Freq %s NOT found for this station %s",
+                                freq, station)
+
+        freq_rows = [(freq, self.get_rows(columns, ii))
+                     for ii, freq in enumerate(self.freq.tolist())]
+        write_csv_files(csv_fn, columns, freq_rows, n_workers=n_workers)
+
+        return dict(freq_rows)
+
+    def get_phase_tensor_gdf(self, ellipsize, crs=None):
+        """
+        Get the phase tensor ellipses of all the frequencies.
+
+        :param ellipsize: length of the major axis in the units of lon, lat
+        :param crs: coordinate system of lon, lat, *default* is 'epsg:4326'
+
+        :returns: geopandas.GeoDataFrame with the columns of GIS_COLUMNS,
+                  one row for each station with data
+        """
+        return self._get_gdf(get_ellipse_polygons(
+            self.lon[None, :].repeat(self.freq.size, 0)[self.valid],
+            self.lat[None, :].repeat(self.freq.size, 0)[self.valid],
+            self.phi_min[self.valid], self.phi_max[self.valid],
+            self.azimuth[self.valid], ellipsize), crs)
+
+    def get_tipper_gdf(self, line_length, component='real', crs=None):
+        """
+        Get the induction arrows of all the frequencies, the arrows are
+        normalised so that the longest arrow of each frequency is
+        line_length.
+
+        :param line_length: length of the longest arrow
+        :param component: [ 'real' | 'imag' ]
+        :param crs: coordinate system of lon, lat, *default* is 'epsg:4326'
+
+        :returns: geopandas.GeoDataFrame with the columns of GIS_COLUMNS and
+                  the arrows as geometry tip_re or tip_im, one row for each
+                  station with data
+        """
+        if component not in ('real', 'imag'):
+            raise SurveyExportError("component must be real or imag")
+        suffix = component[:2]
+        magnitude = getattr(self, 'tip_mag_' + suffix)
+        angle = getattr(self, 'tip_ang_' + suffix)
+
+        max_magnitude = np.where(self.valid & np.isfinite(magnitude),
+                                 magnitude, 0).max(axis=1)
+        length = np.where(max_magnitude > 0.00000001,
+                          line_length / np.where(max_magnitude > 0,
+                                                 max_magnitude, 1),
+                          line_length)
+        normalised = magnitude * length[:, None]
+
+        return self._get_gdf(get_tipper_lines(
+            self.lon[None, :].repeat(self.freq.size, 0)[self.valid],
+            self.lat[None, :].repeat(self.freq.size, 0)[self.valid],
+            normalised[self.valid], angle[self.valid], 1.), crs,
+            geometry_name='tip_' + suffix)
+
+    def _get_gdf(self, geometry, crs, geometry_name='geometry'):
+        import geopandas as gpd
+        import pandas as pd
+
+        pdf = pd.DataFrame(dict((name, self.get_column(name)[self.valid])
+                                for name in GIS_COLUMNS), columns=GIS_COLUMNS)
+        pdf[geometry_name] = geometry
+        if crs is None:
+            crs = 'epsg:4326'
+
+        return gpd.GeoDataFrame(pdf, crs=crs, geometry=geometry_name)
+
+    def write_gis(self, save_path, ellipsize, line_length, crs=None,
+                  target_epsg_code=None, driver='GPKG', n_workers=None,
+                  elements=GIS_ELEMENTS):
+        """
+        Write the phase tensor ellipses and induction arrows of all the
+        frequencies.
+
+        The geometries of all the frequencies are made and reprojected in
+        one go.  With the GPKG driver each element is one GeoPackage layer
+        of all the periods, with a period column.  With any other driver,
+        e.g. 'ESRI Shapefile', each element of each period is written to
+        save_path/Period_{period}/{element}_EPSG_{code}_Period_{period}.shp
+        as ShapefilesCreator does, by a pool of worker processes.
+
+        :param save_path: directory to write to
+        :param ellipsize: length of the major axis of the ellipses
+        :param line_length: length of the longest induction arrow
+        :param crs: coordinate system of the stations, *default* 'epsg:4326'
+        :param target_epsg_code: EPSG code to reproject to, *default* is crs
+        :param driver: fiona driver
+        :param n_workers: number of worker processes writing the files
+        :param elements: list of GIS_ELEMENTS to write
+
+        :returns: dictionary {element: list of files}
+        """
+        if not os.path.isdir(save_path):
+            os.makedirs(save_path)
+
+        gdf_dict = {}
+        for element in elements:
+            if element == 'Phase_Tensor':
+                gdf = self.get_phase_tensor_gdf(ellipsize, crs=crs)
+            elif element in ('Tipper_Real', 'Tipper_Imag'):
+                gdf = self.get_tipper_gdf(line_length,
+                                          component=element[7:].lower(),
+                                          crs=crs)
+            else:
+                raise SurveyExportError(
+                    "elements must be in {}".format(GIS_ELEMENTS))
+            if target_epsg_code is not None:
+                gdf = gdf.to_crs(epsg=target_epsg_code)
+            gdf_dict[element] = gdf
+
+        epsg_code = target_epsg_code
+        if epsg_code is None:
+            epsg_code = str(crs or 'epsg:4326').split(':')[-1]
+
+        jobs = []
+        if driver == 'GPKG':
+            out_fn = os.path.join(save_path, 'MT_EPSG_{}.gpkg'.format(
+                epsg_code))
+            # layers of one GeoPackage can not be written in parallel
+            for element, gdf in gdf_dict.items():
+                _write_gdf(gdf, out_fn, driver, layer=element)
+            _logger.info("Saved %s to %s", list(gdf_dict.keys()), out_fn)
+            return dict((element, [out_fn]) for element in gdf_dict)
+
+        for element, gdf in gdf_dict.items():
+            for period, period_gdf in gdf.groupby('period', sort=False):
+                directory = os.path.join(save_path,
+                                         'Period_{}'.format(period))
+                if not os.path.isdir(directory):
+                    os.mkdir(directory)
+                out_fn = os.path.join(
+                    directory, '{}_EPSG_{}_Period_{}.shp'.format(
+                        element, epsg_code, period))
+                jobs.append((element, period_gdf, out_fn))
+
+        n_workers = _get_n_workers(n_workers, len(jobs))
+        if n_workers == 1:
+            out_fns = [_write_gdf(gdf, out_fn, driver)
+                       for element, gdf, out_fn in jobs]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=n_workers) as executor:
+                out_fns = list(executor.map(
+                    _write_gdf, [job[1] for job in jobs],
+                    [job[2] for job in jobs], [driver] * len(jobs)))
+        _logger.info("Saved %d files to %s", len(out_fns), save_path)
+
+        file_dict = dict((element, []) for element in gdf_dict)
+        for (element, gdf, out_fn), fn in zip(jobs, out_fns):
+            file_dict[element].append(fn)
+
+        return file_dict
+
+    def get_grids(self, columns, cell_size, method='linear'):
+        """
+        Interpolate attributes of the stations onto a regular grid of lon,
+        lat for all the frequencies.
+
+        :param columns: list of column names, see get_column
+        :param cell_size: size of the cells in the units of lon and lat
+        :param method: method of scipy.interpolate.griddata
+
+        :returns: tuple (grid_lon, grid_lat, grids), np.ndarray(n_lat, n_lon)
+                  of the cell centres, north at the top, and a dictionary
+                  {name: np.ndarray(n_freq, n_lat, n_lon)} with np.nan
+                  outside the stations
+        """
+        from scipy.interpolate import griddata
+
+        lon = np.arange(self.lon.min(), self.lon.max() + cell_size,
+                        cell_size)
+        lat = np.arange(self.lat.max(), self.lat.min() - cell_size,
+                        -cell_size)
+        grid_lon, grid_lat = np.meshgrid(lon, lat)
+        points = np.vstack([self.lon, self.lat]).T
+
+        grids = {}
+        for name in columns:
+            values = self.get_column(name)
+            grid = np.zeros((self.freq.size,) + grid_lon.shape)
+            grid[:] = np.nan
+            for ii, valid in enumerate(self.valid):
+                if valid.sum() < 3:
+                    continue
+                grid[ii] = griddata(points[valid], values[ii][valid],
+                                    (grid_lon, grid_lat), method=method)
+            grids[name] = grid
+
+        return grid_lon, grid_lat, grids
+
+    def write_rasters(self, save_path, cell_size, columns=RASTER_COLUMNS,
+                      epsg_code=4326, method='linear', n_workers=None):
+        """
+        Write attributes of each frequency as GeoTIFF (and ASCII grid)
+        rasters save_path/Period_{period}/{name}_Period_{period}.tif, by a
+        pool of worker processes.  Needs GDAL.
+
+        :param save_path: directory to write to
+        :param cell_size: size of the cells in the units of lon and lat
+        :param columns: list of column names, see get_column
+        :param epsg_code: EPSG code of lon, lat
+        :param method: method of scipy.interpolate.griddata
+        :param n_workers: number of worker processes writing the files
+
+        :returns: list of the GeoTIFF files
+        """
+        grid_lon, grid_lat, grids = self.get_grids(columns, cell_size,
+                                                   method=method)
+        # upper left corner of the upper left cell
+        origin = (grid_lon[0, 0] - cell_size / 2.,
+                  grid_lat[0, 0] + cell_size / 2.)
+
+        jobs = []
+        for ii, period in enumerate(self.period):
+            directory = os.path.join(save_path, 'Period_{}'.format(period))
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+            for name in columns:
+                jobs.append((os.path.join(directory, '{}_Period_{}.tif'.format(
+                    name, period)), grids[name][ii]))
+
+        n_workers = _get_n_workers(n_workers, len(jobs))
+        args = ([job[0] for job in jobs], [origin] * len(jobs),
+                [cell_size] * len(jobs), [-cell_size] * len(jobs),
+                [job[1] for job in jobs], [epsg_code] * len(jobs))
+        if n_workers == 1:
+            tif_fns = list(map(_write_raster, *args))
+        else:
+            with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=n_workers) as executor:
+                tif_fns = list(executor.map(_write_raster, *args))
+        _logger.info("Saved %d rasters to %s", len(tif_fns), save_path)
+
+        return tif_fns
+
+
+def _write_raster(tif_fn, origin, pixel_width, pixel_height, data,
+                  epsg_code):
+    from mtpy.utils.convert_modem_data_to_geogrid import array2geotiff_writer
+
+    return array2geotiff_writer(tif_fn, origin, pixel_width, pixel_height,
+                                data.astype(np.float32),
+                                epsg_code=epsg_code)[0]
@@ -145,6 +145,10 @@ def make_log_increasing_array(z1_layer, target_depth, n_layers, increment_factor
 
 
 def invertmatrix_incl_errors(inmatrix, inmatrix_err=None):
+    """
+        Invert a 2x2 matrix, or a stack of them (..., 2, 2), and propagate
+        the errors of the entries (1-norm).
+    """
 
     if inmatrix is None:
         raise MTex.MTpyError_inputarguments('Matrix must be defined')
@@ -163,7 +167,7 @@ def invertmatrix_incl_errors(inmatrix, inmatrix_err=None):
 
     det = np.linalg.det(inmatrix)
 
-    if det == 0:
+    if np.any(det == 0):
         raise MTex.MTpyError_inputarguments('Matrix is singular - I cannot invert that!')
 
     inv_matrix = np.zeros_like(inmatrix)
@@ -179,20 +183,9 @@ def invertmatrix_incl_errors(inmatrix, inmatrix_err=None):
 
     if (inmatrix_err is not None):
         inmatrix_err = np.real(inmatrix_err)
-        inv_matrix_err = np.zeros_like(inmatrix_err)
-
-        for i in range(2):
-            for j in range(2):
-                #looping over the entries of the error matrix
-                err = 0.
-                for k in range(2):
-                    for l in range(2):
-                        #each entry has 4 summands
-
-                        err += np.abs (- inv_matrix[i,k]  * inv_matrix[l,j]  * inmatrix_err[k,l])
-
-
-                inv_matrix_err[i,j] = err
+        # each entry has 4 summands abs(inv_matrix[i,k] * inv_matrix[l,j] * inmatrix_err[k,l])
+        abs_inv = np.abs(np.asarray(inv_matrix))
+        inv_matrix_err = np.matmul(np.matmul(abs_inv, np.abs(inmatrix_err)), abs_inv)
 
  
     return inv_matrix, inv_matrix_err
@@ -0,0 +1,617 @@
+#!/usr/bin/env python
+
+"""
+mtpy/utils/dem_tools.py
+
+Read digital elevation models by window and resample them onto meshes.
+
+Large DEMs (ESRI ASCII grids or GeoTIFFs) are converted once into a binary
+tile pyramid that is cached on disk next to the DEM, or in a per-user
+cache directory when the directory of the DEM is not writable.  Level 0 holds the
+full resolution grid and every following level halves the resolution by
+averaging blocks of 2 x 2 cells, until the whole grid fits in one tile.
+Each level is a .npy file of shape (n_tile_rows, n_tile_cols, tile_size,
+tile_size) that is memory mapped, so reading a window only touches the
+tiles it covers.  The cache is rebuilt when the DEM file changes.
+
+Rows are stored south to north like the arrays returned by
+mtpy.utils.filehandling.read_surface_ascii, and no data values are NaN.
+
+Elevations are resampled onto mesh points with regular grid interpolation
+on the window of the DEM around the points, so only the mesh points are
+projected and no triangulation of the DEM is needed.
+
+:Example: ::
+
+    >>> from mtpy.utils import dem_tools
+    >>> dem = dem_tools.TiledDEM(r"/home/dem/australia_30m.tif")
+    >>> lon, lat, elev = dem.read_window(138.5, 139.5, -35.5, -34.5)
+    >>> elev_mg = dem_tools.interpolate_to_points(dem, grid_east, grid_north,
+    >>> ...                                       epsg=28354)
+
+"""
+
+#=================================================================
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+import scipy.interpolate as spi
+import scipy.ndimage as ndimage
+
+from mtpy.utils import gis_tools, has_gdal
+
+#=================================================================
+# number of rows and columns of a tile
+TILE_SIZE = 256
+# number of cells read around the points to interpolate onto
+BUFFER_CELLS = 3
+# version of the cache layout, a cache of another version is rebuilt
+CACHE_VERSION = 1
+CACHE_HEADER_BASENAME = 'dem.json'
+LEVEL_BASENAME = 'level_{0:02}.npy'
+
+#=================================================================
+
+
+class DEMError(Exception):
+    pass
+
+
+def get_default_cache_dir(dem_fn):
+    """
+    get the directory of the tile pyramid of a DEM
+
+    The pyramid is cached in dem_fn + '.tiles' when the directory of the DEM
+    is writable.  Otherwise it goes in the per-user cache directory
+    ($XDG_CACHE_HOME or ~/.cache)/mtpy/dem_tiles, or in the temporary
+    directory if that can not be created, under a name made from the
+    basename and the full path of the DEM so different DEMs do not clash.
+
+    :param dem_fn: full path to the DEM
+    :returns: full path to the cache directory
+    """
+    dem_fn = os.path.abspath(dem_fn)
+    if os.access(os.path.dirname(dem_fn), os.W_OK):
+        return dem_fn + '.tiles'
+
+    cache_name = '{0}_{1}.tiles'.format(
+        os.path.basename(dem_fn),
+        hashlib.md5(dem_fn.encode('utf-8')).hexdigest()[:12])
+    user_cache = os.environ.get('XDG_CACHE_HOME',
+                                os.path.join(os.path.expanduser('~'),
+                                             '.cache'))
+    for cache_root in [user_cache, tempfile.gettempdir()]:
+        cache_root = os.path.join(cache_root, 'mtpy', 'dem_tiles')
+        try:
+            if not os.path.isdir(cache_root):
+                os.makedirs(cache_root)
+        except OSError:
+            continue
+        if os.access(cache_root, os.W_OK):
+            return os.path.join(cache_root, cache_name)
+    raise DEMError('Could not find a writable directory to cache the tiles '
+                   'of {0}, set cache_dir'.format(dem_fn))
+
+
+def read_ascii_header(ascii_fn):
+    """
+    Read the header of an ESRI ASCII grid.
+
+    :param ascii_fn: full path to ASCII grid
+    :type ascii_fn: string
+
+    :returns: dictionary of the header values with lower case keys and the
+              number of header lines under 'header_lines'
+    """
+    header = {'nodata_value': None}
+    with open(ascii_fn, 'r') as dfid:
+        header_lines = 0
+        for dline in dfid:
+            dline = dline.strip().split()
+            try:
+                float(dline[0])
+                break
+            except ValueError:
+                header[dline[0].lower()] = float(dline[1])
+                header_lines += 1
+    header['header_lines'] = header_lines
+
+    for key in ['ncols', 'nrows', 'cellsize']:
+        if key not in header:
+            raise DEMError('{0} is missing {1} in the header'.format(ascii_fn,
+                                                                     key))
+    for key in ['xll', 'yll']:
+        if key + 'corner' in header:
+            header[key] = header[key + 'corner']
+        elif key + 'center' in header:
+            header[key] = header[key + 'center']
+        else:
+            raise DEMError('{0} is missing {1}corner in the header'.format(
+                           ascii_fn, key))
+
+    return header
+
+
+def _iter_ascii_rows(ascii_fn, header):
+    """
+    yield the rows of an ASCII grid from north to south, rows may be
+    wrapped over several lines
+    """
+    ncols = int(header['ncols'])
+    with open(ascii_fn, 'r') as dfid:
+        for ii in range(header['header_lines']):
+            dfid.readline()
+        values = []
+        n_values = 0
+        for dline in dfid:
+            line_values = np.array(dline.split(), dtype=np.float32)
+            values.append(line_values)
+            n_values += line_values.size
+            while n_values >= ncols:
+                row = np.concatenate(values)
+                yield row[:ncols]
+                values = [row[ncols:]]
+                n_values -= ncols
+
+
+def _block_mean(block):
+    """
+    mean over blocks of 2 x 2 cells ignoring NaN, block has an even shape
+    """
+    valid = ~np.isnan(block)
+    block_sum = np.where(valid, block, 0).reshape(block.shape[0] // 2, 2,
+                                                  block.shape[1] // 2, 2)
+    count = valid.reshape(block_sum.shape).sum(axis=(1, 3))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (block_sum.sum(axis=(1, 3)) / count).astype(block.dtype)
+
+
+class TiledDEM(object):
+    """
+    DEM read by window from a tile pyramid cached on disk.
+
+    The cache is built the first time the DEM is opened, ASCII grids are
+    read one row at a time and GeoTIFFs (needs GDAL) one strip of tiles at
+    a time, so the DEM never has to fit in memory.
+
+    Arguments:
+    -------------
+        **dem_fn** : string
+                     full path to ESRI ASCII grid (.asc) or GeoTIFF (.tif)
+
+        **cache_dir** : string
+                        directory of the tile pyramid
+                        *default* is dem_fn + '.tiles', or a directory in
+                        the per-user cache when the directory of the DEM is
+                        not writable, see get_default_cache_dir
+
+        **tile_size** : int
+                        number of rows and columns of a tile
+                        *default* is TILE_SIZE
+
+        **epsg** : int
+                   EPSG number of the DEM coordinates, *default* is 4326
+                   for ASCII grids (lon, lat in WGS84) and read from the
+                   GeoTIFF projection otherwise
+
+    ======================= ===================================================
+    Attributes              Description
+    ======================= ===================================================
+    nrows, ncols            size of the full resolution grid
+    x0, y0                  coordinates of the south west cell
+    dx, dy                  cell size in the x and y directions
+    nodata_value            no data value of the DEM file
+    n_levels                number of levels in the pyramid
+    levels                  list of memory mapped tile arrays, one per level
+    ======================= ===================================================
+
+    ..note:: As in read_surface_ascii, xllcorner and yllcorner of an ASCII
+             grid are taken as the location of the south west cell.
+
+    """
+
+    def __init__(self, dem_fn, cache_dir=None, tile_size=TILE_SIZE,
+                 epsg=None):
+        if not os.path.isfile(dem_fn):
+            raise DEMError('Could not find {0}'.format(dem_fn))
+        self.dem_fn = os.path.abspath(dem_fn)
+        self.cache_dir = cache_dir
+        if self.cache_dir is None:
+            self.cache_dir = get_default_cache_dir(self.dem_fn)
+        self.tile_size = int(tile_size)
+        self.epsg = epsg
+
+        self.nrows = None
+        self.ncols = None
+        self.x0 = None
+        self.y0 = None
+        self.dx = None
+        self.dy = None
+        self.nodata_value = None
+        self.n_levels = None
+        self.levels = []
+
+        self._open_cache()
+
+    @property
+    def is_geotiff(self):
+        return os.path.splitext(self.dem_fn)[1].lower() in ['.tif', '.tiff']
+
+    def _source_stamp(self):
+        stat = os.stat(self.dem_fn)
+        return {'source': self.dem_fn,
+                'mtime': stat.st_mtime,
+                'size': stat.st_size,
+                'tile_size': self.tile_size,
+                'version': CACHE_VERSION}
+
+    def _open_cache(self):
+        """
+        open the tile pyramid, building it if it is missing or out of date
+        """
+        header_fn = os.path.join(self.cache_dir, CACHE_HEADER_BASENAME)
+        header = None
+        if os.path.isfile(header_fn):
+            with open(header_fn, 'r') as hfid:
+                header = json.load(hfid)
+            stamp = self._source_stamp()
+            if any([header.get(key) != stamp[key] for key in stamp]):
+                header = None
+        if header is None:
+            header = self.build_cache()
+
+        for key in ['nrows', 'ncols', 'x0', 'y0', 'dx', 'dy', 'nodata_value',
+                    'n_levels']:
+            setattr(self, key, header[key])
+        if self.epsg is None:
+            self.epsg = header['epsg']
+        self.levels = [np.load(os.path.join(self.cache_dir,
+                                            LEVEL_BASENAME.format(level)),
+                               mmap_mode='r')
+                       for level in range(self.n_levels)]
+
+    def _read_geotiff_header(self):
+        if not has_gdal():
+            raise DEMError('GDAL is needed to read {0}'.format(self.dem_fn))
+        from osgeo import gdal, osr
+
+        dataset = gdal.Open(self.dem_fn)
+        if dataset is None:
+            raise DEMError('Could not open {0}'.format(self.dem_fn))
+        gt = dataset.GetGeoTransform()
+        if gt[2] != 0 or gt[4] != 0:
+            raise DEMError('Rotated GeoTIFFs are not supported')
+        band = dataset.GetRasterBand(1)
+        nrows = dataset.RasterYSize
+
+        epsg = 4326
+        srs = osr.SpatialReference(wkt=dataset.GetProjection())
+        if srs.AutoIdentifyEPSG() == 0:
+            epsg = int(srs.GetAuthorityCode(None))
+
+        header = {'nrows': nrows,
+                  'ncols': dataset.RasterXSize,
+                  # centre of the south west pixel
+                  'x0': gt[0] + 0.5 * gt[1],
+                  'y0': gt[3] + (nrows - 0.5) * gt[5],
+                  'dx': gt[1],
+                  'dy': abs(gt[5]),
+                  'nodata_value': band.GetNoDataValue(),
+                  'epsg': epsg}
+
+        return dataset, band, header
+
+    def _iter_geotiff_rows(self, band, nrows, ncols):
+        """
+        yield the rows of the GeoTIFF from north to south, read in strips
+        """
+        for yoff in range(0, nrows, self.tile_size):
+            ysize = min(self.tile_size, nrows - yoff)
+            strip = band.ReadAsArray(0, yoff, ncols, ysize)
+            for row in strip.astype(np.float32):
+                yield row
+
+    def build_cache(self):
+        """
+        Convert the DEM into a tile pyramid in cache_dir.
+
+        :returns: dictionary of the cache header
+        """
+        if self.is_geotiff:
+            dataset, band, header = self._read_geotiff_header()
+            rows = self._iter_geotiff_rows(band, header['nrows'],
+                                           header['ncols'])
+        else:
+            ascii_header = read_ascii_header(self.dem_fn)
+            header = {'nrows': int(ascii_header['nrows']),
+                      'ncols': int(ascii_header['ncols']),
+                      'x0': ascii_header['xll'],
+                      'y0': ascii_header['yll'],
+                      'dx': ascii_header['cellsize'],
+                      'dy': ascii_header['cellsize'],
+                      'nodata_value': ascii_header['nodata_value'],
+                      'epsg': 4326}
+            rows = _iter_ascii_rows(self.dem_fn, ascii_header)
+
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir)
+        # write to temporary files first so that an interrupted build or
+        # another process reading the cache never sees a partial pyramid
+        suffix = '.{0}.tmp'.format(os.getpid())
+        ts = self.tile_size
+        nrows, ncols = header['nrows'], header['ncols']
+        nodata_value = header['nodata_value']
+
+        level_fns = []
+        level = self._new_level(0, nrows, ncols, suffix, level_fns)
+        n_read = 0
+        for row in rows:
+            if nodata_value is not None:
+                row[row == nodata_value] = np.nan
+            # rows come north to south, the tiles are stored south to north
+            ii = nrows - 1 - n_read
+            padded = np.full(level.shape[1] * ts, np.nan, dtype=np.float32)
+            padded[:ncols] = row
+            level[ii // ts, :, ii % ts, :] = padded.reshape(-1, ts)
+            n_read += 1
+        if n_read != nrows:
+            raise DEMError('{0} has {1} rows, expected {2}'.format(
+                           self.dem_fn, n_read, nrows))
+        level.flush()
+
+        # halve the resolution until the grid fits in a single tile
+        while max(nrows, ncols) > ts:
+            nrows, ncols = -(-nrows // 2), -(-ncols // 2)
+            level = self._build_level(level, len(level_fns), nrows, ncols,
+                                      suffix, level_fns)
+
+        header['n_levels'] = len(level_fns)
+        header.update(self._source_stamp())
+        del level
+        for tmp_fn in level_fns:
+            os.replace(tmp_fn, tmp_fn[:-len(suffix)])
+        header_fn = os.path.join(self.cache_dir, CACHE_HEADER_BASENAME)
+        with open(header_fn + suffix, 'w') as hfid:
+            json.dump(header, hfid, indent=2)
+        os.replace(header_fn + suffix, header_fn)
+
+        return header
+
+    def _new_level(self, level, nrows, ncols, suffix, level_fns):
+        ts = self.tile_size
+        level_fn = os.path.join(self.cache_dir,
+                                LEVEL_BASENAME.format(level)) + suffix
+        level_fns.append(level_fn)
+        tiles = np.lib.format.open_memmap(level_fn, mode='w+',
+                                          dtype=np.float32,
+                                          shape=(-(-nrows // ts),
+                                                 -(-ncols // ts), ts, ts))
+        tiles[:] = np.nan
+
+        return tiles
+
+    def _build_level(self, previous, level, nrows, ncols, suffix,
+                     level_fns):
+        """
+        build a level from 2 x 2 blocks of tiles of the previous level
+        """
+        ts = self.tile_size
+        tiles = self._new_level(level, nrows, ncols, suffix, level_fns)
+        n_tr, n_tc = previous.shape[0:2]
+        for tr in range(tiles.shape[0]):
+            for tc in range(tiles.shape[1]):
+                block = np.full((2 * ts, 2 * ts), np.nan, dtype=np.float32)
+                for ii in range(2):
+                    for jj in range(2):
+                        if 2 * tr + ii < n_tr and 2 * tc + jj < n_tc:
+                            block[ii * ts:(ii + 1) * ts,
+                                  jj * ts:(jj + 1) * ts] = \
+                                previous[2 * tr + ii, 2 * tc + jj]
+                tiles[tr, tc] = _block_mean(block)
+        tiles.flush()
+
+        return tiles
+
+    def get_level_grid(self, level=0):
+        """
+        Get the grid of a level of the pyramid.
+
+        :returns: x0, y0, dx, dy, nrows, ncols of the level, x0 and y0 are
+                  the coordinates of the south west cell centre
+        """
+        if level < 0 or level >= self.n_levels:
+            raise DEMError('level must be between 0 and {0}'.format(
+                           self.n_levels - 1))
+        factor = 2 ** level
+        return (self.x0 + 0.5 * (factor - 1) * self.dx,
+                self.y0 + 0.5 * (factor - 1) * self.dy,
+                self.dx * factor, self.dy * factor,
+                -(-self.nrows // factor), -(-self.ncols // factor))
+
+    def get_level(self, cell_size):
+        """
+        Get the coarsest level with cells no larger than cell_size.
+
+        :param cell_size: largest cell size wanted in the DEM coordinates
+        :returns: level of the pyramid
+        """
+        level = 0
+        while level + 1 < self.n_levels and \
+                max(self.dx, self.dy) * 2 ** (level + 1) <= cell_size:
+            level += 1
+
+        return level
+
+    def read_window(self, x_min, x_max, y_min, y_max, level=0):
+        """
+        Read the part of the DEM covering a bounding box.
+
+        The window includes the cells on or just outside the bounding box
+        so that the box can be interpolated, it is clipped to the DEM.
+
+        :param x_min, x_max: west and east limits in the DEM coordinates
+        :param y_min, y_max: south and north limits in the DEM coordinates
+        :param level: level of the pyramid to read
+
+        :returns: x, y, elevation, where elevation has shape (len(y), len(x))
+                  ordered south to north and west to east and no data is NaN
+        """
+        x0, y0, dx, dy, nrows, ncols = self.get_level_grid(level)
+        # allow for round off of limits that sit on a cell
+        col0 = max(int(np.floor((x_min - x0) / dx + 1e-6)), 0)
+        col1 = min(int(np.ceil((x_max - x0) / dx - 1e-6)), ncols - 1)
+        row0 = max(int(np.floor((y_min - y0) / dy + 1e-6)), 0)
+        row1 = min(int(np.ceil((y_max - y0) / dy - 1e-6)), nrows - 1)
+        if col0 > col1 or row0 > row1:
+            raise DEMError('Window ({0}, {1}, {2}, {3}) is outside of '
+                           '{4}'.format(x_min, x_max, y_min, y_max,
+                                        self.dem_fn))
+
+        ts = self.tile_size
+        tiles = self.levels[level][row0 // ts:row1 // ts + 1,
+                                   col0 // ts:col1 // ts + 1]
+        n_tr, n_tc = tiles.shape[0:2]
+        window = np.asarray(tiles).transpose(0, 2, 1, 3).reshape(n_tr * ts,
+                                                                 n_tc * ts)
+        elevation = window[row0 % ts:row0 % ts + row1 - row0 + 1,
+                           col0 % ts:col0 % ts + col1 - col0 + 1]
+
+        return (x0 + dx * np.arange(col0, col1 + 1),
+                y0 + dy * np.arange(row0, row1 + 1),
+                elevation)
+
+
+def resample(x, y, elevation, xi, yi, method='linear'):
+    """
+    Interpolate a regular grid onto points.
+
+    :param x, y: 1D increasing coordinates of the grid
+    :param elevation: 2D array of shape (len(y), len(x))
+    :param xi, yi: coordinates of the points
+    :param method: [ 'nearest' | 'linear' | 'cubic' ]
+
+    :returns: elevation at the points, NaN outside the grid or on no data
+              for 'nearest' and 'linear'
+    """
+    xi = np.asarray(xi, dtype=np.float64)
+    yi = np.asarray(yi, dtype=np.float64)
+    if method in ['nearest', 'linear']:
+        interp = spi.RegularGridInterpolator((y, x), elevation,
+                                             method=method,
+                                             bounds_error=False,
+                                             fill_value=np.nan)
+        return interp(np.vstack([yi.flatten(), xi.flatten()]).T).reshape(
+            xi.shape)
+    elif method == 'cubic':
+        # the spline is global, so fill no data with the nearest value
+        nodata = np.isnan(elevation)
+        if nodata.all():
+            return np.full(xi.shape, np.nan)
+        if nodata.any():
+            index = ndimage.distance_transform_edt(nodata,
+                                                   return_distances=False,
+                                                   return_indices=True)
+            elevation = elevation[tuple(index)]
+        # fractional indices of the points in the grid
+        row = np.interp(yi, y, np.arange(y.size), left=np.nan, right=np.nan)
+        col = np.interp(xi, x, np.arange(x.size), left=np.nan, right=np.nan)
+        outside = np.isnan(row) | np.isnan(col)
+        values = ndimage.map_coordinates(
+            elevation.astype(np.float64), [np.nan_to_num(row).flatten(),
+                                         np.nan_to_num(col).flatten()],
+            order=3, mode='nearest').reshape(xi.shape)
+        values[outside] = np.nan
+        return values
+    else:
+        raise DEMError('method must be nearest, linear or cubic, not '
+                       '{0}'.format(method))
+
+
+def project_to_dem(dem, easting, northing, epsg=None, utm_zone=None):
+    """
+    Project points in the model coordinates to the coordinates of a DEM.
+
+    :param dem: TiledDEM
+    :param easting, northing: arrays of the points in metres
+    :param epsg: EPSG number of the points
+    :param utm_zone: UTM zone of the points if epsg is not given
+
+    :returns: x, y of the points in the DEM coordinates, same shape as
+              easting
+    """
+    easting = np.asarray(easting, dtype=np.float64)
+    northing = np.asarray(northing, dtype=np.float64)
+    if dem.epsg == 4326:
+        points = gis_tools.project_point_utm2ll(easting.flatten(),
+                                                northing.flatten(),
+                                                utm_zone, epsg=epsg)
+        if isinstance(points, tuple):
+            lat, lon = np.array([points[0]]), np.array([points[1]])
+        else:
+            lat, lon = points['latitude'], points['longitude']
+        return lon.reshape(easting.shape), lat.reshape(easting.shape)
+    elif dem.epsg == epsg:
+        return easting, northing
+    else:
+        x, y = gis_tools.epsg_project(easting, northing, epsg, dem.epsg)
+        return np.asarray(x), np.asarray(y)
+
+
+def get_point_spacing(x, y):
+    """
+    estimate the spacing of points, the median distance between
+    neighbours along each axis of the array of points, smallest axis
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    spacing = []
+    for axis in range(x.ndim):
+        if x.shape[axis] > 1:
+            distance = np.hypot(np.diff(x, axis=axis), np.diff(y, axis=axis))
+            spacing.append(np.median(distance))
+    if len(spacing) == 0:
+        return 0.
+
+    return min(spacing)
+
+
+def interpolate_to_points(dem, easting, northing, epsg=None, utm_zone=None,
+                          method='linear', level='auto',
+                          buffer_cells=BUFFER_CELLS):
+    """
+    Interpolate a DEM onto points, like the cell centres of a mesh.
+
+    Only the window of the DEM around the points is read, at the
+    resolution of the points when level is 'auto'.
+
+    :param dem: TiledDEM or full path to a DEM file
+    :param easting, northing: arrays of the points in metres, any shape
+    :param epsg: EPSG number of the points
+    :param utm_zone: UTM zone of the points if epsg is not given
+    :param method: [ 'nearest' | 'linear' | 'cubic' ]
+    :param level: level of the pyramid to read, 'auto' picks the coarsest
+                  level with at least 2 DEM cells per point spacing
+    :param buffer_cells: number of cells to read around the points
+
+    :returns: elevation at the points, same shape as easting, NaN where the
+              points are off the DEM
+    """
+    if not isinstance(dem, TiledDEM):
+        dem = TiledDEM(dem)
+
+    x, y = project_to_dem(dem, easting, northing, epsg=epsg,
+                          utm_zone=utm_zone)
+    if level == 'auto':
+        level = dem.get_level(get_point_spacing(x, y) / 2.)
+
+    dx, dy = dem.get_level_grid(level)[2:4]
+    xw, yw, elevation = dem.read_window(np.nanmin(x) - buffer_cells * dx,
+                                        np.nanmax(x) + buffer_cells * dx,
+                                        np.nanmin(y) - buffer_cells * dy,
+                                        np.nanmax(y) + buffer_cells * dy,
+                                        level=level)
+
+    return resample(xw, yw, elevation, x, y, method=method)
@@ -0,0 +1,144 @@
+"""
+EPSG_TABLE
+==================
+
+Mapping of EPSG codes to proj4 strings that is only read when it is first
+used, so that importing mtpy.utils does not pay for it.
+
+The table is read from the epsg file of old versions of pyproj, or from the
+local copy mtpy/utils/epsg.npy of these mappings for newer versions that
+replaced the file by proj.db.  The UTM zones (WGS84 datum) are indexed when
+they are first looked up.
+
+:Example: ::
+
+    >>> from mtpy.utils import EPSG_DICT
+    >>> EPSG_DICT[32755]
+    '+proj=utm +zone=55 +south +datum=WGS84 +units=m +no_defs'
+    >>> EPSG_DICT.get_utm_epsg(55, False)
+    32755
+
+"""
+import os
+import re
+from collections.abc import MutableMapping
+
+import numpy as np
+
+EPSG_NPY_FN = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           'epsg.npy')
+
+
+def read_pyproj_epsg_file():
+    """
+    read the epsg file of pyproj < 1.9.5 into a dictionary
+
+    :raises: Exception if the file is not there
+    """
+    import pyproj
+
+    epsg_dict = {}
+    code_re = re.compile(r'<(\d+)>')
+    proj_re = re.compile(r'>(.*)<')
+    with open(os.path.join(pyproj.pyproj_datadir, 'epsg'), 'r') as epsg_file:
+        for line in epsg_file:
+            if '#' in line:
+                continue
+            epsg_code_val = code_re.findall(line)
+            if len(epsg_code_val) > 0:
+                epsg_dict[int(epsg_code_val[0])] = proj_re.findall(line)[0].strip()
+    return epsg_dict
+
+
+def read_epsg_dict():
+    """
+    read the EPSG codes and proj4 strings from pyproj, or from the local copy
+    if pyproj does not have the epsg file anymore
+    """
+    try:
+        return read_pyproj_epsg_file()
+    except Exception:
+        return np.load(EPSG_NPY_FN, allow_pickle=True).item()
+
+
+class EpsgTable(MutableMapping):
+    """
+    dictionary of EPSG code to proj4 string that is read on first access.
+
+    Codes can be added, e.g. EPSG_DICT[0] = proj_str for a custom projection,
+    these are kept when the table is read afterwards.
+    """
+
+    def __init__(self, reader=read_epsg_dict):
+        self._reader = reader
+        self._table = None
+        self._added = {}
+        self._utm_index = None
+
+    @property
+    def table(self):
+        if self._table is None:
+            table = self._reader()
+            table.update(self._added)
+            self._table = table
+        return self._table
+
+    @property
+    def is_loaded(self):
+        return self._table is not None
+
+    def __getitem__(self, key):
+        if self._table is None and key in self._added:
+            return self._added[key]
+        return self.table[key]
+
+    def __setitem__(self, key, value):
+        if self._table is None:
+            self._added[key] = value
+        else:
+            self._table[key] = value
+        self._utm_index = None
+
+    def __delitem__(self, key):
+        # a code added before the table is read may not be in the file
+        found = False
+        if self._table is None and key in self._added:
+            del self._added[key]
+            found = True
+        if key in self.table:
+            del self._table[key]
+            found = True
+        if not found:
+            raise KeyError(key)
+        self._utm_index = None
+
+    def __iter__(self):
+        return iter(self.table)
+
+    def __len__(self):
+        return len(self.table)
+
+    def __contains__(self, key):
+        return key in self.table
+
+    def __repr__(self):
+        if self._table is None:
+            return '{0}(<not read>)'.format(self.__class__.__name__)
+        return '{0}({1} codes)'.format(self.__class__.__name__, len(self._table))
+
+    def get_utm_epsg(self, zone_number, is_northern):
+        """
+        get the first EPSG code (WGS84 datum) of a UTM zone, None if there is
+        none in the table
+        """
+        if self._utm_index is None:
+            utm_index = {}
+            zone_re = re.compile(r'\+zone=(\d+)')
+            for key, val in self.table.items():
+                if '+datum=WGS84' not in val:
+                    continue
+                zone = zone_re.search(val)
+                if zone is not None:
+                    utm_index.setdefault((int(zone.group(1)), '+south' not in val), key)
+            self._utm_index = utm_index
+        return self._utm_index.get((int(zone_number), bool(is_northern)))
@@ -32,18 +32,18 @@ Revised: 5/2020 JP
 # ==============================================================================
 import numpy as np
 from mtpy.utils.mtpylog import MtPyLog
-from mtpy.utils import HAS_GDAL, EPSG_DICT, NEW_GDAL
+from mtpy.utils import EPSG_DICT, has_gdal, has_new_gdal
 
-if HAS_GDAL:
-    from osgeo import osr
-    from osgeo.ogr import OGRERR_NONE
+_logger = MtPyLog.get_mtpy_logger(__name__)
 
-else:
-    import pyproj
 
-_logger = MtPyLog.get_mtpy_logger(__name__)
-if NEW_GDAL:
-    _logger.info('INFO: GDAL version 3 detected')
+def __getattr__(name):
+    # GDAL is only looked for when it is first needed
+    if name == 'HAS_GDAL':
+        return has_gdal()
+    if name == 'NEW_GDAL':
+        return has_new_gdal()
+    raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
 
 # =============================================================================
 # GIS Error container
@@ -349,16 +349,7 @@ def utm_zone_to_epsg(zone_number, is_northern):
         32755
 
     """
-    for key in list(EPSG_DICT.keys()):
-        val = EPSG_DICT[key]
-        if ('+zone={:<2}'.format(zone_number) in val) and \
-                ('+datum=WGS84' in val):
-            if is_northern:
-                if '+south' not in val:
-                    return key
-            else:
-                if '+south' in val:
-                    return key
+    return EPSG_DICT.get_utm_epsg(zone_number, is_northern)
 
 
 def get_epsg(latitude, longitude):
@@ -397,6 +388,9 @@ def _get_gdal_coordinate_system(datum):
     :rtype: osr.SpatialReference
 
     """
+    from osgeo import osr
+    from osgeo.ogr import OGRERR_NONE
+
     # set lat lon coordinate system
     cs = osr.SpatialReference()
     if isinstance(datum, int):
@@ -536,6 +530,8 @@ def _get_gdal_projection_ll2utm(datum, utm_zone, epsg):
     :rtype: osr.TransformPoint function
 
     """
+    from osgeo import osr
+
     if utm_zone is None and epsg is None:
         raise GISError('Need to input either UTM zone or EPSG number')
 
@@ -574,6 +570,8 @@ def _get_gdal_projection_utm2ll(datum, utm_zone, epsg):
     :rtype: osr.TransformPoint function
 
     """
+    from osgeo import osr
+
     if utm_zone is None and epsg is None:
         raise GISError('Need to input either UTM zone or EPSG number')
 
@@ -612,6 +610,8 @@ def _get_pyproj_projection(datum, utm_zone, epsg):
     :rtype: pyproj.Proj function
 
     """
+    import pyproj
+
     if utm_zone is None and epsg is None:
         raise GISError('Need to input either UTM zone or EPSG number')
 
@@ -686,7 +686,7 @@ def project_point_ll2utm(lat, lon, datum='WGS84', utm_zone=None, epsg=None):
         zone_number, is_northern, utm_zone = get_utm_zone(lat.mean(),
                                                           lon.mean())
     epsg = validate_epsg(epsg)
-    if HAS_GDAL:
+    if has_gdal():
         ll2utm = _get_gdal_projection_ll2utm(datum, utm_zone, epsg)
     else:
         ll2utm = _get_pyproj_projection(datum, utm_zone, epsg)
@@ -698,14 +698,14 @@ def project_point_ll2utm(lat, lon, datum='WGS84', utm_zone=None, epsg=None):
                                                 ('utm_zone', 'U3')])
 
     for ii in range(lat.size):
-        if NEW_GDAL:
+        if has_new_gdal():
             point = ll2utm(lat[ii], lon[ii])
         else:
             point = ll2utm(lon[ii], lat[ii])
 
         projected_point['easting'][ii] = point[0]
         projected_point['northing'][ii] = point[1]
-        if HAS_GDAL:
+        if has_gdal():
             projected_point['elev'][ii] = point[2]
 
         projected_point['utm_zone'][ii] = utm_zone
@@ -770,7 +770,7 @@ def project_point_utm2ll(easting, northing, utm_zone, datum='WGS84', epsg=None):
     northing = validate_input_values(northing)
     epsg = validate_epsg(epsg)
 
-    if HAS_GDAL:
+    if has_gdal():
         utm2ll = _get_gdal_projection_utm2ll(datum, utm_zone, epsg)
     else:
         utm2ll = _get_pyproj_projection(datum, utm_zone, epsg)
@@ -780,7 +780,7 @@ def project_point_utm2ll(easting, northing, utm_zone, datum='WGS84', epsg=None):
                                     dtype=[('latitude', np.float),
                                            ('longitude', np.float)])
     for ii in range(easting.size):
-        if HAS_GDAL:
+        if has_gdal():
             point = utm2ll(easting[ii], northing[ii], 0.0)
 
             try:
@@ -0,0 +1,282 @@
+#!/usr/bin/env python
+"""
+mtpy/utils/instrumentation.py
+
+Lightweight timing and counting of where the time goes when reading,
+converting and writing MT data.
+
+Readers and writers are wrapped in timed spans, either with the timed
+decorator or the span context manager, and count the bytes and records they
+process.  Tracing is disabled by default, then a span only reads the clock
+twice and counters return straight away.  When tracing is enabled every
+finished span is logged at debug level to the mtpy.utils.instrumentation
+logger, added to a summary of calls and seconds per span, and written to the
+trace sinks.  Setting the environment variable MTPY_TRACE to a .json or .csv
+file name traces the whole session to that file.
+
+    * span : context manager timing a block
+    * timed : decorator timing every call of a function
+    * count : add to a counter of the current span
+    * enable_tracing / disable_tracing : switch tracing on and off
+    * get_summary : calls, seconds and counters of every span name
+    * JSONTraceSink / CSVTraceSink : write the spans to a file
+
+:Example: ::
+
+    >>> from mtpy.utils import instrumentation
+    >>> instrumentation.enable_tracing('trace.csv')
+    >>> mt_obj = MT(edi_fn)
+    >>> instrumentation.disable_tracing()
+    >>> instrumentation.get_summary()['core.edi.read_edi_file']
+    {'calls': 1, 'seconds': 0.004, 'bytes': 25014, 'records': 43}
+
+"""
+
+# =================================================================
+import atexit
+import csv
+import functools
+import json
+import os
+import threading
+import time
+
+from mtpy.utils.mtpylog import MtPyLog
+
+# =================================================================
+
+_logger = MtPyLog.get_mtpy_logger(__name__)
+
+
+class JSONTraceSink(object):
+    """
+    write every span as a line of JSON to trace_fn
+    """
+
+    def __init__(self, trace_fn):
+        self.trace_fn = trace_fn
+        self._fid = open(trace_fn, 'w')
+
+    def write(self, record):
+        self._fid.write(json.dumps(record) + '\n')
+
+    def close(self):
+        self._fid.close()
+
+
+class CSVTraceSink(object):
+    """
+    write every span as a row of trace_fn, the counters of a span are
+    written as name=value pairs separated by ';'
+    """
+    columns = ['name', 'parent', 'depth', 'start', 'seconds', 'counters']
+
+    def __init__(self, trace_fn):
+        self.trace_fn = trace_fn
+        self._fid = open(trace_fn, 'w', newline='')
+        self._writer = csv.writer(self._fid)
+        self._writer.writerow(self.columns)
+
+    def write(self, record):
+        counters = ';'.join('{0}={1}'.format(key, value)
+                            for key, value in sorted(record['counters'].items()))
+        self._writer.writerow([record['name'], record['parent'], record['depth'],
+                               '{0:.6f}'.format(record['start']),
+                               '{0:.6f}'.format(record['seconds']), counters])
+
+    def close(self):
+        self._fid.close()
+
+
+def get_trace_sink(trace_fn):
+    """
+    get the sink that writes to trace_fn from its extension, .csv or .json
+    """
+    if os.path.splitext(trace_fn)[1].lower() == '.csv':
+        return CSVTraceSink(trace_fn)
+    return JSONTraceSink(trace_fn)
+
+
+class Span(object):
+    """
+    a timed block, seconds is set once the block is finished
+    """
+    __slots__ = ('name', 'counters', 'start', 'seconds', '_t0', '_tracer')
+
+    def __init__(self, name, tracer, **counters):
+        self.name = name
+        self.counters = counters
+        self.seconds = None
+        self._tracer = tracer
+
+    def __enter__(self):
+        if self._tracer.enabled:
+            self._tracer.push(self)
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.seconds = time.perf_counter() - self._t0
+        if self._tracer.enabled:
+            self._tracer.pop(self)
+        return False
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+
+class Tracer(object):
+    """
+    keeps the stack of open spans of each thread, the summary of the
+    finished spans and the sinks they are written to
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.sinks = []
+        self.summary = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def stack(self):
+        try:
+            return self._local.stack
+        except AttributeError:
+            self._local.stack = []
+            return self._local.stack
+
+    def push(self, span_obj):
+        self.stack.append(span_obj)
+
+    def pop(self, span_obj):
+        stack = self.stack
+        # a span opened before tracing was enabled is not on the stack
+        if span_obj not in stack:
+            return
+        while stack.pop() is not span_obj:
+            pass
+        record = {'name': span_obj.name,
+                  'parent': stack[-1].name if stack else '',
+                  'depth': len(stack),
+                  'start': span_obj.start,
+                  'seconds': span_obj.seconds,
+                  'counters': dict(span_obj.counters)}
+        _logger.debug('%s took %.4f s %s', span_obj.name, span_obj.seconds,
+                      record['counters'])
+        with self._lock:
+            entry = self.summary.setdefault(span_obj.name,
+                                            {'calls': 0, 'seconds': 0.})
+            entry['calls'] += 1
+            entry['seconds'] += span_obj.seconds
+            for key, value in span_obj.counters.items():
+                entry[key] = entry.get(key, 0) + value
+            for sink in self.sinks:
+                sink.write(record)
+
+    def count(self, name, n=1):
+        stack = self.stack
+        if stack:
+            stack[-1].count(name, n)
+
+
+_tracer = Tracer()
+
+
+def span(name, **counters):
+    """
+    time a block of code
+
+    :param name: name of the span, e.g. 'usgs.zen.read_z3d'
+    :param counters: initial counters of the span
+
+    :returns: Span, its seconds attribute is the run time of the block
+
+    :Example: ::
+
+        >>> with span('modem.data.write_data_file') as data_span:
+        >>> ...     write_lines(fid)
+        >>> print(data_span.seconds)
+    """
+    return Span(name, _tracer, **counters)
+
+
+def timed(name=None):
+    """
+    decorator timing every call of a function in a span named name, by
+    default the module and qualified name of the function
+    """
+
+    def decorator(func):
+        span_name = name or '{0}.{1}'.format(func.__module__, func.__qualname__)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _tracer.enabled:
+                return func(*args, **kwargs)
+            with Span(span_name, _tracer):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def count(name, n=1):
+    """
+    add n to the counter name, e.g. 'bytes' or 'records', of the innermost
+    span, nothing is done when tracing is disabled
+    """
+    if _tracer.enabled:
+        _tracer.count(name, n)
+
+
+def is_tracing():
+    return _tracer.enabled
+
+
+def enable_tracing(trace_fn=None, sink=None):
+    """
+    start tracing the spans
+
+    :param trace_fn: file to write the spans to, CSV if it ends with .csv,
+                     otherwise lines of JSON
+    :param sink: object with write(record) and close() methods to write the
+                 spans to
+    """
+    if trace_fn is not None:
+        _tracer.sinks.append(get_trace_sink(trace_fn))
+    if sink is not None:
+        _tracer.sinks.append(sink)
+    _tracer.enabled = True
+
+
+def disable_tracing():
+    """
+    stop tracing and close the sinks, the summary is kept
+    """
+    _tracer.enabled = False
+    for sink in _tracer.sinks:
+        sink.close()
+    _tracer.sinks = []
+
+
+def get_summary():
+    """
+    get the number of calls, total seconds and counters of every span name
+
+    :returns: dictionary of span name to dictionary of totals
+    """
+    with _tracer._lock:
+        return dict((key, dict(value)) for key, value in _tracer.summary.items())
+
+
+def reset_summary():
+    with _tracer._lock:
+        _tracer.summary.clear()
+
+
+if os.environ.get('MTPY_TRACE'):
+    enable_tracing(os.environ['MTPY_TRACE'])
+    atexit.register(disable_tracing)
@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+"""
+mtpy/utils/map_gridding.py
+
+Grid values of MT stations onto a regular map grid by inverse distance
+weighting.
+
+MapGridder is built once for a station layout and keeps the KD-tree of the
+stations and the convex hull of the area to plot.  For every grid it is
+asked for it caches the inverse distance weights as a sparse matrix and the
+triangulation of the grid masked outside the hull, so gridding any number of
+components and frequencies is one matrix product.
+
+    * get_idw_weights : sparse inverse distance weights of stations at points
+
+:Example: ::
+
+    >>> from mtpy.utils.map_gridding import MapGridder
+    >>> gridder = MapGridder(lon, lat)
+    >>> grid_x, grid_y = gridder.get_grid(100, 100)
+    >>> # res is np.ndarray(n_stations, n_freq, 2, 2)
+    >>> res_grid = gridder.grid(res, grid_x, grid_y, nn=7, p=4)
+
+"""
+
+# =================================================================
+from collections import OrderedDict
+
+import matplotlib.tri as tri
+import numpy as np
+import scipy.sparse
+from scipy.spatial import cKDTree, Delaunay
+
+try:
+    from scipy.spatial import QhullError
+except ImportError:
+    from scipy.spatial.qhull import QhullError
+
+from mtpy.utils.mtpylog import MtPyLog
+
+# =================================================================
+
+_logger = MtPyLog.get_mtpy_logger(__name__)
+
+
+def get_idw_weights(tree, points, nn=7, p=4):
+    """
+    Get the inverse distance weights of the stations at a set of points.
+
+    Each point is weighted by 1 / d**p over its nn nearest stations, a
+    point that coincides with a station takes the value of that station.
+
+    :param tree: scipy.spatial.cKDTree of the station coordinates
+    :param points: np.ndarray(n_points, 2) of coordinates
+    :param nn: number of nearest stations to use, at most the number of
+               stations
+    :param p: power of the distance
+
+    :returns: scipy.sparse.csr_matrix(n_points, n_stations) of weights that
+              sum to 1 along each row
+    """
+    n_points = points.shape[0]
+    nn = min(nn, tree.n)
+    distance, index = tree.query(points, k=nn)
+    distance = distance.reshape(n_points, nn)
+    index = index.reshape(n_points, nn)
+
+    coincident = distance[:, 0] == 0
+    weights = np.zeros(distance.shape)
+    weights[~coincident] = 1. / np.power(distance[~coincident], p)
+    weights[~coincident] /= weights[~coincident].sum(axis=1)[:, None]
+    weights[coincident, 0] = 1.
+
+    rows = np.repeat(np.arange(n_points), nn)
+    weights = scipy.sparse.csr_matrix((weights.ravel(), (rows, index.ravel())),
+                                      shape=(n_points, tree.n))
+    # a station without data must not spoil a point it has no weight at
+    weights.eliminate_zeros()
+
+    return weights
+
+
+class MapGridder(object):
+    """
+    Inverse distance weighted gridding of the values of a station layout.
+
+    Arguments
+    ------------
+        **x**, **y** : np.ndarray(n_stations) of station coordinates
+
+        **hull_x**, **hull_y** : np.ndarray of the points whose convex hull
+                                 is the area to plot, *default* is the
+                                 stations
+
+        **max_grids** : number of grids to keep the weights of
+
+    ======================= ===================================================
+    Attributes              Description
+    ======================= ===================================================
+    tree                    scipy.spatial.cKDTree of the stations
+    hull                    scipy.spatial.Delaunay triangulation of the hull
+                            points, None if they are collinear
+    ======================= ===================================================
+
+    A hull of collinear points has no area, the whole grid is plotted then.
+    """
+
+    def __init__(self, x, y, hull_x=None, hull_y=None, max_grids=8):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.hull_x = self.x if hull_x is None else np.asarray(hull_x, dtype=np.float64)
+        self.hull_y = self.y if hull_y is None else np.asarray(hull_y, dtype=np.float64)
+        self.max_grids = max_grids
+
+        self.tree = cKDTree(np.array([self.x, self.y]).T)
+        try:
+            self.hull = Delaunay(np.array([self.hull_x, self.hull_y]).T)
+        except (QhullError, ValueError):
+            _logger.info("hull points are collinear, the whole grid is used")
+            self.hull = None
+
+        self._weights = OrderedDict()
+        self._triangulations = OrderedDict()
+
+    def get_grid(self, nx, ny):
+        """
+        Get a regular grid over the extent of the hull points.
+
+        :returns: tuple (grid_x, grid_y) of np.ndarray(nx * ny)
+        """
+        grid_x, grid_y = np.meshgrid(
+            np.linspace(self.hull_x.min(), self.hull_x.max(), nx),
+            np.linspace(self.hull_y.min(), self.hull_y.max(), ny))
+        return grid_x.flatten(), grid_y.flatten()
+
+    def in_hull(self, x, y):
+        """
+        Test if points are inside the convex hull.
+
+        :returns: np.ndarray(bool) of the shape of x
+        """
+        x = np.asarray(x, dtype=np.float64)
+        if self.hull is None:
+            return np.ones(x.shape, dtype=np.bool_)
+        return self.hull.find_simplex(
+            np.array([x.ravel(), np.ravel(y)]).T).reshape(x.shape) >= 0
+
+    def get_weights(self, grid_x, grid_y, nn=7, p=4):
+        """
+        Get the cached inverse distance weights of a grid, see
+        get_idw_weights.
+        """
+        key = self._get_key(grid_x, grid_y) + (min(nn, self.tree.n), p)
+        return self._get_cached(self._weights, key, lambda: get_idw_weights(
+            self.tree, np.array([np.ravel(grid_x), np.ravel(grid_y)]).T,
+            nn=nn, p=p))
+
+    def get_triangulation(self, grid_x, grid_y):
+        """
+        Get the cached triangulation of a grid with the triangles outside the
+        convex hull masked.
+
+        :returns: matplotlib.tri.Triangulation
+        """
+        def triangulate():
+            triangulation = tri.Triangulation(grid_x, grid_y)
+            inside = self.in_hull(grid_x[triangulation.triangles].mean(axis=1),
+                                  grid_y[triangulation.triangles].mean(axis=1))
+            triangulation.set_mask(~inside)
+            return triangulation
+
+        return self._get_cached(self._triangulations,
+                                self._get_key(grid_x, grid_y), triangulate)
+
+    def grid(self, values, grid_x, grid_y, nn=7, p=4):
+        """
+        Grid station values onto a grid.
+
+        :param values: np.ndarray(n_stations, ...) e.g. the resistivity of
+                       all the components and frequencies
+        :param grid_x, grid_y: np.ndarray(n_points) of grid coordinates
+        :param nn: number of nearest stations
+        :param p: power of the distance
+
+        :returns: np.ndarray(..., n_points) of gridded values
+        """
+        values = np.asarray(values)
+        weights = self.get_weights(grid_x, grid_y, nn=nn, p=p)
+        gridded = weights.dot(values.reshape(values.shape[0], -1))
+
+        return np.moveaxis(gridded, 0, -1).reshape(values.shape[1:] +
+                                                   (weights.shape[0],))
+
+    def clear(self):
+        """
+        Forget the cached weights and triangulations.
+        """
+        self._weights.clear()
+        self._triangulations.clear()
+
+    @staticmethod
+    def _get_key(grid_x, grid_y):
+        grid_x = np.ascontiguousarray(grid_x, dtype=np.float64)
+        grid_y = np.ascontiguousarray(grid_y, dtype=np.float64)
+        return grid_x.shape, hash(grid_x.tobytes()), hash(grid_y.tobytes())
+
+    def _get_cached(self, cache, key, compute):
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+        value = compute()
+        cache[key] = value
+        while len(cache) > self.max_grids:
+            cache.popitem(last=False)
+        return value
@@ -1,3 +1,5 @@
+from collections import OrderedDict
+
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -16,3 +18,81 @@ def gen_hist_bins(uniq_period_list):
     bins -= diff  # shift left
     bins = np.r_[bins, uniq_period_list[-1] + diff[-1]]  # add last bar
     return bins
+
+
+def update_mesh(mesh, x_mesh, values):
+    """
+    update the colours of a pcolormesh in place instead of plotting a new one.
+
+    :param mesh: QuadMesh returned by pcolormesh
+    :param x_mesh: x coordinates the mesh was plotted with, used to trim
+                   values the same way pcolormesh does when they have the
+                   shape of the coordinates
+    :param values: new values, same layout as given to pcolormesh
+    """
+    n_rows, n_cols = x_mesh.shape[0] - 1, x_mesh.shape[1] - 1
+    mesh.set_array(np.asarray(values)[:n_rows, :n_cols].ravel())
+
+
+def blit_axes(*axes):
+    """
+    redraw only the inside of the given axes and blit it onto the canvas.
+
+    much faster than redrawing the whole figure when only the data of an axes
+    changed, ticks, labels and titles are not redrawn.  Falls back to a full
+    draw when the canvas has not been drawn yet or can not blit.
+    """
+    for ax in axes:
+        canvas = ax.figure.canvas
+        try:
+            ax.redraw_in_frame()
+        except AttributeError:
+            canvas.draw_idle()
+            continue
+        canvas.blit(ax.bbox)
+
+
+class SliceCache(object):
+    """
+    Least recently used cache of log10 slices through a 3D resistivity model.
+
+    Slice viewers step through a model one index at a time and often go back
+    to a slice they just showed, so slices are only computed the first time
+    they are asked for and the last max_slices of them are kept.  Call
+    clear() after the model was edited in place.
+
+    :Example: ::
+
+        >>> cache = SliceCache(model_obj.res_model)
+        >>> depth_slice = cache.get_slice(2, 10)
+    """
+
+    def __init__(self, res_model, max_slices=32):
+        self.res_model = res_model
+        self.max_slices = max_slices
+        self._slices = OrderedDict()
+
+    def get_slice(self, axis, index):
+        """
+        get log10 of the resistivity model at index along axis
+        (0 north, 1 east, 2 vertical).
+        """
+        key = (axis, index)
+        if key in self._slices:
+            self._slices.move_to_end(key)
+            return self._slices[key]
+        plot_res = np.log10(np.take(self.res_model, index, axis=axis))
+        self._slices[key] = plot_res
+        while len(self._slices) > self.max_slices:
+            self._slices.popitem(last=False)
+        return plot_res
+
+    def set_model(self, res_model):
+        """
+        set a new resistivity model and drop the cached slices
+        """
+        self.res_model = res_model
+        self.clear()
+
+    def clear(self):
+        self._slices.clear()
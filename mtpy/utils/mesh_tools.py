@@ -10,7 +10,7 @@ functions to assist with mesh generation
 
 import numpy as np
 import mtpy.utils.filehandling as mtfh
-from mtpy.utils import gis_tools
+from mtpy.utils import gis_tools, dem_tools
 import scipy.interpolate as spi
 
 
@@ -76,28 +76,24 @@ def interpolate_elevation_to_grid(grid_east, grid_north, epsg=None, utm_zone=Non
                                   surfacefile=None, surface=None, method='linear',
                                   fast=True):
     """
-    # Note: this documentation is outdated and seems to be copied from
-    #  model.interpolate_elevation2. It needs to be updated. This
-    #  funciton does not update a dictionary but returns an array of
-    #  elevation data.
-
-    project a surface to the model grid and add resulting elevation data
-    to a dictionary called surface_dict. Assumes the surface is in lat/long
-    coordinates (wgs84)
-    The 'fast' method extracts a subset of the elevation data that falls within the
-    mesh-bounds and interpolates them onto mesh nodes. This approach significantly
-    speeds up (~ x5) the interpolation procedure.
+    interpolate a surface onto the model grid and return the elevation at
+    the grid points. Assumes the surface is in lat/long coordinates (wgs84)
+    unless it is a GeoTIFF in another projection.
 
     **returns**
-    nothing returned, but surface data are added to surface_dict under
-    the key given by surfacename.
+    elevation on the grid points, same shape as grid_east (2D if grid_east
+    and grid_north are 1D)
 
     **inputs**
-    choose to provide either surface_file (path to file) or surface (tuple).
-    If both are provided then surface tuple takes priority.
+    choose to provide either surfacefile (path to file) or surface (tuple).
+    If both are provided then surfacefile takes priority.
 
     surface elevations are positive up, and relative to sea level.
-    surface file format is:
+    surfacefile is an ESRI ASCII grid or a GeoTIFF, it is read through a
+    tile pyramid cached next to the file (see mtpy.utils.dem_tools) so only
+    the part of the DEM around the grid is read, at about the resolution of
+    the grid, and interpolated on the regular DEM grid.
+    ASCII grid format is:
 
     ncols         3601
     nrows         3601
@@ -118,16 +114,22 @@ def interpolate_elevation_to_grid(grid_east, grid_north, epsg=None, utm_zone=Non
     and lon, lat are either 1D arrays containing list of longitudes and
     latitudes (in the case of a regular grid) or 2D arrays with same shape
     as elevation array containing longitude and latitude of each point.
+    The 'fast' method extracts a subset of the surface tuple that falls
+    within the mesh-bounds before interpolating.
 
     other inputs:
-    surfacename = name of surface for putting into dictionary
-    surface_epsg = epsg number of input surface, default is 4326 for lat/lon(wgs84)
-    method = interpolation method. Default is 'nearest', if model grid is
-    dense compared to surface points then choose 'linear' or 'cubic'
+    epsg, utm_zone = projection of grid_east and grid_north
+    method = interpolation method 'nearest', 'linear' or 'cubic', if model
+    grid is dense compared to surface points then choose 'linear' or 'cubic'
     """
-    # read the surface data in from ascii if surface not provided
+    if len(grid_east.shape) == 1:
+        grid_east, grid_north = np.meshgrid(grid_east, grid_north)
+
     if surfacefile:
-        lon, lat, elev = mtfh.read_surface_ascii(surfacefile)
+        return dem_tools.interpolate_to_points(surfacefile, grid_east,
+                                               grid_north, epsg=epsg,
+                                               utm_zone=utm_zone,
+                                               method=method)
     elif surface:
         lon, lat, elev = surface
     else:
@@ -148,9 +150,6 @@ def interpolate_elevation_to_grid(grid_east, grid_north, epsg=None, utm_zone=Non
             lon, lat = np.meshgrid(lon, lat, sparse=True)
             lat = lat.T
 
-    if len(grid_east.shape) == 1:
-        grid_east, grid_north = np.meshgrid(grid_east, grid_north)
-
     if(fast):
         buffer = 1  # use a buffer of 1 degree around mesh-bounds
         mlatmin, mlonmin = gis_tools.project_point_utm2ll(grid_east.min(),
@@ -309,16 +308,191 @@ def get_station_buffer(grid_east,grid_north,station_east,station_north,buf=10e3)
     returns a 2D boolean (True/False) array
     
     """
-    first = True
+    xgrid,ygrid = np.meshgrid(grid_east,grid_north)
+    where = np.zeros(xgrid.shape, dtype=bool)
     for xs,ys in np.vstack([station_east,station_north]).T:
-        xgrid,ygrid = np.meshgrid(grid_east,grid_north)
-        station_distance = ((xs - xgrid)**2 + (ys - ygrid)**2)**0.5
-        if first:
-            where = station_distance < buf
-            first = False
-        else:
-            where = np.any([where,station_distance < buf],axis=0)
+        where |= ((xs - xgrid)**2 + (ys - ygrid)**2)**0.5 < buf
             
     return where
+
+
+def get_cell_index(grid_edges, locations):
+    """
+    get the index of the cells containing the locations, cell i spans
+    grid_edges[i] < location <= grid_edges[i + 1]
+
+    :param grid_edges: increasing array of cell edges
+    :param locations: array of locations
+    :returns: array of cell indices
+    """
+    grid_edges = np.asarray(grid_edges)
+    locations = np.asarray(locations)
+    index = np.searchsorted(grid_edges, locations, side='left') - 1
+    outside = (index < 0) | (index > grid_edges.size - 2)
+    if np.any(outside):
+        raise ValueError('locations {0} are outside of the grid {1} to '
+                         '{2}'.format(locations[outside], grid_edges[0],
+                                      grid_edges[-1]))
+
+    return index
+
+
+def get_station_cells(grid_east, grid_north, station_east, station_north,
+                      grid_z=None, station_z=None, origin=(0., 0.),
+                      rotation_angle=0.):
+    """
+    get the cells of a mesh containing all of the stations at once, cell i
+    spans grid[i] < location <= grid[i + 1] as in get_cell_index.
+
+    Stations in the coordinates rotate_mesh places a rotated mesh in are
+    rotated back onto the mesh with the same origin and rotation_angle.
+    Stations above or below the mesh are in its top or bottom layer, stations
+    outside of the mesh horizontally get the index -1 in all of the arrays.
+
+    :param grid_east: increasing array of cell edges in the east direction
+    :param grid_north: increasing array of cell edges in the north direction
+    :param station_east: array of station east locations
+    :param station_north: array of station north locations
+    :param grid_z: increasing array of vertical cell edges, depth positive
+                   down
+    :param station_z: array of station depths, positive down
+    :param origin: position of the (0, 0) point of the mesh in the station
+                   coordinates
+    :param rotation_angle: angle in degrees the mesh is rotated by, the
+                           mesh_rotation_angle of a model
+    :returns: index_east, index_north, index_z arrays of cell indices,
+              index_z is None if station_z is None
+    """
+    grid_east = np.asarray(grid_east)
+    grid_north = np.asarray(grid_north)
+    station_east = np.asarray(station_east, dtype=float) - origin[0]
+    station_north = np.asarray(station_north, dtype=float) - origin[1]
+    if rotation_angle != 0:
+        # inverse of the rotation in rotate_mesh
+        cos_ang = np.cos(np.deg2rad(rotation_angle))
+        sin_ang = np.sin(np.deg2rad(rotation_angle))
+        station_east, station_north = (cos_ang * station_east - sin_ang * station_north,
+                                       sin_ang * station_east + cos_ang * station_north)
+
+    index_east = np.searchsorted(grid_east, station_east, side='left') - 1
+    index_north = np.searchsorted(grid_north, station_north, side='left') - 1
+    outside = (index_east < 0) | (index_east > grid_east.size - 2) | \
+              (index_north < 0) | (index_north > grid_north.size - 2)
+    index_east[outside] = -1
+    index_north[outside] = -1
+    index_z = None
+    if station_z is not None:
+        index_z = np.clip(np.searchsorted(grid_z, station_z, side='left') - 1,
+                          0, len(grid_z) - 2)
+        index_z[outside] = -1
+
+    return index_east, index_north, index_z
+
+
+def move_nodes_off_stations(grid_edges, locations, distance):
+    """
+    move the cell edges closer than distance to a station by distance away
+    from the nearest station, so that no station lies on a cell edge.
+
+    :param grid_edges: increasing array of cell edges
+    :param locations: array of station locations
+    :param distance: distance to move the cell edges by
+    :returns: array of cell edges
+    """
+    grid_edges = np.array(grid_edges, dtype=float)
+    locations = np.sort(locations)
+    # stations either side of each edge
+    index = np.searchsorted(locations, grid_edges)
+    below = locations[np.clip(index - 1, 0, locations.size - 1)]
+    above = locations[np.clip(index, 0, locations.size - 1)]
+    offset = np.where(grid_edges - below <= above - grid_edges, below, above) - grid_edges
+    near = np.abs(offset) < distance
+    grid_edges[near] -= distance * np.sign(offset[near])
+
+    return grid_edges
+
+
+def get_layer_mask(grid_z, top_surface, bottom_surface):
+    """
+    get a mask of the cells of a 3D mesh whose centres lie between two
+    surfaces, top_surface < cell centre <= bottom_surface, with depth
+    positive down.
+
+    :param grid_z: increasing array of vertical cell edges
+    :param top_surface: 2D array (n_north, n_east) of the top surface depth
+    :param bottom_surface: 2D array (n_north, n_east) of the bottom surface
+                           depth
+    :returns: 3D boolean array (n_north, n_east, n_z)
+    """
+    gcz = grid_centre(np.asarray(grid_z))
+    # first cell below the top and first cell below the bottom of each column
+    top_index = np.searchsorted(gcz, top_surface, side='right')
+    bottom_index = np.searchsorted(gcz, bottom_surface, side='right')
+    z_index = np.arange(gcz.size)
+
+    return ((z_index >= top_index[..., None]) &
+            (z_index < bottom_index[..., None]))
+
+
+def _get_nearest_along_axis(centres, values, k):
+    """
+    get the k cell centres nearest to each value along one axis, nearest
+    first
+
+    :returns: indices and distances, 2D arrays (n_values, k)
+    """
+    n_cells = centres.size
+    k = min(k, n_cells)
+    # the k nearest are within k cells of the insertion index
+    window = np.searchsorted(centres, values)[:, None] + np.arange(-k, k)
+    valid = (window >= 0) & (window < n_cells)
+    window = np.clip(window, 0, n_cells - 1)
+    distance = np.where(valid, np.abs(centres[window] - values[:, None]), np.inf)
+    order = np.argsort(distance, axis=1, kind='stable')[:, :k]
+    return (np.take_along_axis(window, order, axis=1),
+            np.take_along_axis(distance, order, axis=1))
+
+
+def get_nearest_cells(grid_centres, locations, k=1):
+    """
+    get the k cells of a rectilinear mesh whose centres are nearest to each
+    location, without building the coordinates of every cell.
+
+    The k nearest cells of a location are among the k nearest cell centres
+    along each axis, and a cell that is the a-th, b-th and c-th nearest
+    along the axes is further than at least (a + 1)(b + 1)(c + 1) - 1 other
+    cells, so only the combinations with (a + 1)(b + 1)(c + 1) <= k are
+    compared.
+
+    :param grid_centres: list of increasing arrays of cell centres along
+                         each axis, in the order of the axes of the model
+    :param locations: array (n_locations, n_axes) of locations, columns in
+                      the order of grid_centres
+    :param k: number of cells to find
+    :returns: distances and flat indices into the model of the cells,
+              nearest first, arrays (n_locations) for k = 1 and
+              (n_locations, k) otherwise as scipy.spatial.cKDTree.query
+    """
+    locations = np.atleast_2d(np.asarray(locations, dtype=float))
+    shape = [np.size(centres) for centres in grid_centres]
+    nearest = [_get_nearest_along_axis(np.asarray(centres, dtype=float),
+                                       locations[:, ii], k)
+               for ii, centres in enumerate(grid_centres)]
+
+    ranks = [rank for rank in np.ndindex(*[index.shape[1] for index, _ in nearest])
+             if np.prod(np.array(rank) + 1) <= k]
+    distance = np.zeros((locations.shape[0], len(ranks)))
+    flat_index = np.zeros((locations.shape[0], len(ranks)), dtype=int)
+    for jj, rank in enumerate(ranks):
+        for ii, (index, axis_distance) in enumerate(nearest):
+            distance[:, jj] += axis_distance[:, rank[ii]] ** 2
+            flat_index[:, jj] = flat_index[:, jj] * shape[ii] + index[:, rank[ii]]
+
+    order = np.argsort(distance, axis=1, kind='stable')[:, :k]
+    distance = np.sqrt(np.take_along_axis(distance, order, axis=1))
+    flat_index = np.take_along_axis(flat_index, order, axis=1)
+    if k == 1:
+        return distance[:, 0], flat_index[:, 0]
+    return distance, flat_index
     
     
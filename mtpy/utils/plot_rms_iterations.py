@@ -83,6 +83,37 @@ def read(logfile):
     return metrics
 
 
+def read_history(directory, n_workers=None):
+    """
+    Get the values of the log files in a ModEM run directory from its
+    RMS history (see mtpy.modeling.modem.InversionMonitor). Only the
+    files that are new or changed since the history was last updated are
+    read, so the log files do not have to be concatenated and read again
+    every time the plot is made.
+
+    Args:
+        directory (str): ModEM run directory.
+        n_workers (int): Number of processes to read new files with,
+            default is the number of cpus.
+
+    Returns
+        dict of str, float: A dictionary containing lists of metric
+            values, as returned by read.
+    """
+    # imported here as the monitor reads log files with this module
+    from mtpy.modeling.modem.inversion_monitor import InversionMonitor, LOG_METRICS
+
+    monitor = InversionMonitor(directory, n_workers=n_workers)
+    monitor.update()
+    metrics = {}
+    for metric in LOG_METRICS:
+        values = monitor.get_log_history(metric)
+        metrics[metric] = [None if np.isnan(value) else float(value) for value in values]
+    if not metrics['rms']:
+        raise ValueError("No readable values in the log files of '{}'.".format(directory))
+    return metrics
+
+
 def plot(metric, values, x_start=0, x_end=None, x_interval=1, y_start=None, y_end=None,
          y_interval=None, fig_width=1900, fig_height=1200, dpi=100, minor_ticks=True):
     fig_width = 800 if fig_width is None else fig_width
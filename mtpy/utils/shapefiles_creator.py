@@ -30,6 +30,7 @@ from mpl_toolkits.axes_grid1 import make_axes_locatable
 from shapely.geometry import Point, Polygon, LineString, LinearRing
 
 from mtpy.core.edi_collection import EdiCollection
+from mtpy.utils.bulk_export import SurveyExport, GIS_ELEMENTS, RASTER_COLUMNS
 from mtpy.utils.mtpy_decorator import deprecated
 from mtpy.utils.mtpylog import MtPyLog
 from mtpy.utils.edi_folders import recursive_glob
@@ -58,6 +59,7 @@ class ShapefilesCreator(EdiCollection):
         :param outdir: path2output dir, where the shp file will be written.
         :param epsg_code: epsg code of the EDI data CRS.
         """
+        self.epsg_code = epsg_code
         self.orig_crs = {'init': 'epsg:{}'.format(epsg_code)}
 
         # ensure that outdir is specified, and be created if not there.
@@ -120,7 +122,27 @@ class ShapefilesCreator(EdiCollection):
 
         return outpath
 
-    def create_phase_tensor_shp(self, period, ellipsize=None, 
+    def _get_survey_export(self, periods, interpolate=True):
+        """
+        Compute the phase tensor and tipper attributes of all the stations at
+        a list of periods in one go.
+        """
+        return SurveyExport(self.mt_obj_list, period_list=periods,
+                            interpolate=interpolate, ptol=self.ptol, by_period=True)
+
+    def _export_gdf(self, geopdf, element_type, target_epsg_code, period, export_fig):
+        if target_epsg_code is None:
+            self._logger.info("Keep the Default/Original Geopandas Dataframe CRS: %s", geopdf.crs)
+            target_epsg_code = self.epsg_code
+        else:
+            geopdf.to_crs(epsg=target_epsg_code, inplace=True)
+
+        path2shp = \
+            self._export_shapefiles(geopdf, element_type, target_epsg_code, period, export_fig)
+
+        return (geopdf, path2shp)
+
+    def create_phase_tensor_shp(self, period, ellipsize=None,
             target_epsg_code=4283, export_fig=False):
         """
         create phase tensor ellipses shape file correspond to a MT period
@@ -130,70 +152,14 @@ class ShapefilesCreator(EdiCollection):
             ellipsize = self.stations_distances.get("Q1PERCENT") / 2  # a half or a third of the min_distance?
             self._logger.debug("Automatically Selected Max-Ellispse Size = %s", ellipsize)
 
-        pt = self.get_phase_tensor_tippers(period)
-
-        self._logger.debug("phase tensor values =: %s", pt)
-
-        if len(pt) < 1:
+        s_export = self._get_survey_export([period])
+        if not s_export.valid.any():
             self._logger.warn("No phase tensor for the period %s for any MT station", period)
             return None
 
-        pdf = pd.DataFrame(pt)
-
-        self._logger.debug(pdf['period'])
-
-        mt_locations = [Point(xy) for xy in zip(pdf['lon'], pdf['lat'])]
-
-        geopdf = gpd.GeoDataFrame(pdf, crs=self.orig_crs, geometry=mt_locations)
-
-        # points to trace out the polygon-ellipse
-        theta = np.arange(0, 2 * np.pi, np.pi / 30.)
-        azimuth = -np.deg2rad(geopdf['azimuth'])
-        scaling = ellipsize / geopdf['phi_max']
-        width = geopdf['phi_max'] * scaling
-        height = geopdf['phi_min'] * scaling
-        x0 = geopdf['lon']
-        y0 = geopdf['lat']
-
-        # Find invalid ellipses
-        bad_min = np.where(np.logical_or(geopdf['phi_min'] == 0, geopdf['phi_min'] > 100))[0]
-        bad_max = np.where(np.logical_or(geopdf['phi_max'] == 0, geopdf['phi_max'] > 100))[0]
-        dot = 0.0000001 * ellipsize
-        height[bad_min] = dot
-        height[bad_max] = dot
-        width[bad_min] = dot
-        width[bad_max] = dot
-
-        # apply formula to generate ellipses
-        ellipse_list = []
-        for i in range(0, len(azimuth)):
-            x = x0[i] + height[i] * np.cos(theta) * np.cos(azimuth[i]) - \
-                width[i] * np.sin(theta) * np.sin(azimuth[i])
-            y = y0[i] + height[i] * np.cos(theta) * np.sin(azimuth[i]) + \
-                width[i] * np.sin(theta) * np.cos(azimuth[i])
-
-            polyg = Polygon(LinearRing([xy for xy in zip(x, y)]))
-
-            # print polyg  # an ellispe
-
-            ellipse_list.append(polyg)
-
-        geopdf = gpd.GeoDataFrame(geopdf, crs=self.orig_crs, geometry=ellipse_list)
-
-        if target_epsg_code is None:
-            self._logger.info("The orginal Geopandas Dataframe CRS: %s", geopdf.crs)
-            # {'init': 'epsg:4283', 'no_defs': True}
-            # raise Exception("Must provide a target_epsg_code")
-            target_epsg_code = geopdf.crs['init'][5:]
-        else:
-            geopdf.to_crs(epsg=target_epsg_code, inplace=True)
-            # world = world.to_crs({'init': 'epsg:3395'})
-            # world.to_crs(epsg=3395) would also work
-
-        path2shp = \
-            self._export_shapefiles(geopdf, 'Phase_Tensor', target_epsg_code, period, export_fig)
+        geopdf = s_export.get_phase_tensor_gdf(ellipsize, crs=self.orig_crs)
 
-        return (geopdf, path2shp)
+        return self._export_gdf(geopdf, 'Phase_Tensor', target_epsg_code, period, export_fig)
 
     def create_tipper_real_shp(self, period, line_length=None, target_epsg_code=4283, export_fig=False):
         """
@@ -207,47 +173,14 @@ class ShapefilesCreator(EdiCollection):
             line_length = self.stations_distances.get("Q1PERCENT")
             self._logger.info("Automatically Selected Max Tipper Length  = %s", line_length)
 
-        pt = self.get_phase_tensor_tippers(period)
-        self._logger.debug("phase tensor values =: %s", pt)
-
-        if len(pt) < 1:
+        s_export = self._get_survey_export([period])
+        if not s_export.valid.any():
             self._logger.warn("No phase tensor for the period %s for any MT station", period)
             return None
 
-        pdf = pd.DataFrame(pt)
-
-        tip_mag_re_maxval = pdf['tip_mag_re'].max()
-
-        if (tip_mag_re_maxval > 0.00000001):
-            line_length_normalized = line_length / tip_mag_re_maxval
-        else:
-            line_length_normalized = line_length
-
-        self._logger.debug(pdf['period'])
-
-        pdf['tip_re'] = pdf.apply(lambda x:
-                                  LineString([(float(x.lon), float(x.lat)),
-                                              (float(x.lon) + line_length_normalized * x.tip_mag_re * np.cos(
-                                                  -np.deg2rad(x.tip_ang_re)),
-                                               float(x.lat) + line_length_normalized * x.tip_mag_re * np.sin(
-                                                   -np.deg2rad(x.tip_ang_re)))]), axis=1)
-
-        geopdf = gpd.GeoDataFrame(pdf, crs=self.orig_crs, geometry='tip_re')
+        geopdf = s_export.get_tipper_gdf(line_length, component='real', crs=self.orig_crs)
 
-        if target_epsg_code is None:
-            self._logger.info("Geopandas Datframe CRS: %s", geopdf.crs)
-            # {'init': 'epsg:4283', 'no_defs': True}
-            # raise Exception("Must provide a target_epsg_code")
-            target_epsg_code = geopdf.crs['init'][5:]
-        else:
-            geopdf.to_crs(epsg=target_epsg_code, inplace=True)
-            # world = world.to_crs({'init': 'epsg:3395'})
-            # world.to_crs(epsg=3395) would also work
-
-        path2shp = \
-            self._export_shapefiles(geopdf, 'Tipper_Real', target_epsg_code, period, export_fig)
-
-        return (geopdf, path2shp)
+        return self._export_gdf(geopdf, 'Tipper_Real', target_epsg_code, period, export_fig)
 
     def create_tipper_imag_shp(self, period, line_length=None, target_epsg_code=4283, export_fig=False):
         """
@@ -262,47 +195,73 @@ class ShapefilesCreator(EdiCollection):
             line_length = self.stations_distances.get("Q1PERCENT")
             self._logger.info("Automatically Selected Max-Tipper Length =: %s", line_length)
 
-        pt = self.get_phase_tensor_tippers(period)
-        self._logger.debug("phase tensor values =: %s", pt)
-
-        if len(pt) < 1:
+        s_export = self._get_survey_export([period])
+        if not s_export.valid.any():
             self._logger.warn("No phase tensor for the period %s for any MT station", period)
             return None
 
-        pdf = pd.DataFrame(pt)
+        geopdf = s_export.get_tipper_gdf(line_length, component='imag', crs=self.orig_crs)
 
-        tip_mag_im_maxval = pdf['tip_mag_im'].max()
+        return self._export_gdf(geopdf, 'Tipper_Imag', target_epsg_code, period, export_fig)
 
-        if (tip_mag_im_maxval > 0.00000001):
-            line_length_normalized = line_length / tip_mag_im_maxval
-        else:
-            line_length_normalized = line_length
+    def create_shapefiles(self, periods=None, ellipsize=None, line_length=None,
+                          target_epsg_code=4283, driver='ESRI Shapefile',
+                          interpolate=True, n_workers=None, elements=GIS_ELEMENTS):
+        """
+        create the phase tensor ellipses and tipper lines of many periods in one go.
+
+        The attributes of all the stations and periods are computed once, the
+        files are written by a pool of n_workers processes.  With the default
+        driver the files are the same as create_phase_tensor_shp,
+        create_tipper_real_shp and create_tipper_imag_shp write for each period,
+        with driver='GPKG' all the periods go into one GeoPackage with a layer
+        for each element.
+
+        :param periods: list of periods, *default* is all_unique_periods
+        :param ellipsize: size of the ellipses, *default* is a half of Q1PERCENT
+        :param line_length: length of the longest tipper line, *default* is Q1PERCENT
+        :param target_epsg_code: EPSG code of the files, None keeps the EDI CRS
+        :return: dictionary {element: [path_to_file,...]}
+        """
+        if periods is None:
+            periods = self.all_unique_periods
+        if ellipsize is None:
+            ellipsize = self.stations_distances.get("Q1PERCENT") / 2
+            self._logger.debug("Automatically Selected Max-Ellispse Size = %s", ellipsize)
+        if line_length is None:
+            line_length = self.stations_distances.get("Q1PERCENT")
+            self._logger.debug("Automatically Selected Max-Tipper Length =: %s", line_length)
+        if target_epsg_code is None:
+            target_epsg_code = self.epsg_code
 
-        self._logger.debug(pdf['period'])
+        s_export = self._get_survey_export(periods, interpolate=interpolate)
 
-        pdf['tip_im'] = pdf.apply(lambda x: LineString([(float(x.lon), float(x.lat)),
-                                                        (float(x.lon) + line_length_normalized * x.tip_mag_im * np.cos(
-                                                            -np.deg2rad(x.tip_ang_im)),
-                                                         float(x.lat) + line_length_normalized * x.tip_mag_im * np.sin(
-                                                             -np.deg2rad(x.tip_ang_im)))]),
-                                  axis=1)
+        return s_export.write_gis(self.outdir, ellipsize, line_length,
+                                  crs='epsg:{}'.format(self.epsg_code),
+                                  target_epsg_code=target_epsg_code, driver=driver,
+                                  n_workers=n_workers, elements=elements)
 
-        geopdf = gpd.GeoDataFrame(pdf, crs=self.orig_crs, geometry='tip_im')
+    def create_rasters(self, periods=None, cell_size=None, columns=RASTER_COLUMNS,
+                       interpolate=True, n_workers=None):
+        """
+        create geotiff rasters of phase tensor and tipper attributes of many periods,
+        the attributes are gridded in the CRS of the EDI files.
 
-        if target_epsg_code is None:
-            self._logger.info("Keep the Default/Original Geopandas Dataframe CRS: %s", geopdf.crs)
-            # {'init': 'epsg:4283', 'no_defs': True}
-            # raise Exception("Must provide a target_epsg_code")
-            target_epsg_code = geopdf.crs['init'][5:]
-        else:
-            geopdf.to_crs(epsg=target_epsg_code, inplace=True)
-            # world = world.to_crs({'init': 'epsg:3395'})
-            # world.to_crs(epsg=3395) would also work
+        :param periods: list of periods, *default* is all_unique_periods
+        :param cell_size: size of the cells, *default* is a half of Q1PERCENT
+        :param columns: attributes to grid, see mtpy.utils.bulk_export.SurveyExport
+        :return: list of path_to_geotiff
+        """
+        if periods is None:
+            periods = self.all_unique_periods
+        if cell_size is None:
+            cell_size = self.stations_distances.get("Q1PERCENT") / 2
+            self._logger.debug("Automatically Selected Cell Size = %s", cell_size)
 
-        path2shp = \
-            self._export_shapefiles(geopdf, 'Tipper_Imag', target_epsg_code, period, export_fig)
+        s_export = self._get_survey_export(periods, interpolate=interpolate)
 
-        return (geopdf, path2shp)
+        return s_export.write_rasters(self.outdir, cell_size, columns=columns,
+                                      epsg_code=self.epsg_code, n_workers=n_workers)
 
 
 def create_tensor_tipper_shapefiles(edi_dir, out_dir, periods,
@@ -336,15 +295,16 @@ def create_tensor_tipper_shapefiles(edi_dir, out_dir, periods,
     sfc = ShapefilesCreator(edifiles, out_dir, epsg_code=src_epsg)
     all_periods = sfc.all_unique_periods
     periods = [periods] if not isinstance(periods, list) else periods
+    nearest_periods = []
     for p in periods:
         # Find closest period.
         index = np.argmin(np.fabs(np.asarray(all_periods) - p))
         nearest = all_periods[index]
         _logger.info("Found nearest period {}s for selected period {}s".format(nearest, p))
-        sfc.create_phase_tensor_shp(all_periods[index], target_epsg_code=dst_epsg,
-                ellipsize=pt_base_size)
-        sfc.create_tipper_real_shp(all_periods[index], target_epsg_code=dst_epsg)
-        sfc.create_tipper_imag_shp(all_periods[index], target_epsg_code=dst_epsg)
+        if nearest not in nearest_periods:
+            nearest_periods.append(nearest)
+    # all the periods and shapefiles in one go
+    sfc.create_shapefiles(nearest_periods, ellipsize=pt_base_size, target_epsg_code=dst_epsg)
 
 
 def plot_phase_tensor_ellipses_and_tippers(edi_dir, out_dir, iperiod=0):
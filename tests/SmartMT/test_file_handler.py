@@ -0,0 +1,46 @@
+import glob
+import os
+from unittest import TestCase
+
+import numpy as np
+
+from mtpy.gui.SmartMT.utils.file_handler import FileHandler, iter_load_files
+from tests import EDI_DATA_DIR
+
+
+class TestFileHandler(TestCase):
+    def setUp(self):
+        self.file_list = sorted(glob.glob(os.path.join(EDI_DATA_DIR, '*.edi')))[:4]
+        self.file_handler = FileHandler()
+
+    def test_add_files(self):
+        self.file_handler.add_files(self.file_list, 'group', n_workers=2)
+        self.assertEqual(self.file_handler.get_group_members('group'), set(self.file_list))
+        for file_ref in self.file_list:
+            self.assertTrue(self.file_handler.is_loaded(file_ref))
+        # loaded files are only added to the new group
+        self.file_handler.add_files(self.file_list[:2], 'other')
+        self.assertEqual(self.file_handler.get_group_members('other'), set(self.file_list[:2]))
+
+    def test_load_error(self):
+        results = list(iter_load_files(self.file_list[:2] + ['not_a_file.edi'], n_workers=2))
+        self.assertEqual(len(results), 3)
+        errors = [file_name for file_name, mt_obj, error in results if error is not None]
+        self.assertEqual(errors, ['not_a_file.edi'])
+
+    def test_station_cache(self):
+        self.file_handler.add_files(self.file_list[:1], n_workers=1)
+        cache = self.file_handler.station_cache
+        mt_obj = self.file_handler.get_MT_obj(self.file_list[0])
+        z_array = mt_obj.Z.z.copy()
+
+        rotated = cache.get_mt_obj(mt_obj, 30)
+        self.assertIs(rotated, cache.get_mt_obj(mt_obj, 390))
+        self.assertIs(mt_obj, cache.get_mt_obj(mt_obj, 0))
+        # the loaded station is left as read
+        self.assertTrue(np.all(mt_obj.Z.z == z_array))
+        self.assertFalse(np.allclose(rotated.Z.z, z_array))
+        self.assertIs(cache.get_pt(mt_obj, 30), cache.get_pt(mt_obj, 30))
+
+        self.file_handler.unload(self.file_list[0])
+        self.assertIsNot(rotated, cache.get_mt_obj(mt_obj, 30))
@@ -0,0 +1,87 @@
+import contextlib
+import copy
+import glob
+import io
+import os
+from unittest import TestCase
+
+import numpy as np
+
+import mtpy.analysis.distortion as distortion
+import mtpy.core.z as mtz
+import mtpy.utils.calculator as mtcc
+from mtpy.core.mt import MT
+from tests import EDI_DATA_DIR
+
+
+class TestDistortion(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        fn_list = sorted(glob.glob(os.path.join(EDI_DATA_DIR, '*.edi')))[:4]
+        cls.mt_list = [MT(fn) for fn in fn_list]
+        # a station with fewer frequencies is padded in the survey
+        z_obj = cls.mt_list[1].Z
+        cls.mt_list[1].Z = mtz.Z(z_obj.z[:-5], z_obj.z_err[:-5], z_obj.freq[:-5])
+
+    def test_survey_matches_stations(self):
+        for n_workers in [1, 2]:
+            s_dis = distortion.SurveyDistortion(self.mt_list, num_freq=12,
+                                                n_workers=n_workers, chunk_size=2)
+            with contextlib.redirect_stdout(io.StringIO()):
+                z_list = s_dis.remove_distortion()
+            for mt_obj, dis, z_obj in zip(self.mt_list, s_dis.distortion, z_list):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    dis_station, z_station = distortion.remove_distortion(
+                        z_object=copy.deepcopy(mt_obj.Z), num_freq=12)
+                self.assertTrue(np.allclose(dis, dis_station))
+                self.assertTrue(np.allclose(z_obj.z, z_station.z))
+                self.assertTrue(np.allclose(z_obj.z_err, z_station.z_err))
+                self.assertTrue(np.all(z_obj.freq == mt_obj.Z.freq))
+
+    def test_remove_distortion_array(self):
+        z_array = np.array([mt_obj.Z.z[:10] for mt_obj in self.mt_list])
+        z_err_array = np.array([mt_obj.Z.z_err[:10] for mt_obj in self.mt_list])
+        dis = np.array([[[1.2, .5], [.35, 2.1]], [[.8, -.1], [.2, 1.]]] * 2)
+        dis_err = np.full(dis.shape, .05)
+        z_dis = np.matmul(dis[:, None], z_array)
+        z_corrected, z_corrected_err = distortion.remove_distortion_array(
+            z_dis, dis, z_err_array, dis_err)
+        self.assertTrue(np.allclose(z_corrected, z_array))
+
+        for ii in range(len(self.mt_list)):
+            z_obj = mtz.Z(z_dis[ii], z_err_array[ii], self.mt_list[ii].Z.freq[:10])
+            d, z_station, z_station_err = z_obj.remove_distortion(dis[ii], dis_err[ii])
+            self.assertTrue(np.allclose(z_corrected[ii], z_station))
+            self.assertTrue(np.allclose(z_corrected_err[ii], z_station_err))
+
+    def test_remove_static_shift(self):
+        s_dis = distortion.SurveyDistortion(self.mt_list, n_workers=1)
+        ss_x = np.array([1.5, .5, 1., 2.])
+        static_shift_list, z_list = s_dis.remove_static_shift(ss_x=ss_x, ss_y=.7)
+        for mt_obj, static_shift, z_obj, factor in zip(self.mt_list, static_shift_list,
+                                                       z_list, ss_x):
+            static_shift_station, z_station = mt_obj.Z.remove_ss(factor, .7)
+            self.assertTrue(np.allclose(static_shift, static_shift_station))
+            self.assertTrue(np.allclose(z_obj.z, z_station))
+            self.assertTrue(np.allclose(np.abs(z_obj.z_err / z_obj.z),
+                                        np.abs(mt_obj.Z.z_err / mt_obj.Z.z)))
+            self.assertTrue(np.allclose(z_obj.resistivity[:, 0] * factor,
+                                        mt_obj.Z.resistivity[:, 0]))
+
+        # a factor for each frequency
+        n_freq = self.mt_list[0].Z.freq.size
+        static_shift, z_station = self.mt_list[0].Z.remove_ss(np.linspace(1, 2, n_freq),
+                                                              [.7])
+        self.assertTrue(np.allclose(static_shift[:, 0, 0] ** 2, np.linspace(1, 2, n_freq)))
+        self.assertTrue(np.allclose(z_station[:, 1], self.mt_list[0].Z.z[:, 1] / .7 ** .5))
+
+    def test_invert_matrices(self):
+        matrices = np.random.uniform(-1, 1, (20, 2, 2))
+        errors = np.random.uniform(0, .1, (20, 2, 2))
+        inverse, inverse_err = mtcc.invertmatrix_incl_errors(matrices, errors)
+        for matrix, error, inv, inv_err in zip(matrices, errors, inverse, inverse_err):
+            expected = np.zeros((2, 2))
+            for i, j, k, l in np.ndindex(2, 2, 2, 2):
+                expected[i, j] += np.abs(inv[i, k] * inv[l, j] * error[k, l])
+            self.assertTrue(np.allclose(inv, np.linalg.inv(matrix)))
+            self.assertTrue(np.allclose(inv_err, expected))
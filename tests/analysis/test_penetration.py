@@ -0,0 +1,84 @@
+import glob
+import os
+from unittest import TestCase
+
+import numpy as np
+
+import mtpy.analysis.niblettbostick as nb
+import mtpy.analysis.penetration as penetration
+import mtpy.core.z as mtz
+import mtpy.imaging.mtplottools as mtpl
+from mtpy.imaging.penetration import get_penetration_depth_by_index, \
+    get_penetration_depth_by_period
+from tests import EDI_DATA_DIR
+
+
+class TestPenetration(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        fn_list = sorted(glob.glob(os.path.join(EDI_DATA_DIR, '*.edi')))[:4]
+        cls.mt_list = mtpl.get_mtlist(fn_list=fn_list)
+        # drop some periods of a station to test the padding
+        z_obj = cls.mt_list[1].Z
+        cls.mt_list[1].Z = mtz.Z(z_array=z_obj.z[:-5], z_err_array=z_obj.z_err[:-5],
+                                 freq=z_obj.freq[:-5])
+        cls.p_obj = penetration.SurveyPenetration(cls.mt_list)
+
+    def test_cube_matches_stations(self):
+        scale_param = np.sqrt(1.0 / (2.0 * np.pi * 4 * np.pi * 10 ** (-7)))
+        for ii, mt_obj in enumerate(self.mt_list):
+            zeta = mt_obj.Z
+            n_periods = zeta.freq.size
+            periods = 1. / zeta.freq
+            depth = self.p_obj.depth[ii, :n_periods]
+            self.assertTrue(np.allclose(
+                depth[:, 0],
+                scale_param * np.sqrt(zeta.resistivity[:, 0, 1] * periods)))
+            self.assertTrue(np.allclose(
+                depth[:, 1],
+                scale_param * np.sqrt(zeta.resistivity[:, 1, 0] * periods)))
+            self.assertTrue(np.allclose(
+                depth[:, 2],
+                scale_param * np.sqrt(0.2 * periods * np.abs(zeta.det) * periods)))
+            self.assertTrue(np.allclose(self.p_obj.skin_depth[ii, :n_periods],
+                                        np.sqrt(2) * depth))
+            rho_nb, nb_depth = nb.rhophi2rhodepth(zeta.resistivity[:, 0, 1],
+                                                  zeta.phase[:, 0, 1], periods)
+            self.assertTrue(np.allclose(nb_depth, depth[:, 0]))
+            self.assertTrue(np.allclose(rho_nb, self.p_obj.rho_nb[ii, :n_periods, 0]))
+            # the padding is nan
+            self.assertTrue(np.all(np.isnan(self.p_obj.depth[ii, n_periods:])))
+
+    def test_depth_by_period(self):
+        selected_periods = [0.01, 1., 1000., 1e6]
+        period, depth, mask = self.p_obj.get_depth_by_period(selected_periods, ptol=0.1)
+        self.assertEqual(depth.shape, (len(self.mt_list), 4, 3))
+        for jj, selected_period in enumerate(selected_periods):
+            for ii, mt_obj in enumerate(self.mt_list):
+                index = np.argmin(np.abs(mt_obj.Z.freq - 1. / selected_period))
+                per = 1. / mt_obj.Z.freq[index]
+                if abs(selected_period - per) > selected_period * 0.1:
+                    self.assertFalse(mask[ii, jj])
+                    self.assertEqual(period[ii, jj], selected_period)
+                    self.assertTrue(np.all(np.isnan(depth[ii, jj])))
+                else:
+                    self.assertTrue(mask[ii, jj])
+                    self.assertAlmostEqual(period[ii, jj], per)
+                    self.assertTrue(np.allclose(depth[ii, jj], self.p_obj.depth[ii, index]))
+        self.assertFalse(np.any(mask[:, -1]))
+
+    def test_imaging_functions(self):
+        stations, periods, pen_depth, latlons = get_penetration_depth_by_period(
+            self.mt_list, 1., whichrho='zyx')
+        _, depth, _ = self.p_obj.get_depth_by_period(1.)
+        self.assertEqual(stations, [mt_obj.station for mt_obj in self.mt_list])
+        self.assertTrue(np.allclose(pen_depth, -depth[:, 0, 1], equal_nan=True))
+        self.assertEqual(latlons, [(mt_obj.lat, mt_obj.lon) for mt_obj in self.mt_list])
+
+        stations, periods, pen_depth, latlons = get_penetration_depth_by_index(
+            self.mt_list, 3, whichrho='det')
+        self.assertTrue(np.allclose(pen_depth, -self.p_obj.depth[:, 3, 2]))
+        self.assertRaises(Exception, get_penetration_depth_by_index, self.mt_list,
+                          self.mt_list[1].Z.freq.size)
+        self.assertRaises(Exception, get_penetration_depth_by_period, self.mt_list, 1.,
+                          whichrho='zxx')
@@ -0,0 +1,79 @@
+import glob
+import os
+from unittest import TestCase
+
+import numpy as np
+
+import mtpy.analysis.geometry as mtg
+import mtpy.analysis.pt as mtpt
+import mtpy.analysis.strike as strike
+import mtpy.imaging.mtplottools as mtpl
+from tests import EDI_DATA_DIR
+
+
+class TestStrike(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        fn_list = sorted(glob.glob(os.path.join(EDI_DATA_DIR, '*.edi')))[:4]
+        cls.mt_list = mtpl.get_mtlist(fn_list=fn_list)
+
+    def test_phase_tensor(self):
+        z_array = self.mt_list[0].Z.z
+        pt_array = strike.get_phase_tensor(z_array)
+        for z, pt in zip(z_array, pt_array):
+            self.assertTrue(np.allclose(pt, mtpt.z2pt(z)[0]))
+        # singular real part gives a zero phase tensor
+        self.assertTrue(np.all(strike.get_phase_tensor(
+            np.array([[1 + 1j, 1], [1, 1]])) == 0))
+
+    def test_survey_matches_stations(self):
+        s_obj = strike.SurveyStrike(self.mt_list, skew_threshold=3)
+        for ii, mt in enumerate(self.mt_list):
+            index = s_obj.station_index == ii
+            self.assertTrue(np.allclose(s_obj.pt_azimuth[index],
+                                        mt.pt.azimuth))
+            self.assertTrue(np.all(
+                s_obj.dimensionality[index] ==
+                mtg.dimensionality(z_object=mt.Z, skew_threshold=3)))
+
+    def test_grid(self):
+        s_obj = strike.SurveyStrike(self.mt_list)
+        period_arr = s_obj.get_period_arr()
+        grid = s_obj.get_grid(s_obj.station_index + 1., period_arr)
+        self.assertEqual(grid.shape, (s_obj.n_periods.max(),
+                                      len(self.mt_list)))
+        # each column only holds the values of its station or the fill
+        for ii in range(len(self.mt_list)):
+            self.assertTrue(np.all(np.in1d(grid[:, ii], [0, ii + 1])))
+            self.assertTrue(np.any(grid[:, ii] == ii + 1))
+
+        # a mask leaves those estimates out
+        grid = s_obj.get_grid(s_obj.station_index + 1., period_arr,
+                              mask=s_obj.station_index != 0,
+                              fill_value=np.nan)
+        self.assertTrue(np.all(np.isnan(grid[:, 0])))
+
+    def test_rose_histograms(self):
+        period = np.logspace(-3, 3, 25)
+        angles = np.random.RandomState(0).uniform(0, 360, (25, 6))
+        angles[0, 0] = 0
+        angles[1, 1] = np.nan
+        edges = [-3, -2, -1, 0, 1, 2]
+        counts, bin_edges = strike.get_rose_histograms(angles, period, edges,
+                                                       bin_width=10)
+        self.assertEqual(counts.shape, (5, 36))
+        for ii in range(5):
+            band = (period > 10.**edges[ii]) & (period < 10.**edges[ii + 1])
+            band_angles = angles[band]
+            band_angles = band_angles[np.nonzero(band_angles)]
+            hist = np.histogram(band_angles, bins=36, range=(0, 360))
+            self.assertTrue(np.all(counts[ii] == hist[0]))
+            self.assertTrue(np.allclose(bin_edges, hist[1]))
+
+    def test_rose_angles(self):
+        rose = strike.get_rose_angles(np.array([[30., 0]]), fold=False)
+        self.assertEqual(rose.shape, (1, 2, 4))
+        self.assertTrue(np.allclose(rose[0, 0], [30, 210, 120, 300]))
+        self.assertTrue(np.all(np.isnan(rose[0, 1])))
+        rose = strike.get_rose_angles(np.array([30.]), orthogonal=False)
+        self.assertTrue(np.allclose(rose, [[30, 30]]))
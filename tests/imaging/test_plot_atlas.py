@@ -0,0 +1,69 @@
+import json
+import os
+from unittest import TestCase
+
+import matplotlib
+
+import mtpy.imaging.plot_atlas as plot_atlas
+from tests import EDI_DATA_DIR, make_temp_dir
+
+
+class TestPlotAtlas(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._temp_dir = make_temp_dir(cls.__name__)
+        cls.mt_list = plot_atlas.read_survey(EDI_DATA_DIR)
+
+    def setUp(self):
+        options = {'ellipse_size': .01, 'plot_tipper': 'yri',
+                   'arrow_size': .02, 'arrow_head_width': .002,
+                   'arrow_head_length': .002, 'fig_dpi': 40}
+        self.specs = [{'type': 'phase_tensor_map', 'period': period,
+                       'options': options} for period in [.01, 1, 100]]
+        self.specs += [{'type': 'phase_tensor_pseudosection',
+                        'name': 'pseudosection',
+                        'options': {'fig_dpi': 40}},
+                       {'type': 'phase_tensor_map', 'name': 'no_period'}]
+
+    def test_pdf(self):
+        save_fn = os.path.join(self._temp_dir, 'atlas.pdf')
+        backend = matplotlib.get_backend()
+        # the pages of a pdf are rendered in this process whatever n_workers is
+        index = plot_atlas.make_atlas(self.specs, save_fn,
+                                      mt_list=self.mt_list, n_workers=2)
+        self.assertEqual(matplotlib.get_backend(), backend)
+        self.assertTrue(os.path.isfile(save_fn))
+        self.assertEqual([entry['status'] for entry in index],
+                         ['ok'] * 4 + ['failed'])
+        self.assertEqual([entry.get('page') for entry in index],
+                         [1, 2, 3, 4, None])
+        self.assertIn('period', index[-1]['error'])
+
+        with open(os.path.join(self._temp_dir,
+                               'atlas_' + plot_atlas.INDEX_BASENAME)) as ifid:
+            self.assertEqual(len(json.load(ifid)), 5)
+
+    def test_directory_pool(self):
+        save_path = make_temp_dir('atlas', self._temp_dir)
+        index = plot_atlas.make_atlas(self.specs, save_path,
+                                      mt_list=self.mt_list, n_workers=2)
+        self.assertEqual([entry['name'] for entry in index],
+                         ['phase_tensor_map_000', 'phase_tensor_map_001',
+                          'phase_tensor_map_002', 'pseudosection',
+                          'no_period'])
+        for entry in index[:4]:
+            self.assertEqual(entry['status'], 'ok')
+            self.assertTrue(os.path.isfile(entry['fn']))
+        self.assertTrue(os.path.isfile(os.path.join(
+            save_path, plot_atlas.HTML_BASENAME)))
+
+    def test_bad_input(self):
+        self.assertRaises(plot_atlas.PlotAtlasError, plot_atlas.make_atlas,
+                          [{'type': 'seismic'}], self._temp_dir,
+                          mt_list=self.mt_list)
+        self.assertRaises(plot_atlas.PlotAtlasError, plot_atlas.make_atlas,
+                          [{'type': 'strike', 'name': 'a'},
+                           {'type': 'strike', 'name': 'a'}], self._temp_dir,
+                          mt_list=self.mt_list)
+        self.assertRaises(plot_atlas.PlotAtlasError, plot_atlas.make_atlas,
+                          [{'type': 'strike'}], self._temp_dir)
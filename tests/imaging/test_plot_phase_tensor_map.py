@@ -142,3 +142,43 @@ class test_plotPhaseTensorMaps(ImageTestCase):
         if save:
             phase_tensor_map.save_figure(savepath, close_plot='n')
             assert (os.path.exists(savepath))
+
+    def test_plot_freq_list(self):
+        """
+        test plotting many frequencies on the same figure
+        """
+        elst = [op.join(EDI_DATA_DIR, f) for f in os.listdir(EDI_DATA_DIR)
+                if f.endswith('.edi')]
+        mtlist = [MT(ff) for ff in elst]
+        freq_list = mtlist[0].Z.freq[::10]
+
+        phase_tensor_map = pptmaps.PlotPhaseTensorMaps(
+            mt_object_list=mtlist,
+            plot_freq=freq_list[0],
+            plot_tipper='yri',
+            ellipse_size=.01,
+            ellipse_colorby='skew_seg',
+            ellipse_range=(-9, 9, 3),
+            ellipse_cmap='mt_seg_bl2wh2rd',
+            arrow_size=0.02,
+            arrow_head_width=0.002,
+            arrow_head_length=0.002,
+            fig_dpi=50,
+            plot_yn='n')
+
+        savepath = os.path.join(self._temp_dir, 'phase_tensor_maps.pdf')
+        fn_list = phase_tensor_map.plot_freq_list(freq_list, savepath)
+        self.assertEqual(fn_list, [savepath])
+        self.assertTrue(os.path.isfile(savepath))
+        # the collections of the previous frequencies are removed
+        self.assertEqual(len(phase_tensor_map.ax.collections),
+                         len(phase_tensor_map._renderer.collections))
+        self.assertEqual(len(phase_tensor_map.ax.texts),
+                         len(phase_tensor_map._station_labels))
+
+        fn_list = phase_tensor_map.plot_freq_list(freq_list[:2],
+                                                  self._temp_dir,
+                                                  file_format='png')
+        self.assertEqual(len(fn_list), 2)
+        for fn in fn_list:
+            self.assertTrue(os.path.isfile(fn))
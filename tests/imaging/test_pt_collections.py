@@ -0,0 +1,75 @@
+from unittest import TestCase
+
+import matplotlib.patches as patches
+import matplotlib.pyplot as plt
+import numpy as np
+
+import mtpy.imaging.mtcolors as mtcl
+import mtpy.imaging.pt_collections as ptcol
+
+
+class TestPTCollections(TestCase):
+    def setUp(self):
+        np.random.seed(0)
+        self.x, self.y = np.random.randn(2, 20)
+        self.dx, self.dy = np.random.randn(2, 20) * .3
+
+    def tearDown(self):
+        plt.close('all')
+
+    def test_arrow_vertices(self):
+        self.dx[0] = self.dy[0] = 0
+        for kwargs in [{'width': .01, 'head_width': .04, 'head_length': .05,
+                        'length_includes_head': False},
+                       {'width': .02, 'length_includes_head': True}]:
+            verts = ptcol.get_arrow_vertices(self.x, self.y, self.dx,
+                                             self.dy, **kwargs)
+            self.assertEqual(verts.shape, (20, 7, 2))
+            for ii in range(1, 20):
+                arrow = patches.FancyArrow(self.x[ii], self.y[ii],
+                                           self.dx[ii], self.dy[ii],
+                                           **kwargs)
+                self.assertTrue(np.allclose(verts[ii], arrow.get_xy()[:7]))
+        # an arrow of no length is drawn on its tail
+        self.assertTrue(np.allclose(verts[0], [self.x[0], self.y[0]]))
+
+    def test_plot_colors(self):
+        values = np.linspace(-12, 95, 41)
+        for comp, cmap, ckmin, ckmax, bounds in [
+                ('phimin', 'mt_bl2gr2rd', 0, 90, None),
+                ('skew', 'mt_bl2wh2rd', -9, 9, None),
+                ('skew_seg', 'mt_seg_bl2wh2rd', -9, 9,
+                 np.arange(-9, 12, 3)),
+                ('geometric_mean', 'viridis', 0, 50, None)]:
+            colors = mtcl.get_plot_colors(values, comp, cmap, ckmin, ckmax,
+                                          bounds=bounds)
+            self.assertEqual(colors.shape, (values.size, 4))
+            for value, color in zip(values, colors):
+                expected = mtcl.get_plot_color(value, comp, cmap, ckmin,
+                                               ckmax, bounds=bounds)
+                self.assertTrue(np.allclose(color, expected))
+
+        self.assertRaises(NameError, mtcl.get_plot_colors, values, 'rho',
+                          'mt_bl2gr2rd', 0, 90)
+
+    def test_renderer(self):
+        fig, ax = plt.subplots()
+        renderer = ptcol.PTCollectionRenderer(ax, zorder=3)
+        ellipses = renderer.draw_ellipses(self.x, self.y, np.ones(20),
+                                          np.full(20, .5),
+                                          np.linspace(0, 180, 20),
+                                          facecolors='r', lw=.5,
+                                          edgecolor='k')
+        arrows = renderer.draw_arrows(self.x, self.y, self.dx, self.dy,
+                                      color='b', width=.01)
+        self.assertEqual(len(ax.collections), 2)
+        self.assertEqual(ellipses.get_zorder(), 3)
+        self.assertEqual(arrows.get_zorder(), 4)
+        self.assertTrue(np.allclose(ellipses.get_linewidths(), .5))
+        self.assertTrue(np.allclose(arrows.get_facecolors(),
+                                    [[0, 0, 1, 1]]))
+        fig.canvas.draw()
+
+        renderer.clear()
+        self.assertEqual(len(ax.collections), 0)
+        self.assertEqual(renderer.collections, [])
@@ -0,0 +1,50 @@
+import os
+from unittest import TestCase
+
+import numpy as np
+
+from mtpy.modeling.modem import Covariance
+from mtpy.modeling.modem.convariance import encode_mask_layer
+from tests import make_temp_dir
+
+
+class TestCovariance(TestCase):
+    def setUp(self):
+        self._temp_dir = make_temp_dir(self.__class__.__name__)
+        self.res_model = np.full((6, 5, 4), 100.)
+        self.res_model[:, :, 0] = 1e12
+        self.res_model[:2, :, 1] = 0.3
+
+    def test_encode_mask_layer(self):
+        layer = np.array([[0, 1, 9], [1.5, 2.5, -1]])
+        self.assertEqual(encode_mask_layer(layer), ' 0  1  9 \n 2  2 -1 \n')
+        # values wider than 3 characters
+        layer[0, 0] = 1000
+        self.assertEqual(encode_mask_layer(layer), '1000 1  9 \n 2  2 -1 \n')
+
+    def test_write_read(self):
+        cov_fn = os.path.join(self._temp_dir, 'covariance.cov')
+        cov = Covariance(smoothing_num=2)
+        cov.write_covariance_file(cov_fn=cov_fn, res_model=self.res_model)
+        self.assertEqual(np.count_nonzero(cov.mask_arr == 0), 30)
+        self.assertEqual(np.count_nonzero(cov.mask_arr == 9), 10)
+
+        cov_read = Covariance()
+        cov_read.read_cov_file(cov_fn)
+        self.assertEqual(cov_read.grid_dimensions, (6, 5, 4))
+        self.assertEqual(cov_read.smoothing_num, 2)
+        self.assertTrue(np.allclose(cov_read.smoothing_north, 0.3))
+        # the rows are read in the order of the file, which is north flipped
+        self.assertTrue(np.all(cov_read.mask_arr == cov.mask_arr[::-1]))
+
+    def test_model_sidecar(self):
+        res_fn = os.path.join(self._temp_dir, 'model.npy')
+        np.save(res_fn, self.res_model)
+        cov_in_memory = Covariance()
+        cov_in_memory.write_covariance_file(cov_fn=os.path.join(self._temp_dir, 'memory.cov'),
+                                            res_model=self.res_model)
+        cov = Covariance()
+        cov.write_covariance_file(model_fn=res_fn)
+        self.assertEqual(cov.cov_fn, os.path.join(self._temp_dir, 'covariance.cov'))
+        with open(cov.cov_fn) as cov_file, open(cov_in_memory.cov_fn) as memory_file:
+            self.assertEqual(cov_file.read(), memory_file.read())
@@ -0,0 +1,42 @@
+import glob
+import os
+from unittest import TestCase
+
+import numpy as np
+
+from mtpy.modeling.modem import Data
+from tests import make_temp_dir, EDI_DATA_DIR2, SAMPLE_DIR
+
+
+class TestDataWriter(TestCase):
+    def setUp(self):
+        self._temp_dir = make_temp_dir(self.__class__.__name__)
+        # data files written from this setup by the line by line writer
+        self._expected_dir = os.path.join(SAMPLE_DIR, 'ModEM_data_writer')
+        edi_list = sorted(glob.glob(os.path.join(EDI_DATA_DIR2, '*.edi')))[:4]
+        self.data_obj = Data(edi_list=edi_list, period_list=np.logspace(-2, 3, 6),
+                             epsg=3112, inv_mode='1')
+        self.data_obj.get_mt_dict()
+        self.data_obj.get_period_list()
+        self.data_obj.fill_data_array(new_edi_dir=os.path.join(self._temp_dir, 'new_edis'))
+        z = self.data_obj.data_array['z']
+        z[0, 0] = 0
+        z[1, 2, 0, 1] = 0
+        z[2, 3, 1, 1] = 1e32
+        self.data_obj.data_array['z'] = z
+
+    def test_formatting(self):
+        for formatting in ['1', '2']:
+            self.data_obj.formatting = formatting
+            self.data_obj.compute_inv_error()
+            # errors that are not finite are replaced by the order of magnitude
+            self.data_obj.data_array['z_inv_err'][1, 1, 1, 0] = np.nan
+            fn_basename = 'ModEM_Data_format{}.dat'.format(formatting)
+            data_fn = self.data_obj.write_data_file(save_path=self._temp_dir,
+                                                    fn_basename=fn_basename,
+                                                    fill=False, compute_error=False)
+            with open(data_fn, 'rb') as data_file:
+                data = data_file.read()
+            with open(os.path.join(self._expected_dir, fn_basename), 'rb') as data_file:
+                expected = data_file.read()
+            self.assertEqual(data, expected)
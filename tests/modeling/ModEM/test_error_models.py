@@ -0,0 +1,72 @@
+from unittest import TestCase
+
+import numpy as np
+
+from mtpy.modeling.modem import DataError
+from mtpy.modeling.modem.error_models import compute_z_error, ERROR_MODELS
+
+
+class TestErrorModels(TestCase):
+    def setUp(self):
+        random_state = np.random.RandomState(0)
+        shape = (6, 5, 2, 2)
+        self.z = random_state.normal(size=shape) + 1j * random_state.normal(size=shape)
+        self.z[0, 0] = 0
+        self.z[1, 0, 0, 1] = 0
+        self.z[1, 1, 0, 1] = 0
+        self.z[1, 1, 1, 0] = 0
+        self.z[2, 0, 1, 1] = 0
+        self.z_err = np.abs(self.z) * random_state.uniform(0, 0.2, shape)
+
+    def _check(self, error_type, expected, error_value=5):
+        z_inv_err = compute_z_error(self.z, self.z_err, error_type, error_value)
+        d = np.abs(self.z)
+        for ss in range(self.z.shape[0]):
+            for ff in range(self.z.shape[1]):
+                if d[ss, ff].sum() == 0:
+                    self.assertTrue(np.all(z_inv_err[ss, ff] == self.z_err[ss, ff]))
+                else:
+                    err = expected(d[ss, ff]) * np.asarray(error_value) / 100.
+                    self.assertTrue(np.allclose(z_inv_err[ss, ff], err))
+
+    def test_egbert(self):
+        def egbert(d):
+            d_xy, d_yx = d[0, 1], d[1, 0]
+            if d_xy == 0 and d_yx == 0:
+                return max(d[0, 0], d[1, 1])
+            return np.sqrt((d_xy or d_yx) * (d_yx or d_xy))
+        self._check('egbert', egbert)
+        self._check('egbert', egbert, error_value=np.array([[5, 10], [10, 5]]))
+
+    def test_median_eigen(self):
+        self._check('median', lambda d: np.median(d[d != 0]))
+        self._check('eigen', lambda d: np.abs(np.linalg.eigvals(d)).mean())
+
+    def test_component_layout(self):
+        error_type = np.array([['off_diagonals', 'mean_od'], ['percent', 'egbert']])
+
+        def expected(d):
+            od = np.array([d[0, 1], d[1, 0]])
+            return np.array([[d[0, 1], np.mean(od[od != 0]) if od.any() else np.nan],
+                             [d[1, 0], np.sqrt((d[0, 1] or d[1, 0]) * (d[1, 0] or d[0, 1]))
+                              if od.any() else max(d[0, 0], d[1, 1])]])
+        z_inv_err = compute_z_error(self.z, self.z_err, error_type, 5)
+        self.assertTrue(np.isnan(z_inv_err[1, 1, 0, 1]))
+        self.z[1, 1] = 0
+        self._check(error_type, expected)
+
+    def test_floor(self):
+        z_inv_err = compute_z_error(self.z, self.z_err, 'percent', 5)
+        z_floor = compute_z_error(self.z, self.z_err, 'percent_floor', 5)
+        self.assertTrue(np.all(z_floor == np.maximum(z_inv_err, self.z_err)))
+
+    def test_new_model(self):
+        ERROR_MODELS['constant'] = lambda d: np.ones(d.shape)
+        try:
+            z_inv_err = compute_z_error(self.z, self.z_err, 'constant', 5)
+            self.assertTrue(np.allclose(z_inv_err[1:], 0.05))
+        finally:
+            del ERROR_MODELS['constant']
+        self.assertRaises(DataError, compute_z_error, self.z, self.z_err, 'constant', 5)
+        self.assertRaises(DataError, compute_z_error, self.z, self.z_err,
+                          ['egbert', 'median'], 5)
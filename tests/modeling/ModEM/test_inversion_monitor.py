@@ -0,0 +1,79 @@
+import os
+import shutil
+from unittest import TestCase
+
+import numpy as np
+
+from mtpy.modeling.modem import InversionMonitor, PlotRMSMaps, Residual
+from mtpy.utils import plot_rms_iterations
+from tests import make_temp_dir, SAMPLE_DIR
+
+LOG_LINES = ['START:  f=   8.402E+03 m2=   0.000E+00 rms=   10.74 lambda=   1.000E+01 alpha=   2.000E+01\n',
+             'Starting NLCG iteration 1\n',
+             '    with:  f=   5.123E+03 m2=   3.210E+01 rms=   8.12 lambda=   1.000E+01 alpha=   2.000E+01\n',
+             'Starting NLCG iteration 2\n',
+             '    with:  f=   3.456E+03 m2=   5.430E+01 rms=   6.26 lambda=   1.000E+01 alpha=   2.000E+01\n']
+
+
+class TestInversionMonitor(TestCase):
+    def setUp(self):
+        self._temp_dir = make_temp_dir(self.__class__.__name__)
+        self._model_dir = os.path.join(SAMPLE_DIR, 'ModEM')
+        for iteration in [1, 2]:
+            shutil.copy(os.path.join(self._model_dir, 'Modular_MPI_NLCG_004.res'),
+                        os.path.join(self._temp_dir, 'Modular_MPI_NLCG_{0:03}.res'.format(iteration)))
+        shutil.copy(os.path.join(self._model_dir, 'Modular_MPI_NLCG_004.rho'),
+                    os.path.join(self._temp_dir, 'Modular_MPI_NLCG_002.rho'))
+        self._log_fn = os.path.join(self._temp_dir, 'Modular_MPI_NLCG.log')
+        with open(self._log_fn, 'w') as log_file:
+            log_file.writelines(LOG_LINES[:3])
+
+    def test_update(self):
+        monitor = InversionMonitor(self._temp_dir, n_workers=1)
+        parsed = monitor.update()
+        self.assertEqual(len(parsed), 4)
+        self.assertEqual(monitor.update(), [])
+
+        res_obj = Residual(residual_fn=os.path.join(self._model_dir, 'Modular_MPI_NLCG_004.res'))
+        res_obj.get_rms()
+        iterations, rms = monitor.get_rms_history()
+        self.assertTrue(np.all(iterations == [1, 2]))
+        self.assertTrue(np.allclose(rms, res_obj.rms))
+        station = res_obj.rms_array['station'][3]
+        iterations, rms = monitor.get_rms_history(station=station, component='zxy')
+        self.assertTrue(np.allclose(rms, res_obj.rms_array['rms_z_component'][3, 0, 1]))
+        iterations, rms = monitor.get_rms_period_history(station)
+        self.assertEqual(rms.shape, (2, res_obj.period_list.size))
+        self.assertTrue(np.allclose(monitor.get_log_history('rms'), [8.12]))
+        self.assertTrue(np.all(monitor.history['model_iteration'] == [2]))
+
+        # only the new and changed files are parsed, the history is kept on disk
+        shutil.copy(os.path.join(self._temp_dir, 'Modular_MPI_NLCG_001.res'),
+                    os.path.join(self._temp_dir, 'Modular_MPI_NLCG_003.res'))
+        with open(self._log_fn, 'a') as log_file:
+            log_file.writelines(LOG_LINES[3:])
+        monitor = InversionMonitor(self._temp_dir, n_workers=2)
+        parsed = monitor.update()
+        self.assertEqual(sorted(os.path.basename(fn) for fn in parsed),
+                         ['Modular_MPI_NLCG.log', 'Modular_MPI_NLCG_003.res'])
+        self.assertTrue(np.all(monitor.get_rms_history()[0] == [1, 2, 3]))
+        self.assertEqual(monitor.history['rms_z_component_period'].shape[0], 3)
+        self.assertTrue(np.allclose(monitor.get_log_history('rms'), [8.12, 6.26]))
+
+    def test_plots_read_history(self):
+        # a concatenated log file is not counted twice
+        plot_rms_iterations.concatenate_log_files(self._temp_dir)
+        metrics = plot_rms_iterations.read_history(self._temp_dir, n_workers=1)
+        self.assertEqual(metrics['rms'], [8.12])
+        self.assertEqual(metrics['f'], [5.123E+03])
+
+        monitor = InversionMonitor(self._temp_dir, n_workers=1)
+        res_fn = os.path.join(self._temp_dir, 'Modular_MPI_NLCG_002.res')
+        rms_map = PlotRMSMaps(res_fn, plot_yn='n')
+        rms_map_history = PlotRMSMaps(res_fn, plot_yn='n', inversion_monitor=monitor)
+        self.assertEqual(monitor.update(), [])
+        for key in rms_map.residual.rms_array.dtype.names:
+            if key.startswith('rms'):
+                self.assertTrue(np.allclose(rms_map_history.residual.rms_array[key],
+                                            rms_map.residual.rms_array[key], equal_nan=True))
+        self.assertAlmostEqual(rms_map_history.residual.rms_z, rms_map.residual.rms_z)
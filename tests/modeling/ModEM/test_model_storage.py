@@ -0,0 +1,72 @@
+import contextlib
+import io
+import os
+from unittest import TestCase
+
+import numpy as np
+
+from mtpy.modeling.modem import Model
+from mtpy.modeling.modem.exception import ModelError
+from tests import make_temp_dir, SAMPLE_DIR
+
+
+class TestModelStorage(TestCase):
+    def setUp(self):
+        self._temp_dir = make_temp_dir(self.__class__.__name__)
+        self._model_fn = os.path.join(SAMPLE_DIR, 'ModEM', 'Modular_MPI_NLCG_004.rho')
+        self.model_obj = self._read_model()
+
+    def _read_model(self, **kwargs):
+        model_obj = Model(**kwargs)
+        with contextlib.redirect_stdout(io.StringIO()):
+            model_obj.read_model_file(self._model_fn)
+        return model_obj
+
+    def test_float32(self):
+        model32 = self._read_model(res_dtype=np.float32)
+        self.assertEqual(model32.res_model.dtype, np.float32)
+        self.assertTrue(np.allclose(model32.res_model, self.model_obj.res_model, rtol=1e-5))
+        self.assertTrue(np.all(model32.grid_z == self.model_obj.grid_z))
+
+        model32.write_model_file(save_path=self._temp_dir, model_fn_basename='float32.rho')
+        model_read = Model()
+        with contextlib.redirect_stdout(io.StringIO()):
+            model_read.read_model_file(model32.model_fn)
+        self.assertTrue(np.allclose(model_read.res_model, self.model_obj.res_model, rtol=1e-5))
+
+    def test_memory_map(self):
+        npy_fn = os.path.join(self._temp_dir, 'res_model.npy')
+        model_mm = self._read_model(res_model_npy_fn=npy_fn)
+        self.assertIsInstance(model_mm.res_model, np.memmap)
+        self.assertTrue(np.all(model_mm.res_model == self.model_obj.res_model))
+        model_mm.res_model.flush()
+        self.assertTrue(np.all(np.load(npy_fn, mmap_mode='r') == self.model_obj.res_model))
+
+        # a new model with two air layers replaces the file of the old one
+        shape = model_mm.res_model.shape
+        model_mm.res_model = model_mm._allocate_res_model(shape[:2] + (shape[2] + 2,), 1e12,
+                                                          np.s_[:, :, 2:])
+        self.assertIsInstance(model_mm.res_model, np.memmap)
+        self.assertTrue(np.all(model_mm.res_model[:, :, :2] == 1e12))
+        self.assertTrue(np.all(model_mm.res_model[:, :, 2:] == self.model_obj.res_model))
+        self.assertTrue(np.all(np.load(npy_fn, mmap_mode='r') == model_mm.res_model))
+        self.assertEqual([fn for fn in os.listdir(self._temp_dir) if fn.endswith('.npy')],
+                         ['res_model.npy'])
+
+        # the model file is read again into the file it is mapped to
+        with contextlib.redirect_stdout(io.StringIO()):
+            model_mm.read_model_file(self._model_fn)
+        self.assertTrue(np.all(model_mm.res_model == self.model_obj.res_model))
+
+    def test_get_station_cells(self):
+        station_east = np.array([0., 1000., -2500.])
+        station_north = np.array([0., -500., 3000.])
+        cells = self.model_obj.get_station_cells(station_east, station_north)
+        self.assertTrue(np.all(cells[0] == np.searchsorted(self.model_obj.grid_east, station_east) - 1))
+        self.assertTrue(np.all(cells[1] == np.searchsorted(self.model_obj.grid_north, station_north) - 1))
+
+        # the cells follow the mesh
+        self.model_obj.grid_east = self.model_obj.grid_east + 600
+        cells = self.model_obj.get_station_cells(station_east, station_north)
+        self.assertTrue(np.all(cells[0] == np.searchsorted(self.model_obj.grid_east, station_east) - 1))
+        self.assertRaises(ModelError, Model().get_station_cells)
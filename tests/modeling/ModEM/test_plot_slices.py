@@ -0,0 +1,27 @@
+from unittest import TestCase
+
+import numpy as np
+
+from mtpy.modeling.modem.plot_slices import PlotSlices
+
+
+class TestPlotSlices(TestCase):
+    def test_get_station_grid_locations(self):
+        plot_obj = PlotSlices.__new__(PlotSlices)
+        plot_obj.grid_east = np.linspace(-10, 10, 21)
+        plot_obj.grid_north = np.linspace(-8, 8, 17)
+        # on a grid line, between grid lines, beyond the last grid line and
+        # west of the first one
+        plot_obj.station_east = np.array([-3., 2.5, 12., -20.])
+        plot_obj.station_north = np.array([2., -0.5, 3.2, 0.])
+        plot_obj.get_station_grid_locations()
+
+        self.assertEqual(plot_obj.station_dict_east[-3.], [2.])
+        self.assertEqual(plot_obj.station_dict_east[2.], [-0.5])
+        self.assertEqual(plot_obj.station_dict_east[10.], [3.2])
+        self.assertEqual(sum(len(val) for val in plot_obj.station_dict_east.values()), 3)
+        # the station west of the grid is still on a north grid line
+        self.assertEqual(plot_obj.station_dict_north[0.], [-20.])
+        self.assertEqual(plot_obj.station_dict_north[2.], [-3.])
+        self.assertEqual(plot_obj.station_dict_north[-1.], [2.5])
+        self.assertEqual(plot_obj.station_dict_north[3.], [12.])
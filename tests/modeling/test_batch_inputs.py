@@ -0,0 +1,88 @@
+import filecmp
+import json
+import os
+from unittest import TestCase
+
+import numpy as np
+
+import mtpy.modeling.batch_inputs as batch_inputs
+from tests import EDI_DATA_DIR, make_temp_dir
+
+
+class TestBatchInputs(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._temp_dir = make_temp_dir(cls.__name__)
+        cls.mt_list = batch_inputs.read_survey(EDI_DATA_DIR)
+
+    def setUp(self):
+        self.variants = [{'name': 'strike_{0:02}'.format(strike),
+                          'data': {'geoelectric_strike': strike,
+                                   'freq_min': 1, 'freq_max': 10000},
+                          'mesh': {'n_layers': 40, 'cell_width': 500}}
+                         for strike in [0, 30]]
+
+    def test_occam2d_pool_matches_serial(self):
+        serial_path = make_temp_dir('serial', self._temp_dir)
+        pool_path = make_temp_dir('pool', self._temp_dir)
+        serial = batch_inputs.build_inputs(self.variants, serial_path,
+                                           mt_list=self.mt_list, n_workers=1)
+        pooled = batch_inputs.build_inputs(self.variants, pool_path,
+                                           mt_list=self.mt_list, n_workers=2)
+
+        for s_entry, p_entry in zip(serial, pooled):
+            self.assertEqual(s_entry['status'], 'ok')
+            self.assertEqual(p_entry['status'], 'ok')
+            self.assertEqual(s_entry['num_free_param'],
+                             p_entry['num_free_param'])
+            # the startup files hold the time they were written
+            for key in ['data_fn', 'mesh_fn', 'reg_fn']:
+                fn = s_entry['files'][key]
+                self.assertTrue(filecmp.cmp(fn, p_entry['files'][key],
+                                            shallow=False))
+
+        with open(os.path.join(pool_path,
+                               batch_inputs.MANIFEST_BASENAME)) as mfid:
+            manifest = json.load(mfid)
+        self.assertEqual([entry['name'] for entry in manifest],
+                         ['strike_00', 'strike_30'])
+        # the survey given is not changed by the builds
+        self.assertEqual(self.mt_list[0].rotation_angle, 0)
+
+    def test_failed_variant(self):
+        self.variants[1]['mesh']['n_layer'] = 40
+        save_path = make_temp_dir('failed', self._temp_dir)
+        manifest = batch_inputs.build_inputs(self.variants, save_path,
+                                             mt_list=self.mt_list,
+                                             n_workers=1)
+        self.assertEqual(manifest[0]['status'], 'ok')
+        self.assertEqual(manifest[1]['status'], 'failed')
+        self.assertIn('n_layer', manifest[1]['error'])
+
+    def test_ws3dinv(self):
+        save_path = make_temp_dir('ws3dinv', self._temp_dir)
+        variants = [{'name': 'rotated',
+                     'station_list': ['pb23', 'pb25', 'pb27', 'pb29'],
+                     'rotation_angle': 20,
+                     'data': {'period_list': np.logspace(-2, 2, 6)},
+                     'mesh': {'cell_size_east': 2000,
+                              'cell_size_north': 2000}}]
+        manifest = batch_inputs.build_inputs(variants, save_path,
+                                             program='ws3dinv',
+                                             mt_list=self.mt_list,
+                                             n_workers=1)
+        self.assertEqual(manifest[0]['status'], 'ok')
+        self.assertEqual(manifest[0]['stations'],
+                         ['pb23', 'pb25', 'pb27', 'pb29'])
+        for fn in manifest[0]['files'].values():
+            self.assertTrue(os.path.isfile(fn))
+
+    def test_bad_input(self):
+        self.assertRaises(batch_inputs.BatchInputError,
+                          batch_inputs.build_inputs, self.variants,
+                          self._temp_dir, program='occam1d',
+                          mt_list=self.mt_list)
+        self.assertRaises(batch_inputs.BatchInputError,
+                          batch_inputs.build_inputs,
+                          [{'name': 'a'}, {'name': 'a'}], self._temp_dir,
+                          mt_list=self.mt_list)
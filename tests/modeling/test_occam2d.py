@@ -19,6 +19,8 @@ Revision History:
 import os
 from unittest import TestCase
 
+import numpy as np
+
 import mtpy.modeling.occam2d as occam2d
 from tests import EDI_DATA_DIR, SAMPLE_DIR, make_temp_dir
 
@@ -207,3 +209,45 @@ class TestOccam2D(TestCase):
             plt_wait(1)
 
         plt_close()
+
+
+class TestOccam2DModel(TestCase):
+    def setUp(self):
+        self.iter_fn = os.path.join(SAMPLE_DIR, 'Occam2d', 'ITER12.iter')
+
+    def test_model_index(self):
+        model_rows = [[2, 3], [1, 2], [3, 1]]
+        model_columns = [[2, 1, 3], [3, 3], [6]]
+        model_index = occam2d.get_model_index(model_rows, model_columns, 7, 6)
+
+        expected = np.full((7, 6), -1)
+        mm = 0
+        ny1 = 0
+        for row, col in zip(model_rows, model_columns):
+            nx1 = 0
+            for cc in col:
+                expected[ny1:ny1 + row[0], nx1:nx1 + cc] = mm
+                nx1 += cc
+                mm += 1
+            ny1 += row[0]
+        self.assertTrue(np.all(model_index == expected))
+
+        values = np.arange(6) * 10.
+        self.assertTrue(np.all(occam2d.map_model_values(values, model_index) ==
+                               np.where(expected < 0, 0, expected * 10.)))
+        self.assertRaises(occam2d.OccamInputError, occam2d.map_model_values,
+                          values[:4], model_index)
+
+    def test_build_models(self):
+        model = occam2d.Model(self.iter_fn)
+        model.build_model()
+        res_model = model.res_model.copy()
+        self.assertEqual(res_model.shape, (model.plot_z.size,
+                                           model.plot_x.size))
+
+        res_models = model.build_models([self.iter_fn, self.iter_fn])
+        self.assertEqual(res_models.shape, (2,) + res_model.shape)
+        self.assertTrue(np.all(res_models[0] == res_model))
+        self.assertTrue(np.all(res_models[1] == res_model))
+        self.assertIs(occam2d.get_model_grid(model.model_fn),
+                      occam2d.get_model_grid(model.model_fn))
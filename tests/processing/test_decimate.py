@@ -0,0 +1,60 @@
+from unittest import TestCase
+
+import numpy as np
+import scipy.signal as signal
+
+import mtpy.processing.decimate as mtdecimate
+from mtpy.core.ts import MTTS
+
+
+class TestDecimate(TestCase):
+    def setUp(self):
+        np.random.seed(0)
+        self.data = np.random.randn(50001)
+
+    def test_decimation_stages(self):
+        self.assertEqual(mtdecimate.get_decimation_stages(1024), [8, 8, 8, 2])
+        self.assertEqual(mtdecimate.get_decimation_stages(64), [8, 8])
+        self.assertEqual(mtdecimate.get_decimation_stages(33), [11, 3])
+        for dec_factor in range(1, 200):
+            self.assertEqual(
+                np.prod(mtdecimate.get_decimation_stages(dec_factor)),
+                dec_factor)
+
+    def test_matches_resample_poly(self):
+        for dec_factor in [2, 7, 64, 1024]:
+            expected = self.data
+            for factor in mtdecimate.get_decimation_stages(dec_factor):
+                h = np.array(mtdecimate.get_stage_filter(factor, 'float64'))
+                expected = signal.resample_poly(expected, 1, factor, window=h)
+
+            decimated = mtdecimate.decimate(self.data, dec_factor,
+                                            dtype='float64')
+            self.assertEqual(decimated.size, expected.size)
+            self.assertTrue(np.allclose(decimated, expected, atol=1e-12))
+
+    def test_chunks_and_streaming(self):
+        whole = mtdecimate.decimate(self.data, 64, chunk_size=self.data.size)
+        chunked = mtdecimate.decimate(self.data, 64, chunk_size=1000)
+        self.assertEqual(chunked.dtype, np.float32)
+        self.assertTrue(np.allclose(whole, chunked, atol=1e-6))
+
+        decimator = mtdecimate.Decimator(64)
+        streamed = [decimator.process(self.data[ii:ii + 333])
+                    for ii in range(0, self.data.size, 333)]
+        streamed.append(decimator.flush())
+        self.assertTrue(np.allclose(whole, np.concatenate(streamed),
+                                    atol=1e-6))
+
+    def test_mtts_decimate(self):
+        ts_obj = MTTS()
+        ts_obj.ts = np.random.randn(4096 * 16)
+        ts_obj.sampling_rate = 4096
+        ts_obj.start_time_utc = '2020-01-01T00:00:00'
+
+        ts_obj.decimate(1024)
+
+        self.assertEqual(ts_obj.sampling_rate, 4)
+        self.assertEqual(ts_obj.n_samples, 64)
+        self.assertEqual(ts_obj.start_time_utc, '2020-01-01T00:00:00')
+        self.assertEqual(ts_obj.stop_time_utc, '2020-01-01T00:00:15.750000')
@@ -0,0 +1,81 @@
+from unittest import TestCase
+
+import numpy as np
+import scipy.signal as sps
+
+import mtpy.processing.tf as mttf
+
+
+class TestTF(TestCase):
+    def setUp(self):
+        np.random.seed(0)
+        t = np.arange(2000) / 100.
+        self.data = np.sin(2 * np.pi * 5 * t) + 0.3 * np.random.randn(t.size)
+
+    def test_windows(self):
+        tlst = np.arange(0, 1800, 50)
+        windows = mttf.tf_windows(self.data, 128, tlst)
+        self.assertEqual(windows.shape, (tlst.size, 128))
+        self.assertFalse(windows.flags.writeable)
+        for ii, tt in enumerate(tlst):
+            self.assertTrue(np.all(windows[ii] == self.data[tt:tt + 128]))
+        self.assertRaises(ValueError, mttf.tf_windows, self.data, 128,
+                          np.array([0, 10, 30]))
+        self.assertRaises(ValueError, mttf.tf_windows, self.data, 128,
+                          np.array([1900]))
+
+    def test_stft_matches_single_windows(self):
+        nh, tstep, nfbins, ng = 128, 16, 256, 5
+        tfarray, tlst, flst = mttf.stft(self.data, nh=nh, tstep=tstep,
+                                        nfbins=nfbins, ng=ng, df=100.)
+
+        h = mttf.normalize_L2(np.hanning(nh))
+        g = mttf.normalize_L2(np.hanning(ng))
+        fa = sps.hilbert(mttf.dctrend(self.data))
+        for place, ii in enumerate(tlst):
+            FXwin = np.fft.fft(fa[ii:ii + nh] * h, n=nfbins)[:nfbins // 2]
+            FXwin = np.convolve(mttf.padzeros(FXwin, npad=FXwin.size + ng - 1),
+                                g, 'valid')
+            self.assertTrue(np.allclose(tfarray[:, place], FXwin[::-1]))
+
+    def test_wvd_matches_single_windows(self):
+        nh, tstep, nfbins = 63, 32, 128
+        tfarray, tlst, flst = mttf.wvd(self.data, nh=nh, tstep=tstep,
+                                       nfbins=nfbins, df=100.)
+        self.assertEqual(tfarray.shape, (nfbins, tlst.size))
+
+        fa = sps.hilbert(mttf.dctrend(self.data))
+        tau = (nh - 1) // 2
+        for point, nn in enumerate(tlst):
+            tau_min = min(nn, tau, fa.size - nn - 1)
+            tau_lst = np.arange(-tau_min, tau_min + 1)
+            Rnn = 4 * np.conjugate(fa[nn - tau_lst]) * fa[nn + tau_lst]
+            expected = np.fft.fft(mttf.padzeros(Rnn, npad=nfbins)[::-1]) / nh
+            self.assertTrue(np.allclose(tfarray[:, point], expected))
+
+    def test_chunking(self):
+        for func, kwargs in [(mttf.smethod, {'nh': 128, 'nfbins': 256}),
+                             (mttf.spwvd, {'nh': 127, 'ng': 31,
+                                           'nfbins': 256}),
+                             (mttf.robust_stft_median, {'nh': 64,
+                                                        'nfbins': 128})]:
+            whole = func(self.data, tstep=32, **kwargs)
+            chunked = func(self.data, tstep=32, chunk_bytes=1, **kwargs)
+            self.assertTrue(np.allclose(whole[0], chunked[0]))
+            self.assertTrue(np.all(whole[1] == chunked[1]))
+
+    def test_specwv(self):
+        nhs, tstep, nfbins = 128, 48, 256
+        tfarray, tlst, flst = mttf.specwv(self.data, tstep=tstep, nhs=nhs,
+                                          nhwv=127, ngwv=7, nfbins=nfbins,
+                                          df=100.)
+        pst, pst_tlst, pst_flst = mttf.stft(self.data, nh=nhs, tstep=tstep,
+                                            nfbins=nfbins, df=100.)
+        self.assertEqual(tfarray.shape, pst.shape)
+        self.assertTrue(np.all(tlst == pst_tlst))
+        self.assertTrue(np.all(flst == pst_flst))
+
+        # both distributions peak at the 5 Hz sine, rows are in descending
+        # frequency
+        peak = flst[nfbins // 2 - 1 - np.argmax(np.abs(tfarray), axis=0)]
+        self.assertTrue(np.all(np.abs(peak - 5) <= 100. / nfbins))
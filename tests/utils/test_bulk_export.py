@@ -0,0 +1,85 @@
+import csv
+import glob
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+import mtpy.imaging.mtplottools as mtpl
+from mtpy.analysis.pt import PhaseTensor
+from mtpy.utils.bulk_export import SurveyExport, PT_COLUMNS, GIS_COLUMNS, \
+    get_ellipse_polygons
+from tests import EDI_DATA_DIR
+
+
+class TestSurveyExport(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        fn_list = sorted(glob.glob(os.path.join(EDI_DATA_DIR, '*.edi')))[:4]
+        cls.mt_list = mtpl.get_mtlist(fn_list=fn_list)
+        cls.freq_list = cls.mt_list[0].Z.freq[::10]
+        cls.s_export = SurveyExport(cls.mt_list, cls.freq_list, interpolate=False)
+
+    def setUp(self):
+        self.save_path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.save_path)
+
+    def test_attributes(self):
+        s_export = self.s_export
+        self.assertEqual(s_export.phi_min.shape, (len(self.freq_list), len(self.mt_list)))
+        for jj, mt_obj in enumerate(self.mt_list):
+            pt_obj = PhaseTensor(z_object=mt_obj.Z)
+            for ii, freq in enumerate(self.freq_list):
+                index = np.where(np.abs(mt_obj.Z.freq - freq) < freq * 0.05)[0]
+                if index.size == 0:
+                    self.assertFalse(s_export.valid[ii, jj])
+                    continue
+                index = index[0]
+                self.assertTrue(s_export.valid[ii, jj])
+                self.assertAlmostEqual(s_export.phi_min[ii, jj], pt_obj.phimin[index])
+                self.assertAlmostEqual(s_export.phi_max[ii, jj], pt_obj.phimax[index])
+                self.assertAlmostEqual(s_export.azimuth[ii, jj], pt_obj.azimuth[index])
+                self.assertAlmostEqual(s_export.skew[ii, jj], pt_obj.beta[index])
+                self.assertAlmostEqual(s_export.elliptic[ii, jj], pt_obj.ellipticity[index])
+                self.assertAlmostEqual(s_export.tip_mag_re[ii, jj],
+                                       mt_obj.Tipper.mag_real[index])
+                self.assertTrue(np.allclose(s_export.get_column('RHOxy')[ii, jj],
+                                            mt_obj.Z.resistivity[index, 0, 1]))
+
+    def test_write_csv(self):
+        csv_fn = os.path.join(self.save_path, 'phase_tensor.csv')
+        freq_rows = self.s_export.write_csv(csv_fn, PT_COLUMNS, n_workers=2)
+        with open(csv_fn) as csv_file:
+            rows = list(csv.reader(csv_file))
+        self.assertEqual(rows[0], PT_COLUMNS)
+        self.assertEqual(len(rows) - 1, self.s_export.valid.sum())
+        self.assertEqual(len(freq_rows), len(self.freq_list))
+        for freq, f_rows in freq_rows.items():
+            f_fn = os.path.join(self.save_path, 'phase_tensor_{}Hz.csv'.format(freq))
+            with open(f_fn) as csv_file:
+                self.assertEqual(len(list(csv.reader(csv_file))), len(f_rows) + 1)
+
+    def test_ellipses(self):
+        lon = np.array([130., 131.])
+        lat = np.array([-20., -21.])
+        polygons = get_ellipse_polygons(lon, lat, np.array([20., 0.]), np.array([40., 45.]),
+                                        np.array([30., 0.]), 0.1)
+        x, y = np.array(polygons[0].exterior.coords).T
+        self.assertTrue(np.allclose(np.hypot(x - lon[0], y - lat[0]).max(), 0.1))
+        self.assertTrue(np.allclose(np.hypot(x - lon[0], y - lat[0]).min(), 0.05))
+        # a phi_min of 0 is a dot
+        self.assertTrue(polygons[1].area < 1e-14)
+
+    def test_write_gis(self):
+        file_dict = self.s_export.write_gis(self.save_path, 0.01, 0.02, driver='GPKG')
+        gdf = self.s_export.get_tipper_gdf(0.02, component='imag')
+        self.assertEqual(list(gdf.columns), GIS_COLUMNS + ['tip_im'])
+        self.assertEqual(len(gdf), self.s_export.valid.sum())
+        lengths = gdf.geometry.length.values
+        self.assertTrue(np.all(lengths[np.isfinite(lengths)] <= 0.02 + 1e-12))
+        self.assertEqual(set(file_dict.keys()), {'Phase_Tensor', 'Tipper_Real', 'Tipper_Imag'})
+        self.assertTrue(os.path.isfile(file_dict['Phase_Tensor'][0]))
@@ -0,0 +1,109 @@
+import os
+from unittest import TestCase, mock
+
+import numpy as np
+
+from mtpy.utils import dem_tools, gis_tools, mesh_tools
+from mtpy.utils import filehandling as mtfh
+from tests import make_temp_dir
+
+
+class TestDEMTools(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._temp_dir = make_temp_dir(cls.__name__)
+        cls.dem_fn = os.path.join(cls._temp_dir, 'dem.asc')
+        nrows, ncols, cellsize = 150, 170, 0.002
+        lon = 138.5 + cellsize * np.arange(ncols)
+        lat = -34.5 + cellsize * np.arange(nrows)
+        lon, lat = np.meshgrid(lon, lat)
+        # a plane, so linear interpolation is exact
+        cls.elevation = 2000 * (lon - 138.5) - 1000 * (lat + 34.5) + 100
+        cls.elevation[20:25, 30:40] = -9999
+        with open(cls.dem_fn, 'w') as dfid:
+            dfid.write('ncols {0}\nnrows {1}\nxllcorner 138.5\n'
+                       'yllcorner -34.5\ncellsize {2}\n'
+                       'NODATA_value -9999\n'.format(ncols, nrows, cellsize))
+            np.savetxt(dfid, cls.elevation[::-1], fmt='%.3f')
+        cls.elevation[20:25, 30:40] = np.nan
+
+    def test_read_window(self):
+        dem = dem_tools.TiledDEM(self.dem_fn, tile_size=32)
+        self.assertEqual(dem.n_levels, 4)
+        lon, lat, elev = mtfh.read_surface_ascii(self.dem_fn)
+        x, y, window = dem.read_window(lon[0], lon[-1], lat[0], lat[-1])
+        self.assertTrue(np.allclose(x, lon))
+        self.assertTrue(np.allclose(y, lat))
+        self.assertTrue(np.allclose(window, self.elevation, equal_nan=True))
+
+        x, y, window = dem.read_window(lon[50], lon[70], lat[40], lat[45])
+        self.assertTrue(np.allclose(x, lon[50:71]))
+        self.assertTrue(np.allclose(window, self.elevation[40:46, 50:71]))
+
+        # level 1 is the mean of blocks of 2 x 2 cells
+        x, y, window = dem.read_window(lon[0], lon[-1], lat[0], lat[-1],
+                                       level=1)
+        blocks = self.elevation.reshape(75, 2, 85, 2)
+        self.assertTrue(np.allclose(x, lon[0::2] + 0.001))
+        self.assertTrue(np.allclose(window[0:10, 0:10],
+                                    blocks.mean(axis=(1, 3))[0:10, 0:10]))
+        self.assertAlmostEqual(window[12, 15], np.nanmean(blocks[12, :, 15]),
+                               places=3)
+        self.assertTrue(np.isnan(window[10, 17]))
+
+        self.assertRaises(dem_tools.DEMError, dem.read_window, 0, 1, 0, 1)
+
+    def test_cache(self):
+        dem = dem_tools.TiledDEM(self.dem_fn, tile_size=64)
+        header_fn = os.path.join(dem.cache_dir,
+                                 dem_tools.CACHE_HEADER_BASENAME)
+        mtime = os.path.getmtime(header_fn)
+        dem_tools.TiledDEM(self.dem_fn, tile_size=64)
+        self.assertEqual(os.path.getmtime(header_fn), mtime)
+        # a changed DEM file is tiled again
+        os.utime(self.dem_fn, (mtime + 10, mtime + 10))
+        dem_tools.TiledDEM(self.dem_fn, tile_size=64)
+        self.assertNotEqual(os.path.getmtime(header_fn), mtime)
+
+    def test_cache_dir(self):
+        self.assertEqual(dem_tools.get_default_cache_dir(self.dem_fn),
+                         os.path.abspath(self.dem_fn) + '.tiles')
+        # the DEM is in a read only directory
+        user_cache = os.path.join(self._temp_dir, 'user_cache')
+        dem_dir = os.path.dirname(os.path.abspath(self.dem_fn))
+        access = os.access
+        with mock.patch.dict(os.environ, {'XDG_CACHE_HOME': user_cache}), \
+                mock.patch('os.access', lambda path, mode: path != dem_dir and
+                           access(path, mode)):
+            cache_dir = dem_tools.get_default_cache_dir(self.dem_fn)
+            dem = dem_tools.TiledDEM(self.dem_fn, tile_size=64)
+        self.assertEqual(os.path.dirname(cache_dir),
+                         os.path.join(user_cache, 'mtpy', 'dem_tiles'))
+        self.assertEqual(dem.cache_dir, cache_dir)
+        self.assertTrue(os.path.isfile(os.path.join(
+            cache_dir, dem_tools.CACHE_HEADER_BASENAME)))
+
+    def test_interpolate_elevation_to_grid(self):
+        east, north, zone = gis_tools.project_point_ll2utm(-34.35, 138.65,
+                                                           epsg=32754)
+        grid_east = east + np.arange(-5000, 5001, 500.)
+        grid_north = north + np.arange(-3000, 3001, 500.)
+        elev_mg = mesh_tools.interpolate_elevation_to_grid(
+            grid_east, grid_north, epsg=32754, surfacefile=self.dem_fn,
+            method='linear')
+        self.assertEqual(elev_mg.shape, (grid_north.size, grid_east.size))
+
+        grid_east, grid_north = np.meshgrid(grid_east, grid_north)
+        points = gis_tools.project_point_utm2ll(grid_east.flatten(),
+                                                grid_north.flatten(), None,
+                                                epsg=32754)
+        expected = 2000 * (points['longitude'] - 138.5) - \
+            1000 * (points['latitude'] + 34.5) + 100
+        self.assertTrue(np.allclose(elev_mg.flatten(), expected, atol=0.01))
+
+        for method in ['nearest', 'cubic']:
+            elev_mg = dem_tools.interpolate_to_points(
+                self.dem_fn, grid_east, grid_north, epsg=32754,
+                method=method)
+            self.assertTrue(np.allclose(elev_mg.flatten(), expected,
+                                        atol=5))
@@ -0,0 +1,86 @@
+import csv
+import glob
+import json
+import os
+from unittest import TestCase
+
+from mtpy.core.mt import MT
+from mtpy.utils import instrumentation
+from tests import make_temp_dir, EDI_DATA_DIR
+
+
+class TestInstrumentation(TestCase):
+    def setUp(self):
+        self._temp_dir = make_temp_dir(self.__class__.__name__)
+        instrumentation.reset_summary()
+
+    def tearDown(self):
+        instrumentation.disable_tracing()
+        instrumentation.reset_summary()
+
+    def test_disabled(self):
+        @instrumentation.timed('test.disabled')
+        def func():
+            instrumentation.count('records', 3)
+            return 1
+
+        with instrumentation.span('test.block') as block:
+            self.assertEqual(func(), 1)
+        self.assertTrue(block.seconds >= 0)
+        self.assertEqual(instrumentation.get_summary(), {})
+
+    def test_nested_spans(self):
+        records = []
+
+        class Sink(object):
+            def write(self, record):
+                records.append(record)
+
+            def close(self):
+                pass
+
+        @instrumentation.timed()
+        def read():
+            instrumentation.count('records', 2)
+            instrumentation.count('bytes', 10)
+
+        instrumentation.enable_tracing(sink=Sink())
+        with instrumentation.span('test.outer', files=1):
+            read()
+            read()
+        summary = instrumentation.get_summary()
+        name = '{0}.{1}'.format(__name__, read.__qualname__)
+        self.assertEqual(summary[name]['calls'], 2)
+        self.assertEqual(summary[name]['records'], 4)
+        self.assertEqual(summary['test.outer']['files'], 1)
+        self.assertNotIn('records', summary['test.outer'])
+        self.assertEqual([(record['name'], record['parent'], record['depth'])
+                          for record in records],
+                         [(name, 'test.outer', 1), (name, 'test.outer', 1),
+                          ('test.outer', '', 0)])
+
+    def test_trace_files(self):
+        edi_fn = sorted(glob.glob(os.path.join(EDI_DATA_DIR, '*.edi')))[0]
+        json_fn = os.path.join(self._temp_dir, 'trace.json')
+        csv_fn = os.path.join(self._temp_dir, 'trace.csv')
+        instrumentation.enable_tracing(json_fn)
+        instrumentation.enable_tracing(csv_fn)
+        mt_obj = MT(edi_fn)
+        instrumentation.disable_tracing()
+
+        edi_summary = instrumentation.get_summary()['core.edi.read_edi_file']
+        self.assertEqual(edi_summary['calls'], 1)
+        self.assertEqual(edi_summary['bytes'], os.path.getsize(edi_fn))
+        self.assertEqual(edi_summary['records'], mt_obj.Z.freq.size)
+
+        with open(json_fn) as json_file:
+            json_records = [json.loads(line) for line in json_file]
+        with open(csv_fn) as csv_file:
+            csv_records = list(csv.DictReader(csv_file))
+        self.assertEqual([record['name'] for record in json_records],
+                         [record['name'] for record in csv_records])
+        edi_record = [record for record in csv_records
+                      if record['name'] == 'core.edi.read_edi_file'][0]
+        self.assertEqual(edi_record['parent'], 'core.mt.read_mt_file')
+        self.assertIn('bytes={0}'.format(os.path.getsize(edi_fn)),
+                      edi_record['counters'].split(';'))
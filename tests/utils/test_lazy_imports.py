@@ -0,0 +1,61 @@
+import subprocess
+import sys
+from unittest import TestCase
+
+from mtpy.utils.epsg_table import EpsgTable, read_epsg_dict
+
+
+class TestLazyImports(TestCase):
+    def test_import_mt(self):
+        # the optional and slow modules are only imported when they are used
+        code = ("import sys, mtpy.core.mt, mtpy.utils\n"
+                "lazy = ['scipy.stats', 'scipy.interpolate', 'osgeo', 'pyproj']\n"
+                "print([m for m in lazy if m in sys.modules])\n"
+                "print(mtpy.utils.EPSG_DICT.is_loaded)\n")
+        output = subprocess.check_output([sys.executable, '-c', code],
+                                         stderr=subprocess.DEVNULL)
+        self.assertEqual(output.decode().split(), ['[]', 'False'])
+
+    def test_import_modem(self):
+        # the ModEM plotting classes are imported on first access
+        code = ("import sys, mtpy.modeling.modem as modem\n"
+                "lazy = ['mtpy.modeling.modem.plot_response', 'geopandas']\n"
+                "print([m for m in lazy if m in sys.modules])\n"
+                "print(modem.PlotResponse.__module__)\n")
+        output = subprocess.check_output([sys.executable, '-c', code],
+                                         stderr=subprocess.DEVNULL)
+        self.assertEqual(output.decode().split()[-2:],
+                         ['[]', 'mtpy.modeling.modem.plot_response'])
+
+
+class TestEpsgTable(TestCase):
+    def setUp(self):
+        self.n_reads = 0
+
+        def reader():
+            self.n_reads += 1
+            return read_epsg_dict()
+        self.table = EpsgTable(reader)
+
+    def test_read_once(self):
+        self.table[0] = '+proj=longlat +datum=WGS84'
+        self.assertEqual(self.table[0], '+proj=longlat +datum=WGS84')
+        self.assertEqual(self.n_reads, 0)
+        self.assertIn('+zone=55', self.table[28355])
+        self.assertIn(0, self.table)
+        self.assertTrue(len(self.table) > 1000)
+        self.assertEqual(self.n_reads, 1)
+
+    def test_delete(self):
+        self.table[0] = '+proj=longlat +datum=WGS84'
+        del self.table[0]
+        self.assertNotIn(0, self.table)
+        del self.table[28355]
+        self.assertNotIn(28355, self.table)
+        self.assertRaises(KeyError, self.table.__delitem__, 0)
+        self.assertEqual(self.n_reads, 1)
+
+    def test_utm_epsg(self):
+        self.assertEqual(self.table.get_utm_epsg(55, False), 32755)
+        self.assertEqual(self.table.get_utm_epsg(5, True), 32605)
+        self.assertIsNone(self.table.get_utm_epsg(61, True))
@@ -0,0 +1,61 @@
+import glob
+import os
+from unittest import TestCase
+
+import numpy as np
+
+from mtpy.core.mt import MT
+from mtpy.imaging.plot_resphase_maps import PlotResPhaseMaps
+from mtpy.utils.map_gridding import MapGridder
+from tests import EDI_DATA_DIR
+
+
+class TestMapGridder(TestCase):
+    def setUp(self):
+        random_state = np.random.RandomState(0)
+        self.x = random_state.uniform(0, 10, 20)
+        self.y = random_state.uniform(0, 10, 20)
+        self.values = random_state.uniform(0, 1, (20, 3, 2, 2))
+        self.gridder = MapGridder(self.x, self.y)
+
+    def test_grid(self):
+        grid_x, grid_y = self.gridder.get_grid(15, 12)
+        gridded = self.gridder.grid(self.values, grid_x, grid_y, nn=5, p=2)
+        self.assertEqual(gridded.shape, (3, 2, 2, 15 * 12))
+        # same as the inverse distance weights of the 5 nearest stations
+        for kk in (0, 50, 179):
+            distance = np.hypot(self.x - grid_x[kk], self.y - grid_y[kk])
+            nearest = np.argsort(distance)[:5]
+            weights = 1. / distance[nearest] ** 2
+            expected = np.tensordot(weights, self.values[nearest], axes=1) / weights.sum()
+            self.assertTrue(np.allclose(gridded[..., kk], expected))
+        self.assertIs(self.gridder.get_weights(grid_x, grid_y, nn=5, p=2),
+                      self.gridder.get_weights(grid_x.copy(), grid_y.copy(), nn=5, p=2))
+
+    def test_coincident_points(self):
+        values = self.values[:, 0, 0, 0].copy()
+        values[1] = np.nan
+        gridded = self.gridder.grid(values, self.x[:1], self.y[:1])
+        self.assertEqual(gridded[0], values[0])
+
+    def test_hull(self):
+        grid_x, grid_y = self.gridder.get_grid(20, 20)
+        triangulation = self.gridder.get_triangulation(grid_x, grid_y)
+        self.assertTrue(triangulation.mask.any() and not triangulation.mask.all())
+        self.assertTrue(self.gridder.in_hull(self.x.mean(), self.y.mean()))
+        self.assertFalse(np.any(self.gridder.in_hull([-1., 11.], [5., 5.])))
+        # collinear stations have no hull, the whole grid is used
+        gridder = MapGridder(np.arange(5.), np.arange(5.))
+        self.assertIsNone(gridder.hull)
+        self.assertTrue(np.all(gridder.in_hull(grid_x, grid_y)))
+
+    def test_plot_gridder_cache(self):
+        fn_list = sorted(glob.glob(os.path.join(EDI_DATA_DIR, '*.edi')))
+        plot_obj = PlotResPhaseMaps(fn_list=fn_list[:6], plot_yn='n')
+        gridder = plot_obj.get_gridder()
+        self.assertIs(plot_obj.get_gridder(), gridder)
+        # another survey with as many stations
+        plot_obj.mt_list = [MT(fn) for fn in fn_list[6:12]]
+        new_gridder = plot_obj.get_gridder()
+        self.assertIsNot(new_gridder, gridder)
+        self.assertTrue(np.allclose(new_gridder.x, [mt_obj.lon for mt_obj in plot_obj.mt_list]))
@@ -0,0 +1,46 @@
+from unittest import TestCase
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+from mtpy.utils.matplotlib_utils import SliceCache, blit_axes, update_mesh
+
+
+class TestSliceCache(TestCase):
+    def setUp(self):
+        self.res_model = 10 ** np.random.RandomState(0).uniform(0, 4, (5, 6, 7))
+
+    def test_get_slice(self):
+        cache = SliceCache(self.res_model, max_slices=2)
+        self.assertTrue(np.allclose(cache.get_slice(0, 1), np.log10(self.res_model[1])))
+        self.assertTrue(np.allclose(cache.get_slice(1, 2), np.log10(self.res_model[:, 2])))
+        self.assertTrue(np.allclose(cache.get_slice(2, 3), np.log10(self.res_model[:, :, 3])))
+        # only the last two slices are kept
+        self.assertEqual(list(cache._slices.keys()), [(1, 2), (2, 3)])
+        self.assertIs(cache.get_slice(1, 2), cache.get_slice(1, 2))
+
+    def test_clear(self):
+        cache = SliceCache(self.res_model)
+        old_slice = cache.get_slice(2, 0)
+        self.res_model[:, :, 0] = 100.
+        self.assertIs(cache.get_slice(2, 0), old_slice)
+        cache.clear()
+        self.assertTrue(np.allclose(cache.get_slice(2, 0), 2))
+
+
+class TestUpdateMesh(TestCase):
+    def test_update_mesh(self):
+        x_mesh, y_mesh = np.meshgrid(np.arange(4), np.arange(3), indexing='ij')
+        fig, ax = plt.subplots()
+        mesh = ax.pcolormesh(x_mesh, y_mesh, np.zeros((3, 2)))
+        fig.canvas.draw()
+        values = np.arange(6.).reshape(3, 2)
+        update_mesh(mesh, x_mesh, values)
+        self.assertTrue(np.all(mesh.get_array() == values.ravel()))
+        # values the size of the coordinates are trimmed like pcolormesh does
+        update_mesh(mesh, x_mesh, np.ones((4, 3)))
+        self.assertTrue(np.all(mesh.get_array() == 1))
+        blit_axes(ax)
+        plt.close(fig)
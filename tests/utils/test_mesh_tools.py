@@ -0,0 +1,109 @@
+from unittest import TestCase
+
+import numpy as np
+
+import mtpy.utils.mesh_tools as mtmesh
+
+
+class TestMeshTools(TestCase):
+    def setUp(self):
+        np.random.seed(0)
+        self.grid_east = np.linspace(-5000, 5000, 21)
+        self.grid_north = np.linspace(-4000, 4000, 17)
+        self.grid_z = np.array([0, 10, 30, 60, 100, 150, 250, 400, 600.])
+
+    def test_get_layer_mask(self):
+        shape = (self.grid_north.size - 1, self.grid_east.size - 1)
+        top = np.random.uniform(-20, 200, shape)
+        bottom = top + np.random.uniform(0, 300, shape)
+        mask = mtmesh.get_layer_mask(self.grid_z, top, bottom)
+
+        gcz = mtmesh.grid_centre(self.grid_z)
+        expected = np.zeros(shape + (gcz.size,), dtype=bool)
+        for ii in range(shape[0]):
+            for jj in range(shape[1]):
+                expected[ii, jj] = (gcz > top[ii, jj]) & \
+                                   (gcz <= bottom[ii, jj])
+        self.assertTrue(np.all(mask == expected))
+
+    def test_get_cell_index(self):
+        locations = np.random.uniform(-4999, 4999, 50)
+        index = mtmesh.get_cell_index(self.grid_east, locations)
+        for loc, ii in zip(locations, index):
+            self.assertTrue(self.grid_east[ii] < loc <= self.grid_east[ii + 1])
+        self.assertRaises(ValueError, mtmesh.get_cell_index, self.grid_east,
+                          np.array([0, 6000]))
+
+    def test_get_station_cells(self):
+        station_east = np.random.uniform(-4999, 4999, 50)
+        station_north = np.random.uniform(-3999, 3999, 50)
+        station_z = np.random.uniform(-50, 700, 50)
+        index_east, index_north, index_z = mtmesh.get_station_cells(
+            self.grid_east, self.grid_north, station_east, station_north,
+            grid_z=self.grid_z, station_z=station_z)
+        self.assertTrue(np.all(index_east == mtmesh.get_cell_index(self.grid_east, station_east)))
+        self.assertTrue(np.all(index_north == mtmesh.get_cell_index(self.grid_north, station_north)))
+        # stations above and below the mesh are in the top and bottom layers
+        self.assertTrue(np.all(index_z[station_z <= 0] == 0))
+        self.assertTrue(np.all(index_z[station_z > 600] == self.grid_z.size - 2))
+        inside = (station_z > 0) & (station_z <= 600)
+        self.assertTrue(np.all(index_z[inside] == mtmesh.get_cell_index(self.grid_z, station_z[inside])))
+
+        # a station outside of the mesh is in no cell
+        index_east, index_north, index_z = mtmesh.get_station_cells(
+            self.grid_east, self.grid_north, [100., 5500., -2000.], [200., 0., -4000.],
+            grid_z=self.grid_z, station_z=[10., 10., 10.])
+        self.assertEqual(index_east.tolist(), [10, -1, -1])
+        self.assertEqual(index_north.tolist(), [8, -1, -1])
+        self.assertEqual(index_z.tolist(), [0, -1, -1])
+
+        # cell centres of a rotated mesh are in their own cells
+        origin = (500000., 7000000.)
+        for angle in [30., -75.]:
+            xg, yg = mtmesh.rotate_mesh(self.grid_east, self.grid_north, origin,
+                                        angle, return_centre=True)
+            index_east, index_north, index_z = mtmesh.get_station_cells(
+                self.grid_east, self.grid_north, xg.ravel(), yg.ravel(),
+                origin=origin, rotation_angle=angle)
+            expected_east, expected_north = np.meshgrid(np.arange(self.grid_east.size - 1),
+                                                        np.arange(self.grid_north.size - 1))
+            self.assertTrue(np.all(index_east == expected_east.ravel()))
+            self.assertTrue(np.all(index_north == expected_north.ravel()))
+            self.assertIsNone(index_z)
+
+    def test_move_nodes_off_stations(self):
+        locations = np.array([-2990., 1005., 2490., 4200.])
+        grid = mtmesh.move_nodes_off_stations(self.grid_east, locations, 20.)
+        self.assertTrue(np.all(grid[[4, 12, 15]] == [-3020, 980, 2520]))
+        self.assertTrue(np.all(np.delete(grid, [4, 12, 15]) ==
+                               np.delete(self.grid_east, [4, 12, 15])))
+        self.assertTrue(np.all(np.abs(grid[:, None] - locations).min(axis=0) >= 20))
+
+    def test_get_station_buffer(self):
+        station_east = np.array([-2000, 1500.])
+        station_north = np.array([0, 2000.])
+        where = mtmesh.get_station_buffer(self.grid_east, self.grid_north,
+                                          station_east, station_north,
+                                          buf=1200)
+        xgrid, ygrid = np.meshgrid(self.grid_east, self.grid_north)
+        expected = np.any([np.hypot(xgrid - xs, ygrid - ys) < 1200
+                           for xs, ys in zip(station_east, station_north)],
+                          axis=0)
+        self.assertTrue(np.all(where == expected))
+
+    def test_get_nearest_cells(self):
+        from scipy.spatial import cKDTree
+
+        centres = [mtmesh.grid_centre(grid) for grid in
+                   [self.grid_north, self.grid_east, self.grid_z]]
+        mgn, mge, mgz = np.meshgrid(*centres, indexing='ij')
+        tree = cKDTree(np.vstack([mgn.ravel(), mge.ravel(), mgz.ravel()]).T)
+        locations = np.column_stack([np.random.uniform(-5000, 5000, 200),
+                                     np.random.uniform(-6000, 6000, 200),
+                                     np.random.uniform(-50, 700, 200)])
+        for k in [1, 5]:
+            distance, index = mtmesh.get_nearest_cells(centres, locations, k=k)
+            expected_distance, expected_index = tree.query(locations, k=k)
+            self.assertEqual(index.shape, expected_index.shape)
+            self.assertTrue(np.allclose(distance, expected_distance))
+            self.assertTrue(np.all(index == expected_index))